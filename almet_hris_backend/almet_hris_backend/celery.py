@@ -1,6 +1,7 @@
 import os
 from celery import Celery
 from celery.schedules import crontab
+from kombu import Exchange, Queue
 
 # Set default Django settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'almet_hris_backend.settings')
@@ -13,38 +14,120 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Auto-discover tasks from all installed apps
 app.autodiscover_tasks()
 
+# ==================== QUEUES & ROUTING ====================
+# One queue per workload so a burst of one kind cannot starve the others.
+# Run a worker per queue with its own concurrency, e.g.:
+#   celery -A almet_hris_backend worker -Q email_transactional -c 4
+#   celery -A almet_hris_backend worker -Q email_bulk -c 2
+#   celery -A almet_hris_backend worker -Q scans -c 1
+#   celery -A almet_hris_backend worker -Q recalc -c 1
+#   celery -A almet_hris_backend worker -Q default -c 2
+# (or a single worker with -Q default,email_transactional,email_bulk,scans,recalc)
+
+app.conf.task_default_queue = 'default'
+app.conf.task_queues = (
+    Queue('default', Exchange('default'), routing_key='default'),
+    Queue('email_transactional', Exchange('email_transactional'), routing_key='email_transactional'),
+    Queue('email_bulk', Exchange('email_bulk'), routing_key='email_bulk'),
+    Queue('scans', Exchange('scans'), routing_key='scans'),
+    Queue('recalc', Exchange('recalc'), routing_key='recalc'),
+)
+
+app.conf.task_routes = {
+    # Single notifications triggered by user actions
+    'api.tasks.deliver_outbox_emails': {'queue': 'email_transactional'},
+    'api.tasks.send_position_change_email': {'queue': 'email_transactional'},
+    'api.tasks.send_birthday_notification': {'queue': 'email_transactional'},
+    'api.tasks.send_anniversary_notification': {'queue': 'email_transactional'},
+    'api.tasks.send_welcome_email_task': {'queue': 'email_transactional'},
+    # Announcements / all-staff mail
+    'api.tasks.deliver_bulk_outbox_emails': {'queue': 'email_bulk'},
+    'api.tasks.send_daily_celebration_notifications': {'queue': 'email_bulk'},
+    'api.tasks.send_training_assignment_notifications': {'queue': 'email_bulk'},
+    'api.tasks.send_job_description_assignment_notifications': {'queue': 'email_bulk'},
+    # Periodic scans
+    'api.tasks.resignation_exit_tasks.*': {'queue': 'scans'},
+    # Heavy recalculation
+    'api.tasks.update_all_employee_statuses': {'queue': 'recalc'},
+    'api.tasks.accrue_monthly_timeoff': {'queue': 'recalc'},
+    'api.tasks.reconcile_training_progress': {'queue': 'recalc'},
+}
+
+# Per-worker rate limits (Graph throttles per mailbox)
+app.conf.task_annotations = {
+    'api.tasks.deliver_outbox_emails': {'rate_limit': '60/m'},
+    'api.tasks.deliver_bulk_outbox_emails': {'rate_limit': '10/m'},
+    'api.tasks.send_position_change_email': {'rate_limit': '30/m'},
+    'api.tasks.send_birthday_notification': {'rate_limit': '30/m'},
+    'api.tasks.send_anniversary_notification': {'rate_limit': '30/m'},
+    'api.tasks.send_welcome_email_task': {'rate_limit': '30/m'},
+    'api.tasks.update_all_employee_statuses': {'rate_limit': '2/m'},
+}
+
 # Configure periodic tasks
+# DatabaseScheduler syncs these into PeriodicTask rows; it reads 'expire_seconds'
+# from the options (a plain 'expires' is dropped)
 app.conf.beat_schedule = {
     # ==================== EMPLOYEE STATUS UPDATES ====================
     'update-employee-statuses-daily': {
         'task': 'api.tasks.update_all_employee_statuses',
         'schedule': crontab(hour=1, minute=0),
+        'options': {'expire_seconds': 60 * 50},
     },
     'update-employee-statuses-hourly': {
         'task': 'api.tasks.update_all_employee_statuses',
         'schedule': crontab(minute=0),
+        'options': {'expire_seconds': 60 * 50},  # Drop if not started before the next run
     },
     'check-expiring-contracts': {
         'task': 'api.tasks.resignation_exit_tasks.check_expiring_contracts',
         'schedule': crontab(minute='*/2'),   # Daily at 10 AM
+        'options': {'expire_seconds': 110},
     },
     'check-probation-reviews': {
         'task': 'api.tasks.resignation_exit_tasks.check_probation_reviews',
         'schedule': crontab(minute='*/2'),   # Daily at 10:30 AM
+        'options': {'expire_seconds': 110},
+    },
+    'sync-employee-due-events': {
+        'task': 'api.tasks.resignation_exit_tasks.sync_employee_due_events',
+        'schedule': crontab(hour=0, minute=30),  # Nightly re-sync of the due-date index
+        'options': {'expire_seconds': 60 * 60},
     },
     'send-resignation-reminders': {
         'task': 'api.tasks.resignation_exit_tasks.send_resignation_reminders',
         'schedule': crontab(hour=9, minute=0),  # Daily at 10 AM
+        'options': {'expire_seconds': 60 * 60},
     },
     'send-exit-interview-reminders': {
         'task': 'api.tasks.resignation_exit_tasks.send_exit_interview_reminders',
         'schedule': crontab(hour=9, minute=0),  # Daily at 10:30 AM
+        'options': {'expire_seconds': 60 * 60},
+    },
+    # ==================== TIME OFF ====================
+    'accrue-monthly-timeoff': {
+        'task': 'api.tasks.accrue_monthly_timeoff',
+        'schedule': crontab(hour=0, minute=15),  # Daily; no-op after the month's first run
+        'options': {'expire_seconds': 60 * 60},
+    },
+    # ==================== TRAINING ====================
+    'reconcile-training-progress': {
+        'task': 'api.tasks.reconcile_training_progress',
+        'schedule': crontab(hour=0, minute=45),
+        'options': {'expire_seconds': 60 * 60},
+    },
+    # ==================== EMAIL OUTBOX ====================
+    'deliver-outbox-emails': {
+        'task': 'api.tasks.deliver_outbox_emails',
+        'schedule': crontab(minute='*'),  # Every minute (retries / missed deliveries)
+        'options': {'expire_seconds': 50},
     },
     # ==================== CELEBRATION NOTIFICATIONS ====================
     'send-daily-celebrations': {
     'task': 'api.tasks.send_daily_celebration_notifications',
     # 'schedule': crontab(minute='*/2'),       # 🧪 TEST: Every 2 minutes
     'schedule': crontab(hour=9, minute=0),  # Daily at 9 AM
+    'options': {'expire_seconds': 60 * 60 * 3},
 },
 }
 
@@ -171,6 +171,19 @@ MICROSOFT_CLIENT_ID = os.getenv('MICROSOFT_CLIENT_ID', '')
 MICROSOFT_TENANT_ID = os.getenv('MICROSOFT_TENANT_ID', '')
 AZURE_CLIENT_SECRET = os.getenv('AZURE_CLIENT_SECRET', '')
 
+# Microsoft Graph API (endpoint can point at a local fake server for testing)
+MICROSOFT_GRAPH_ENDPOINT = os.getenv('MICROSOFT_GRAPH_ENDPOINT', 'https://graph.microsoft.com/v1.0')
+GRAPH_BULK_MAX_WORKERS = int(os.getenv('GRAPH_BULK_MAX_WORKERS', '4'))
+GRAPH_CLIENT = {
+    'POOL_SIZE': int(os.getenv('GRAPH_POOL_SIZE', '20')),
+    'CONNECT_TIMEOUT': 5,
+    'READ_TIMEOUT': 30,
+    'MAX_RETRIES': 3,
+    'BACKOFF_FACTOR': 0.5,
+    'RETRY_STATUS_CODES': (429, 500, 502, 503, 504),
+    'SLOW_CALL_MS': 5000,
+}
+
 # CORS settings - Frontend üçün
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -273,6 +286,7 @@ GRADING_SYSTEM_SETTINGS = {
    
     'MAX_SCENARIOS_PER_SYSTEM': 50,  # Limit scenarios per grading system
     'AUTO_ARCHIVE_DAYS': 365,  # Auto archive old scenarios after 1 year
+    'MAX_SWEEP_POINTS': 10000,  # Max combinations evaluated by one what-if sweep
 }
 
 # Cache Configuration (for better performance with PostgreSQL)
@@ -293,6 +307,9 @@ SESSION_COOKIE_AGE = 3600  # 1 hour
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Pre-rendered job description PDFs (outside MEDIA_ROOT: not publicly served)
+JOB_DESCRIPTION_PDF_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'job_description_pdfs')
+
 # File Upload Settings
 DATA_UPLOAD_MAX_MEMORY_SIZE = 524288000  # 500MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 524288000  # 500MB
@@ -0,0 +1,236 @@
+# api/assessment_analytics.py - Assessment dashboard analytics
+
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count, Prefetch, Q
+
+from .assessment_permissions import get_assessment_access
+from .competency_assessment_models import (
+    EmployeeCoreAssessment, EmployeeBehavioralAssessment, EmployeeLeadershipAssessment,
+    EmployeeCoreCompetencyRating, EmployeeBehavioralCompetencyRating,
+    EmployeeLeadershipCompetencyRating
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AssessmentAnalyticsService:
+    """
+    Summary statistics for core, behavioral and leadership assessments.
+
+    Status counts are one conditional aggregate per assessment family, recent
+    and top lists are fetched with their related rows up front, and the whole
+    summary is cached per access scope. Any assessment save/delete bumps the
+    cache version (see api.signals).
+    """
+
+    CACHE_PREFIX = 'assessment_analytics'
+    VERSION_KEY = 'assessment_analytics:version'
+    CACHE_TIMEOUT = 60 * 10
+    LIST_LIMIT = 5
+
+    FAMILIES = {
+        'core': EmployeeCoreAssessment,
+        'behavioral': EmployeeBehavioralAssessment,
+        'leadership': EmployeeLeadershipAssessment,
+    }
+
+    def __init__(self, user, access=None):
+        self.user = user
+        self.access = access if access is not None else get_assessment_access(user)
+
+    # ------------------------------------------------------------------
+    # Scope / cache
+    # ------------------------------------------------------------------
+
+    def scope_queryset(self, queryset):
+        """Same rules as filter_assessment_queryset, without re-resolving access"""
+        if self.access['can_view_all']:
+            return queryset
+        if self.access['accessible_employee_ids']:
+            return queryset.filter(employee_id__in=self.access['accessible_employee_ids'])
+        return queryset.none()
+
+    def scope_key(self):
+        if self.access['can_view_all']:
+            return 'all'
+        ids = sorted(self.access['accessible_employee_ids'] or [])
+        if not ids:
+            return 'none'
+        return hashlib.md5(','.join(map(str, ids)).encode()).hexdigest()
+
+    @classmethod
+    def _version(cls):
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            version = 1
+            cache.set(cls.VERSION_KEY, version, None)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        try:
+            cache.incr(cls.VERSION_KEY)
+        except ValueError:
+            cache.set(cls.VERSION_KEY, 1, None)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def status_counts(self):
+        """{'core': {'total', 'completed'}, ...} - one aggregate query per family"""
+        counts = {}
+        for family, model in self.FAMILIES.items():
+            counts[family] = self.scope_queryset(model.objects.all()).aggregate(
+                total=Count('id'),
+                completed=Count('id', filter=Q(status='COMPLETED'))
+            )
+        return counts
+
+    @staticmethod
+    def with_related(family, queryset):
+        """Attach everything the full assessment serializers read"""
+        if family == 'core':
+            return queryset.select_related(
+                'employee', 'position_assessment'
+            ).prefetch_related(
+                Prefetch(
+                    'competency_ratings',
+                    queryset=EmployeeCoreCompetencyRating.objects.select_related('skill__group')
+                )
+            )
+        if family == 'behavioral':
+            return queryset.select_related(
+                'employee', 'position_assessment__position_group'
+            ).prefetch_related(
+                Prefetch(
+                    'competency_ratings',
+                    queryset=EmployeeBehavioralCompetencyRating.objects.select_related(
+                        'behavioral_competency__group'
+                    )
+                )
+            )
+        return queryset.select_related(
+            'employee', 'position_assessment__position_group'
+        ).prefetch_related(
+            Prefetch(
+                'competency_ratings',
+                queryset=EmployeeLeadershipCompetencyRating.objects.select_related(
+                    'leadership_item__child_group__main_group'
+                )
+            )
+        )
+
+    def recent(self, family):
+        queryset = self.scope_queryset(self.FAMILIES[family].objects.all())
+        return self.with_related(family, queryset).order_by('-created_at')[:self.LIST_LIMIT]
+
+    def top_core(self):
+        assessments = self.scope_queryset(
+            EmployeeCoreAssessment.objects.filter(status='COMPLETED')
+        ).select_related('employee').only(
+            'completion_percentage', 'assessment_date', 'employee',
+            'employee__full_name', 'employee__employee_id'
+        ).order_by('-completion_percentage')[:self.LIST_LIMIT]
+
+        return [
+            {
+                'employee_name': assessment.employee.full_name,
+                'employee_id': assessment.employee.employee_id,
+                'completion_percentage': assessment.completion_percentage,
+                'assessment_date': assessment.assessment_date
+            }
+            for assessment in assessments
+        ]
+
+    def top_behavioral(self):
+        assessments = self.scope_queryset(
+            EmployeeBehavioralAssessment.objects.filter(status='COMPLETED')
+        ).select_related('employee').only(
+            'overall_percentage', 'overall_letter_grade', 'assessment_date', 'employee',
+            'employee__full_name', 'employee__employee_id'
+        ).order_by('-overall_percentage')[:self.LIST_LIMIT]
+
+        return [
+            {
+                'employee_name': assessment.employee.full_name,
+                'employee_id': assessment.employee.employee_id,
+                'overall_percentage': assessment.overall_percentage,
+                'overall_letter_grade': assessment.overall_letter_grade,
+                'assessment_date': assessment.assessment_date
+            }
+            for assessment in assessments
+        ]
+
+    def top_leadership(self):
+        assessments = self.scope_queryset(
+            EmployeeLeadershipAssessment.objects.filter(status='COMPLETED')
+        ).select_related('employee__position_group').only(
+            'overall_percentage', 'overall_letter_grade', 'assessment_date', 'employee',
+            'employee__full_name', 'employee__employee_id', 'employee__job_title',
+            'employee__position_group', 'employee__position_group__name'
+        ).order_by('-overall_percentage')[:self.LIST_LIMIT]
+
+        return [
+            {
+                'employee_name': assessment.employee.full_name,
+                'employee_id': assessment.employee.employee_id,
+                'job_title': assessment.employee.job_title,
+                'position_group': (
+                    assessment.employee.position_group.get_name_display()
+                    if assessment.employee.position_group else None
+                ),
+                'overall_percentage': assessment.overall_percentage,
+                'overall_letter_grade': assessment.overall_letter_grade,
+                'assessment_date': assessment.assessment_date
+            }
+            for assessment in assessments
+        ]
+
+    # ------------------------------------------------------------------
+    # Summary
+    # ------------------------------------------------------------------
+
+    def build_summary(self):
+        from .competency_assessment_serializers import (
+            EmployeeCoreAssessmentSerializer, EmployeeBehavioralAssessmentSerializer,
+            EmployeeLeadershipAssessmentSerializer
+        )
+
+        counts = self.status_counts()
+        total = {family: data['total'] for family, data in counts.items()}
+        completed = {family: data['completed'] for family, data in counts.items()}
+        access = self.access
+
+        return {
+            'user_access': {
+                'role': 'Admin' if access['can_view_all'] else ('Manager' if access['is_manager'] else 'Employee'),
+                'can_view_all': access['can_view_all'],
+                'accessible_employees_count': len(access['accessible_employee_ids']) if access['accessible_employee_ids'] else 'All'
+            },
+            'summary_statistics': {
+                'total_core_assessments': total['core'],
+                'total_behavioral_assessments': total['behavioral'],
+                'total_leadership_assessments': total['leadership'],
+                'completed_assessments': sum(completed.values()),
+                'pending_assessments': sum(total.values()) - sum(completed.values())
+            },
+            'recent_core_assessments': EmployeeCoreAssessmentSerializer(self.recent('core'), many=True).data,
+            'recent_behavioral_assessments': EmployeeBehavioralAssessmentSerializer(self.recent('behavioral'), many=True).data,
+            'recent_leadership_assessments': EmployeeLeadershipAssessmentSerializer(self.recent('leadership'), many=True).data,
+            'top_core_performers': self.top_core(),
+            'top_behavioral_performers': self.top_behavioral(),
+            'top_leadership_performers': self.top_leadership()
+        }
+
+    def get_summary(self):
+        """Cached summary for this user's access scope"""
+        key = f"{self.CACHE_PREFIX}:{self._version()}:summary:{self.scope_key()}"
+        summary = cache.get(key)
+        if summary is None:
+            summary = self.build_summary()
+            cache.set(key, summary, self.CACHE_TIMEOUT)
+        return summary
@@ -0,0 +1,259 @@
+# api/assessment_campaigns.py - Bulk assessment creation from position templates
+
+from collections import defaultdict
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Employee
+from .competency_assessment_models import (
+    PositionCoreAssessment, PositionBehavioralAssessment, PositionLeadershipAssessment,
+    EmployeeCoreAssessment, EmployeeBehavioralAssessment, EmployeeLeadershipAssessment,
+    EmployeeCoreCompetencyRating, EmployeeBehavioralCompetencyRating,
+    EmployeeLeadershipCompetencyRating
+)
+
+logger = logging.getLogger(__name__)
+
+LEADERSHIP_KEYWORDS = [
+    'MANAGER',
+    'VICE CHAIRMAN',
+    'VICE_CHAIRMAN',
+    'DIRECTOR',
+    'VICE',
+    'HOD'
+]
+
+
+def is_leadership_position(position_group):
+    """Same check as PositionLeadershipAssessment.clean / get_for_employee"""
+    if not position_group:
+        return False
+    position_name = position_group.name.upper().replace('_', ' ').strip()
+    return any(
+        keyword.upper().replace('_', ' ') == position_name or
+        keyword.upper() == position_group.name.upper()
+        for keyword in LEADERSHIP_KEYWORDS
+    )
+
+
+class AssessmentCampaignService:
+    """
+    Launch DRAFT assessments for a population in one operation.
+
+    Templates are resolved for all employees from a single template query per
+    family (same matching rules as the get_for_employee endpoints), then
+    assessments and their rating rows are bulk-created. Rating rows are seeded
+    with the template's required levels and the lowest actual level of the
+    scale. Because every assessment built from one template starts out
+    identical, scores are calculated once per template and copied to the rest.
+    """
+
+    BATCH_SIZE = 500
+
+    FAMILIES = {
+        'core': {
+            'template_model': PositionCoreAssessment,
+            'assessment_model': EmployeeCoreAssessment,
+            'rating_model': EmployeeCoreCompetencyRating,
+            'rating_field': 'skill',
+            'min_actual_level': 0,
+            'score_fields': [
+                'total_position_score', 'total_employee_score', 'gap_score',
+                'completion_percentage', 'group_scores'
+            ],
+        },
+        'behavioral': {
+            'template_model': PositionBehavioralAssessment,
+            'assessment_model': EmployeeBehavioralAssessment,
+            'rating_model': EmployeeBehavioralCompetencyRating,
+            'rating_field': 'behavioral_competency',
+            'min_actual_level': 1,
+            'score_fields': ['group_scores', 'overall_percentage', 'overall_letter_grade'],
+        },
+        'leadership': {
+            'template_model': PositionLeadershipAssessment,
+            'assessment_model': EmployeeLeadershipAssessment,
+            'rating_model': EmployeeLeadershipCompetencyRating,
+            'rating_field': 'leadership_item',
+            'min_actual_level': 1,
+            'score_fields': [
+                'main_group_scores', 'child_group_scores',
+                'overall_percentage', 'overall_letter_grade'
+            ],
+        },
+    }
+
+    def __init__(self, user, access):
+        self.user = user
+        self.access = access
+
+    # ------------------------------------------------------------------
+    # Template resolution
+    # ------------------------------------------------------------------
+
+    def _load_templates(self, family, employees):
+        """Active templates for the population's position groups, with ratings"""
+        config = self.FAMILIES[family]
+        position_group_ids = {emp.position_group_id for emp in employees if emp.position_group_id}
+        rating_field = config['rating_field']
+
+        templates = config['template_model'].objects.filter(
+            position_group_id__in=position_group_ids,
+            is_active=True
+        ).prefetch_related('competency_ratings').order_by('pk')
+
+        return [
+            (template, [(getattr(r, f'{rating_field}_id'), r.required_level) for r in template.competency_ratings.all()])
+            for template in templates
+        ]
+
+    def resolve_templates(self, family, employees):
+        """Return {employee_id: (template, template_ratings)} and {employee_id: reason}"""
+        templates = self._load_templates(family, employees)
+        resolved = {}
+        missing = {}
+
+        if family == 'core':
+            by_title = {}
+            for template, ratings in templates:
+                key = (template.position_group_id, (template.job_title or '').lower())
+                by_title.setdefault(key, (template, ratings))
+
+            for emp in employees:
+                match = by_title.get((emp.position_group_id, (emp.job_title or '').lower()))
+                if match:
+                    resolved[emp.id] = match
+                else:
+                    missing[emp.id] = f'No core assessment template found for {emp.job_title}'
+            return resolved, missing
+
+        by_position = defaultdict(list)
+        for template, ratings in templates:
+            by_position[template.position_group_id].append((template, ratings))
+
+        for emp in employees:
+            if family == 'leadership' and not is_leadership_position(emp.position_group):
+                missing[emp.id] = 'Not a leadership position'
+                continue
+
+            match = next(
+                (
+                    (template, ratings) for template, ratings in by_position.get(emp.position_group_id, [])
+                    if emp.grading_level in (template.grade_levels or [])
+                ),
+                None
+            )
+            if match:
+                resolved[emp.id] = match
+            else:
+                missing[emp.id] = f'No {family} assessment template found (Grade {emp.grading_level})'
+
+        return resolved, missing
+
+    # ------------------------------------------------------------------
+    # Launch
+    # ------------------------------------------------------------------
+
+    def get_population(self, employee_ids):
+        employees = Employee.objects.filter(id__in=employee_ids).select_related('position_group')
+        if not self.access['can_view_all']:
+            employees = employees.filter(id__in=self.access['accessible_employee_ids'] or [])
+        return list(employees)
+
+    def launch(self, employee_ids, families, assessment_date=None, notes='', skip_existing_drafts=True):
+        employees = self.get_population(employee_ids)
+        found_ids = {emp.id for emp in employees}
+        assessment_date = assessment_date or timezone.now()
+
+        result = {
+            'created': {family: 0 for family in families},
+            'skipped': [
+                {'employee_id': emp_id, 'assessment_type': None, 'reason': 'Employee not found or not accessible'}
+                for emp_id in employee_ids if emp_id not in found_ids
+            ]
+        }
+
+        with transaction.atomic():
+            for family in families:
+                created, skipped = self._launch_family(
+                    family, employees, assessment_date, notes, skip_existing_drafts
+                )
+                result['created'][family] = created
+                result['skipped'].extend(skipped)
+
+        from .assessment_analytics import AssessmentAnalyticsService
+        transaction.on_commit(AssessmentAnalyticsService.invalidate)
+
+        result['total_created'] = sum(result['created'].values())
+        result['total_skipped'] = len(result['skipped'])
+        return result
+
+    def _launch_family(self, family, employees, assessment_date, notes, skip_existing_drafts):
+        config = self.FAMILIES[family]
+        assessment_model = config['assessment_model']
+        rating_model = config['rating_model']
+        rating_field = config['rating_field']
+
+        skipped = []
+        resolved, missing = self.resolve_templates(family, employees)
+        for emp_id, reason in missing.items():
+            skipped.append({'employee_id': emp_id, 'assessment_type': family, 'reason': reason})
+
+        if skip_existing_drafts and resolved:
+            existing = set(assessment_model.objects.filter(
+                employee_id__in=resolved.keys(), status='DRAFT'
+            ).values_list('employee_id', flat=True))
+            for emp_id in existing:
+                resolved.pop(emp_id, None)
+                skipped.append({
+                    'employee_id': emp_id, 'assessment_type': family,
+                    'reason': 'Draft assessment already exists'
+                })
+
+        if not resolved:
+            return 0, skipped
+
+        assessments = []
+        ratings = []
+        by_template = defaultdict(list)
+        for emp_id, (template, template_ratings) in resolved.items():
+            assessment = assessment_model(
+                employee_id=emp_id,
+                position_assessment=template,
+                assessment_date=assessment_date,
+                status='DRAFT',
+                notes=notes
+            )
+            assessments.append(assessment)
+            by_template[template.pk].append(assessment)
+
+            for item_id, required_level in template_ratings:
+                rating = rating_model(
+                    assessment=assessment,
+                    required_level=required_level,
+                    actual_level=config['min_actual_level']
+                )
+                setattr(rating, f'{rating_field}_id', item_id)
+                if family == 'core':
+                    # bulk_create skips save(), which normally sets gap
+                    rating.gap = rating.actual_level - rating.required_level
+                ratings.append(rating)
+
+        assessment_model.objects.bulk_create(assessments, batch_size=self.BATCH_SIZE)
+        rating_model.objects.bulk_create(ratings, batch_size=self.BATCH_SIZE)
+
+        # Identical seeded ratings give identical scores: calculate once per template
+        for template_pk, template_assessments in by_template.items():
+            first, rest = template_assessments[0], template_assessments[1:]
+            if not resolved[first.employee_id][1]:
+                continue
+            first.calculate_scores()
+            if rest:
+                assessment_model.objects.filter(
+                    pk__in=[a.pk for a in rest]
+                ).update(**{field: getattr(first, field) for field in config['score_fields']})
+
+        logger.info(f"Assessment campaign: created {len(assessments)} {family} assessments")
+        return len(assessments), skipped
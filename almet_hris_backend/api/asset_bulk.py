@@ -0,0 +1,253 @@
+# api/asset_bulk.py - Bulk asset creation
+"""
+Asset Bulk Creation
+Receiving a batch of assets (AssetBatchViewSet.create_assets_from_batch) and
+importing batches from Excel/CSV (AssetViewSet.bulk_upload) go through one
+set-based pipeline instead of a save() per row:
+
+- categories are resolved with one query (missing ones bulk-created)
+- batch / asset numbers are allocated in blocks (one timestamp + sequence)
+- batches, assets and their CREATED activity rows are bulk-created
+- batch quantities move with one conditional F() UPDATE
+
+Everything runs in a single transaction. bulk_create skips save() and
+post_save, so the fields Asset.save() / AssetBatch.save() derive are set
+here, and callers drop cached asset statistics themselves.
+"""
+
+from decimal import Decimal
+import logging
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .asset_models import AssetCategory, AssetBatch, Asset, AssetActivity
+
+logger = logging.getLogger(__name__)
+
+
+class AssetBulkCreator:
+    """Set-based creation of batches, assets and their activity rows"""
+
+    BULK_BATCH_SIZE = 500
+
+    # ------------------------------------------------------------------
+    # Numbering
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def allocate_numbers(prefix, count):
+        """
+        Block of unique numbers: one microsecond timestamp per block plus a
+        sequence, e.g. AST-20250101120000123456-00001
+        """
+        stamp = timezone.now().strftime('%Y%m%d%H%M%S%f')
+        return [f"{prefix}-{stamp}-{index:05d}" for index in range(1, count + 1)]
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def resolve_categories(names, user=None):
+        """
+        {name: AssetCategory} for all names, creating the missing ones
+
+        Returns:
+            dict: name -> AssetCategory
+        """
+        names = {name for name in names if name}
+        categories = {
+            category.name: category
+            for category in AssetCategory.objects.filter(name__in=names)
+        }
+        missing = [name for name in names if name not in categories]
+        if missing:
+            # Conflicts are categories created concurrently by another request
+            AssetCategory.objects.bulk_create(
+                [AssetCategory(name=name, created_by=user) for name in missing],
+                ignore_conflicts=True
+            )
+            categories.update({
+                category.name: category
+                for category in AssetCategory.objects.filter(name__in=missing)
+            })
+        return categories
+
+    @staticmethod
+    def existing_serial_numbers(serial_numbers):
+        """Serial numbers already used by an asset (one query)"""
+        return set(
+            Asset.objects.filter(serial_number__in=list(serial_numbers)).values_list('serial_number', flat=True)
+        )
+
+    # ------------------------------------------------------------------
+    # Assets
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _build_assets(cls, batch, serial_numbers, asset_numbers, user):
+        # bulk_create skips Asset.save(): copy the batch fields here
+        return [
+            Asset(
+                batch=batch,
+                asset_number=asset_number,
+                serial_number=serial_number,
+                asset_name=batch.asset_name,
+                category_id=batch.category_id,
+                status='IN_STOCK',
+                created_by=user
+            )
+            for serial_number, asset_number in zip(serial_numbers, asset_numbers)
+        ]
+
+    @classmethod
+    def _insert_assets(cls, assets, user):
+        """bulk_create assets and their CREATED activity rows"""
+        Asset.objects.bulk_create(assets, batch_size=cls.BULK_BATCH_SIZE)
+        AssetActivity.objects.bulk_create(
+            [
+                AssetActivity(
+                    asset=asset,
+                    activity_type='CREATED',
+                    description=f"Asset batch-dən yaradıldı: {asset.batch.batch_number}",
+                    performed_by=user,
+                    metadata={'batch_number': asset.batch.batch_number, 'batch_id': asset.batch_id}
+                )
+                for asset in assets
+            ],
+            batch_size=cls.BULK_BATCH_SIZE
+        )
+        return assets
+
+    @classmethod
+    def create_assets(cls, batch, serial_numbers, user=None):
+        """
+        Create one asset per serial number from an existing batch
+
+        The quantity moves from available to assigned with a conditional
+        UPDATE, so concurrent requests can never take more than the batch
+        has.
+
+        Raises:
+            ValueError: inactive batch, insufficient quantity, duplicate or
+                existing serial numbers
+        """
+        serial_numbers = list(serial_numbers)
+        quantity = len(serial_numbers)
+
+        if len(set(serial_numbers)) != quantity:
+            raise ValueError("Serial nömrələr təkrarlanmamalıdır")
+        existing = cls.existing_serial_numbers(serial_numbers)
+        if existing:
+            raise ValueError(f"Bu serial nömrələr artıq mövcuddur: {sorted(existing)}")
+
+        with transaction.atomic():
+            updated = AssetBatch.objects.filter(
+                pk=batch.pk,
+                status='ACTIVE',
+                available_quantity__gte=quantity
+            ).update(
+                available_quantity=F('available_quantity') - quantity,
+                assigned_quantity=F('assigned_quantity') + quantity,
+                updated_at=timezone.now()
+            )
+            if not updated:
+                raise ValueError(f"Batch {batch.batch_number} - kifayət qədər say yoxdur")
+
+            batch.refresh_from_db(fields=['available_quantity', 'assigned_quantity', 'status', 'updated_at'])
+
+            assets = cls._build_assets(
+                batch, serial_numbers, cls.allocate_numbers('AST', quantity), user
+            )
+            cls._insert_assets(assets, user)
+
+        logger.info(
+            f"✅ {quantity} asset yaradıldı | "
+            f"Batch: {batch.batch_number} | "
+            f"Available: {batch.available_quantity}/{batch.initial_quantity}"
+        )
+        return assets
+
+    # ------------------------------------------------------------------
+    # Batches
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def create_batches(cls, rows, user=None):
+        """
+        Create batches (and the assets of rows that list serial numbers)
+
+        Args:
+            rows: list of dicts with asset_name, category, quantity,
+                unit_price, purchase_date and optional useful_life_years,
+                supplier, serial_numbers and row (source line for errors)
+
+        Returns:
+            dict: {'batches': [...], 'assets': [...], 'errors': [...]}
+        """
+        errors = []
+
+        # Serial numbers: duplicates within the file and existing assets
+        seen = {}
+        for row in rows:
+            for serial_number in row.get('serial_numbers') or []:
+                seen.setdefault(serial_number, []).append(row)
+        existing = cls.existing_serial_numbers(seen)
+
+        valid_rows = []
+        for row in rows:
+            serial_numbers = row.get('serial_numbers') or []
+            conflicts = sorted(
+                serial_number for serial_number in set(serial_numbers)
+                if serial_number in existing or len(seen[serial_number]) > 1
+            )
+            if conflicts:
+                errors.append(f"Sətir {row.get('row', '?')}: serial nömrələr təkrar/mövcuddur: {conflicts}")
+            elif len(serial_numbers) > row['quantity']:
+                errors.append(f"Sətir {row.get('row', '?')}: serial nömrələr sayı miqdardan çoxdur")
+            else:
+                valid_rows.append(row)
+
+        if not valid_rows:
+            return {'batches': [], 'assets': [], 'errors': errors}
+
+        with transaction.atomic():
+            categories = cls.resolve_categories([row['category'] for row in valid_rows], user)
+            batch_numbers = cls.allocate_numbers('BATCH', len(valid_rows))
+
+            batches = []
+            for row, batch_number in zip(valid_rows, batch_numbers):
+                quantity = row['quantity']
+                received = len(row.get('serial_numbers') or [])
+                unit_price = Decimal(str(row['unit_price']))
+                # bulk_create skips AssetBatch.save(): number, total and status here
+                batches.append(AssetBatch(
+                    batch_number=batch_number,
+                    asset_name=row['asset_name'],
+                    category=categories[row['category']],
+                    initial_quantity=quantity,
+                    available_quantity=quantity - received,
+                    assigned_quantity=received,
+                    unit_price=unit_price,
+                    total_value=unit_price * quantity,
+                    purchase_date=row['purchase_date'],
+                    useful_life_years=row.get('useful_life_years') or 5,
+                    supplier=row.get('supplier') or '',
+                    status='ACTIVE',
+                    created_by=user
+                ))
+            AssetBatch.objects.bulk_create(batches, batch_size=cls.BULK_BATCH_SIZE)
+
+            total_assets = sum(len(row.get('serial_numbers') or []) for row in valid_rows)
+            asset_numbers = iter(cls.allocate_numbers('AST', total_assets))
+            assets = []
+            for row, batch in zip(valid_rows, batches):
+                serial_numbers = row.get('serial_numbers') or []
+                assets.extend(cls._build_assets(
+                    batch, serial_numbers, [next(asset_numbers) for _ in serial_numbers], user
+                ))
+            cls._insert_assets(assets, user)
+
+        return {'batches': batches, 'assets': assets, 'errors': errors}
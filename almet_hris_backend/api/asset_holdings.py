@@ -0,0 +1,162 @@
+# api/asset_holdings.py - Assets held by employees
+"""
+Asset Holdings
+The assets held by one or many employees, loaded together with everything
+the employee / offboarding asset views show, in a fixed number of queries:
+
+- assets with batch, category, holder and clarification users (1 query)
+- current (not checked in) assignments, via Prefetch (1 query)
+- pending transfer requests, via Prefetch (1 query)
+- latest clarification activity, as Subquery annotations
+
+Shared by EmployeeViewSet.get_employee_assets, AssetViewSet.my_assets and
+the EmployeeOffboardingViewSet asset endpoints.
+"""
+
+import logging
+
+from django.db.models import OuterRef, Prefetch, Subquery
+
+from .asset_models import Asset, AssetActivity, AssetAssignment, AssetTransferRequest
+
+logger = logging.getLogger(__name__)
+
+
+class AssetHoldings:
+    """Prefetched asset holdings of employees"""
+
+    CLARIFICATION_ACTIVITIES = ('CLARIFICATION_REQUESTED', 'CLARIFICATION_PROVIDED')
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def queryset(cls, employee_ids, statuses=None):
+        """
+        Assets held by the employees, ready for the helpers below
+
+        Each asset gets:
+            current_assignments: [AssetAssignment] (newest first)
+            pending_transfers: [AssetTransferRequest] (newest first)
+            latest_clarification_type / latest_clarification_at
+        """
+        latest_clarification = AssetActivity.objects.filter(
+            asset=OuterRef('pk'),
+            activity_type__in=cls.CLARIFICATION_ACTIVITIES
+        ).order_by('-performed_at')
+
+        queryset = Asset.objects.filter(
+            assigned_to_id__in=list(employee_ids)
+        ).select_related(
+            'batch__category', 'batch__created_by', 'category', 'assigned_to',
+            'clarification_requested_by', 'clarification_provided_by'
+        ).prefetch_related(
+            Prefetch(
+                'assignments',
+                queryset=AssetAssignment.objects.filter(
+                    check_in_date__isnull=True
+                ).select_related('assigned_by').order_by('-created_at'),
+                to_attr='current_assignments'
+            ),
+            Prefetch(
+                'assettransferrequest_set',
+                queryset=AssetTransferRequest.objects.filter(
+                    status='PENDING'
+                ).select_related('to_employee').order_by('-requested_at'),
+                to_attr='pending_transfers'
+            )
+        ).annotate(
+            latest_clarification_type=Subquery(latest_clarification.values('activity_type')[:1]),
+            latest_clarification_at=Subquery(latest_clarification.values('performed_at')[:1])
+        ).order_by('-updated_at')
+
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+        return queryset
+
+    @classmethod
+    def for_employee(cls, employee, statuses=None):
+        return list(cls.queryset([employee.pk], statuses))
+
+    @classmethod
+    def by_employee(cls, employee_ids, statuses=None):
+        """{employee_id: [asset, ...]} for many employees at once"""
+        holdings = {employee_id: [] for employee_id in employee_ids}
+        for asset in cls.queryset(employee_ids, statuses):
+            holdings.setdefault(asset.assigned_to_id, []).append(asset)
+        return holdings
+
+    # ------------------------------------------------------------------
+    # Per-asset helpers (no queries)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def current_assignment(asset):
+        assignments = getattr(asset, 'current_assignments', None)
+        if assignments is None:
+            return asset.assignments.filter(check_in_date__isnull=True).first()
+        return assignments[0] if assignments else None
+
+    @staticmethod
+    def pending_transfer(asset):
+        transfers = getattr(asset, 'pending_transfers', None)
+        return transfers[0] if transfers else None
+
+    @staticmethod
+    def clarification_detail(asset):
+        """Clarification request / response of the asset (None if never requested)"""
+        if asset.status != 'NEED_CLARIFICATION' and not asset.clarification_requested_reason:
+            return None
+
+        latest_at = getattr(asset, 'latest_clarification_at', None)
+        return {
+            'has_clarification': True,
+            'requested': {
+                'reason': asset.clarification_requested_reason,
+                'requested_at': asset.clarification_requested_at.isoformat() if asset.clarification_requested_at else None,
+                'requested_by': (
+                    asset.clarification_requested_by.get_full_name()
+                    if asset.clarification_requested_by else None
+                )
+            },
+            'response': {
+                'text': asset.clarification_response,
+                'provided_at': asset.clarification_provided_at.isoformat() if asset.clarification_provided_at else None,
+                'provided_by': (
+                    asset.clarification_provided_by.get_full_name()
+                    if asset.clarification_provided_by else None
+                )
+            } if asset.clarification_response else None,
+            'status': 'pending' if not asset.clarification_response else 'resolved',
+            'is_pending': not bool(asset.clarification_response),
+            'last_activity': {
+                'type': asset.latest_clarification_type,
+                'at': latest_at.isoformat()
+            } if latest_at else None
+        }
+
+    # ------------------------------------------------------------------
+    # Summaries (no queries)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def summary(assets):
+        """Counts by status (non-zero, in choice order) and by category"""
+        status_counts = {}
+        category_counts = {}
+        for asset in assets:
+            status_counts[asset.status] = status_counts.get(asset.status, 0) + 1
+            if asset.category_id:
+                name = asset.category.name
+                category_counts[name] = category_counts.get(name, 0) + 1
+
+        return {
+            'total_assets': len(assets),
+            'by_status': {
+                code: {'label': label, 'count': status_counts[code]}
+                for code, label in Asset.STATUS_CHOICES
+                if status_counts.get(code)
+            },
+            'by_category': category_counts
+        }
@@ -6,6 +6,7 @@ from .asset_models import (
     AssetActivity, EmployeeOffboarding, AssetTransferRequest
 )
 from .models import Employee
+from .asset_bulk import AssetBulkCreator
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.db import transaction
@@ -464,47 +465,15 @@ class AssetCreateMultipleSerializer(serializers.Serializer):
         return attrs
     
     def create(self, validated_data):
-        """Bir neçə asset yaradılır"""
-        batch = validated_data['batch']
-        serial_numbers = validated_data['serial_numbers']
-        quantity = validated_data['quantity']
-        user = self.context['request'].user
-        
-        created_assets = []
-        
-        with transaction.atomic():
-            # Batch-dən say azalt
-            if not batch.assign_quantity(quantity):
-                raise serializers.ValidationError(
-                    f"Batch {batch.batch_number} - kifayət qədər say yoxdur"
-                )
-            
-            # Asset-ləri yarat
-            for serial_number in serial_numbers:
-                asset = Asset.objects.create(
-                    batch=batch,
-                    serial_number=serial_number,
-                    status='IN_STOCK',
-                    created_by=user
-                )
-                created_assets.append(asset)
-                
-                # Activity log
-                AssetActivity.objects.create(
-                    asset=asset,
-                    activity_type='CREATED',
-                    description=f"Asset batch-dən yaradıldı: {batch.batch_number}",
-                    performed_by=user,
-                    metadata={'batch_number': batch.batch_number, 'batch_id': batch.id}
-                )
-        
-        logger.info(
-            f"✅ {quantity} asset yaradıldı | "
-            f"Batch: {batch.batch_number} | "
-            f"Available: {batch.available_quantity}/{batch.initial_quantity}"
-        )
-        
-        return created_assets
+        """Bir neçə asset yaradılır (bulk: bax api.asset_bulk)"""
+        try:
+            return AssetBulkCreator.create_assets(
+                validated_data['batch'],
+                validated_data['serial_numbers'],
+                user=self.context['request'].user
+            )
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
 
 
 # ============================================
@@ -39,6 +39,30 @@ from .asset_permissions import (
 )
 from .models import Employee
 from .system_email_service import system_email_service
+from .grouped_stats import Breakdown, GroupedStats
+from .asset_bulk import AssetBulkCreator
+from .asset_holdings import AssetHoldings
+
+
+ASSET_STATS = GroupedStats(
+    'assets',
+    measures={
+        'total': Count('pk'),
+        'assigned': Count('pk', filter=Q(assigned_to__isnull=False)),
+    },
+    breakdowns={
+        'status': Breakdown('status', choices=Asset.STATUS_CHOICES),
+        'category': Breakdown('category__name'),
+    },
+    invalidate_on=[Asset, AssetCategory],
+)
+
+ASSET_CATEGORY_STATS = GroupedStats(
+    'asset_category',
+    measures={'total': Count('pk')},
+    breakdowns={'status': Breakdown('status', choices=Asset.STATUS_CHOICES)},
+    invalidate_on=[Asset],
+)
 
 
 # ============================================
@@ -65,18 +89,21 @@ class AssetCategoryViewSet(viewsets.ModelViewSet):
         category = self.get_object()
         
         total_batches = category.batches.count()
-        total_assets = Asset.objects.filter(category=category).count()
+        stats = ASSET_CATEGORY_STATS.get(
+            Asset.objects.filter(category=category), scope=f'category:{category.pk}'
+        )
+        total_assets = stats['measures']['total']
         
         # Status breakdown
-        status_breakdown = {}
-        for status_choice in Asset.STATUS_CHOICES:
-            status_code = status_choice[0]
-            count = Asset.objects.filter(category=category, status=status_code).count()
-            if count > 0:
-                status_breakdown[status_code] = {
-                    'label': status_choice[1],
-                    'count': count
-                }
+        status_labels = dict(Asset.STATUS_CHOICES)
+        status_breakdown = {
+            status_code: {
+                'label': status_labels[status_code],
+                'count': count
+            }
+            for status_code, count in stats['breakdowns']['status'].items()
+            if count > 0
+        }
         
         return Response({
             'category': category.name,
@@ -199,6 +226,11 @@ class AssetBatchViewSet(viewsets.ModelViewSet):
             # Create assets
             created_assets = serializer.save()
             
+            # bulk_create skips post_save: drop cached statistics here
+            ASSET_STATS.invalidate()
+            ASSET_CATEGORY_STATS.invalidate()
+            batch.refresh_from_db()
+            
             return Response({
                 'success': True,
                 'message': f'{len(created_assets)} asset yaradıldı',
@@ -488,7 +520,7 @@ class AssetViewSet(viewsets.ModelViewSet):
             </html>
             """
             
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email='myalmet@almettrading.com',
                 to_email=employee.user.email,
                 subject=f'Asset Təyinatı - {len(assets)} əşya',
@@ -935,9 +967,7 @@ class AssetViewSet(viewsets.ModelViewSet):
         if not access['employee']:
             return Response({'assets': [], 'message': 'Sizin işçi profiliniz yoxdur'})
         
-        assets = Asset.objects.filter(
-            assigned_to=access['employee']
-        ).select_related('batch', 'category')
+        assets = AssetHoldings.for_employee(access['employee'])
         
         return Response({
             'employee': {
@@ -945,7 +975,7 @@ class AssetViewSet(viewsets.ModelViewSet):
                 'name': access['employee'].full_name,
                 'employee_id': access['employee'].employee_id
             },
-            'total_assets': assets.count(),
+            'total_assets': len(assets),
             'assets': AssetListSerializer(assets, many=True, context={'request': request}).data
         })
     
@@ -993,41 +1023,53 @@ class AssetViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            results = {'success': 0, 'failed': 0, 'errors': []}
-            
-            with transaction.atomic():
-                for index, row in df.iterrows():
-                    try:
-                        # Get or create category
-                        category, _ = AssetCategory.objects.get_or_create(
-                            name=row['category'],
-                            defaults={'created_by': request.user}
-                        )
-                        
-                        # Create batch
-                        batch = AssetBatch.objects.create(
-                            asset_name=row['asset_name'],
-                            category=category,
-                            initial_quantity=int(row['quantity']),
-                            available_quantity=int(row['quantity']),
-                            unit_price=float(row['unit_price']),
-                            purchase_date=pd.to_datetime(row['purchase_date']).date(),
-                            useful_life_years=int(row.get('useful_life_years', 5)),
-                            supplier=row.get('supplier', ''),
-                            created_by=request.user
-                        )
-                        
-                        results['success'] += 1
-                        
-                    except Exception as e:
-                        results['failed'] += 1
-                        results['errors'].append(f"Sətir {index + 2}: {str(e)}")
+            # Parse rows; invalid rows are reported, the rest go in one bulk insert
+            rows = []
+            errors = []
+            for index, row in enumerate(df.to_dict('records')):
+                try:
+                    quantity = int(row['quantity'])
+                    if quantity < 1:
+                        raise ValueError("Miqdar ən azı 1 olmalıdır")
+                    serial_numbers = row.get('serial_numbers')
+                    useful_life_years = row.get('useful_life_years')
+                    supplier = row.get('supplier')
+                    rows.append({
+                        'row': index + 2,
+                        'asset_name': str(row['asset_name']).strip(),
+                        'category': str(row['category']).strip(),
+                        'quantity': quantity,
+                        'unit_price': float(row['unit_price']),
+                        'purchase_date': pd.to_datetime(row['purchase_date']).date(),
+                        'useful_life_years': int(useful_life_years) if pd.notna(useful_life_years) else 5,
+                        'supplier': str(supplier) if pd.notna(supplier) else '',
+                        'serial_numbers': [
+                            serial.strip() for serial in str(serial_numbers).split(',') if serial.strip()
+                        ] if pd.notna(serial_numbers) else [],
+                    })
+                except Exception as e:
+                    errors.append(f"Sətir {index + 2}: {str(e)}")
+            
+            created = AssetBulkCreator.create_batches(rows, user=request.user)
+            errors.extend(created['errors'])
+            
+            if created['batches']:
+                # bulk_create skips post_save: drop cached statistics here
+                ASSET_STATS.invalidate()
+                ASSET_CATEGORY_STATS.invalidate()
+            
+            results = {
+                'success': len(created['batches']),
+                'failed': len(errors),
+                'errors': errors
+            }
             
             logger.info(f"✅ Bulk upload: {results['success']} uğurlu, {results['failed']} uğursuz")
             
             return Response({
                 'success': True,
                 'imported': results['success'],
+                'assets_created': len(created['assets']),
                 'failed': results['failed'],
                 'errors': results['errors'][:10]
             })
@@ -1046,28 +1088,33 @@ class AssetViewSet(viewsets.ModelViewSet):
         """Asset statistikası"""
         queryset = self.get_queryset()
         
-        total_assets = queryset.count()
+        access = get_asset_access_level(request.user)
+        if access['can_view_all_assets']:
+            scope = 'all'
+        else:
+            scope = f"employees:{GroupedStats.scope_key(access['accessible_employee_ids'] or [])}"
+        stats = ASSET_STATS.get(queryset, scope=scope)
+        
+        total_assets = stats['measures']['total']
         
         # Status breakdown
+        status_labels = dict(Asset.STATUS_CHOICES)
         status_breakdown = {}
-        for choice in Asset.STATUS_CHOICES:
-            count = queryset.filter(status=choice[0]).count()
+        for status_code, count in stats['breakdowns']['status'].items():
             if count > 0:
-                status_breakdown[choice[0]] = {
-                    'label': choice[1],
+                status_breakdown[status_code] = {
+                    'label': status_labels[status_code],
                     'count': count,
                     'percentage': round((count / total_assets * 100), 1) if total_assets > 0 else 0
                 }
         
         # Category breakdown
-        category_breakdown = {}
-        categories = queryset.values('category__name').annotate(count=Count('id'))
-        for cat in categories:
-            if cat['category__name']:
-                category_breakdown[cat['category__name']] = cat['count']
+        category_breakdown = {
+            name: count for name, count in stats['breakdowns']['category'].items() if name
+        }
         
         # Assignment breakdown
-        assigned_count = queryset.filter(assigned_to__isnull=False).count()
+        assigned_count = stats['measures']['assigned']
         unassigned_count = total_assets - assigned_count
         
         return Response({
@@ -1090,6 +1137,9 @@ class EmployeeOffboardingViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     ordering = ['-created_at']
     
+    # Assets the leaving employee still has to hand over
+    HANDOVER_STATUSES = ['ASSIGNED', 'IN_USE']
+    
     def get_queryset(self):
         access = get_asset_access_level(self.request.user)
         queryset = super().get_queryset()
@@ -1287,7 +1337,7 @@ class EmployeeOffboardingViewSet(viewsets.ModelViewSet):
                 """
             
             # Send email
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email='myalmet@almettrading.com',
                 to_email=it_emails,
                 subject=subject,
@@ -1344,18 +1394,65 @@ class EmployeeOffboardingViewSet(viewsets.ModelViewSet):
     def assets(self, request, pk=None):
         """Offboarding üçün asset-lər"""
         offboarding = self.get_object()
-        assets = Asset.objects.filter(
-            assigned_to=offboarding.employee,
-            status__in=['ASSIGNED', 'IN_USE']
-        )
+        assets = AssetHoldings.for_employee(offboarding.employee, statuses=self.HANDOVER_STATUSES)
         
         return Response({
             'employee': offboarding.employee.full_name,
             'offboarding_type': offboarding.offboarding_type,
-            'total_assets': assets.count(),
+            'total_assets': len(assets),
             'it_handover_completed': offboarding.it_handover_completed,
-            'assets': AssetListSerializer(assets, many=True, context={'request': request}).data
+            'assets': AssetListSerializer(assets, many=True, context={'request': request}).data,
+            'pending_transfers': self._pending_transfers(assets)
         })
+    
+    @action(detail=False, methods=['get'], url_path='assets-overview')
+    def assets_overview(self, request):
+        """Açıq offboarding-lərin hamısı üçün asset xülasəsi (sabit sayda sorğu)"""
+        offboardings = list(
+            self.get_queryset().filter(status__in=['PENDING', 'IN_PROGRESS'])
+        )
+        holdings = AssetHoldings.by_employee(
+            {offboarding.employee_id for offboarding in offboardings},
+            statuses=self.HANDOVER_STATUSES
+        )
+        
+        results = []
+        for offboarding in offboardings:
+            assets = holdings.get(offboarding.employee_id, [])
+            results.append({
+                'offboarding_id': offboarding.id,
+                'employee': {
+                    'id': offboarding.employee.id,
+                    'name': offboarding.employee.full_name,
+                    'employee_id': offboarding.employee.employee_id
+                },
+                'offboarding_type': offboarding.offboarding_type,
+                'last_working_day': offboarding.last_working_day,
+                'status': offboarding.status,
+                'it_handover_completed': offboarding.it_handover_completed,
+                'summary': AssetHoldings.summary(assets),
+                'pending_transfers': self._pending_transfers(assets)
+            })
+        
+        return Response({
+            'count': len(results),
+            'offboardings': results
+        })
+    
+    @staticmethod
+    def _pending_transfers(assets):
+        transfers = []
+        for asset in assets:
+            transfer = AssetHoldings.pending_transfer(asset)
+            if transfer:
+                transfers.append({
+                    'id': transfer.id,
+                    'asset_id': str(asset.id),
+                    'asset_name': asset.asset_name,
+                    'to_employee': transfer.to_employee.full_name,
+                    'employee_approved': transfer.employee_approved
+                })
+        return transfers
 
 
 # ============================================
@@ -1491,7 +1588,7 @@ class AssetTransferRequestViewSet(viewsets.ModelViewSet):
                 </html>
                 """
                 
-                system_email_service.send_email_as_system(
+                system_email_service.queue_email_as_system(
                     from_email='myalmet@almettrading.com',
                     to_email=to_employee_email,
                     subject=f'Asset Transfer Approval Required - {transfer.asset.asset_name}',
@@ -1533,7 +1630,7 @@ class AssetTransferRequestViewSet(viewsets.ModelViewSet):
                 </html>
                 """
                 
-                system_email_service.send_email_as_system(
+                system_email_service.queue_email_as_system(
                     from_email='myalmet@almettrading.com',
                     to_email=from_employee_email,
                     subject=f'Asset Transfer - {transfer.asset.asset_name}',
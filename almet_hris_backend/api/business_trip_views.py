@@ -833,14 +833,11 @@ def create_trip_request(request):
             # Send notification
             graph_token = get_graph_access_token(request.user)
             notification_sent = False
-            if graph_token:
-                notification_sent = notification_manager.notify_request_created(trip_req, graph_token)
-                if notification_sent:
-                    logger.info("✅ Notification sent to Line Manager")
-                else:
-                    logger.warning("⚠️ Failed to send notification")
+            notification_sent = notification_manager.notify_request_created(trip_req, graph_token)
+            if notification_sent:
+                logger.info("✅ Notification sent to Line Manager")
             else:
-                logger.warning("⚠️ Graph token not available - notification skipped")
+                logger.warning("⚠️ Failed to send notification")
             
             # Prepare response
             response_data = {
@@ -995,31 +992,29 @@ def approve_reject_request(request, pk):
                 msg = 'Approved by Line Manager'
                 
                 # ✅ Send notification to Finance
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_line_manager_approved(
-                            trip_request=trip_req,
-                            access_token=graph_token
-                        )
-                        if notification_sent:
-                            logger.info("✅ Notification sent to Finance")
-                    except Exception as e:
-                        logger.error(f"❌ Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_line_manager_approved(
+                        trip_request=trip_req,
+                        access_token=graph_token
+                    )
+                    if notification_sent:
+                        logger.info("✅ Notification sent to Finance")
+                except Exception as e:
+                    logger.error(f"❌ Notification error: {e}")
             else:
                 trip_req.reject_by_line_manager(request.user, data.get('reason', ''))
                 msg = 'Rejected by Line Manager'
                 
                 # ✅ Send rejection notification to Employee
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_request_rejected(
-                            trip_request=trip_req,
-                            access_token=graph_token
-                        )
-                        if notification_sent:
-                            logger.info("✅ Rejection notification sent to Employee")
-                    except Exception as e:
-                        logger.error(f"❌ Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_request_rejected(
+                        trip_request=trip_req,
+                        access_token=graph_token
+                    )
+                    if notification_sent:
+                        logger.info("✅ Rejection notification sent to Employee")
+                except Exception as e:
+                    logger.error(f"❌ Notification error: {e}")
         
         # FINANCE APPROVAL/REJECTION
         elif trip_req.status == 'PENDING_FINANCE':
@@ -1028,31 +1023,29 @@ def approve_reject_request(request, pk):
                 msg = 'Approved by Finance'
                 
                 # ✅ Send notification to HR
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_finance_approved(
-                            trip_request=trip_req,
-                            access_token=graph_token
-                        )
-                        if notification_sent:
-                            logger.info("✅ Notification sent to HR")
-                    except Exception as e:
-                        logger.error(f"❌ Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_finance_approved(
+                        trip_request=trip_req,
+                        access_token=graph_token
+                    )
+                    if notification_sent:
+                        logger.info("✅ Notification sent to HR")
+                except Exception as e:
+                    logger.error(f"❌ Notification error: {e}")
             else:
                 trip_req.reject_by_finance(request.user, data.get('reason', ''))
                 msg = 'Rejected by Finance'
                 
                 # ✅ Send rejection notification to Employee
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_request_rejected(
-                            trip_request=trip_req,
-                            access_token=graph_token
-                        )
-                        if notification_sent:
-                            logger.info("✅ Rejection notification sent to Employee")
-                    except Exception as e:
-                        logger.error(f"❌ Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_request_rejected(
+                        trip_request=trip_req,
+                        access_token=graph_token
+                    )
+                    if notification_sent:
+                        logger.info("✅ Rejection notification sent to Employee")
+                except Exception as e:
+                    logger.error(f"❌ Notification error: {e}")
         
         # HR APPROVAL/REJECTION
         elif trip_req.status == 'PENDING_HR':
@@ -1061,31 +1054,29 @@ def approve_reject_request(request, pk):
                 msg = 'Approved by HR - Request is now APPROVED'
                 
                 # ✅ Send final approval notification to Employee
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_hr_approved(
-                            trip_request=trip_req,
-                            access_token=graph_token
-                        )
-                        if notification_sent:
-                            logger.info("✅ Final approval notification sent to Employee")
-                    except Exception as e:
-                        logger.error(f"❌ Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_hr_approved(
+                        trip_request=trip_req,
+                        access_token=graph_token
+                    )
+                    if notification_sent:
+                        logger.info("✅ Final approval notification sent to Employee")
+                except Exception as e:
+                    logger.error(f"❌ Notification error: {e}")
             else:
                 trip_req.reject_by_hr(request.user, data.get('reason', ''))
                 msg = 'Rejected by HR'
                 
                 # ✅ Send rejection notification to Employee
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_request_rejected(
-                            trip_request=trip_req,
-                            access_token=graph_token
-                        )
-                        if notification_sent:
-                            logger.info("✅ Rejection notification sent to Employee")
-                    except Exception as e:
-                        logger.error(f"❌ Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_request_rejected(
+                        trip_request=trip_req,
+                        access_token=graph_token
+                    )
+                    if notification_sent:
+                        logger.info("✅ Rejection notification sent to Employee")
+                except Exception as e:
+                    logger.error(f"❌ Notification error: {e}")
         else:
             return Response({
                 'error': 'Request is not pending approval'
@@ -1234,16 +1225,15 @@ def cancel_trip(request, pk):
         
         # ✅ Send cancellation notifications to all approvers
         notification_sent = False
-        if notification_ctx['can_send_emails']:
-            try:
-                notification_sent = notification_manager.notify_trip_cancelled(
-                    trip_request=trip_req,
-                    access_token=notification_ctx['graph_token']
-                )
-                if notification_sent:
-                    logger.info("✅ Cancellation notifications sent to all approvers")
-            except Exception as e:
-                logger.error(f"❌ Error sending cancellation notifications: {e}")
+        try:
+            notification_sent = notification_manager.notify_trip_cancelled(
+                trip_request=trip_req,
+                access_token=notification_ctx['graph_token']
+            )
+            if notification_sent:
+                logger.info("✅ Cancellation notifications sent to all approvers")
+        except Exception as e:
+            logger.error(f"❌ Error sending cancellation notifications: {e}")
         
         return Response({
             'message': 'Trip cancelled successfully.',
@@ -0,0 +1,362 @@
+# api/celebration_feed.py - Set-based celebration lookups
+"""
+Celebration Feed
+Finds employees whose birthday / work anniversary falls inside a date window
+with one query on the month/day of the date (indexed expressions on Employee),
+instead of scanning every employee in Python. Wish counts come from one
+grouped query.
+
+The combined feed (auto birthdays / anniversaries, 30-day promotions and
+manual celebrations) is cached per date: rebuilt by the morning Celery job,
+patched in place when a wish is added and invalidated when celebrations,
+their images or employees change (see api.signals).
+"""
+
+import calendar
+from datetime import date, timedelta
+import hashlib
+import json
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractDay, ExtractMonth
+from django.utils import timezone
+
+from .celebration_models import Celebration, CelebrationWish
+from .celebration_serializers import CelebrationImageSerializer
+from .models import Employee
+
+logger = logging.getLogger(__name__)
+
+
+def month_day_occurrences(start, end):
+    """
+    (month, day) -> date it falls on inside [start, end]
+
+    The window may cross New Year. In non-leap years Feb 29 dates are
+    celebrated on Feb 28.
+    """
+    occurrences = {}
+    current = start
+    while current <= end:
+        occurrences[(current.month, current.day)] = current
+        if current.month == 2 and current.day == 28 and not calendar.isleap(current.year):
+            occurrences[(2, 29)] = current
+        current += timedelta(days=1)
+    return occurrences
+
+
+def employees_with_date_in_window(queryset, field, start, end):
+    """
+    Employees whose `field` (month/day) falls inside [start, end]
+
+    Returns:
+        list: (employee, occurrence date) tuples
+    """
+    occurrences = month_day_occurrences(start, end)
+    if not occurrences:
+        return []
+
+    month_key = f'{field}_month'
+    day_key = f'{field}_day'
+
+    condition = Q()
+    for month, day in occurrences:
+        condition |= Q(**{month_key: month, day_key: day})
+
+    employees = queryset.annotate(**{
+        month_key: ExtractMonth(field),
+        day_key: ExtractDay(field),
+    }).filter(condition)
+
+    return [
+        (employee, occurrences[(getattr(employee, month_key), getattr(employee, day_key))])
+        for employee in employees
+    ]
+
+
+def auto_wish_counts(employee_ids, celebration_type):
+    """{employee_id: wish count} for one auto celebration type, one query"""
+    if not employee_ids:
+        return {}
+    return dict(
+        CelebrationWish.objects.filter(
+            employee_id__in=employee_ids,
+            celebration_type=celebration_type
+        ).order_by().values('employee_id').annotate(
+            total=Count('id')
+        ).values_list('employee_id', 'total')
+    )
+
+
+def build_auto_celebrations(today):
+    """
+    Auto celebrations for upcoming birthdays and work anniversaries
+    """
+    auto_celebrations = []
+    employees = Employee.objects.filter(is_deleted=False).select_related('position_group')
+
+    # Birthdays: from 10 days before until the birthday
+    birthdays = employees_with_date_in_window(
+        employees, 'date_of_birth', today, today + timedelta(days=10)
+    )
+    birthday_wishes = auto_wish_counts([emp.id for emp, _ in birthdays], 'birthday')
+
+    for emp, birthday in birthdays:
+        age = birthday.year - emp.date_of_birth.year
+        position = str(emp.position_group) if emp.position_group else 'Employee'
+        auto_celebrations.append({
+            'id': f'birthday-{emp.id}',
+            'type': 'birthday',
+            'employee_name': f'{emp.first_name} {emp.last_name}',
+            'employee_id': emp.id,
+            'position': position,
+            'date': birthday.isoformat(),
+            'images': ['https://www.sugar.org/wp-content/uploads/Birthday-Cake-1.png'],
+            'message': f"Wishing you a wonderful {age}th birthday filled with joy and happiness! Thank you for all your contributions to the team.",
+            'wishes': birthday_wishes.get(emp.id, 0),
+            'is_auto': True
+        })
+
+    # Work anniversaries: from 10 days before until 5 days after (at least 1 year)
+    anniversaries = [
+        (emp, anniversary)
+        for emp, anniversary in employees_with_date_in_window(
+            employees, 'start_date', today - timedelta(days=5), today + timedelta(days=10)
+        )
+        if anniversary.year - emp.start_date.year > 0
+    ]
+    anniversary_wishes = auto_wish_counts([emp.id for emp, _ in anniversaries], 'work_anniversary')
+
+    for emp, anniversary in anniversaries:
+        years = anniversary.year - emp.start_date.year
+        position = str(emp.position_group) if emp.position_group else 'Employee'
+        auto_celebrations.append({
+            'id': f'anniversary-{emp.id}',
+            'type': 'work_anniversary',
+            'employee_name': f'{emp.first_name} {emp.last_name}',
+            'employee_id': emp.id,
+            'position': position,
+            'date': anniversary.isoformat(),
+            'years': years,
+            'images': ['https://media.istockphoto.com/id/2219719967/vector/happy-work-anniversary-clipart-design-company-office-celebration-greeting-text-clip-art-with.jpg?s=612x612&w=0&k=20&c=tLT5yhtCjLw2gSsUNElBOOPHBFeVjCtSzcJTQzuPY1M='],
+            'message': f"Congratulations on {years} {'year' if years == 1 else 'years'} with Almet Holding! Thank you for your dedication and valuable contributions to our team.",
+            'wishes': anniversary_wishes.get(emp.id, 0),
+            'is_auto': True
+        })
+
+    return auto_celebrations
+
+
+def build_promotion_celebrations(today):
+    """
+    Promotion celebrations from the last 30 days
+    """
+    thirty_days_ago = today - timedelta(days=30)
+    promotion_celebrations = []
+
+    promotions = list(Celebration.objects.filter(
+        type='promotion',
+        date__gte=thirty_days_ago,
+        employee__isnull=False
+    ).select_related('employee__position_group'))
+
+    wishes = auto_wish_counts({promo.employee_id for promo in promotions}, 'promotion')
+
+    for promo in promotions:
+        position = str(promo.employee.position_group) if promo.employee.position_group else 'Employee'
+
+        promotion_celebrations.append({
+            'id': f'promotion-{promo.id}',
+            'type': 'promotion',
+            'employee_name': f'{promo.employee.first_name} {promo.employee.last_name}',
+            'employee_id': promo.employee.id,
+            'position': position,
+            'new_job_title': promo.new_job_title,
+            'date': promo.date.isoformat(),
+            'images': ['https://cdn-icons-png.flaticon.com/512/3176/3176366.png'],
+            'message': promo.message,
+            'wishes': wishes.get(promo.employee_id, 0),
+            'is_auto': True
+        })
+
+    return promotion_celebrations
+
+
+def build_manual_celebrations():
+    """
+    Manual celebrations (everything except promotions)
+    Image URLs are relative; CelebrationFeed.for_request makes them absolute.
+    """
+    manual_celebrations = Celebration.objects.exclude(type='promotion').annotate(
+        wish_total=Count('wishes')
+    ).prefetch_related('images')
+    manual_data = []
+
+    for celebration in manual_celebrations:
+        images_data = [
+            dict(image) for image in CelebrationImageSerializer(celebration.images.all(), many=True).data
+        ]
+
+        manual_data.append({
+            'id': str(celebration.id),
+            'type': celebration.type,
+            'title': celebration.title,
+            'date': celebration.date.isoformat(),
+            'images': images_data,
+            'message': celebration.message,
+            'wishes': celebration.wish_total,
+            'is_auto': False
+        })
+
+    return manual_data
+
+
+class CelebrationFeed:
+    """Per-date cache of the combined celebrations feed"""
+
+    CACHE_PREFIX = 'celebration_feed'
+    VERSION_KEY = 'celebration_feed:version'
+    CACHE_TIMEOUT = 60 * 60 * 26
+    LOCK_TIMEOUT = 10
+
+    # ------------------------------------------------------------------
+    # Cache keys
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _version(cls):
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            version = 1
+            cache.set(cls.VERSION_KEY, version, None)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        """Drop every cached feed (celebrations / images / employees changed)"""
+        try:
+            cache.incr(cls.VERSION_KEY)
+        except ValueError:
+            cache.set(cls.VERSION_KEY, 1, None)
+
+    @classmethod
+    def cache_key(cls, day):
+        return f"{cls.CACHE_PREFIX}:{cls._version()}:{day.isoformat()}"
+
+    @staticmethod
+    def _etag(items):
+        payload = json.dumps(items, sort_keys=True, default=str)
+        return hashlib.md5(payload.encode()).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Build / read
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, day=None):
+        day = day or date.today()
+        items = (
+            build_auto_celebrations(day) +
+            build_promotion_celebrations(day) +
+            build_manual_celebrations()
+        )
+        # Newest first
+        items.sort(key=lambda x: x['date'], reverse=True)
+        return {
+            'date': day.isoformat(),
+            'items': items,
+            'etag': cls._etag(items),
+            'generated_at': timezone.now().isoformat()
+        }
+
+    @classmethod
+    def refresh(cls, day=None):
+        """Rebuild and store the feed (morning Celery job)"""
+        day = day or date.today()
+        feed = cls.build(day)
+        cache.set(cls.cache_key(day), feed, cls.CACHE_TIMEOUT)
+        return feed
+
+    @classmethod
+    def get(cls, day=None):
+        """Cached feed for the date, built on a miss"""
+        day = day or date.today()
+        feed = cache.get(cls.cache_key(day))
+        if feed is None:
+            feed = cls.refresh(day)
+        return feed
+
+    @staticmethod
+    def for_request(items, request):
+        """Make manual celebration image URLs absolute for this request"""
+        def absolute(url):
+            return request.build_absolute_uri(url) if url else url
+
+        result = []
+        for item in items:
+            if not item['is_auto'] and item['images']:
+                item = dict(item)
+                item['images'] = [
+                    dict(image, image=absolute(image.get('image')), image_url=absolute(image.get('image')))
+                    for image in item['images']
+                ]
+            result.append(item)
+        return result
+
+    # ------------------------------------------------------------------
+    # Wish count patches
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _patch_wishes(cls, matches, wishes):
+        """Set the wish count of matching items in today's cached feed"""
+        key = cls.cache_key(date.today())
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, cls.LOCK_TIMEOUT):
+            # Someone else is patching; rebuild rather than lose an update
+            cls.invalidate()
+            return
+
+        try:
+            feed = cache.get(key)
+            if feed is None:
+                return
+
+            changed = False
+            for item in feed['items']:
+                if matches(item) and item['wishes'] != wishes:
+                    item['wishes'] = wishes
+                    changed = True
+
+            if changed:
+                feed['etag'] = cls._etag(feed['items'])
+                cache.set(key, feed, cls.CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Could not patch celebration feed wishes: {e}")
+            cls.invalidate()
+        finally:
+            cache.delete(lock_key)
+
+    @classmethod
+    def patch_manual_wishes(cls, celebration):
+        cls._patch_wishes(
+            lambda item: not item['is_auto'] and item['id'] == str(celebration.id),
+            celebration.wishes_count
+        )
+
+    @classmethod
+    def patch_auto_wishes(cls, employee_id, celebration_type):
+        wishes = CelebrationWish.objects.filter(
+            employee_id=employee_id,
+            celebration_type=celebration_type
+        ).count()
+        cls._patch_wishes(
+            lambda item: (
+                item['is_auto'] and
+                item['type'] == celebration_type and
+                item['employee_id'] == employee_id
+            ),
+            wishes
+        )
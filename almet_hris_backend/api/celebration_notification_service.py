@@ -3,6 +3,7 @@
 import logging
 from datetime import date
 from .models import Employee
+from .celebration_feed import employees_with_date_in_window
 from .system_email_service import system_email_service
 
 logger = logging.getLogger(__name__)
@@ -622,32 +623,31 @@ class CelebrationNotificationService:
         }
         
         try:
-            employees = Employee.objects.filter(is_deleted=False)
+            employees = Employee.objects.filter(is_deleted=False).select_related(
+                'business_function', 'department', 'position_group'
+            )
             
-            for emp in employees:
-                # Check birthdays
-                if emp.date_of_birth:
-                    if emp.date_of_birth.month == today.month and emp.date_of_birth.day == today.day:
-                        logger.info(f"🎂 Processing birthday for {emp.first_name} {emp.last_name}")
-                        
-                        if self.should_send_email(emp):
-                            if self.send_birthday_notification(emp):
-                                results['birthdays_sent'] += 1
-                        else:
-                            results['skipped'] += 1
+            # Check birthdays (only employees born on this month/day)
+            for emp, _ in employees_with_date_in_window(employees, 'date_of_birth', today, today):
+                logger.info(f"🎂 Processing birthday for {emp.first_name} {emp.last_name}")
                 
-                # Check work anniversaries
-                if emp.start_date:
-                    if emp.start_date.month == today.month and emp.start_date.day == today.day:
-                        years = today.year - emp.start_date.year
-                        if years > 0:  # At least 1 year
-                            logger.info(f"🏆 Processing {years}-year anniversary for {emp.first_name} {emp.last_name}")
-                            
-                            if self.should_send_email(emp):
-                                if self.send_work_anniversary_notification(emp, years):
-                                    results['anniversaries_sent'] += 1
-                            else:
-                                results['skipped'] += 1
+                if self.should_send_email(emp):
+                    if self.send_birthday_notification(emp):
+                        results['birthdays_sent'] += 1
+                else:
+                    results['skipped'] += 1
+            
+            # Check work anniversaries
+            for emp, _ in employees_with_date_in_window(employees, 'start_date', today, today):
+                years = today.year - emp.start_date.year
+                if years > 0:  # At least 1 year
+                    logger.info(f"🏆 Processing {years}-year anniversary for {emp.first_name} {emp.last_name}")
+                    
+                    if self.should_send_email(emp):
+                        if self.send_work_anniversary_notification(emp, years):
+                            results['anniversaries_sent'] += 1
+                    else:
+                        results['skipped'] += 1
             
             logger.info(f"✅ Daily celebration check complete: {results}")
             return results
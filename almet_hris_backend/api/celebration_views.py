@@ -2,7 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count
+from django.utils.http import parse_etags
 from datetime import date, timedelta
 from .celebration_models  import Celebration, CelebrationImage, CelebrationWish
 from .celebration_serializers  import (
@@ -12,6 +12,7 @@ from .celebration_serializers  import (
 
 )
 from .models import Employee
+from .celebration_feed import CelebrationFeed
 
 
 class CelebrationViewSet(viewsets.ModelViewSet):
@@ -50,154 +51,19 @@ class CelebrationViewSet(viewsets.ModelViewSet):
     def all_celebrations(self, request):
         """
         Get all celebrations including auto-generated birthdays, work anniversaries, and promotions
+        Served from the per-day feed cache; supports If-None-Match
         """
-        today = date.today()
-        
-        # Get auto celebrations (birthdays & anniversaries)
-        auto_celebrations = self.get_auto_celebrations(today)
-        
-        # ✅ Get promotions from last 30 days
-        promotion_celebrations = self.get_promotion_celebrations()
-        
-        # Get manual celebrations
-        manual_celebrations = Celebration.objects.exclude(type='promotion')
-        manual_data = []
-        
-        for celebration in manual_celebrations:
-            wishes_count = CelebrationWish.objects.filter(celebration=celebration).count()
-            
-            images_data = CelebrationImageSerializer(
-                celebration.images.all(), 
-                many=True, 
-                context={'request': request}
-            ).data
-            
-            manual_data.append({
-                'id': str(celebration.id),
-                'type': celebration.type,
-                'title': celebration.title,
-                'date': celebration.date.isoformat(),
-                'images': images_data,
-                'message': celebration.message,
-                'wishes': wishes_count,
-                'is_auto': False
-            })
-        
-        # Combine all celebrations
-        all_celebrations = auto_celebrations + promotion_celebrations + manual_data
-        
-        # Sort by date (newest first)
-        all_celebrations.sort(key=lambda x: x['date'], reverse=True)
-        
-        return Response(all_celebrations)
-    
-    def get_auto_celebrations(self, today):
-        """
-        Generate auto celebrations for birthdays and work anniversaries
-        """
-        auto_celebrations = []
-        employees = Employee.objects.filter(is_deleted=False)
+        feed = CelebrationFeed.get()
+        etag = f'"{feed["etag"]}"'
         
-        for emp in employees:
-            # Check for birthdays (10 days before until birthday)
-            if emp.date_of_birth:
-                birth_date = emp.date_of_birth
-                this_year_birthday = date(today.year, birth_date.month, birth_date.day)
-                
-                ten_days_before = this_year_birthday - timedelta(days=10)
-                
-                # Show from 10 days before until birthday, then hide
-                if ten_days_before <= today <= this_year_birthday:
-                    age = today.year - birth_date.year
-                    wishes_count = CelebrationWish.objects.filter(
-                        employee=emp,
-                        celebration_type='birthday'
-                    ).count()
-                    position = str(emp.position_group) if emp.position_group else 'Employee'
-                    auto_celebrations.append({
-                        'id': f'birthday-{emp.id}',
-                        'type': 'birthday',
-                        'employee_name': f'{emp.first_name} {emp.last_name}',
-                        'employee_id': emp.id,
-                        'position': position,
-                        'date': this_year_birthday.isoformat(),
-                        'images': ['https://www.sugar.org/wp-content/uploads/Birthday-Cake-1.png'],
-                        'message': f"Wishing you a wonderful {age}th birthday filled with joy and happiness! Thank you for all your contributions to the team.",
-                        'wishes': wishes_count,
-                        'is_auto': True
-                    })
-            
-            # Check for work anniversaries (10 days before until 5 days after)
-            if emp.start_date:
-                start_date = emp.start_date
-                this_year_anniversary = date(today.year, start_date.month, start_date.day)
-                
-                ten_days_before = this_year_anniversary - timedelta(days=10)
-                five_days_after = this_year_anniversary + timedelta(days=5)
-                
-                # Show from 10 days before until 5 days after anniversary
-                if ten_days_before <= today <= five_days_after:
-                    years = today.year - start_date.year
-                    
-                    # Only show if at least 1 year
-                    if years > 0:
-                        wishes_count = CelebrationWish.objects.filter(
-                            employee=emp,
-                            celebration_type='work_anniversary'
-                        ).count()
-                        position = str(emp.position_group) if emp.position_group else 'Employee'
-                        auto_celebrations.append({
-                            'id': f'anniversary-{emp.id}',
-                            'type': 'work_anniversary',
-                            'employee_name': f'{emp.first_name} {emp.last_name}',
-                            'employee_id': emp.id,
-                            'position': position,
-                            'date': this_year_anniversary.isoformat(),
-                            'years': years,
-                            'images': ['https://media.istockphoto.com/id/2219719967/vector/happy-work-anniversary-clipart-design-company-office-celebration-greeting-text-clip-art-with.jpg?s=612x612&w=0&k=20&c=tLT5yhtCjLw2gSsUNElBOOPHBFeVjCtSzcJTQzuPY1M='],
-                            'message': f"Congratulations on {years} {'year' if years == 1 else 'years'} with Almet Holding! Thank you for your dedication and valuable contributions to our team.",
-                            'wishes': wishes_count,
-                            'is_auto': True
-                        })
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(CelebrationFeed.for_request(feed['items'], request))
         
-        return auto_celebrations
-    
-    def get_promotion_celebrations(self):
-        """
-        ✅ Get promotion celebrations from last 30 days
-        """
-        thirty_days_ago = date.today() - timedelta(days=30)
-        promotion_celebrations = []
-        
-        promotions = Celebration.objects.filter(
-            type='promotion',
-            date__gte=thirty_days_ago
-        ).select_related('employee')
-        
-        for promo in promotions:
-            if promo.employee:
-                wishes_count = CelebrationWish.objects.filter(
-                    employee=promo.employee,
-                    celebration_type='promotion'
-                ).count()
-                
-                position = str(promo.employee.position_group) if promo.employee.position_group else 'Employee'
-                
-                promotion_celebrations.append({
-                    'id': f'promotion-{promo.id}',
-                    'type': 'promotion',
-                    'employee_name': f'{promo.employee.first_name} {promo.employee.last_name}',
-                    'employee_id': promo.employee.id,
-                    'position': position,
-                    'new_job_title': promo.new_job_title,
-                    'date': promo.date.isoformat(),
-                    'images': ['https://cdn-icons-png.flaticon.com/512/3176/3176366.png'],
-                    'message': promo.message,
-                    'wishes': wishes_count,
-                    'is_auto': True
-                })
-        
-        return promotion_celebrations
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
     
     @action(detail=True, methods=['post'])
     def add_wish(self, request, pk=None):
@@ -227,9 +93,10 @@ class CelebrationViewSet(viewsets.ModelViewSet):
             message=message
         )
         
-        # Update wishes count
+        # Update wishes count (queryset update: a wish should not invalidate the feed)
         celebration.wishes_count = CelebrationWish.objects.filter(celebration=celebration).count()
-        celebration.save()
+        Celebration.objects.filter(pk=celebration.pk).update(wishes_count=celebration.wishes_count)
+        CelebrationFeed.patch_manual_wishes(celebration)
         
         return Response(CelebrationWishSerializer(wish).data, status=status.HTTP_201_CREATED)
     
@@ -258,6 +125,7 @@ class CelebrationViewSet(viewsets.ModelViewSet):
             celebration_type=celebration_type,
             message=message
         )
+        CelebrationFeed.patch_auto_wishes(employee.id, celebration_type)
         
         return Response(CelebrationWishSerializer(wish).data, status=status.HTTP_201_CREATED)
     
@@ -287,28 +155,18 @@ class CelebrationViewSet(viewsets.ModelViewSet):
         today = date.today()
         current_month = today.month
         
-        # Get auto celebrations count
-        auto_celebrations = self.get_auto_celebrations(today)
-        promotion_celebrations = self.get_promotion_celebrations()
-        
-        # Get manual celebrations count
-        manual_count = Celebration.objects.exclude(type='promotion').count()
+        celebrations = CelebrationFeed.get(today)['items']
+        celebration_dates = [date.fromisoformat(c['date']) for c in celebrations]
         
         # Total celebrations
-        total_count = len(auto_celebrations) + len(promotion_celebrations) + manual_count
+        total_count = len(celebrations)
         
         # This month count
-        this_month_auto = len([c for c in auto_celebrations if date.fromisoformat(c['date']).month == current_month])
-        this_month_promo = len([c for c in promotion_celebrations if date.fromisoformat(c['date']).month == current_month])
-        this_month_manual = Celebration.objects.exclude(type='promotion').filter(date__month=current_month).count()
-        this_month_count = this_month_auto + this_month_promo + this_month_manual
+        this_month_count = len([d for d in celebration_dates if d.month == current_month])
         
         # Upcoming (next 7 days)
         seven_days_later = today + timedelta(days=7)
-        upcoming_auto = len([c for c in auto_celebrations if today <= date.fromisoformat(c['date']) <= seven_days_later])
-        upcoming_promo = len([c for c in promotion_celebrations if today <= date.fromisoformat(c['date']) <= seven_days_later])
-        upcoming_manual = Celebration.objects.exclude(type='promotion').filter(date__gte=today, date__lte=seven_days_later).count()
-        upcoming_count = upcoming_auto + upcoming_promo + upcoming_manual
+        upcoming_count = len([d for d in celebration_dates if today <= d <= seven_days_later])
         
         # Total wishes
         total_wishes = CelebrationWish.objects.count()
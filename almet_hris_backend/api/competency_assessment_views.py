@@ -36,6 +36,8 @@ from .competency_assessment_serializers import (
     
 )
 from .models import Employee,PositionGroup
+from .assessment_analytics import AssessmentAnalyticsService
+from .assessment_campaigns import AssessmentCampaignService
 
 import logging
 
@@ -1741,108 +1743,8 @@ class AssessmentDashboardViewSet(viewsets.ViewSet):
     
     @action(detail=False, methods=['get'])
     def summary(self, request):
-        """Get assessment summary statistics including leadership"""
-        access = get_assessment_access(request.user)
-        core_qs = filter_assessment_queryset(request.user, EmployeeCoreAssessment.objects.all())
-        behavioral_qs = filter_assessment_queryset(request.user, EmployeeBehavioralAssessment.objects.all())
-        leadership_qs = filter_assessment_queryset(request.user, EmployeeLeadershipAssessment.objects.all())
-        # Basic counts
-        total_core = core_qs.count()
-        total_behavioral = behavioral_qs.count()
-        total_leadership = leadership_qs.count()
-        
-        completed_core = core_qs.filter(status='COMPLETED').count()
-        completed_behavioral = behavioral_qs.filter(status='COMPLETED').count()
-        completed_leadership = leadership_qs.filter(status='COMPLETED').count()
-        
-        # Recent assessments
-        recent_core = EmployeeCoreAssessment.objects.select_related(
-            'employee', 'position_assessment'
-        ).order_by('-created_at')[:5]
-        
-        recent_behavioral = EmployeeBehavioralAssessment.objects.select_related(
-            'employee', 'position_assessment'
-        ).order_by('-created_at')[:5]
-        
-        recent_leadership = EmployeeLeadershipAssessment.objects.select_related(  # NEW
-            'employee', 'position_assessment'
-        ).order_by('-created_at')[:5]
-        
-        # Top performers (core competency)
-        top_core = EmployeeCoreAssessment.objects.filter(
-            status='COMPLETED'
-        ).select_related('employee').order_by('-completion_percentage')[:5]
-        
-        # Top performers (behavioral)
-        top_behavioral = EmployeeBehavioralAssessment.objects.filter(
-            status='COMPLETED'
-        ).select_related('employee').order_by('-overall_percentage')[:5]
-        
-        # Top performers (leadership) - NEW
-        top_leadership = EmployeeLeadershipAssessment.objects.filter(
-            status='COMPLETED'
-        ).select_related('employee').order_by('-overall_percentage')[:5]
-        
-        # Serialize data
-        core_serializer = EmployeeCoreAssessmentSerializer(recent_core, many=True)
-        behavioral_serializer = EmployeeBehavioralAssessmentSerializer(recent_behavioral, many=True)
-        leadership_serializer = EmployeeLeadershipAssessmentSerializer(recent_leadership, many=True)  # NEW
-        
-        top_core_data = [
-            {
-                'employee_name': assessment.employee.full_name,
-                'employee_id': assessment.employee.employee_id,
-                'completion_percentage': assessment.completion_percentage,
-                'assessment_date': assessment.assessment_date
-            }
-            for assessment in top_core
-        ]
-        
-        top_behavioral_data = [
-            {
-                'employee_name': assessment.employee.full_name,
-                'employee_id': assessment.employee.employee_id,
-                'overall_percentage': assessment.overall_percentage,
-                'overall_letter_grade': assessment.overall_letter_grade,
-                'assessment_date': assessment.assessment_date
-            }
-            for assessment in top_behavioral
-        ]
-        
-        # NEW - Leadership top performers
-        top_leadership_data = [
-            {
-                'employee_name': assessment.employee.full_name,
-                'employee_id': assessment.employee.employee_id,
-                'job_title': assessment.employee.job_title,
-                'position_group': assessment.employee.position_group.get_name_display(),
-                'overall_percentage': assessment.overall_percentage,
-                'overall_letter_grade': assessment.overall_letter_grade,
-                'assessment_date': assessment.assessment_date
-            }
-            for assessment in top_leadership
-        ]
-        
-        return Response({
-            'user_access': {
-                'role': 'Admin' if access['can_view_all'] else ('Manager' if access['is_manager'] else 'Employee'),
-                'can_view_all': access['can_view_all'],
-                'accessible_employees_count': len(access['accessible_employee_ids']) if access['accessible_employee_ids'] else 'All'
-            },
-            'summary_statistics': {
-                'total_core_assessments': total_core,
-                'total_behavioral_assessments': total_behavioral,
-                'total_leadership_assessments': total_leadership,  # NEW
-                'completed_assessments': completed_core + completed_behavioral + completed_leadership,  # UPDATED
-                'pending_assessments': (total_core - completed_core) + (total_behavioral - completed_behavioral) + (total_leadership - completed_leadership)  # UPDATED
-            },
-            'recent_core_assessments': core_serializer.data,
-            'recent_behavioral_assessments': behavioral_serializer.data,
-            'recent_leadership_assessments': leadership_serializer.data,  # NEW
-            'top_core_performers': top_core_data,
-            'top_behavioral_performers': top_behavioral_data,
-            'top_leadership_performers': top_leadership_data  # NEW
-        })
+        """Get assessment summary statistics including leadership (cached per access scope)"""
+        return Response(AssessmentAnalyticsService(request.user).get_summary())
     
     
     @swagger_auto_schema(
@@ -1870,7 +1772,9 @@ class AssessmentDashboardViewSet(viewsets.ViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            employee = Employee.objects.get(id=employee_id)
+            employee = Employee.objects.select_related(
+                'position_group', 'department', 'business_function'
+            ).get(id=employee_id)
             
             # ✅ DÜZƏLDİLDİ: Position group name-i normalize et
             position_name = employee.position_group.name.upper().replace('_', ' ').strip()
@@ -1895,37 +1799,38 @@ class AssessmentDashboardViewSet(viewsets.ViewSet):
 
             
             # Get all assessments for employee
-            core_assessments = EmployeeCoreAssessment.objects.filter(
-                employee=employee
-            ).select_related('position_assessment').order_by('-assessment_date')
+            core_assessments = AssessmentAnalyticsService.with_related(
+                'core', EmployeeCoreAssessment.objects.filter(employee=employee)
+            ).order_by('-assessment_date')
             
             # Get behavioral OR leadership assessments based on position
             if is_leadership_position:
-                leadership_assessments = EmployeeLeadershipAssessment.objects.filter(
-                    employee=employee
-                ).select_related('position_assessment').order_by('-assessment_date')
+                leadership_assessments = list(AssessmentAnalyticsService.with_related(
+                    'leadership', EmployeeLeadershipAssessment.objects.filter(employee=employee)
+                ).order_by('-assessment_date'))
                 
                 behavioral_assessments = []
                 latest_behavioral = None
-                latest_leadership = leadership_assessments.first()
+                latest_leadership = leadership_assessments[0] if leadership_assessments else None
             else:
-                behavioral_assessments = EmployeeBehavioralAssessment.objects.filter(
-                    employee=employee
-                ).select_related('position_assessment').order_by('-assessment_date')
+                behavioral_assessments = list(AssessmentAnalyticsService.with_related(
+                    'behavioral', EmployeeBehavioralAssessment.objects.filter(employee=employee)
+                ).order_by('-assessment_date'))
                 
                 leadership_assessments = []
-                latest_behavioral = behavioral_assessments.first()
+                latest_behavioral = behavioral_assessments[0] if behavioral_assessments else None
                 latest_leadership = None
             
             # Get latest assessments
-            latest_core = core_assessments.first()
+            core_assessments = list(core_assessments)
+            latest_core = core_assessments[0] if core_assessments else None
             
             # Development areas (skills with negative gaps from core assessment)
             development_areas = []
             strengths = []
             
             if latest_core:
-                for rating in latest_core.competency_ratings.select_related('skill__group').all():
+                for rating in latest_core.competency_ratings.all():
                     if rating.gap < 0:
                         development_areas.append({
                             'skill_name': rating.skill.name,
@@ -1999,6 +1904,77 @@ class AssessmentDashboardViewSet(viewsets.ViewSet):
             return Response({'error': 'Invalid employee_id format'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
+    @swagger_auto_schema(
+        method='post',
+        operation_description='Create DRAFT assessments for many employees from their position templates',
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['employee_ids'],
+            properties={
+                'employee_ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                'assessment_types': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_STRING, enum=['core', 'behavioral', 'leadership'])
+                ),
+                'assessment_date': openapi.Schema(type=openapi.TYPE_STRING, format='date-time'),
+                'notes': openapi.Schema(type=openapi.TYPE_STRING),
+                'skip_existing_drafts': openapi.Schema(type=openapi.TYPE_BOOLEAN, default=True)
+            }
+        )
+    )
+    @action(detail=False, methods=['post'])
+    def launch_campaign(self, request):
+        """Bulk-create assessments for a selected population"""
+        from django.utils.dateparse import parse_datetime
+        
+        employee_ids = request.data.get('employee_ids', [])
+        assessment_types = request.data.get('assessment_types') or list(AssessmentCampaignService.FAMILIES.keys())
+        
+        if not employee_ids or not isinstance(employee_ids, list):
+            return Response({'error': 'employee_ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        invalid_types = [t for t in assessment_types if t not in AssessmentCampaignService.FAMILIES]
+        if invalid_types:
+            return Response({
+                'error': f"Invalid assessment_types: {', '.join(map(str, invalid_types))}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            employee_ids = [int(emp_id) for emp_id in employee_ids]
+        except (ValueError, TypeError):
+            return Response({'error': 'Invalid employee_ids format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        assessment_date = None
+        if request.data.get('assessment_date'):
+            assessment_date = parse_datetime(str(request.data['assessment_date']))
+            if assessment_date is None:
+                return Response({'error': 'Invalid assessment_date format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        access = get_assessment_access(request.user)
+        if not access['can_view_all'] and not access['is_manager']:
+            return Response({
+                'error': 'Permission denied',
+                'detail': 'Only managers and admins can launch assessment campaigns'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            result = AssessmentCampaignService(request.user, access).launch(
+                employee_ids,
+                assessment_types,
+                assessment_date=assessment_date,
+                notes=request.data.get('notes', ''),
+                skip_existing_drafts=str(request.data.get('skip_existing_drafts', True)).lower() in ('1', 'true', 'yes')
+            )
+        except Exception as e:
+            logger.error(f"Assessment campaign error: {str(e)}")
+            return Response({'error': f'Failed to launch campaign: {str(e)}'},
+                          status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return Response({
+            'success': True,
+            **result
+        }, status=status.HTTP_201_CREATED)
+    
     @action(detail=False, methods=['get'])
     def scale_levels(self, request):
         """Get all available scale levels for assessments"""
@@ -313,7 +313,7 @@ class ContractRenewalRequest(SoftDeleteModel):
             </html>
             """
             
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email="myalmet@almettrading.com",
                 to_email=hr_email,
                 subject=subject,
@@ -339,7 +339,7 @@ class ContractRenewalRequest(SoftDeleteModel):
             subject = subject_map.get(notification_type, 'Contract Status Update')
             body = self._get_employee_notification_body(notification_type)
             
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email="myalmet@almettrading.com",
                 to_email=self.employee.email,
                 subject=subject,
@@ -610,7 +610,7 @@ class ProbationReview(SoftDeleteModel):
             </html>
             """
             
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email="myalmet@almettrading.com",
                 to_email=recipients,
                 subject=subject,
@@ -620,6 +620,53 @@ class ProbationReview(SoftDeleteModel):
             logger.error(f"Error sending completion notification: {e}")
 
 
+class EmployeeDueEvent(models.Model):
+    """
+    Upcoming contract expiry / probation review milestone of an employee
+    Maintained on employee save (api.due_events); the periodic scans pick up
+    unprocessed rows whose due_date has arrived instead of scanning employees.
+    """
+    
+    EVENT_TYPE_CHOICES = [
+        ('CONTRACT_EXPIRY', 'Contract Expiry'),
+        ('PROBATION_30_DAY', '30-Day Probation Review'),
+        ('PROBATION_60_DAY', '60-Day Probation Review'),
+        ('PROBATION_90_DAY', '90-Day Probation Review'),
+    ]
+    
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='due_events'
+    )
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES)
+    due_date = models.DateField(
+        help_text="Date the scan acts on the event"
+    )
+    target_date = models.DateField(
+        help_text="Contract end date / review due date"
+    )
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['due_date']
+        unique_together = ['employee', 'event_type', 'target_date']
+        indexes = [
+            models.Index(
+                fields=['event_type', 'due_date'],
+                condition=models.Q(processed_at__isnull=True),
+                name='due_event_pending_idx'
+            ),
+        ]
+        verbose_name = "Employee Due Event"
+        verbose_name_plural = "Employee Due Events"
+    
+    def __str__(self):
+        return f"{self.employee_id} - {self.get_event_type_display()} ({self.due_date})"
+
+
 class ProbationReviewResponse(models.Model):
     """
     Response to probation review question
@@ -0,0 +1,225 @@
+# api/due_events.py - Due-date index for contract and probation scans
+"""
+Employee Due Events
+Each employee's upcoming contract expiry and 30/60/90-day probation review
+milestones are kept as EmployeeDueEvent rows, re-synced when the dates that
+drive them change (see api.signals) and once a night as a safety net.
+
+The periodic scans claim unprocessed rows whose due_date has arrived
+(SELECT ... FOR UPDATE SKIP LOCKED), act on them and mark the handled ones
+processed in the same transaction, so a run costs O(new events) instead of
+O(employees) and two overlapping runs never act on the same event. Events a
+scan skips stay pending and are reconsidered until their target date passes.
+"""
+
+from datetime import date, timedelta
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .contract_probation_models import EmployeeDueEvent
+from .models import Employee
+
+logger = logging.getLogger(__name__)
+
+
+class EmployeeDueEvents:
+    """Maintains and claims EmployeeDueEvent rows"""
+
+    # Fixed-term contracts get a renewal request 2 weeks before they end
+    CONTRACT_DURATIONS = ('3_MONTHS', '6_MONTHS', '1_YEAR', '2_YEARS')
+    CONTRACT_NOTICE_DAYS = 14
+
+    # event_type -> (review_period, review due day); created 3 days before
+    PROBATION_REVIEWS = {
+        'PROBATION_30_DAY': ('30_DAY', 30),
+        'PROBATION_60_DAY': ('60_DAY', 60),
+        'PROBATION_90_DAY': ('90_DAY', 90),
+    }
+    PROBATION_NOTICE_DAYS = 3
+
+    # Employee fields the events are derived from
+    SOURCE_FIELDS = ('contract_end_date', 'contract_duration', 'start_date', 'is_deleted')
+
+    CLAIM_BATCH_SIZE = 200
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def expected_events(cls, employee, today=None):
+        """
+        {event_type: (due_date, target_date)} still ahead of the employee
+
+        Milestones whose due date has already passed are not created, the
+        same as the day-matching scans they replace.
+        """
+        today = today or date.today()
+        events = {}
+        if employee.is_deleted:
+            return events
+
+        if employee.contract_duration in cls.CONTRACT_DURATIONS and employee.contract_end_date:
+            due_date = employee.contract_end_date - timedelta(days=cls.CONTRACT_NOTICE_DAYS)
+            if due_date >= today:
+                events['CONTRACT_EXPIRY'] = (due_date, employee.contract_end_date)
+
+        if employee.start_date:
+            for event_type, (_, review_day) in cls.PROBATION_REVIEWS.items():
+                target_date = employee.start_date + timedelta(days=review_day)
+                due_date = target_date - timedelta(days=cls.PROBATION_NOTICE_DAYS)
+                if due_date >= today:
+                    events[event_type] = (due_date, target_date)
+
+        return events
+
+    @classmethod
+    def sync(cls, employees, today=None):
+        """
+        Bring the unprocessed events of the employees in line with their
+        current dates. Processed events are history and are kept, and so are
+        past-due events the scans have not handled yet (until their target
+        date passes).
+
+        Returns:
+            tuple: (created, deleted)
+        """
+        today = today or date.today()
+        employees = list(employees)
+        if not employees:
+            return 0, 0
+
+        expected = {}
+        for employee in employees:
+            for event_type, (due_date, target_date) in cls.expected_events(employee, today).items():
+                expected[(employee.pk, event_type, due_date, target_date)] = employee
+
+        employee_events = EmployeeDueEvent.objects.filter(
+            employee_id__in=[employee.pk for employee in employees]
+        )
+        rows = list(employee_events.values_list(
+            'id', 'employee_id', 'event_type', 'due_date', 'target_date', 'processed_at'
+        ))
+
+        stale_ids = []
+        # (employee_id, event_type, target_date) of the rows that stay (unique_together)
+        kept = set()
+        for event_id, employee_id, event_type, due_date, target_date, processed_at in rows:
+            if (processed_at is not None
+                    or (employee_id, event_type, due_date, target_date) in expected
+                    # Due, not handled yet: the scans still need it
+                    or due_date < today <= target_date):
+                kept.add((employee_id, event_type, target_date))
+            else:
+                stale_ids.append(event_id)
+
+        deleted = 0
+        if stale_ids:
+            deleted, _ = EmployeeDueEvent.objects.filter(id__in=stale_ids).delete()
+
+        new_events = [
+            EmployeeDueEvent(
+                employee_id=employee_id,
+                event_type=event_type,
+                due_date=due_date,
+                target_date=target_date
+            )
+            for (employee_id, event_type, due_date, target_date) in expected
+            if (employee_id, event_type, target_date) not in kept
+        ]
+        if not new_events:
+            return 0, deleted
+
+        # Conflicts are rows a concurrent sync inserted first; ignored rows
+        # have no pk, so count what is there now
+        EmployeeDueEvent.objects.bulk_create(new_events, ignore_conflicts=True)
+        created = employee_events.count() - (len(rows) - deleted)
+
+        return created, deleted
+
+    @classmethod
+    def sync_all(cls, today=None, chunk_size=1000):
+        """Full re-sync (nightly safety net for changes made without signals)"""
+        today = today or date.today()
+        created = deleted = 0
+
+        employees = Employee.all_objects.only('pk', *cls.SOURCE_FIELDS).order_by('pk')
+        chunk = []
+        for employee in employees.iterator(chunk_size=chunk_size):
+            chunk.append(employee)
+            if len(chunk) >= chunk_size:
+                chunk_created, chunk_deleted = cls.sync(chunk, today)
+                created += chunk_created
+                deleted += chunk_deleted
+                chunk = []
+        if chunk:
+            chunk_created, chunk_deleted = cls.sync(chunk, today)
+            created += chunk_created
+            deleted += chunk_deleted
+
+        return created, deleted
+
+    # ------------------------------------------------------------------
+    # Processing
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def process_due(cls, event_types, handler, today=None):
+        """
+        Claim due, unprocessed events in batches and run handler(event) on
+        each inside the claiming transaction. Only events the handler
+        reports as handled (truthy return) are marked processed; skipped
+        events stay pending and are reconsidered on later runs until their
+        target date passes. An event whose handler raises is rolled back to
+        its savepoint and left for the next run.
+
+        Returns:
+            tuple: (processed, failed)
+        """
+        today = today or date.today()
+        processed = 0
+        failed_ids = set()
+        # Skipped this run: claimed again by the next run, not by the next batch
+        skipped_ids = set()
+
+        while True:
+            with transaction.atomic():
+                events = list(
+                    EmployeeDueEvent.objects.select_for_update(
+                        skip_locked=True, of=('self',)
+                    ).filter(
+                        event_type__in=event_types,
+                        processed_at__isnull=True,
+                        due_date__lte=today,
+                        target_date__gte=today
+                    ).exclude(
+                        id__in=failed_ids | skipped_ids
+                    ).select_related(
+                        'employee__status'
+                    ).order_by('due_date', 'id')[:cls.CLAIM_BATCH_SIZE]
+                )
+                if not events:
+                    break
+
+                done_ids = []
+                for event in events:
+                    try:
+                        with transaction.atomic():
+                            handled = handler(event)
+                        if handled:
+                            done_ids.append(event.id)
+                        else:
+                            skipped_ids.add(event.id)
+                    except Exception as e:
+                        failed_ids.add(event.id)
+                        logger.warning(f"⚠️ Due event {event.id} ({event.event_type}) failed: {e}")
+
+                EmployeeDueEvent.objects.filter(id__in=done_ids).update(processed_at=timezone.now())
+
+            processed += len(done_ids)
+            if len(events) < cls.CLAIM_BATCH_SIZE:
+                break
+
+        return processed, len(failed_ids)
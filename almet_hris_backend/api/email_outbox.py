@@ -0,0 +1,282 @@
+# api/email_outbox.py - Transactional email outbox
+"""
+Email Outbox
+Notification code enqueues emails instead of calling Microsoft Graph inside
+the HTTP request. Outbox rows (and their PENDING NotificationLog rows) are
+written in the caller's transaction; after commit a Celery task delivers them
+with the application token (Graph $batch), retrying with exponential backoff. A periodic
+dispatcher picks up anything the on-commit task missed (broker down, worker
+crash).
+"""
+
+from datetime import timedelta
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .notification_models import NotificationSettings, NotificationLog, EmailOutboxMessage
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_SENDER_EMAIL = 'myalmet@almettrading.com'
+
+
+class EmailOutbox:
+    """Enqueue, claim and deliver outbox emails"""
+
+    CLAIM_BATCH_SIZE = 80
+    BULK_THRESHOLD = 20
+    STALE_LOCK_MINUTES = 10
+    MAX_BACKOFF_MINUTES = 60 * 6
+
+    # ------------------------------------------------------------------
+    # Enqueue
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize_recipients(to_email):
+        """Accept a single address or a list; drop blanks and duplicates"""
+        if isinstance(to_email, str):
+            to_email = [to_email]
+        recipients = []
+        for email in to_email or []:
+            email = (email or '').strip()
+            if email and email not in recipients:
+                recipients.append(email)
+        return recipients
+
+    @staticmethod
+    def _emails_enabled():
+        try:
+            return NotificationSettings.get_active().enable_email_notifications
+        except Exception as e:
+            logger.warning(f"Could not load notification settings: {e}")
+            return True
+
+    @classmethod
+    def enqueue(cls, recipients, subject, body_html, sender_email=None,
+                related_model='', related_object_id='', sent_by=None):
+        """
+        Queue one email (all recipients in the TO field)
+
+        Returns:
+            EmailOutboxMessage or None if nothing was queued
+        """
+        messages = cls.enqueue_many([{
+            'recipients': recipients,
+            'subject': subject,
+            'body_html': body_html,
+            'sender_email': sender_email,
+            'related_model': related_model,
+            'related_object_id': related_object_id,
+            'sent_by': sent_by,
+        }])
+        return messages[0] if messages else None
+
+    @classmethod
+    def enqueue_many(cls, emails):
+        """
+        Queue several emails with two bulk inserts
+
+        Args:
+            emails: list of dicts with the arguments of enqueue()
+
+        Returns:
+            list: created EmailOutboxMessage objects
+        """
+        if not cls._emails_enabled():
+            logger.info("Email notifications are disabled - nothing queued")
+            return []
+
+        messages = []
+        logs = []
+        for email in emails:
+            recipients = cls._normalize_recipients(email.get('recipients'))
+            if not recipients:
+                continue
+
+            related_object_id = email.get('related_object_id')
+            message = EmailOutboxMessage(
+                sender_email=email.get('sender_email') or SYSTEM_SENDER_EMAIL,
+                recipients=recipients,
+                subject=email['subject'],
+                body=email['body_html'],
+                related_model=email.get('related_model') or '',
+                related_object_id=str(related_object_id) if related_object_id else '',
+                sent_by=email.get('sent_by')
+            )
+            messages.append(message)
+
+            for recipient in recipients:
+                logs.append(NotificationLog(
+                    notification_type='EMAIL',
+                    recipient_email=recipient,
+                    subject=message.subject,
+                    body=message.body,
+                    related_model=message.related_model,
+                    related_object_id=message.related_object_id,
+                    status='PENDING',
+                    sent_by=message.sent_by,
+                    outbox_message=message
+                ))
+
+        if not messages:
+            return []
+
+        with transaction.atomic():
+            EmailOutboxMessage.objects.bulk_create(messages)
+            NotificationLog.objects.bulk_create(logs)
+
+        message_ids = [str(message.id) for message in messages]
+        transaction.on_commit(lambda: cls._schedule_delivery(message_ids))
+        return messages
+
+    @classmethod
+    def _schedule_delivery(cls, message_ids):
+        from .tasks import deliver_outbox_emails, deliver_bulk_outbox_emails
+        try:
+            # Large fan-outs (news, announcements) go to the bulk email queue
+            if len(message_ids) > cls.BULK_THRESHOLD:
+                deliver_bulk_outbox_emails.delay(message_ids)
+            else:
+                deliver_outbox_emails.delay(message_ids)
+        except Exception as e:
+            # The periodic dispatcher will pick these up
+            logger.warning(f"Could not schedule outbox delivery ({len(message_ids)} emails): {e}")
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def claim(cls, message_ids=None, limit=None):
+        """
+        Lock due messages for this worker (PENDING and due, or SENDING with a
+        stale lock left by a crashed worker)
+        """
+        now = timezone.now()
+        stale_before = now - timedelta(minutes=cls.STALE_LOCK_MINUTES)
+
+        with transaction.atomic():
+            queryset = EmailOutboxMessage.objects.select_for_update(skip_locked=True).filter(
+                Q(status='PENDING', next_attempt_at__lte=now) |
+                Q(status='SENDING', locked_at__lt=stale_before)
+            )
+            if message_ids:
+                queryset = queryset.filter(id__in=message_ids)
+
+            messages = list(queryset.order_by('next_attempt_at')[:limit or cls.CLAIM_BATCH_SIZE])
+            if messages:
+                EmailOutboxMessage.objects.filter(
+                    id__in=[message.id for message in messages]
+                ).update(status='SENDING', locked_at=now)
+
+        return messages
+
+    @classmethod
+    def deliver(cls, messages):
+        """
+        Send claimed messages (Graph $batch, 20 per call) and record outcomes
+
+        Returns:
+            list: success flag per message
+        """
+        from .system_email_service import system_email_service
+
+        try:
+            results = system_email_service.send_batch_as_system([
+                {
+                    'from_email': message.sender_email,
+                    'to_email': message.recipients,
+                    'subject': message.subject,
+                    'body_html': message.body
+                }
+                for message in messages
+            ])
+        except Exception as e:
+            results = [
+                {'success': False, 'message': f"Exception: {str(e)}", 'message_id': None}
+                for _ in messages
+            ]
+
+        for message, result in zip(messages, results):
+            message.attempts += 1
+            if result['success']:
+                cls._mark_sent(message, result.get('message_id') or '')
+            else:
+                cls._mark_attempt_failed(message, result['message'])
+        return [result['success'] for result in results]
+
+    @classmethod
+    def _mark_sent(cls, message, message_id):
+        now = timezone.now()
+        EmailOutboxMessage.objects.filter(id=message.id).update(
+            status='SENT', attempts=message.attempts, sent_at=now,
+            message_id=message_id, last_error='', locked_at=None, updated_at=now
+        )
+        message.logs.update(
+            status='SENT', sent_at=now, message_id=message_id,
+            retry_count=message.attempts - 1, updated_at=now
+        )
+
+    @classmethod
+    def _retry_delay(cls, settings, attempts):
+        """Exponential backoff based on the configured retry delay"""
+        base = max(settings.email_retry_delay_minutes, 1)
+        return timedelta(minutes=min(base * 2 ** (attempts - 1), cls.MAX_BACKOFF_MINUTES))
+
+    @classmethod
+    def _mark_attempt_failed(cls, message, error_message):
+        now = timezone.now()
+        settings = NotificationSettings.get_active()
+        retries_used = message.attempts - 1
+
+        if retries_used < settings.email_retry_attempts:
+            next_attempt_at = now + cls._retry_delay(settings, message.attempts)
+            EmailOutboxMessage.objects.filter(id=message.id).update(
+                status='PENDING', attempts=message.attempts, next_attempt_at=next_attempt_at,
+                last_error=error_message, locked_at=None, updated_at=now
+            )
+            message.logs.update(
+                status='RETRY', error_message=error_message,
+                retry_count=message.attempts, updated_at=now
+            )
+            logger.warning(
+                f"Outbox email {message.id} failed (attempt {message.attempts}), "
+                f"retrying at {next_attempt_at:%Y-%m-%d %H:%M}: {error_message}"
+            )
+        else:
+            EmailOutboxMessage.objects.filter(id=message.id).update(
+                status='FAILED', attempts=message.attempts,
+                last_error=error_message, locked_at=None, updated_at=now
+            )
+            message.logs.update(
+                status='FAILED', error_message=error_message,
+                retry_count=message.attempts, updated_at=now
+            )
+            logger.error(f"Outbox email {message.id} failed permanently: {error_message}")
+
+    @classmethod
+    def dispatch(cls, message_ids=None):
+        """
+        Deliver due messages batch by batch
+
+        Args:
+            message_ids: restrict to these messages (on-commit delivery);
+                         None drains everything that is due
+        """
+        sent = 0
+        failed = 0
+
+        while True:
+            messages = cls.claim(message_ids)
+            if not messages:
+                break
+
+            outcomes = cls.deliver(messages)
+            sent += sum(outcomes)
+            failed += len(outcomes) - sum(outcomes)
+
+        return {'sent': sent, 'failed': failed}
@@ -0,0 +1,218 @@
+# api/employee_side_effects.py - Deferred Employee save side effects
+"""
+Employee Side Effects
+Employee post_save receivers only *schedule* side effects (status update,
+job description auto-assignment, notification emails, cache invalidation).
+Scheduled effects are de-duplicated per (effect, employee) and run once when
+the surrounding transaction commits, against a fresh copy of the employees.
+
+Bulk operations wrap their loop in EmployeeSideEffects.batch(): effects of
+every save inside are collected and replayed together at the end. Code that
+bypasses signals (queryset.update, bulk_create) can call replay() directly.
+
+Handlers are registered in api.signals.
+"""
+
+from contextlib import contextmanager
+import logging
+import threading
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+def _get_state():
+    if not hasattr(_state, 'pending'):
+        _state.pending = {}
+        _state.batch_depth = 0
+    return _state
+
+
+def _flush_pending():
+    EmployeeSideEffects.flush()
+
+
+def _flush_registered(connection):
+    """False if our on-commit flush was dropped by a rollback"""
+    return any(item[1] is _flush_pending for item in connection.run_on_commit)
+
+
+def _discard_stale(state):
+    """
+    Drop effects left behind by a rolled back transaction: pending effects
+    are only live while our on-commit flush is registered
+    """
+    if not state.pending:
+        return
+    connection = transaction.get_connection()
+    if not (connection.in_atomic_block and _flush_registered(connection)):
+        state.pending.clear()
+
+
+class EmployeeSideEffects:
+    """Collects Employee side effects and runs each once per employee"""
+
+    # name -> (handler, needs_employee); run in registration order
+    _handlers = {}
+
+    # Fields compared by the receivers (see snapshot())
+    SNAPSHOT_RELATED = ('status', 'position_group')
+
+    # Effects replay() runs by default: those derived from the current row
+    # alone ('welcome' / 'position_change' need the previous one)
+    REPLAY_EFFECTS = ('status', 'job_description', 'due_events', 'caches')
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def handler(cls, name, needs_employee=True):
+        """
+        Register a handler
+
+        The handler receives a list of (employee, context) tuples. Employees
+        are reloaded at flush time; deleted rows are dropped. Handlers with
+        needs_employee=False run once and receive an empty list.
+        """
+        def decorator(func):
+            cls._handlers[name] = (func, needs_employee)
+            return func
+        return decorator
+
+    # ------------------------------------------------------------------
+    # Pre-save snapshot
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def snapshot(cls, instance):
+        """
+        Store the saved row's previous values on the instance (one query,
+        shared by all receivers)
+        """
+        from .models import Employee
+
+        previous = None
+        if instance.pk:
+            previous = Employee.all_objects.select_related(*cls.SNAPSHOT_RELATED).filter(
+                pk=instance.pk
+            ).first()
+        instance._pre_save_snapshot = previous
+        return previous
+
+    @staticmethod
+    def previous(instance):
+        """Previous version of the instance (None for new employees)"""
+        return getattr(instance, '_pre_save_snapshot', None)
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def schedule(cls, name, employee=None, context=None):
+        """
+        Schedule an effect for an employee (or a global effect if None)
+
+        A second schedule of the same effect for the same employee within the
+        transaction keeps the first context (e.g. the original position) and
+        runs only once.
+        """
+        if name not in cls._handlers:
+            raise ValueError(f"Unknown employee side effect: {name}")
+
+        state = _get_state()
+        key = (name, employee.pk if employee is not None else None)
+
+        if state.batch_depth:
+            state.pending.setdefault(key, context or {})
+            return
+
+        _discard_stale(state)
+        state.pending.setdefault(key, context or {})
+
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            cls.flush()
+        elif not _flush_registered(connection):
+            transaction.on_commit(_flush_pending)
+
+    @classmethod
+    @contextmanager
+    def batch(cls):
+        """Collect effects of every save inside and replay them together"""
+        state = _get_state()
+        if not state.batch_depth:
+            _discard_stale(state)
+        state.batch_depth += 1
+        try:
+            yield
+        finally:
+            state.batch_depth -= 1
+            if not state.batch_depth and state.pending:
+                connection = transaction.get_connection()
+                if connection.in_atomic_block:
+                    if not _flush_registered(connection):
+                        transaction.on_commit(_flush_pending)
+                else:
+                    cls.flush()
+
+    @classmethod
+    def replay(cls, employee_ids, effects=None):
+        """
+        Run effects for employees changed without signals
+        (queryset.update / bulk_create); by default REPLAY_EFFECTS, which
+        include the global cache invalidation
+        """
+        from .models import Employee
+
+        effects = effects or [name for name in cls.REPLAY_EFFECTS if name in cls._handlers]
+        per_employee = [name for name in effects if cls._handlers[name][1]]
+        with cls.batch():
+            for name in effects:
+                if name not in per_employee:
+                    cls.schedule(name)
+            for employee in Employee.all_objects.filter(pk__in=list(employee_ids)).only('pk'):
+                for name in per_employee:
+                    cls.schedule(name, employee)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def flush(cls):
+        """Run and clear all pending effects"""
+        from .models import Employee
+
+        state = _get_state()
+        pending, state.pending = state.pending, {}
+        if not pending:
+            return
+
+        employee_ids = {pk for (_, pk) in pending if pk is not None}
+        employees = {}
+        if employee_ids:
+            employees = Employee.all_objects.select_related(
+                'status', 'position_group', 'business_function', 'department',
+                'unit', 'job_function', 'line_manager'
+            ).in_bulk(list(employee_ids))
+
+        for name, (handler, needs_employee) in cls._handlers.items():
+            entries = [
+                (employees[pk], context)
+                for (effect, pk), context in pending.items()
+                if effect == name and pk in employees
+            ]
+            if needs_employee and not entries:
+                continue
+            if not needs_employee and not any(effect == name for (effect, _) in pending):
+                continue
+
+            try:
+                handler(entries)
+            except Exception as e:
+                logger.error(f"❌ Employee side effect '{name}' failed: {e}", exc_info=True)
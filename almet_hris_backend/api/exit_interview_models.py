@@ -205,7 +205,7 @@ class ExitInterview(SoftDeleteModel):
             </html>
             """
             
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email="myalmet@almettrading.com",
                 to_email=hr_email,
                 subject=subject,
@@ -0,0 +1,207 @@
+# api/graph_client.py - Shared Microsoft Graph HTTP client
+"""
+Graph Client
+One pooled, keep-alive requests.Session per process for all Microsoft Graph
+traffic. Retries 429/5xx of idempotent requests with backoff (honouring
+Retry-After) at the transport level and keeps per-endpoint latency metrics.
+POSTs (sendMail, $batch) are never retried here - a retried sendMail can
+deliver twice; callers that batch retry throttled items themselves.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRAPH_CLIENT_SETTINGS = {
+    'POOL_SIZE': 20,
+    'CONNECT_TIMEOUT': 5,
+    'READ_TIMEOUT': 30,
+    'MAX_RETRIES': 3,
+    'BACKOFF_FACTOR': 0.5,
+    'RETRY_STATUS_CODES': (429, 500, 502, 503, 504),
+    'SLOW_CALL_MS': 5000,
+}
+
+# Path segments that identify a mailbox or a resource, collapsed for metrics
+_ID_SEGMENT = re.compile(r'^[A-Za-z0-9_\-=+]{20,}$')
+
+
+def get_graph_client_settings():
+    return {**DEFAULT_GRAPH_CLIENT_SETTINGS, **getattr(settings, 'GRAPH_CLIENT', {})}
+
+
+class GraphClient:
+    """Microsoft Graph client with a per-process connection pool"""
+
+    def __init__(self, base_url=None):
+        self.base_url = (base_url or getattr(
+            settings, 'MICROSOFT_GRAPH_ENDPOINT', 'https://graph.microsoft.com/v1.0'
+        )).rstrip('/')
+        self.config = get_graph_client_settings()
+
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Session
+    # ------------------------------------------------------------------
+
+    def _build_session(self):
+        retry = Retry(
+            total=self.config['MAX_RETRIES'],
+            connect=self.config['MAX_RETRIES'],
+            read=0,
+            status=self.config['MAX_RETRIES'],
+            status_forcelist=self.config['RETRY_STATUS_CODES'],
+            # urllib3 default: idempotent verbs only, never POST
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            backoff_factor=self.config['BACKOFF_FACTOR'],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.config['POOL_SIZE'],
+            pool_maxsize=self.config['POOL_SIZE'],
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @property
+    def session(self):
+        """Shared session; rebuilt after fork so workers never share sockets"""
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._session_lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._build_session()
+                    self._session_pid = pid
+        return self._session
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def build_url(self, path):
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, access_token=None, headers=None, **kwargs):
+        """
+        Send a Graph request
+
+        Args:
+            method: HTTP method
+            path: Graph path (e.g. '/me/messages') or absolute URL
+            access_token: Bearer token (delegated or application)
+            headers: extra headers
+            **kwargs: passed to requests (params, json, timeout, ...)
+
+        Returns:
+            requests.Response (exceptions propagate, as with requests)
+        """
+        request_headers = {'Content-Type': 'application/json'}
+        if access_token:
+            request_headers['Authorization'] = f'Bearer {access_token}'
+        request_headers.update(headers or {})
+
+        kwargs.setdefault('timeout', (self.config['CONNECT_TIMEOUT'], self.config['READ_TIMEOUT']))
+
+        url = self.build_url(path)
+        endpoint = f"{method.upper()} {self.endpoint_name(url)}"
+        started = time.perf_counter()
+        status_code = None
+        try:
+            response = self.session.request(method, url, headers=request_headers, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            self._record(endpoint, (time.perf_counter() - started) * 1000, status_code)
+
+    def get(self, path, access_token=None, **kwargs):
+        return self.request('GET', path, access_token=access_token, **kwargs)
+
+    def post(self, path, access_token=None, **kwargs):
+        return self.request('POST', path, access_token=access_token, **kwargs)
+
+    def patch(self, path, access_token=None, **kwargs):
+        return self.request('PATCH', path, access_token=access_token, **kwargs)
+
+    def delete(self, path, access_token=None, **kwargs):
+        return self.request('DELETE', path, access_token=access_token, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def endpoint_name(self, url):
+        """'/users/a@b.com/sendMail' -> '/users/{id}/sendMail'"""
+        path = url.split('?', 1)[0]
+        if path.startswith(self.base_url):
+            path = path[len(self.base_url):]
+        elif '://' in path:
+            path = '/' + path.split('://', 1)[1].split('/', 1)[-1]
+
+        segments = [
+            '{id}' if ('@' in segment or _ID_SEGMENT.match(segment)) else segment
+            for segment in path.split('/')
+        ]
+        return '/'.join(segments) or '/'
+
+    def _record(self, endpoint, elapsed_ms, status_code):
+        with self._metrics_lock:
+            entry = self._metrics.setdefault(endpoint, {
+                'count': 0,
+                'errors': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'status_codes': {}
+            })
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            status_key = str(status_code) if status_code is not None else 'exception'
+            entry['status_codes'][status_key] = entry['status_codes'].get(status_key, 0) + 1
+            if status_code is None or status_code >= 400:
+                entry['errors'] += 1
+
+        if elapsed_ms >= self.config['SLOW_CALL_MS']:
+            logger.warning(f"Slow Graph call: {endpoint} took {elapsed_ms:.0f}ms (status {status_code})")
+
+    def get_metrics(self):
+        """Per-endpoint latency metrics for this process"""
+        with self._metrics_lock:
+            return {
+                endpoint: {
+                    'count': entry['count'],
+                    'errors': entry['errors'],
+                    'avg_ms': round(entry['total_ms'] / entry['count'], 1) if entry['count'] else 0,
+                    'max_ms': round(entry['max_ms'], 1),
+                    'status_codes': dict(entry['status_codes'])
+                }
+                for endpoint, entry in sorted(self._metrics.items())
+            }
+
+    def reset_metrics(self):
+        with self._metrics_lock:
+            self._metrics = {}
+
+
+# Singleton instance
+graph_client = GraphClient()
@@ -0,0 +1,154 @@
+# api/grouped_stats.py - Declarative dashboard statistics
+"""
+Grouped Statistics
+A dashboard declares its measures (aggregate expressions) and breakdowns
+(group-by dimensions) once. The engine compiles every measure and every
+breakdown with known choices into conditional aggregates of a single query;
+open-ended breakdowns (e.g. by department name) add one GROUP BY query each.
+
+Results are cached per scope: the caller passes the queryset it is allowed to
+see together with a scope key describing that access (see scope_key()).
+Saves / deletes of the declared models bump the version, dropping every
+cached scope at once.
+
+    ASSET_STATS = GroupedStats(
+        'assets',
+        measures={'total': Count('pk')},
+        breakdowns={'status': Breakdown('status', choices=Asset.STATUS_CHOICES)},
+        invalidate_on=[Asset],
+    )
+    data = ASSET_STATS.get(queryset, scope='all')
+    data['measures']['total'], data['breakdowns']['status']['IN_USE']
+"""
+
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+
+class Breakdown:
+    """
+    Count per value of a field
+
+    With choices the counts are conditional aggregates of the main query
+    (every choice is present, zeros included, in choice order). Without
+    choices the values come from a GROUP BY query, largest first, optionally
+    limited.
+    """
+
+    def __init__(self, field, choices=None, limit=None):
+        self.field = field
+        self.choices = [choice[0] for choice in choices] if choices else None
+        self.limit = limit
+
+
+class GroupedStats:
+    """One dashboard's statistics, compiled to as few queries as possible"""
+
+    CACHE_PREFIX = 'grouped_stats'
+    CACHE_TIMEOUT = 60 * 10
+
+    def __init__(self, name, measures=None, breakdowns=None, invalidate_on=(), timeout=None):
+        self.name = name
+        self.measures = measures or {}
+        self.breakdowns = breakdowns or {}
+        self.timeout = timeout or self.CACHE_TIMEOUT
+        self.version_key = f"{self.CACHE_PREFIX}:{name}:version"
+
+        for model in invalidate_on:
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    self._on_change,
+                    sender=model,
+                    weak=False,
+                    dispatch_uid=f"{self.CACHE_PREFIX}:{name}:{model._meta.label}:{signal is post_save}"
+                )
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def _version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            version = 1
+            cache.set(self.version_key, version, None)
+        return version
+
+    def invalidate(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, None)
+
+    def _on_change(self, sender, **kwargs):
+        self.invalidate()
+
+    @staticmethod
+    def scope_key(*parts):
+        """Short stable key for an access scope (e.g. a list of employee ids)"""
+        raw = '|'.join(
+            ','.join(str(value) for value in sorted(part)) if isinstance(part, (list, set, tuple)) else str(part)
+            for part in parts
+        )
+        return hashlib.md5(raw.encode()).hexdigest()[:16]
+
+    # ------------------------------------------------------------------
+    # Compute
+    # ------------------------------------------------------------------
+
+    def compute(self, queryset):
+        """
+        Returns:
+            dict: {'measures': {name: value}, 'breakdowns': {name: {value: count}}}
+        """
+        aggregates = dict(self.measures)
+        choice_aliases = {}
+        for name, breakdown in self.breakdowns.items():
+            if breakdown.choices is None:
+                continue
+            for index, value in enumerate(breakdown.choices):
+                alias = f"_{name}_{index}"
+                aggregates[alias] = Count('pk', filter=Q(**{breakdown.field: value}))
+                choice_aliases[alias] = (name, value)
+
+        row = queryset.order_by().aggregate(**aggregates) if aggregates else {}
+
+        result = {
+            'measures': {name: row[name] for name in self.measures},
+            'breakdowns': {}
+        }
+
+        for name, breakdown in self.breakdowns.items():
+            if breakdown.choices is not None:
+                result['breakdowns'][name] = {
+                    value: row[alias]
+                    for alias, (breakdown_name, value) in choice_aliases.items()
+                    if breakdown_name == name
+                }
+                continue
+
+            groups = queryset.order_by().values(breakdown.field).annotate(
+                _count=Count('pk')
+            ).order_by('-_count', breakdown.field)
+            if breakdown.limit:
+                groups = groups[:breakdown.limit]
+            result['breakdowns'][name] = {
+                group[breakdown.field]: group['_count'] for group in groups
+            }
+
+        return result
+
+    def get(self, queryset, scope='all'):
+        """Cached compute() for the scope the queryset was filtered to"""
+        key = f"{self.CACHE_PREFIX}:{self.name}:{self._version()}:{scope}"
+        data = cache.get(key)
+        if data is None:
+            data = self.compute(queryset)
+            cache.set(key, data, self.timeout)
+        return data
@@ -8,7 +8,7 @@ import logging
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from .system_email_service import system_email_service
-from .notification_models import NotificationSettings, NotificationLog
+from .notification_models import NotificationSettings
 
 logger = logging.getLogger(__name__)
 
@@ -61,67 +61,22 @@ class HandoverEmailService:
             # Fallback to generic template
             html_content = self._get_fallback_email_html(context)
         
-        # Send email using system email service
+        # Queue email; the outbox creates the notification logs and sends after commit
         try:
-            # Handle both single email and list
-            if isinstance(recipient_email, str):
-                recipients = [recipient_email]
-            else:
-                recipients = recipient_email
-            
-            # Create notification log
-            for email in recipients:
-                NotificationLog.objects.create(
-                    notification_type='EMAIL',
-                    recipient_email=email,
-                    subject=subject,
-                    body=html_content,
-                    related_model='HandoverRequest',
-                    related_object_id=handover.request_id,
-                    status='PENDING',
-                    sent_by=handover.created_by
-                )
-            
-            # Send email
-            result = system_email_service.send_email_as_system(
+            result = system_email_service.queue_email_as_system(
                 from_email=settings.handover_sender_email,
-                to_email=recipients,
+                to_email=recipient_email,
                 subject=subject,
-                body_html=html_content
+                body_html=html_content,
+                related_model='HandoverRequest',
+                related_object_id=handover.request_id,
+                sent_by=handover.created_by
             )
             
-            if result['success']:
-      
-                
-                # Update notification logs
-                for email in recipients:
-                    try:
-                        log = NotificationLog.objects.filter(
-                            recipient_email=email,
-                            related_object_id=handover.request_id,
-                            status='PENDING'
-                        ).latest('created_at')
-                        log.mark_as_sent(result.get('message_id'))
-                    except NotificationLog.DoesNotExist:
-                        pass
-                
-                return True
-            else:
-                logger.error(f"❌ Failed to send handover email: {result['message']}")
-                
-                # Mark as failed
-                for email in recipients:
-                    try:
-                        log = NotificationLog.objects.filter(
-                            recipient_email=email,
-                            related_object_id=handover.request_id,
-                            status='PENDING'
-                        ).latest('created_at')
-                        log.mark_as_failed(result['message'])
-                    except NotificationLog.DoesNotExist:
-                        pass
-                
-                return False
+            if not result['success']:
+                logger.error(f"❌ Failed to queue handover email: {result['message']}")
+            
+            return result['success']
                 
         except Exception as e:
             error_msg = f"Exception sending handover email: {str(e)}"
@@ -0,0 +1,346 @@
+# api/job_description_assignments.py - Batched job description assignment / approval
+"""
+Job Description Assignment Batches
+Rolling a job description out to many holders goes through set-based
+operations instead of one request per assignment:
+
+- add: candidates (employees with the related rows the criteria check needs,
+  vacancies, existing assignments) are loaded with one query each, validated
+  in memory with validate_employee_assignment(), and the new assignments are
+  bulk-created
+- submit / line manager approval / employee approval: the selected
+  assignments are locked, checked and moved with one bulk_update
+
+Every call returns a result per requested item. Notification emails are
+queued after commit by a Celery task
+(api.tasks.send_job_description_assignment_notifications), the cached
+PDF (which lists assignments and approvals) is re-rendered and the cached
+assignment statistics are dropped (bulk writes skip post_save).
+"""
+
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .email_outbox import EmailOutbox
+from .job_description_models import JobDescription, JobDescriptionAssignment
+from .job_description_pdf import JobDescriptionPDF
+from .models import Employee, VacantPosition
+
+logger = logging.getLogger(__name__)
+
+
+class JobDescriptionAssignmentBatch:
+    """Bulk create and transition JobDescriptionAssignment rows"""
+
+    # Related rows read by validate_employee_assignment()
+    EMPLOYEE_RELATED = (
+        'business_function', 'department', 'unit', 'job_function', 'position_group', 'line_manager'
+    )
+    JOB_DESCRIPTION_RELATED = (
+        'business_function', 'department', 'unit', 'job_function', 'position_group'
+    )
+    ASSIGNMENT_RELATED = ('employee', 'vacancy_position', 'reports_to')
+
+    # event -> notified party
+    NOTIFICATION_EVENTS = ('SUBMITTED', 'LINE_MANAGER_APPROVED', 'APPROVED')
+
+    # ------------------------------------------------------------------
+    # Add
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def add(cls, job_description, employee_ids=(), vacancy_ids=(), require_match=False):
+        """
+        Add employees / vacancies to a job description
+
+        Args:
+            require_match: skip employees that fail the job description's
+                criteria instead of only reporting the mismatch
+
+        Returns:
+            dict: {'created': [JobDescriptionAssignment], 'results': [...]}
+        """
+        jd = JobDescription.objects.select_related(*cls.JOB_DESCRIPTION_RELATED).get(pk=job_description.pk)
+
+        employees = Employee.objects.filter(
+            id__in=list(employee_ids), is_deleted=False
+        ).select_related(*cls.EMPLOYEE_RELATED).in_bulk()
+        vacancies = VacantPosition.objects.filter(
+            id__in=list(vacancy_ids), is_filled=False
+        ).select_related('reporting_to').in_bulk()
+
+        assigned_employees = set()
+        assigned_vacancies = set()
+        for employee_id, vacancy_id in jd.assignments.filter(is_active=True).values_list(
+            'employee_id', 'vacancy_position_id'
+        ):
+            assigned_employees.add(employee_id)
+            assigned_vacancies.add(vacancy_id)
+
+        results = []
+        new_assignments = []
+
+        for employee_id in dict.fromkeys(employee_ids):
+            result = {'type': 'employee', 'id': employee_id}
+            results.append(result)
+
+            employee = employees.get(employee_id)
+            if employee is None:
+                result.update(status='not_found', reason='Employee not found')
+                continue
+            result['name'] = employee.full_name
+            if employee_id in assigned_employees:
+                result.update(status='skipped', reason='Already assigned')
+                continue
+
+            # save() is skipped by bulk_create: reports_to / is_vacancy set here
+            assignment = JobDescriptionAssignment(
+                job_description=jd,
+                employee=employee,
+                is_vacancy=False,
+                reports_to=employee.line_manager
+            )
+            matches, message = assignment.validate_employee_assignment()
+            result['criteria_match'] = matches
+            if not matches:
+                result['mismatch'] = message
+                if require_match:
+                    result.update(status='rejected', reason='Does not match job description criteria')
+                    continue
+
+            result['status'] = 'created'
+            result['assignment'] = assignment
+            new_assignments.append(assignment)
+
+        for vacancy_id in dict.fromkeys(vacancy_ids):
+            result = {'type': 'vacancy', 'id': vacancy_id}
+            results.append(result)
+
+            vacancy = vacancies.get(vacancy_id)
+            if vacancy is None:
+                result.update(status='not_found', reason='Vacancy not found or already filled')
+                continue
+            result['name'] = f"VACANT - {vacancy.position_id}"
+            if vacancy_id in assigned_vacancies:
+                result.update(status='skipped', reason='Already assigned')
+                continue
+
+            assignment = JobDescriptionAssignment(
+                job_description=jd,
+                employee=None,
+                is_vacancy=True,
+                vacancy_position=vacancy,
+                reports_to=vacancy.reporting_to
+            )
+            result['status'] = 'created'
+            result['assignment'] = assignment
+            new_assignments.append(assignment)
+
+        with transaction.atomic():
+            JobDescriptionAssignment.objects.bulk_create(new_assignments)
+            # bulk_create skips post_save: the PDF lists the assignments
+            if new_assignments:
+                JobDescriptionPDF.schedule(jd.pk)
+                transaction.on_commit(cls._invalidate_stats)
+
+        for result in results:
+            assignment = result.pop('assignment', None)
+            if assignment is not None:
+                result['assignment_id'] = str(assignment.id)
+
+        logger.info(f"✅ JD {jd.id}: {len(new_assignments)} assignment(s) added in bulk")
+        return {'created': new_assignments, 'results': results}
+
+    # ------------------------------------------------------------------
+    # Transitions
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _transition(cls, job_description, assignment_ids, from_statuses, apply, fields, event=None):
+        """
+        Lock the selected active assignments, apply(assignment) to those in
+        from_statuses (it returns an error message or None) and save them
+        with one bulk_update
+
+        assignment_ids=None selects every assignment in from_statuses.
+        """
+        results = []
+        changed = []
+
+        with transaction.atomic():
+            queryset = job_description.assignments.select_for_update(of=('self',)).filter(
+                is_active=True
+            ).select_related(*cls.ASSIGNMENT_RELATED)
+
+            if assignment_ids is None:
+                assignments = list(queryset.filter(status__in=from_statuses).order_by('created_at'))
+                requested = [assignment.pk for assignment in assignments]
+            else:
+                requested = list(dict.fromkeys(assignment_ids))
+                assignments = list(queryset.filter(pk__in=requested))
+            by_id = {str(assignment.pk): assignment for assignment in assignments}
+
+            now = timezone.now()
+            for assignment_id in requested:
+                result = {'assignment_id': str(assignment_id)}
+                results.append(result)
+
+                assignment = by_id.get(str(assignment_id))
+                if assignment is None:
+                    result.update(success=False, error='Assignment not found')
+                    continue
+                result['name'] = assignment.get_display_name()
+
+                if assignment.status not in from_statuses:
+                    result.update(
+                        success=False,
+                        error=f'Invalid status: {assignment.get_status_display()}'
+                    )
+                    continue
+
+                error = apply(assignment, now)
+                if error:
+                    result.update(success=False, error=error)
+                    continue
+
+                assignment.updated_at = now
+                changed.append(assignment)
+                result.update(success=True, status=assignment.get_status_display())
+
+            JobDescriptionAssignment.objects.bulk_update(changed, [*fields, 'updated_at'])
+
+            if changed:
+                JobDescriptionPDF.schedule(job_description.pk)
+                transaction.on_commit(cls._invalidate_stats)
+
+            if event and changed:
+                changed_ids = [str(assignment.pk) for assignment in changed]
+                transaction.on_commit(lambda: cls._schedule_notifications(changed_ids, event))
+
+        return {
+            'updated': changed,
+            'updated_count': len(changed),
+            'failed_count': len(results) - len(changed),
+            'results': results
+        }
+
+    @classmethod
+    def submit(cls, job_description, assignment_ids=None):
+        """DRAFT / REVISION_REQUIRED -> PENDING_LINE_MANAGER"""
+        def apply(assignment, now):
+            if not assignment.reports_to_id:
+                return 'No line manager'
+            assignment.status = 'PENDING_LINE_MANAGER'
+
+        return cls._transition(
+            job_description, assignment_ids, ['DRAFT', 'REVISION_REQUIRED'], apply,
+            fields=['status'], event='SUBMITTED'
+        )
+
+    @classmethod
+    def approve_as_line_manager(cls, job_description, user, assignment_ids=None, comments=''):
+        """PENDING_LINE_MANAGER -> PENDING_EMPLOYEE (vacancies: APPROVED)"""
+        def apply(assignment, now):
+            assignment.line_manager_approved_by = user
+            assignment.line_manager_approved_at = now
+            assignment.line_manager_comments = comments
+            assignment.status = 'APPROVED' if assignment.is_vacancy else 'PENDING_EMPLOYEE'
+
+        return cls._transition(
+            job_description, assignment_ids, ['PENDING_LINE_MANAGER'], apply,
+            fields=['status', 'line_manager_approved_by', 'line_manager_approved_at', 'line_manager_comments'],
+            event='LINE_MANAGER_APPROVED'
+        )
+
+    @classmethod
+    def approve_as_employee(cls, job_description, user, assignment_ids=None, comments=''):
+        """PENDING_EMPLOYEE -> APPROVED"""
+        def apply(assignment, now):
+            assignment.employee_approved_by = user
+            assignment.employee_approved_at = now
+            assignment.employee_comments = comments
+            assignment.status = 'APPROVED'
+
+        return cls._transition(
+            job_description, assignment_ids, ['PENDING_EMPLOYEE'], apply,
+            fields=['status', 'employee_approved_by', 'employee_approved_at', 'employee_comments'],
+            event='APPROVED'
+        )
+
+    @staticmethod
+    def _invalidate_stats():
+        # Imported here: the views module imports this one
+        from .job_description_views import JOB_DESCRIPTION_ASSIGNMENT_STATS
+        JOB_DESCRIPTION_ASSIGNMENT_STATS.invalidate()
+
+    # ------------------------------------------------------------------
+    # Notifications
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _schedule_notifications(assignment_ids, event):
+        from .tasks import send_job_description_assignment_notifications
+        try:
+            send_job_description_assignment_notifications.delay(assignment_ids, event)
+        except Exception as e:
+            logger.warning(f"Could not schedule job description notifications ({event}): {e}")
+
+    @staticmethod
+    def _build_email_html(recipient_name, intro, assignments):
+        rows = ''.join(
+            f"<li>{assignment.job_description.job_title} - {assignment.get_display_name()}</li>"
+            for assignment in assignments
+        )
+        return f"""
+        <div style="font-family: Arial, sans-serif; max-width: 600px;">
+            <p>Dear {recipient_name},</p>
+            <p>{intro}</p>
+            <ul>{rows}</ul>
+            <p>Please review them in the myAlmet portal.</p>
+        </div>
+        """
+
+    @classmethod
+    def notify(cls, assignment_ids, event):
+        """
+        Queue one email per recipient for a batch transition
+
+        SUBMITTED goes to the line managers, LINE_MANAGER_APPROVED and
+        APPROVED to the employees.
+
+        Returns:
+            int: number of queued emails
+        """
+        if event not in cls.NOTIFICATION_EVENTS:
+            raise ValueError(f"Unknown job description notification event: {event}")
+
+        recipient_field = 'reports_to' if event == 'SUBMITTED' else 'employee'
+        intro = {
+            'SUBMITTED': 'The following job descriptions are waiting for your approval:',
+            'LINE_MANAGER_APPROVED': 'Your line manager approved the following job descriptions; your approval is needed:',
+            'APPROVED': 'The following job descriptions have been fully approved:',
+        }[event]
+
+        by_recipient = {}
+        assignments = JobDescriptionAssignment.objects.filter(
+            id__in=assignment_ids
+        ).select_related('job_description', 'employee', 'vacancy_position', 'reports_to')
+        for assignment in assignments:
+            recipient = getattr(assignment, recipient_field)
+            if recipient is None or not recipient.email:
+                continue
+            by_recipient.setdefault(recipient.pk, (recipient, []))[1].append(assignment)
+
+        emails = [
+            {
+                'recipients': recipient.email,
+                'subject': f"Job description {'approval request' if event != 'APPROVED' else 'approved'} ({len(items)})",
+                'body_html': cls._build_email_html(recipient.full_name, intro, items),
+                'related_model': 'JobDescriptionAssignment',
+                'related_object_id': items[0].id,
+            }
+            for recipient, items in by_recipient.values()
+        ]
+        return len(EmailOutbox.enqueue_many(emails))
@@ -0,0 +1,236 @@
+# api/job_description_matching.py - Eligible employees / vacancies for a job description
+"""
+Job Description Matching
+Finds the employees and vacant positions a job description would apply to
+with one composed query per model instead of a filter (and two counts) per
+criterion:
+
+- every criterion is a Q object; the matching queryset ANDs them together
+- grading levels are compared normalized in SQL (same rules as
+  normalize_grading_level: no underscores / spaces, upper case)
+- employees match the department by name (same-named departments of other
+  business functions count), vacancies by id
+- diagnostics() counts the candidates each criterion accepts, alone and
+  combined with the previous ones, in a single conditional aggregate
+
+The preview endpoint runs on every form change, so its matching ids are
+cached per criteria tuple; Employee / VacantPosition / Department changes
+bump the cache version (see api/signals.py). Writes that skip signals
+(queryset.update, bulk_create) must go through EmployeeSideEffects.replay()
+or call invalidate(); the short timeout bounds anything else.
+"""
+
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Subquery, Value
+from django.db.models.functions import Replace, Upper
+
+from .job_description_models import normalize_grading_level
+from .models import Department, Employee, VacantPosition
+
+logger = logging.getLogger(__name__)
+
+
+class EligibleEmployeeMatcher:
+    """Composed eligibility query for job description criteria"""
+
+    CACHE_PREFIX = 'jd_eligible'
+    VERSION_KEY = 'jd_eligible:version'
+    CACHE_TIMEOUT = 60 * 2
+
+    CRITERIA = (
+        'job_title', 'business_function_id', 'department_id', 'unit_id',
+        'job_function_id', 'position_group_id', 'grading_levels'
+    )
+    EMPLOYEE_RELATED = (
+        'business_function', 'department', 'unit', 'job_function', 'position_group', 'line_manager'
+    )
+    VACANCY_RELATED = (
+        'business_function', 'department', 'unit', 'job_function', 'position_group', 'reporting_to'
+    )
+
+    # ------------------------------------------------------------------
+    # Criteria
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def normalize(cls, job_title=None, business_function_id=None, department_id=None, unit_id=None,
+                  job_function_id=None, position_group_id=None, grading_levels=None):
+        """Criteria as a hashable tuple (in CRITERIA order, empty values as None)"""
+        if isinstance(grading_levels, str):
+            grading_levels = [grading_levels]
+        # Any non-empty list filters: [''] matches employees without a grade
+        grades = tuple(sorted({normalize_grading_level(level) for level in grading_levels or []}))
+
+        return (
+            job_title.strip() if job_title and job_title.strip() else None,
+            *(
+                str(value) if value else None
+                for value in (business_function_id, department_id, unit_id, job_function_id, position_group_id)
+            ),
+            grades or None
+        )
+
+    @staticmethod
+    def _normalized_grade():
+        """SQL counterpart of normalize_grading_level()"""
+        return Upper(Replace(Replace('grading_level', Value('_'), Value('')), Value(' '), Value('')))
+
+    @classmethod
+    def _conditions(cls, model, criteria):
+        """[(criterion, Q)] for the criteria that are set, in CRITERIA order"""
+        job_title, business_function_id, department_id, unit_id, job_function_id, position_group_id, grades = criteria
+        conditions = []
+
+        if job_title:
+            conditions.append(('job_title', Q(job_title__iexact=job_title)))
+        if business_function_id:
+            conditions.append(('business_function_id', Q(business_function_id=business_function_id)))
+        if department_id:
+            if model is Employee:
+                department_name = Department.objects.filter(pk=department_id).values('name')[:1]
+                same_name = Department.all_objects.alias(upper_name=Upper('name')).filter(
+                    upper_name=Upper(Subquery(department_name))
+                )
+                conditions.append(('department_id', Q(department_id=department_id) | Q(department__in=same_name)))
+            else:
+                conditions.append(('department_id', Q(department_id=department_id)))
+        if unit_id:
+            conditions.append(('unit_id', Q(unit_id=unit_id)))
+        if job_function_id:
+            conditions.append(('job_function_id', Q(job_function_id=job_function_id)))
+        if position_group_id:
+            conditions.append(('position_group_id', Q(position_group_id=position_group_id)))
+        if grades:
+            conditions.append(('grading_levels', Q(normalized_grade__in=grades)))
+
+        return conditions
+
+    @classmethod
+    def _base(cls, model):
+        if model is Employee:
+            queryset = Employee.objects.filter(is_deleted=False)
+        else:
+            queryset = VacantPosition.objects.filter(is_filled=False, is_deleted=False, include_in_headcount=True)
+        return queryset.alias(normalized_grade=cls._normalized_grade())
+
+    @classmethod
+    def _filtered(cls, model, criteria):
+        queryset = cls._base(model)
+        for _, condition in cls._conditions(model, criteria):
+            queryset = queryset.filter(condition)
+        return queryset
+
+    # ------------------------------------------------------------------
+    # Querysets (uncached, always current)
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def employees(cls, **criteria):
+        """Matching employees, ordered by line manager / employee id"""
+        return cls._filtered(Employee, cls.normalize(**criteria)).select_related(
+            *cls.EMPLOYEE_RELATED
+        ).order_by('line_manager_id', 'employee_id')
+
+    @classmethod
+    def vacancies(cls, **criteria):
+        """Matching open vacant positions"""
+        return cls._filtered(VacantPosition, cls.normalize(**criteria)).select_related(*cls.VACANCY_RELATED)
+
+    # ------------------------------------------------------------------
+    # Cached ids (preview)
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _version(cls):
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            version = 1
+            cache.set(cls.VERSION_KEY, version, None)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        """Drop every cached match (employees / vacancies / departments changed)"""
+        try:
+            cache.incr(cls.VERSION_KEY)
+        except ValueError:
+            cache.set(cls.VERSION_KEY, 1, None)
+
+    @classmethod
+    def cache_key(cls, kind, criteria):
+        digest = hashlib.md5(repr(criteria).encode()).hexdigest()
+        return f"{cls.CACHE_PREFIX}:{cls._version()}:{kind}:{digest}"
+
+    @classmethod
+    def matching_ids(cls, **criteria):
+        """
+        Ids of the matching employees and vacancies, cached per criteria
+
+        Returns:
+            dict: {'employees': [id, ...], 'vacancies': [id, ...]} (query order)
+        """
+        normalized = cls.normalize(**criteria)
+        key = cls.cache_key('ids', normalized)
+        ids = cache.get(key)
+        if ids is None:
+            ids = {
+                'employees': list(
+                    cls._filtered(Employee, normalized).order_by(
+                        'line_manager_id', 'employee_id'
+                    ).values_list('id', flat=True)
+                ),
+                'vacancies': list(
+                    cls._filtered(VacantPosition, normalized).order_by(
+                        '-created_at'
+                    ).values_list('id', flat=True)
+                ),
+            }
+            cache.set(key, ids, cls.CACHE_TIMEOUT)
+        return ids
+
+    @staticmethod
+    def fetch(queryset, ids):
+        """Rows for ids, in the order of ids"""
+        rows = queryset.in_bulk(list(ids))
+        return [rows[pk] for pk in ids if pk in rows]
+
+    @classmethod
+    def employee_page(cls, ids):
+        return cls.fetch(Employee.objects.select_related(*cls.EMPLOYEE_RELATED), ids)
+
+    @classmethod
+    def vacancy_page(cls, ids):
+        return cls.fetch(VacantPosition.objects.select_related(*cls.VACANCY_RELATED), ids)
+
+    # ------------------------------------------------------------------
+    # Diagnostics
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def diagnostics(cls, model=Employee, **criteria):
+        """
+        How many candidates each criterion accepts (one aggregate query)
+
+        Returns:
+            dict: {'candidates': n,
+                   'by_criterion': {criterion: matches on its own},
+                   'cumulative': {criterion: matches with every criterion up to it}}
+        """
+        conditions = cls._conditions(model, cls.normalize(**criteria))
+
+        aggregates = {'candidates': Count('pk')}
+        combined = Q()
+        for index, (_, condition) in enumerate(conditions):
+            combined &= condition
+            aggregates[f'only_{index}'] = Count('pk', filter=condition)
+            aggregates[f'upto_{index}'] = Count('pk', filter=combined)
+
+        row = cls._base(model).order_by().aggregate(**aggregates)
+        return {
+            'candidates': row['candidates'],
+            'by_criterion': {name: row[f'only_{index}'] for index, (name, _) in enumerate(conditions)},
+            'cumulative': {name: row[f'upto_{index}'] for index, (name, _) in enumerate(conditions)},
+        }
@@ -642,109 +642,22 @@ class JobDescription(models.Model):
     def get_eligible_employees_with_priority(cls, job_title=None, business_function_id=None,
                                              department_id=None, unit_id=None, job_function_id=None,
                                              position_group_id=None, grading_levels=None):
-        """Get employees matching ALL criteria with detailed logging"""
-        from .models import Employee
-        
-        
-        
-        queryset = Employee.objects.filter(
-            is_deleted=False
-        ).select_related(
-            'business_function', 'department', 'unit', 'job_function',
-            'position_group', 'line_manager'
+        """
+        Get employees matching ALL criteria (one composed query, see
+        EligibleEmployeeMatcher; use its diagnostics() to see which criterion
+        filters candidates out)
+        """
+        from .job_description_matching import EligibleEmployeeMatcher
+
+        return EligibleEmployeeMatcher.employees(
+            job_title=job_title,
+            business_function_id=business_function_id,
+            department_id=department_id,
+            unit_id=unit_id,
+            job_function_id=job_function_id,
+            position_group_id=position_group_id,
+            grading_levels=grading_levels
         )
-        
-        initial_count = queryset.count()
-      
-        
-        # 1. JOB TITLE FILTER
-        if job_title:
-            job_title_clean = job_title.strip()
-            before = queryset.count()
-            queryset = queryset.filter(job_title__iexact=job_title_clean)
-            after = queryset.count()
-            
-            
-            
-            if after == 0:
-               
-                all_titles = list(Employee.objects.filter(
-                    is_deleted=False
-                ).values_list('job_title', flat=True).distinct()[:30])
-                logger.error(f"  Available job titles: {all_titles}")
-                return Employee.objects.none()
-          
-        
-        # 2. BUSINESS FUNCTION FILTER
-        if business_function_id:
-            before = queryset.count()
-            queryset = queryset.filter(business_function_id=business_function_id)
-            after = queryset.count()
-            
-        
-        # 3. DEPARTMENT FILTER
-        if department_id:
-            before = queryset.count()
-            try:
-                from .models import Department
-                target_dept = Department.objects.get(id=department_id)
-                dept_name = target_dept.name
-                queryset = queryset.filter(department__name__iexact=dept_name)
-            except:
-                queryset = queryset.filter(department_id=department_id)
-            after = queryset.count()
-            
-        
-        # 4. UNIT FILTER
-        if unit_id:
-            before = queryset.count()
-            queryset = queryset.filter(unit_id=unit_id)
-            after = queryset.count()
-            
-        
-        # 5. JOB FUNCTION FILTER
-        if job_function_id:
-            before = queryset.count()
-            queryset = queryset.filter(job_function_id=job_function_id)
-            after = queryset.count()
-            
-        
-        # 6. POSITION GROUP FILTER
-        if position_group_id:
-            before = queryset.count()
-            queryset = queryset.filter(position_group_id=position_group_id)
-            after = queryset.count()
-            
-        
-        # 7. GRADING LEVEL FILTER
-        if grading_levels:
-            if isinstance(grading_levels, str):
-                grading_levels = [grading_levels]
-            
-            normalized_targets = [normalize_grading_level(gl.strip()) for gl in grading_levels]
-            
-            
-            
-            all_remaining = list(queryset)
-            matching_ids = []
-            
-            for emp in all_remaining:
-                emp_grade = emp.grading_level.strip() if emp.grading_level else ""
-                emp_normalized = normalize_grading_level(emp_grade)
-                
-                if emp_normalized in normalized_targets:
-                    matching_ids.append(emp.id)
-            
-            before = queryset.count()
-            queryset = queryset.filter(id__in=matching_ids)
-            after = queryset.count()
-            
-        
-        final_count = queryset.count()
-       
-        
-        
-        return queryset.order_by('line_manager_id', 'employee_id')
     
     @classmethod
     def get_eligible_employees(cls, job_title=None, business_function=None, department=None,
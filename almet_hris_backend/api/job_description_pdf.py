@@ -0,0 +1,688 @@
+# api/job_description_pdf.py - Pre-rendered job description PDFs
+"""
+Job Description PDF
+Rendering a job description with reportlab takes far longer than serving a
+file, so each version of the content is rendered once and kept on disk:
+
+- content_hash(): digest of everything the PDF shows (header fields,
+  assignments / approvals, sections, skills, competencies, resources,
+  access rights, benefits), read with a few values() queries
+- files are named <job_description_id>_<hash>.pdf under
+  settings.JOB_DESCRIPTION_PDF_CACHE_DIR; changed content gets a new file
+  and the old ones are pruned
+- saves of a job description or its parts schedule a re-render after commit
+  (Celery: api.tasks.render_job_description_pdf); a download that finds no
+  file for the current hash renders it in the request
+- response() streams the file with ETag (the hash) and Last-Modified,
+  answers conditional requests with 304 and single byte ranges with 206
+"""
+
+from datetime import datetime
+from io import BytesIO
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from .job_description_models import JobDescription
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+    HAS_REPORTLAB = True
+except ImportError:
+    HAS_REPORTLAB = False
+
+logger = logging.getLogger(__name__)
+
+
+class JobDescriptionPDF:
+    """Disk cache of rendered job description PDFs"""
+
+    PENDING_KEY = 'jd_pdf:pending:{}'
+    PENDING_TIMEOUT = 60
+    RENDER_DELAY = 10  # seconds: one render for all the saves of an edit
+    PRUNE_GRACE = 60  # seconds: keep files another request may have just written
+    CHUNK_SIZE = 64 * 1024
+
+    _styles = None
+
+    # ------------------------------------------------------------------
+    # Content hash
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def snapshot(job_description):
+        """Everything render() shows, as plain values"""
+        jd = job_description
+        return {
+            'header': JobDescription.objects.filter(pk=jd.pk).values(
+                'job_title', 'business_function__name', 'department__name', 'unit__name',
+                'job_function__name', 'position_group__name', 'grading_levels', 'version',
+                'created_at', 'job_purpose'
+            ).first(),
+            'assignments': list(jd.assignments.filter(is_active=True).values_list(
+                'employee__full_name', 'is_vacancy', 'vacancy_position__position_id', 'status',
+                'reports_to__full_name', 'line_manager_approved_at', 'line_manager_comments',
+                'employee_approved_at', 'employee_comments'
+            )),
+            'sections': list(jd.sections.order_by('order').values_list('title', 'content')),
+            'skills': list(jd.required_skills.values_list('skill__group__name', 'skill__name').order_by('pk')),
+            'competencies': list(jd.behavioral_competencies.values_list(
+                'competency__group__name', 'competency__name'
+            ).order_by('pk')),
+            'resources': list(jd.business_resources.values_list(
+                'resource__name', 'specific_items__name'
+            ).order_by('pk', 'specific_items__pk')),
+            'access_rights': list(jd.access_rights.values_list(
+                'access_matrix__name', 'specific_items__name'
+            ).order_by('pk', 'specific_items__pk')),
+            'benefits': list(jd.company_benefits.values_list(
+                'benefit__name', 'specific_items__name', 'specific_items__value', 'specific_items__description'
+            ).order_by('pk', 'specific_items__pk')),
+        }
+
+    @classmethod
+    def content_hash(cls, job_description):
+        payload = json.dumps(cls.snapshot(job_description), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def cache_dir():
+        return getattr(
+            settings, 'JOB_DESCRIPTION_PDF_CACHE_DIR',
+            os.path.join(settings.BASE_DIR, 'cache', 'job_description_pdfs')
+        )
+
+    @classmethod
+    def path_for(cls, job_description_id, digest):
+        return os.path.join(cls.cache_dir(), f"{job_description_id}_{digest}.pdf")
+
+    @staticmethod
+    def _write(path, data):
+        """Write via a temporary file so readers never see a partial PDF"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def prune(cls, job_description_id, keep=None):
+        """Remove the cached files of a job description (except keep)"""
+        cutoff = time.time() - cls.PRUNE_GRACE
+        removed = 0
+        for path in glob.glob(os.path.join(cls.cache_dir(), f"{job_description_id}_*.pdf")):
+            if path == keep:
+                continue
+            try:
+                if keep is None or os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    @classmethod
+    def ensure(cls, job_description):
+        """
+        Cached PDF for the current content, rendered if missing
+
+        Returns:
+            tuple: (path, digest, rendered)
+        """
+        digest = cls.content_hash(job_description)
+        path = cls.path_for(job_description.pk, digest)
+        if os.path.exists(path):
+            return path, digest, False
+
+        cls._write(path, cls.render(job_description))
+        cls.prune(job_description.pk, keep=path)
+        logger.info(f"✅ Job description PDF rendered: {job_description.pk} ({digest})")
+        return path, digest, True
+
+    @classmethod
+    def refresh(cls, job_description_id):
+        """Render the PDF of a changed job description (Celery)"""
+        cache.delete(cls.PENDING_KEY.format(job_description_id))
+
+        job_description = JobDescription.objects.select_related(
+            'business_function', 'department', 'unit', 'job_function', 'position_group'
+        ).filter(pk=job_description_id).first()
+        if job_description is None:
+            return {'job_description_id': str(job_description_id), 'removed': cls.prune(job_description_id)}
+
+        path, digest, rendered = cls.ensure(job_description)
+        cls.prune(job_description_id, keep=path)
+        return {'job_description_id': str(job_description_id), 'digest': digest, 'rendered': rendered}
+
+    @staticmethod
+    def filename(job_description, mtime):
+        stamp = datetime.fromtimestamp(mtime).strftime('%Y%m%d_%H%M')
+        return f"JobDescription_{job_description.job_title.replace(' ', '_')}_{stamp}.pdf"
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def schedule(cls, job_description_id):
+        """Re-render after the current transaction commits"""
+        transaction.on_commit(lambda: cls._enqueue(job_description_id))
+
+    @classmethod
+    def _enqueue(cls, job_description_id):
+        key = cls.PENDING_KEY.format(job_description_id)
+        if not cache.add(key, 1, cls.PENDING_TIMEOUT):
+            return  # a render is already queued
+
+        from .tasks import render_job_description_pdf
+        try:
+            render_job_description_pdf.apply_async((str(job_description_id),), countdown=cls.RENDER_DELAY)
+        except Exception as e:
+            cache.delete(key)
+            logger.warning(f"Could not schedule job description PDF render ({job_description_id}): {e}")
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _parse_range(header, size):
+        """
+        Single 'bytes=' range of the Range header
+
+        Returns:
+            (start, end) inclusive, None to send the whole file (no / invalid /
+            multi-range header), False if the range is not satisfiable
+        """
+        if not header or not header.startswith('bytes='):
+            return None
+        spec = header[len('bytes='):].strip()
+        if ',' in spec:
+            return None
+        first, separator, last = spec.partition('-')
+        if not separator:
+            return None
+
+        try:
+            if not first:
+                length = int(last)
+                if length <= 0:
+                    return False
+                return max(size - length, 0), size - 1
+            start = int(first)
+            end = int(last) if last else size - 1
+        except ValueError:
+            return None
+
+        if start >= size:
+            return False
+        if end < start:
+            return None
+        return start, min(end, size - 1)
+
+    @staticmethod
+    def _if_range_matches(request, etag, mtime):
+        """Range applies unless If-Range names another version"""
+        if_range = request.headers.get('If-Range')
+        if not if_range:
+            return True
+        # If-Range needs a strong validator: a weak ETag never matches (RFC 9110 13.1.5)
+        if if_range.startswith('W/'):
+            return False
+        if if_range.startswith('"'):
+            return if_range == etag
+        return parse_http_date_safe(if_range) == int(mtime)
+
+    @classmethod
+    def _iter_range(cls, fh, start, end):
+        try:
+            fh.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = fh.read(min(cls.CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            fh.close()
+
+    @classmethod
+    def response(cls, request, path, digest, job_description):
+        """File response with ETag / Last-Modified, 304 and Range support"""
+        fh = open(path, 'rb')
+        stat = os.fstat(fh.fileno())
+        size, mtime = stat.st_size, int(stat.st_mtime)
+        filename = cls.filename(job_description, mtime)
+
+        etag = f'"{digest}"'
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(mtime),
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': 'private, no-cache',
+        }
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            not_modified = etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+        else:
+            if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+            not_modified = if_modified_since is not None and mtime <= if_modified_since
+
+        byte_range = None
+        if not not_modified and cls._if_range_matches(request, etag, mtime):
+            byte_range = cls._parse_range(request.headers.get('Range'), size)
+
+        if not_modified or byte_range is False:
+            fh.close()
+            if not_modified:
+                response = HttpResponseNotModified()
+            else:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+        elif byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                cls._iter_range(fh, start, end), status=206, content_type='application/pdf'
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        else:
+            response = FileResponse(fh, content_type='application/pdf', as_attachment=True, filename=filename)
+
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def styles(cls):
+        """Paragraph styles, built once per process"""
+        if cls._styles is None:
+            base = getSampleStyleSheet()
+            cls._styles = {
+                'title': ParagraphStyle(
+                    'CustomTitle',
+                    parent=base['Heading1'],
+                    fontSize=18,
+                    textColor=colors.HexColor('#1e3a8a'),
+                    spaceAfter=30,
+                    alignment=TA_CENTER,
+                    fontName='Helvetica-Bold'
+                ),
+                'heading2': ParagraphStyle(
+                    'CustomHeading2',
+                    parent=base['Heading2'],
+                    fontSize=14,
+                    textColor=colors.HexColor('#1e40af'),
+                    spaceAfter=12,
+                    spaceBefore=20,
+                    fontName='Helvetica-Bold',
+                    borderWidth=1,
+                    borderColor=colors.HexColor('#93c5fd'),
+                    borderPadding=5,
+                    backColor=colors.HexColor('#eff6ff')
+                ),
+                'heading3': ParagraphStyle(
+                    'CustomHeading3',
+                    parent=base['Heading3'],
+                    fontSize=12,
+                    textColor=colors.HexColor('#1e40af'),
+                    spaceAfter=8,
+                    spaceBefore=12,
+                    fontName='Helvetica-Bold'
+                ),
+                'body': ParagraphStyle(
+                    'CustomBody',
+                    parent=base['Normal'],
+                    fontSize=10,
+                    leading=14,
+                    alignment=TA_JUSTIFY,
+                    spaceAfter=6
+                ),
+                'footer': ParagraphStyle(
+                    'Footer',
+                    parent=base['Normal'],
+                    fontSize=8,
+                    textColor=colors.HexColor('#6b7280'),
+                    alignment=TA_CENTER
+                ),
+            }
+        return cls._styles
+
+    @classmethod
+    def render(cls, job_description):
+        """Render the PDF (bytes)"""
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            topMargin=2*cm,
+            bottomMargin=2*cm,
+            leftMargin=2*cm,
+            rightMargin=2*cm
+        )
+
+        styles = cls.styles()
+        title_style = styles['title']
+        heading2_style = styles['heading2']
+        heading3_style = styles['heading3']
+        body_style = styles['body']
+        footer_style = styles['footer']
+
+        # Build PDF content
+        story = []
+        
+        # ============================================
+        # HEADER SECTION
+        # ============================================
+        story.append(Paragraph("JOB DESCRIPTION", title_style))
+        story.append(Spacer(1, 0.3*cm))
+        
+        # Basic Info Table
+        basic_info_data = [
+            ['Job Title:', job_description.job_title],
+            ['Business Function:', job_description.business_function.name],
+            ['Department:', job_description.department.name],
+            ['Unit:', job_description.unit.name if job_description.unit else 'N/A'],
+            ['Job Function:', job_description.job_function.name],
+            ['Position Group:', job_description.position_group.name],
+            ['Grading Levels:', ', '.join(job_description.grading_levels)],
+            ['Version:', str(job_description.version)],
+            ['Created:', job_description.created_at.strftime('%d %B %Y')],
+        ]
+        
+        basic_table = Table(basic_info_data, colWidths=[4*cm, 13*cm])
+        basic_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#374151')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]))
+        story.append(basic_table)
+        story.append(Spacer(1, 0.5*cm))
+        
+        # ============================================
+        # ASSIGNMENTS SECTION
+        # ============================================
+        assignments = job_description.assignments.filter(is_active=True)
+        if assignments.exists():
+            story.append(Paragraph("ASSIGNED EMPLOYEES & POSITIONS", heading2_style))
+            
+            assignment_data = [['Name', 'Type', 'Status', 'Reports To']]
+            
+            for assignment in assignments:
+                # Wrap text in Paragraph for better text handling
+                name_para = Paragraph(assignment.get_display_name(), body_style)
+                type_text = 'Employee' if not assignment.is_vacancy else 'Vacant'
+                status_para = Paragraph(assignment.get_status_display(), body_style)
+                reports_para = Paragraph(
+                    assignment.reports_to.full_name if assignment.reports_to else 'N/A',
+                    body_style
+                )
+                
+                assignment_data.append([
+                    name_para,
+                    type_text,
+                    status_para,
+                    reports_para
+                ])
+            
+            # Better column widths - total = 17cm (fits in A4 with margins)
+            assignment_table = Table(assignment_data, colWidths=[5.5*cm, 2.5*cm, 4.5*cm, 4.5*cm])
+            assignment_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 1), (-1, -1), 9),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # TOP alignment for better text wrapping
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
+                ('LEFTPADDING', (0, 0), (-1, -1), 8),
+                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+                ('TOPPADDING', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ]))
+            story.append(assignment_table)
+            story.append(Spacer(1, 0.5*cm))
+        
+        # ============================================
+        # JOB PURPOSE
+        # ============================================
+        story.append(Paragraph("JOB PURPOSE", heading2_style))
+        story.append(Paragraph(job_description.job_purpose, body_style))
+        story.append(Spacer(1, 0.3*cm))
+        
+        # ============================================
+        # SECTIONS (Critical Duties, KPIs, etc.)
+        # ============================================
+        sections = job_description.sections.all().order_by('order')
+        if sections.exists():
+            for section in sections:
+                story.append(Paragraph(section.title.upper(), heading2_style))
+                story.append(Paragraph(section.content, body_style))
+                story.append(Spacer(1, 0.3*cm))
+        
+        # ============================================
+        # REQUIRED SKILLS
+        # ============================================
+        skills = job_description.required_skills.select_related('skill', 'skill__group').all()
+        if skills.exists():
+            story.append(Paragraph("REQUIRED SKILLS", heading2_style))
+            
+            skills_by_group = {}
+            for jd_skill in skills:
+                group_name = jd_skill.skill.group.name if jd_skill.skill.group else 'Other'
+                if group_name not in skills_by_group:
+                    skills_by_group[group_name] = []
+                skills_by_group[group_name].append(jd_skill.skill.name)
+            
+            for group_name, skill_list in skills_by_group.items():
+                story.append(Paragraph(f"<b>{group_name}:</b>", heading3_style))
+                for skill_name in skill_list:
+                    story.append(Paragraph(f"• {skill_name}", body_style))
+            
+            story.append(Spacer(1, 0.3*cm))
+        
+        # ============================================
+        # BEHAVIORAL COMPETENCIES
+        # ============================================
+        competencies = job_description.behavioral_competencies.select_related(
+            'competency', 'competency__group'
+        ).all()
+        if competencies.exists():
+            story.append(Paragraph("BEHAVIORAL COMPETENCIES", heading2_style))
+            
+            comp_by_group = {}
+            for jd_comp in competencies:
+                group_name = jd_comp.competency.group.name if jd_comp.competency.group else 'Other'
+                if group_name not in comp_by_group:
+                    comp_by_group[group_name] = []
+                comp_by_group[group_name].append(jd_comp.competency.name)
+            
+            for group_name, comp_list in comp_by_group.items():
+                story.append(Paragraph(f"<b>{group_name}:</b>", heading3_style))
+                for comp_name in comp_list:
+                    story.append(Paragraph(f"• {comp_name}", body_style))
+            
+            story.append(Spacer(1, 0.3*cm))
+        
+        # ============================================
+        # BUSINESS RESOURCES
+        # ============================================
+        resources = job_description.business_resources.select_related('resource').prefetch_related(
+            'specific_items'
+        ).all()
+        if resources.exists():
+            story.append(Paragraph("BUSINESS RESOURCES", heading2_style))
+            
+            for jd_resource in resources:
+                resource_name = jd_resource.resource.name
+                items = jd_resource.specific_items.all()
+                
+                if items.exists():
+                    items_text = ', '.join([item.name for item in items])
+                    story.append(Paragraph(
+                        f"<b>{resource_name}:</b> {items_text}",
+                        body_style
+                    ))
+                else:
+                    story.append(Paragraph(
+                        f"<b>{resource_name}:</b> All items",
+                        body_style
+                    ))
+            
+            story.append(Spacer(1, 0.3*cm))
+        
+        # ============================================
+        # ACCESS RIGHTS
+        # ============================================
+        access_rights = job_description.access_rights.select_related('access_matrix').prefetch_related(
+            'specific_items'
+        ).all()
+        if access_rights.exists():
+            story.append(Paragraph("ACCESS RIGHTS & PERMISSIONS", heading2_style))
+            
+            for jd_access in access_rights:
+                access_name = jd_access.access_matrix.name
+                items = jd_access.specific_items.all()
+                
+                if items.exists():
+                    items_text = ', '.join([item.name for item in items])
+                    story.append(Paragraph(
+                        f"<b>{access_name}:</b> {items_text}",
+                        body_style
+                    ))
+                else:
+                    story.append(Paragraph(
+                        f"<b>{access_name}:</b> All items",
+                        body_style
+                    ))
+            
+            story.append(Spacer(1, 0.3*cm))
+        
+        # ============================================
+        # COMPANY BENEFITS
+        # ============================================
+        benefits = job_description.company_benefits.select_related('benefit').prefetch_related(
+            'specific_items'
+        ).all()
+        if benefits.exists():
+            story.append(Paragraph("COMPANY BENEFITS", heading2_style))
+            
+            for jd_benefit in benefits:
+                benefit_name = jd_benefit.benefit.name
+                items = jd_benefit.specific_items.all()
+                
+                if items.exists():
+                    for item in items:
+                        value_text = f" ({item.value})" if item.value else ""
+                        story.append(Paragraph(
+                            f"<b>{benefit_name} - {item.name}:</b>{value_text} {item.description}",
+                            body_style
+                        ))
+                else:
+                    story.append(Paragraph(
+                        f"<b>{benefit_name}:</b> Standard package",
+                        body_style
+                    ))
+            
+            story.append(Spacer(1, 0.3*cm))
+        
+        # ============================================
+        # APPROVAL SIGNATURES (if any approved)
+        # ============================================
+        approved_assignments = job_description.assignments.filter(
+            is_active=True,
+            status='APPROVED'
+        )
+        
+        if approved_assignments.exists():
+            story.append(PageBreak())
+            story.append(Paragraph("APPROVAL SIGNATURES", heading2_style))
+            
+            for assignment in approved_assignments:
+                story.append(Paragraph(
+                    f"<b>Position:</b> {assignment.get_display_name()}",
+                    heading3_style
+                ))
+                
+                if assignment.line_manager_approved_at:
+                    story.append(Paragraph(
+                        f"<b>Line Manager:</b> {assignment.reports_to.full_name if assignment.reports_to else 'N/A'}",
+                        body_style
+                    ))
+                    story.append(Paragraph(
+                        f"<b>Approved:</b> {assignment.line_manager_approved_at.strftime('%d %B %Y, %H:%M')}",
+                        body_style
+                    ))
+                    if assignment.line_manager_comments:
+                        story.append(Paragraph(
+                            f"<b>Comments:</b> {assignment.line_manager_comments}",
+                            body_style
+                        ))
+                
+                if assignment.employee_approved_at and not assignment.is_vacancy:
+                    story.append(Paragraph(
+                        f"<b>Employee:</b> {assignment.employee.full_name}",
+                        body_style
+                    ))
+                    story.append(Paragraph(
+                        f"<b>Approved:</b> {assignment.employee_approved_at.strftime('%d %B %Y, %H:%M')}",
+                        body_style
+                    ))
+                    if assignment.employee_comments:
+                        story.append(Paragraph(
+                            f"<b>Comments:</b> {assignment.employee_comments}",
+                            body_style
+                        ))
+                
+                story.append(Spacer(1, 0.5*cm))
+        
+        # ============================================
+        # FOOTER
+        # ============================================
+        story.append(Spacer(1, 1*cm))
+        story.append(Paragraph(
+            f"Generated on {datetime.now().strftime('%d %B %Y at %H:%M')} | Version {job_description.version}",
+            footer_style
+        ))
+        
+        # Build PDF
+        doc.build(story)
+        return buffer.getvalue()
@@ -8,10 +8,11 @@ from .job_description_models import (
     JobBusinessResource, AccessMatrix, CompanyBenefit,
     JobDescriptionBusinessResource, JobDescriptionAccessMatrix,
     JobDescriptionCompanyBenefit, JobBusinessResourceItem,
-    AccessMatrixItem, CompanyBenefitItem, normalize_grading_level
+    AccessMatrixItem, CompanyBenefitItem
 )
 from .models import BusinessFunction, Department, Unit, PositionGroup, Employee, JobFunction, VacantPosition
 from .competency_models import Skill, BehavioralCompetency
+from .job_description_matching import EligibleEmployeeMatcher
 from django.contrib.auth.models import User
 from django.db import transaction
 import logging
@@ -738,46 +739,7 @@ class JobDescriptionCreateUpdateSerializer(serializers.ModelSerializer):
     
     def _get_eligible_vacancies(self, **kwargs):
         """Get eligible vacant positions"""
-        queryset = VacantPosition.objects.filter(
-            is_filled=False,
-            is_deleted=False,
-            include_in_headcount=True
-        )
-        
-        if kwargs.get('job_title'):
-            queryset = queryset.filter(job_title__iexact=kwargs['job_title'].strip())
-        
-        if kwargs.get('business_function_id'):
-            queryset = queryset.filter(business_function_id=kwargs['business_function_id'])
-        
-        if kwargs.get('department_id'):
-            queryset = queryset.filter(department_id=kwargs['department_id'])
-        
-        if kwargs.get('unit_id'):
-            queryset = queryset.filter(unit_id=kwargs['unit_id'])
-        
-        if kwargs.get('job_function_id'):
-            queryset = queryset.filter(job_function_id=kwargs['job_function_id'])
-        
-        if kwargs.get('position_group_id'):
-            queryset = queryset.filter(position_group_id=kwargs['position_group_id'])
-        
-        grading_levels = kwargs.get('grading_levels', [])
-        if grading_levels:
-            if isinstance(grading_levels, str):
-                grading_levels = [grading_levels]
-            
-            normalized = [normalize_grading_level(gl) for gl in grading_levels]
-            matching_ids = []
-            
-            for v in queryset:
-                v_norm = normalize_grading_level(v.grading_level or '')
-                if v_norm in normalized:
-                    matching_ids.append(v.id)
-            
-            queryset = queryset.filter(id__in=matching_ids)
-        
-        return queryset
+        return EligibleEmployeeMatcher.vacancies(**kwargs)
     
     def _create_nested_data(self, job_description, sections_data, skills_data,
                            competencies_data, business_resources_data,
@@ -1154,6 +1116,10 @@ class AddAssignmentSerializer(serializers.Serializer):
         required=False,
         help_text="List of vacancy IDs to add"
     )
+    require_match = serializers.BooleanField(
+        default=False,
+        help_text="Skip employees that do not match the job description criteria"
+    )
     
     def validate(self, attrs):
         employee_ids = attrs.get('employee_ids', [])
@@ -1167,6 +1133,18 @@ class AddAssignmentSerializer(serializers.Serializer):
         return attrs
 
 
+class BulkAssignmentActionSerializer(serializers.Serializer):
+    """Serializer for bulk submit / approval of assignments"""
+    
+    assignment_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        help_text="Assignments to process (omit for all eligible assignments)"
+    )
+    comments = serializers.CharField(required=False, allow_blank=True, default='')
+
+
 # ==================== ASSIGNMENT MANAGEMENT SERIALIZERS ====================
 
 class AssignmentStatusUpdateSerializer(serializers.Serializer):
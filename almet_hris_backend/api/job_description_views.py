@@ -14,34 +14,19 @@ from django.http import HttpResponse, JsonResponse
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 import logging
-from datetime import datetime
-from io import BytesIO
 from rest_framework import serializers
 from .job_description_permissions import (
     get_job_description_access, 
     filter_job_description_queryset,can_user_view_job_description
 )
 
-# Reportlab imports
-try:
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch, cm
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-    HAS_REPORTLAB = True
-except ImportError:
-    HAS_REPORTLAB = False
-
 logger = logging.getLogger(__name__)
 
 # Job Description Models
 from .job_description_models import (
     JobDescription, JobDescriptionAssignment,
     JobBusinessResource, AccessMatrix, CompanyBenefit,
-    JobBusinessResourceItem, AccessMatrixItem, CompanyBenefitItem,
-    normalize_grading_level
+    JobBusinessResourceItem, AccessMatrixItem, CompanyBenefitItem
 )
 
 # Job Description Serializers
@@ -53,11 +38,15 @@ from .job_description_serializers import (
     EmployeeBasicSerializer, JobBusinessResourceItemSerializer,
     AccessMatrixItemSerializer, CompanyBenefitItemSerializer,
     JobDescriptionAssignmentListSerializer, JobDescriptionAssignmentDetailSerializer,
-    AddAssignmentSerializer, ReassignEmployeeSerializer
+    AddAssignmentSerializer, ReassignEmployeeSerializer, BulkAssignmentActionSerializer
 )
+from .job_description_assignments import JobDescriptionAssignmentBatch
+from .job_description_matching import EligibleEmployeeMatcher
+from .job_description_pdf import HAS_REPORTLAB, JobDescriptionPDF
 
 # Core Models
 from .models import VacantPosition, Employee
+from .grouped_stats import Breakdown, GroupedStats
 from .views import ModernPagination
 
 class JobDescriptionFilter:
@@ -319,50 +308,14 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        employee_ids = serializer.validated_data.get('employee_ids', [])
-        vacancy_ids = serializer.validated_data.get('vacancy_ids', [])
-        
-        with transaction.atomic():
-            assignments_created = []
-            
-            # Add employees
-            for emp_id in employee_ids:
-                try:
-                    employee = Employee.objects.get(id=emp_id, is_deleted=False)
-                    
-                    # Check if already assigned
-                    if job_description.assignments.filter(employee=employee, is_active=True).exists():
-                        continue
-                    
-                    assignment = JobDescriptionAssignment.objects.create(
-                        job_description=job_description,
-                        employee=employee,
-                        is_vacancy=False,
-                        reports_to=employee.line_manager
-                    )
-                    assignments_created.append(assignment)
-                except Employee.DoesNotExist:
-                    pass
-            
-            # Add vacancies
-            for vac_id in vacancy_ids:
-                try:
-                    vacancy = VacantPosition.objects.get(id=vac_id, is_filled=False)
-                    
-                    # Check if already assigned
-                    if job_description.assignments.filter(vacancy_position=vacancy, is_active=True).exists():
-                        continue
-                    
-                    assignment = JobDescriptionAssignment.objects.create(
-                        job_description=job_description,
-                        employee=None,
-                        is_vacancy=True,
-                        vacancy_position=vacancy,
-                        reports_to=vacancy.reporting_to
-                    )
-                    assignments_created.append(assignment)
-                except VacantPosition.DoesNotExist:
-                    pass
+        # Candidates loaded and validated in one pass, created with bulk_create
+        result = JobDescriptionAssignmentBatch.add(
+            job_description,
+            employee_ids=serializer.validated_data.get('employee_ids', []),
+            vacancy_ids=serializer.validated_data.get('vacancy_ids', []),
+            require_match=serializer.validated_data.get('require_match', False)
+        )
+        assignments_created = result['created']
         
         return Response({
             'success': True,
@@ -374,7 +327,8 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
                     'is_vacancy': a.is_vacancy
                 }
                 for a in assignments_created
-            ]
+            ],
+            'results': result['results']
         }, status=status.HTTP_201_CREATED)
     
     @swagger_auto_schema(
@@ -498,36 +452,76 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
     
     @swagger_auto_schema(
         method='post',
-        operation_description="Submit all draft assignments for approval",
+        operation_description="Submit all (or the listed) draft assignments for approval",
+        request_body=BulkAssignmentActionSerializer,
         responses={200: "Submitted successfully"}
     )
     @action(detail=True, methods=['post'])
     def submit_all_for_approval(self, request, pk=None):
-        """Submit all draft assignments for approval"""
+        """Submit all draft assignments (or assignment_ids) for approval in one bulk_update"""
         job_description = self.get_object()
         
-        draft_assignments = job_description.assignments.filter(
-            is_active=True,
-            status__in=['DRAFT', 'REVISION_REQUIRED']
+        serializer = BulkAssignmentActionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = JobDescriptionAssignmentBatch.submit(
+            job_description,
+            assignment_ids=serializer.validated_data.get('assignment_ids')
         )
+        errors = [
+            f"{item.get('name', item['assignment_id'])}: {item['error']}"
+            for item in result['results'] if not item['success']
+        ]
         
-        submitted_count = 0
-        errors = []
+        return Response({
+            'success': True,
+            'message': f"Submitted {result['updated_count']} assignment(s) for approval",
+            'submitted_count': result['updated_count'],
+            'errors': errors if errors else None,
+            'results': result['results']
+        })
+    
+    @swagger_auto_schema(
+        method='post',
+        operation_description="Approve several assignments as line manager",
+        request_body=BulkAssignmentActionSerializer
+    )
+    @action(detail=True, methods=['post'])
+    def bulk_approve_by_line_manager(self, request, pk=None):
+        """Approve many PENDING_LINE_MANAGER assignments at once"""
+        return self._bulk_transition(request, JobDescriptionAssignmentBatch.approve_as_line_manager)
+    
+    @swagger_auto_schema(
+        method='post',
+        operation_description="Approve several assignments as employee",
+        request_body=BulkAssignmentActionSerializer
+    )
+    @action(detail=True, methods=['post'])
+    def bulk_approve_as_employee(self, request, pk=None):
+        """Approve many PENDING_EMPLOYEE assignments at once"""
+        return self._bulk_transition(request, JobDescriptionAssignmentBatch.approve_as_employee)
+    
+    def _bulk_transition(self, request, transition):
+        job_description = self.get_object()
         
-        for assignment in draft_assignments:
-            if not assignment.reports_to:
-                errors.append(f"{assignment.get_display_name()}: No line manager")
-                continue
-            
-            assignment.status = 'PENDING_LINE_MANAGER'
-            assignment.save()
-            submitted_count += 1
+        serializer = BulkAssignmentActionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = transition(
+            job_description,
+            request.user,
+            assignment_ids=serializer.validated_data.get('assignment_ids'),
+            comments=serializer.validated_data.get('comments', '')
+        )
         
         return Response({
             'success': True,
-            'message': f'Submitted {submitted_count} assignment(s) for approval',
-            'submitted_count': submitted_count,
-            'errors': errors if errors else None
+            'message': f"Approved {result['updated_count']} assignment(s)",
+            'approved_count': result['updated_count'],
+            'failed_count': result['failed_count'],
+            'results': result['results']
         })
     
     @action(detail=True, methods=['post'])
@@ -843,33 +837,23 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Get eligible employees
-            eligible_employees = JobDescription.get_eligible_employees_with_priority(
-                job_title=job_title,
-                business_function_id=business_function_id,
-                department_id=department_id,
-                unit_id=unit_id,
-                job_function_id=job_function_id,
-                position_group_id=position_group_id,
-                grading_levels=grading_levels
-            )
+            criteria = {
+                'job_title': job_title,
+                'business_function_id': business_function_id,
+                'department_id': department_id,
+                'unit_id': unit_id,
+                'job_function_id': job_function_id,
+                'position_group_id': position_group_id,
+                'grading_levels': grading_levels
+            }
             
-            # Get eligible vacancies
-            eligible_vacancies = []
-            vacancies_count = 0
-            if include_vacancies:
-                eligible_vacancies = self._get_eligible_vacant_positions(
-                    job_title=job_title,
-                    business_function_id=business_function_id,
-                    department_id=department_id,
-                    unit_id=unit_id,
-                    job_function_id=job_function_id,
-                    position_group_id=position_group_id,
-                    grading_levels=grading_levels
-                )
-                vacancies_count = eligible_vacancies.count()
+            # Matching ids are cached per criteria; only the preview page is loaded
+            matching = EligibleEmployeeMatcher.matching_ids(**criteria)
+            employee_ids = matching['employees']
+            vacancy_ids = matching['vacancies'] if include_vacancies else []
             
-            employees_count = eligible_employees.count()
+            employees_count = len(employee_ids)
+            vacancies_count = len(vacancy_ids)
             total_count = employees_count + vacancies_count
             
             # Determine assignment strategy
@@ -893,14 +877,14 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
             
             # Serialize employees
             employees_data = EmployeeBasicSerializer(
-                eligible_employees[:max_preview], 
+                EligibleEmployeeMatcher.employee_page(employee_ids[:max_preview]),
                 many=True
             ).data
             
             # Serialize vacancies
             vacancies_data = []
             if include_vacancies:
-                for v in eligible_vacancies[:max_preview]:
+                for v in EligibleEmployeeMatcher.vacancy_page(vacancy_ids[:max_preview]):
                     vacancies_data.append({
                         'id': v.original_employee_pk or v.id,
                         'employee_id': v.position_id,
@@ -934,15 +918,7 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
             unified_list = employees_data + vacancies_data
             
             # Build criteria info
-            criteria_info = {
-                'job_title': job_title,
-                'business_function_id': business_function_id,
-                'department_id': department_id,
-                'unit_id': unit_id,
-                'job_function_id': job_function_id,
-                'position_group_id': position_group_id,
-                'grading_levels': grading_levels
-            }
+            criteria_info = dict(criteria)
             
             response_data = {
                 # Strategy info
@@ -983,6 +959,10 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
                 }
             }
             
+            # Per-criterion counts explain an empty (or unexpected) match
+            if total_count == 0 or request.data.get('include_diagnostics'):
+                response_data['diagnostics'] = EligibleEmployeeMatcher.diagnostics(**criteria)
+            
           
             
             return Response(response_data)
@@ -997,421 +977,22 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
                 },
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-    def _get_eligible_vacant_positions(self, **kwargs):
-        """Get eligible vacant positions"""
-        queryset = VacantPosition.objects.filter(
-            is_filled=False,
-            is_deleted=False,
-            include_in_headcount=True
-        )
-        
-        if kwargs.get('job_title'):
-            queryset = queryset.filter(job_title__iexact=kwargs['job_title'].strip())
-        
-        if kwargs.get('business_function_id'):
-            queryset = queryset.filter(business_function_id=kwargs['business_function_id'])
-        
-        if kwargs.get('department_id'):
-            queryset = queryset.filter(department_id=kwargs['department_id'])
-        
-        if kwargs.get('unit_id'):
-            queryset = queryset.filter(unit_id=kwargs['unit_id'])
-        
-        if kwargs.get('job_function_id'):
-            queryset = queryset.filter(job_function_id=kwargs['job_function_id'])
-        
-        if kwargs.get('position_group_id'):
-            queryset = queryset.filter(position_group_id=kwargs['position_group_id'])
-        
-        grading_levels = kwargs.get('grading_levels', [])
-        if grading_levels:
-            if isinstance(grading_levels, str):
-                grading_levels = [grading_levels]
-            
-            normalized = [normalize_grading_level(gl) for gl in grading_levels]
-            matching = [v.id for v in queryset if normalize_grading_level(v.grading_level or '') in normalized]
-            queryset = queryset.filter(id__in=matching)
-        
-        return queryset
-    
     @action(detail=True, methods=['get'])
     def download_pdf(self, request, pk=None):
-        """Download comprehensive job description as PDF"""
+        """
+        Download comprehensive job description as PDF
+        Served from the pre-rendered cache; supports ETag / Last-Modified and Range
+        """
         if not HAS_REPORTLAB:
             return HttpResponse("PDF library not available", status=500)
         
         try:
             job_description = self.get_object()
-            buffer = BytesIO()
-            
-            # Create PDF document with margins
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=A4,
-                topMargin=2*cm,
-                bottomMargin=2*cm,
-                leftMargin=2*cm,
-                rightMargin=2*cm
-            )
-            
-            # Define custom styles
-            styles = getSampleStyleSheet()
-            
-            # Title style
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=18,
-                textColor=colors.HexColor('#1e3a8a'),
-                spaceAfter=30,
-                alignment=TA_CENTER,
-                fontName='Helvetica-Bold'
-            )
-            
-            # Heading styles
-            heading2_style = ParagraphStyle(
-                'CustomHeading2',
-                parent=styles['Heading2'],
-                fontSize=14,
-                textColor=colors.HexColor('#1e40af'),
-                spaceAfter=12,
-                spaceBefore=20,
-                fontName='Helvetica-Bold',
-                borderWidth=1,
-                borderColor=colors.HexColor('#93c5fd'),
-                borderPadding=5,
-                backColor=colors.HexColor('#eff6ff')
-            )
-            
-            heading3_style = ParagraphStyle(
-                'CustomHeading3',
-                parent=styles['Heading3'],
-                fontSize=12,
-                textColor=colors.HexColor('#1e40af'),
-                spaceAfter=8,
-                spaceBefore=12,
-                fontName='Helvetica-Bold'
-            )
-            
-            # Body text style
-            body_style = ParagraphStyle(
-                'CustomBody',
-                parent=styles['Normal'],
-                fontSize=10,
-                leading=14,
-                alignment=TA_JUSTIFY,
-                spaceAfter=6
-            )
-            
-            # Build PDF content
-            story = []
-            
-            # ============================================
-            # HEADER SECTION
-            # ============================================
-            story.append(Paragraph("JOB DESCRIPTION", title_style))
-            story.append(Spacer(1, 0.3*cm))
-            
-            # Basic Info Table
-            basic_info_data = [
-                ['Job Title:', job_description.job_title],
-                ['Business Function:', job_description.business_function.name],
-                ['Department:', job_description.department.name],
-                ['Unit:', job_description.unit.name if job_description.unit else 'N/A'],
-                ['Job Function:', job_description.job_function.name],
-                ['Position Group:', job_description.position_group.name],
-                ['Grading Levels:', ', '.join(job_description.grading_levels)],
-                ['Version:', str(job_description.version)],
-                ['Created:', job_description.created_at.strftime('%d %B %Y')],
-            ]
-            
-            basic_table = Table(basic_info_data, colWidths=[4*cm, 13*cm])
-            basic_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
-                ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#374151')),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            story.append(basic_table)
-            story.append(Spacer(1, 0.5*cm))
-            
-            # ============================================
-            # ASSIGNMENTS SECTION
-            # ============================================
-            assignments = job_description.assignments.filter(is_active=True)
-            if assignments.exists():
-                story.append(Paragraph("ASSIGNED EMPLOYEES & POSITIONS", heading2_style))
-                
-                assignment_data = [['Name', 'Type', 'Status', 'Reports To']]
-                
-                for assignment in assignments:
-                    # Wrap text in Paragraph for better text handling
-                    name_para = Paragraph(assignment.get_display_name(), body_style)
-                    type_text = 'Employee' if not assignment.is_vacancy else 'Vacant'
-                    status_para = Paragraph(assignment.get_status_display(), body_style)
-                    reports_para = Paragraph(
-                        assignment.reports_to.full_name if assignment.reports_to else 'N/A',
-                        body_style
-                    )
-                    
-                    assignment_data.append([
-                        name_para,
-                        type_text,
-                        status_para,
-                        reports_para
-                    ])
-                
-                # Better column widths - total = 17cm (fits in A4 with margins)
-                assignment_table = Table(assignment_data, colWidths=[5.5*cm, 2.5*cm, 4.5*cm, 4.5*cm])
-                assignment_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 9),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # TOP alignment for better text wrapping
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                    ('TOPPADDING', (0, 0), (-1, -1), 8),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ]))
-                story.append(assignment_table)
-                story.append(Spacer(1, 0.5*cm))
-            
-            # ============================================
-            # JOB PURPOSE
-            # ============================================
-            story.append(Paragraph("JOB PURPOSE", heading2_style))
-            story.append(Paragraph(job_description.job_purpose, body_style))
-            story.append(Spacer(1, 0.3*cm))
-            
-            # ============================================
-            # SECTIONS (Critical Duties, KPIs, etc.)
-            # ============================================
-            sections = job_description.sections.all().order_by('order')
-            if sections.exists():
-                for section in sections:
-                    story.append(Paragraph(section.title.upper(), heading2_style))
-                    story.append(Paragraph(section.content, body_style))
-                    story.append(Spacer(1, 0.3*cm))
-            
-            # ============================================
-            # REQUIRED SKILLS
-            # ============================================
-            skills = job_description.required_skills.select_related('skill', 'skill__group').all()
-            if skills.exists():
-                story.append(Paragraph("REQUIRED SKILLS", heading2_style))
-                
-                skills_by_group = {}
-                for jd_skill in skills:
-                    group_name = jd_skill.skill.group.name if jd_skill.skill.group else 'Other'
-                    if group_name not in skills_by_group:
-                        skills_by_group[group_name] = []
-                    skills_by_group[group_name].append(jd_skill.skill.name)
-                
-                for group_name, skill_list in skills_by_group.items():
-                    story.append(Paragraph(f"<b>{group_name}:</b>", heading3_style))
-                    for skill_name in skill_list:
-                        story.append(Paragraph(f"• {skill_name}", body_style))
-                
-                story.append(Spacer(1, 0.3*cm))
-            
-            # ============================================
-            # BEHAVIORAL COMPETENCIES
-            # ============================================
-            competencies = job_description.behavioral_competencies.select_related(
-                'competency', 'competency__group'
-            ).all()
-            if competencies.exists():
-                story.append(Paragraph("BEHAVIORAL COMPETENCIES", heading2_style))
-                
-                comp_by_group = {}
-                for jd_comp in competencies:
-                    group_name = jd_comp.competency.group.name if jd_comp.competency.group else 'Other'
-                    if group_name not in comp_by_group:
-                        comp_by_group[group_name] = []
-                    comp_by_group[group_name].append(jd_comp.competency.name)
-                
-                for group_name, comp_list in comp_by_group.items():
-                    story.append(Paragraph(f"<b>{group_name}:</b>", heading3_style))
-                    for comp_name in comp_list:
-                        story.append(Paragraph(f"• {comp_name}", body_style))
-                
-                story.append(Spacer(1, 0.3*cm))
-            
-            # ============================================
-            # BUSINESS RESOURCES
-            # ============================================
-            resources = job_description.business_resources.select_related('resource').prefetch_related(
-                'specific_items'
-            ).all()
-            if resources.exists():
-                story.append(Paragraph("BUSINESS RESOURCES", heading2_style))
-                
-                for jd_resource in resources:
-                    resource_name = jd_resource.resource.name
-                    items = jd_resource.specific_items.all()
-                    
-                    if items.exists():
-                        items_text = ', '.join([item.name for item in items])
-                        story.append(Paragraph(
-                            f"<b>{resource_name}:</b> {items_text}",
-                            body_style
-                        ))
-                    else:
-                        story.append(Paragraph(
-                            f"<b>{resource_name}:</b> All items",
-                            body_style
-                        ))
-                
-                story.append(Spacer(1, 0.3*cm))
-            
-            # ============================================
-            # ACCESS RIGHTS
-            # ============================================
-            access_rights = job_description.access_rights.select_related('access_matrix').prefetch_related(
-                'specific_items'
-            ).all()
-            if access_rights.exists():
-                story.append(Paragraph("ACCESS RIGHTS & PERMISSIONS", heading2_style))
-                
-                for jd_access in access_rights:
-                    access_name = jd_access.access_matrix.name
-                    items = jd_access.specific_items.all()
-                    
-                    if items.exists():
-                        items_text = ', '.join([item.name for item in items])
-                        story.append(Paragraph(
-                            f"<b>{access_name}:</b> {items_text}",
-                            body_style
-                        ))
-                    else:
-                        story.append(Paragraph(
-                            f"<b>{access_name}:</b> All items",
-                            body_style
-                        ))
-                
-                story.append(Spacer(1, 0.3*cm))
-            
-            # ============================================
-            # COMPANY BENEFITS
-            # ============================================
-            benefits = job_description.company_benefits.select_related('benefit').prefetch_related(
-                'specific_items'
-            ).all()
-            if benefits.exists():
-                story.append(Paragraph("COMPANY BENEFITS", heading2_style))
-                
-                for jd_benefit in benefits:
-                    benefit_name = jd_benefit.benefit.name
-                    items = jd_benefit.specific_items.all()
-                    
-                    if items.exists():
-                        for item in items:
-                            value_text = f" ({item.value})" if item.value else ""
-                            story.append(Paragraph(
-                                f"<b>{benefit_name} - {item.name}:</b>{value_text} {item.description}",
-                                body_style
-                            ))
-                    else:
-                        story.append(Paragraph(
-                            f"<b>{benefit_name}:</b> Standard package",
-                            body_style
-                        ))
-                
-                story.append(Spacer(1, 0.3*cm))
-            
-            # ============================================
-            # APPROVAL SIGNATURES (if any approved)
-            # ============================================
-            approved_assignments = job_description.assignments.filter(
-                is_active=True,
-                status='APPROVED'
-            )
-            
-            if approved_assignments.exists():
-                story.append(PageBreak())
-                story.append(Paragraph("APPROVAL SIGNATURES", heading2_style))
-                
-                for assignment in approved_assignments:
-                    story.append(Paragraph(
-                        f"<b>Position:</b> {assignment.get_display_name()}",
-                        heading3_style
-                    ))
-                    
-                    if assignment.line_manager_approved_at:
-                        story.append(Paragraph(
-                            f"<b>Line Manager:</b> {assignment.reports_to.full_name if assignment.reports_to else 'N/A'}",
-                            body_style
-                        ))
-                        story.append(Paragraph(
-                            f"<b>Approved:</b> {assignment.line_manager_approved_at.strftime('%d %B %Y, %H:%M')}",
-                            body_style
-                        ))
-                        if assignment.line_manager_comments:
-                            story.append(Paragraph(
-                                f"<b>Comments:</b> {assignment.line_manager_comments}",
-                                body_style
-                            ))
-                    
-                    if assignment.employee_approved_at and not assignment.is_vacancy:
-                        story.append(Paragraph(
-                            f"<b>Employee:</b> {assignment.employee.full_name}",
-                            body_style
-                        ))
-                        story.append(Paragraph(
-                            f"<b>Approved:</b> {assignment.employee_approved_at.strftime('%d %B %Y, %H:%M')}",
-                            body_style
-                        ))
-                        if assignment.employee_comments:
-                            story.append(Paragraph(
-                                f"<b>Comments:</b> {assignment.employee_comments}",
-                                body_style
-                            ))
-                    
-                    story.append(Spacer(1, 0.5*cm))
-            
-            # ============================================
-            # FOOTER
-            # ============================================
-            story.append(Spacer(1, 1*cm))
-            footer_style = ParagraphStyle(
-                'Footer',
-                parent=styles['Normal'],
-                fontSize=8,
-                textColor=colors.HexColor('#6b7280'),
-                alignment=TA_CENTER
-            )
-            story.append(Paragraph(
-                f"Generated on {datetime.now().strftime('%d %B %Y at %H:%M')} | Version {job_description.version}",
-                footer_style
-            ))
-            
-            # Build PDF
-            doc.build(story)
-            buffer.seek(0)
-            
-            # Generate filename
-            filename = f"JobDescription_{job_description.job_title.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-            
-            response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+            path, digest, _ = JobDescriptionPDF.ensure(job_description)
+            return JobDescriptionPDF.response(request, path, digest, job_description)
             
         except Exception as e:
-
+            logger.error(f"❌ PDF generation error: {str(e)}")
             return HttpResponse(f"PDF Generation Error: {str(e)}", status=500)
 
 # ==================== RESOURCE VIEWSETS ====================
@@ -1604,6 +1185,25 @@ class CompanyBenefitItemViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
 
+JOB_DESCRIPTION_STATS = GroupedStats(
+    'job_descriptions',
+    measures={'total': Count('pk')},
+    breakdowns={'department': Breakdown('department__name', limit=10)},
+    invalidate_on=[JobDescription],
+)
+
+JOB_DESCRIPTION_ASSIGNMENT_STATS = GroupedStats(
+    'job_description_assignments',
+    measures={
+        'total': Count('pk'),
+        'employees': Count('pk', filter=Q(is_vacancy=False)),
+        'vacancies': Count('pk', filter=Q(is_vacancy=True)),
+    },
+    breakdowns={'status': Breakdown('status', choices=JobDescriptionAssignment.STATUS_CHOICES)},
+    invalidate_on=[JobDescriptionAssignment],
+)
+
+
 class JobDescriptionStatsViewSet(viewsets.ViewSet):
     """Statistics for job descriptions"""
     
@@ -1612,35 +1212,29 @@ class JobDescriptionStatsViewSet(viewsets.ViewSet):
     def list(self, request):
         """Get comprehensive statistics"""
         
-        total_jds = JobDescription.objects.count()
-        total_assignments = JobDescriptionAssignment.objects.filter(is_active=True).count()
+        jd_stats = JOB_DESCRIPTION_STATS.get(JobDescription.objects.all())
+        assignment_data = JOB_DESCRIPTION_ASSIGNMENT_STATS.get(
+            JobDescriptionAssignment.objects.filter(is_active=True)
+        )
+        
+        total_jds = jd_stats['measures']['total']
+        total_assignments = assignment_data['measures']['total']
+        status_counts = assignment_data['breakdowns']['status']
         
         # Assignment status breakdown
         assignment_stats = {}
-        for status_choice in JobDescriptionAssignment.STATUS_CHOICES:
-            code = status_choice[0]
-            count = JobDescriptionAssignment.objects.filter(
-                is_active=True, status=code
-            ).count()
-            if count > 0:
-                assignment_stats[status_choice[1]] = count
+        for code, label in JobDescriptionAssignment.STATUS_CHOICES:
+            if status_counts[code] > 0:
+                assignment_stats[label] = status_counts[code]
         
         # By department
-        dept_stats = {}
-        dept_counts = JobDescription.objects.values('department__name').annotate(
-            count=Count('id')
-        ).order_by('-count')[:10]
-        for item in dept_counts:
-            if item['department__name']:
-                dept_stats[item['department__name']] = item['count']
+        dept_stats = {
+            name: count for name, count in jd_stats['breakdowns']['department'].items() if name
+        }
         
         # Employee vs Vacancy
-        employee_assignments = JobDescriptionAssignment.objects.filter(
-            is_active=True, is_vacancy=False
-        ).count()
-        vacancy_assignments = JobDescriptionAssignment.objects.filter(
-            is_active=True, is_vacancy=True
-        ).count()
+        employee_assignments = assignment_data['measures']['employees']
+        vacancy_assignments = assignment_data['measures']['vacancies']
         
         return Response({
             'total_job_descriptions': total_jds,
@@ -1652,15 +1246,8 @@ class JobDescriptionStatsViewSet(viewsets.ViewSet):
                 'vacancies': vacancy_assignments
             },
             'pending_approvals': {
-                'total': JobDescriptionAssignment.objects.filter(
-                    is_active=True,
-                    status__in=['PENDING_LINE_MANAGER', 'PENDING_EMPLOYEE']
-                ).count(),
-                'pending_line_manager': JobDescriptionAssignment.objects.filter(
-                    is_active=True, status='PENDING_LINE_MANAGER'
-                ).count(),
-                'pending_employee': JobDescriptionAssignment.objects.filter(
-                    is_active=True, status='PENDING_EMPLOYEE'
-                ).count()
+                'total': status_counts['PENDING_LINE_MANAGER'] + status_counts['PENDING_EMPLOYEE'],
+                'pending_line_manager': status_counts['PENDING_LINE_MANAGER'],
+                'pending_employee': status_counts['PENDING_EMPLOYEE']
             }
         })        
\ No newline at end of file
@@ -0,0 +1,301 @@
+# api/mailbox_cache.py - Cached, incremental Outlook mailbox view
+"""
+Outlook Mailbox Cache
+Keeps a per-user index of HRIS notification emails (inbox + sent items),
+refreshed incrementally with Microsoft Graph delta queries. Both folders are
+refreshed in a single $batch call, and not more often than every
+MIN_REFRESH_SECONDS. Module / prefix filtering runs against the cached index.
+
+A refresh follows at most MAX_PAGES delta pages per folder; a longer crawl
+(initial sync of a large mailbox) keeps its pending nextLink in the state and
+resumes from it on the next refresh. The folder's deltaLink is only replaced
+when the last page arrives.
+"""
+
+from collections import OrderedDict
+from datetime import timedelta
+import hashlib
+import logging
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .graph_client import graph_client
+
+logger = logging.getLogger(__name__)
+
+
+def get_module_prefixes(settings):
+    """Subject prefix per module, in the order modules are detected"""
+    return OrderedDict([
+        ('business_trip', settings.business_trip_subject_prefix),
+        ('vacation', settings.vacation_subject_prefix),
+        ('timeoff', getattr(settings, 'timeoff_subject_prefix', '[TIME OFF]')),
+        ('handover', getattr(settings, 'handover_subject_prefix', '[HANDOVER]')),
+        ('company_news', settings.company_news_subject_prefix),
+    ])
+
+
+class OutlookMailboxCache:
+    """Per-user cache of notification email summaries"""
+
+    # email_type -> well-known Graph folder name
+    FOLDERS = OrderedDict([
+        ('RECEIVED', 'inbox'),
+        ('SENT', 'sentitems'),
+    ])
+    SELECT_FIELDS = (
+        'id,subject,from,toRecipients,receivedDateTime,sentDateTime,'
+        'isRead,hasAttachments,importance,bodyPreview'
+    )
+    SUMMARY_FIELDS = SELECT_FIELDS.split(',')
+
+    CACHE_PREFIX = 'outlook_mailbox'
+    CACHE_TIMEOUT = 60 * 60 * 24 * 7
+    MIN_REFRESH_SECONDS = 30
+    SYNC_WINDOW_DAYS = 90
+    PAGE_SIZE = 100
+    MAX_PAGES = 20
+
+    def __init__(self, user, access_token, settings):
+        self.user = user
+        self.access_token = access_token
+        self.prefixes = [prefix for prefix in get_module_prefixes(settings).values() if prefix]
+        self._state = None
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @property
+    def cache_key(self):
+        # Prefixes are part of the key: changing them in settings starts a new index
+        prefix_hash = hashlib.md5('|'.join(self.prefixes).encode()).hexdigest()[:12]
+        return f"{self.CACHE_PREFIX}:{self.user.id}:{prefix_hash}"
+
+    @classmethod
+    def _empty_state(cls):
+        return {
+            'synced_at': None,
+            'folders': {
+                email_type: {'delta_link': None, 'next_link': None, 'messages': {}}
+                for email_type in cls.FOLDERS
+            }
+        }
+
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = cache.get(self.cache_key) or self._empty_state()
+        return self._state
+
+    def save(self):
+        cache.set(self.cache_key, self.state, self.CACHE_TIMEOUT)
+
+    @property
+    def synced_at(self):
+        return self.state['synced_at']
+
+    # ------------------------------------------------------------------
+    # Delta sync
+    # ------------------------------------------------------------------
+
+    def _initial_delta_path(self, folder):
+        since = (timezone.now() - timedelta(days=self.SYNC_WINDOW_DAYS)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        query = urlencode({
+            '$select': self.SELECT_FIELDS,
+            '$filter': f'receivedDateTime ge {since}'
+        })
+        return f"/me/mailFolders/{folder}/messages/delta?{query}"
+
+    @staticmethod
+    def _relative(url):
+        """Graph links are absolute; $batch wants paths relative to the version root"""
+        if url.startswith(graph_client.base_url):
+            return url[len(graph_client.base_url):]
+        if '://' in url:
+            # https://graph.microsoft.com/v1.0/me/... -> /me/...
+            path = url.split('://', 1)[1].split('/', 1)[-1]
+            return '/' + path.split('/', 1)[-1]
+        return url
+
+    def _matches(self, subject):
+        subject_lower = (subject or '').lower()
+        return any(prefix.lower() in subject_lower for prefix in self.prefixes)
+
+    def _normalize(self, item, email_type):
+        summary = {field: item.get(field) for field in self.SUMMARY_FIELDS}
+        summary['email_type'] = email_type
+        return summary
+
+    def _apply_page(self, email_type, page):
+        """Apply one delta page to the folder index; return the next link (kept in the state)"""
+        folder_state = self.state['folders'][email_type]
+        messages = folder_state['messages']
+
+        for item in page.get('value', []):
+            message_id = item.get('id')
+            if not message_id:
+                continue
+            if '@removed' in item or not self._matches(item.get('subject')):
+                messages.pop(message_id, None)
+            else:
+                messages[message_id] = self._normalize(item, email_type)
+
+        if page.get('@odata.deltaLink'):
+            # Last page of the round: only now does the new deltaLink apply
+            folder_state['delta_link'] = page['@odata.deltaLink']
+            folder_state['next_link'] = None
+            return None
+        folder_state['next_link'] = page.get('@odata.nextLink')
+        return folder_state['next_link']
+
+    def _reset_folder(self, email_type):
+        self.state['folders'][email_type] = {'delta_link': None, 'next_link': None, 'messages': {}}
+
+    def _folder_path(self, email_type):
+        folder_state = self.state['folders'][email_type]
+        # Resume an unfinished round before asking for new changes
+        link = folder_state.get('next_link') or folder_state['delta_link']
+        if link:
+            return self._relative(link)
+        return self._initial_delta_path(self.FOLDERS[email_type])
+
+    def _follow_next_links(self, email_type, next_link):
+        """
+        Extra pages (initial sync or large change sets only); stops after
+        MAX_PAGES with the pending nextLink left in the state for the next refresh
+        """
+        pages = 0
+        while next_link and pages < self.MAX_PAGES:
+            response = graph_client.get(
+                next_link,
+                access_token=self.access_token,
+                headers={'Prefer': f'odata.maxpagesize={self.PAGE_SIZE}'}
+            )
+            if response.status_code != 200:
+                logger.warning(f"Mailbox delta page failed ({email_type}): {response.status_code}")
+                return False
+            next_link = self._apply_page(email_type, response.json())
+            pages += 1
+        return True
+
+    def refresh(self, force=False):
+        """
+        Bring the index up to date with one $batch delta call
+        (skipped when synced less than MIN_REFRESH_SECONDS ago)
+
+        Returns:
+            bool: True if Graph was called
+        """
+        if not force and self.synced_at and time.time() - self.synced_at < self.MIN_REFRESH_SECONDS:
+            return False
+
+        lock_key = f"{self.cache_key}:lock"
+        if not cache.add(lock_key, 1, 60):
+            # Another request is refreshing this mailbox; serve what we have
+            return False
+
+        try:
+            self._refresh()
+            return True
+        finally:
+            cache.delete(lock_key)
+
+    def _refresh(self, retry_reset=True):
+        email_types = list(self.FOLDERS)
+        batch = {
+            'requests': [
+                {
+                    'id': email_type,
+                    'method': 'GET',
+                    'url': self._folder_path(email_type),
+                    'headers': {'Prefer': f'odata.maxpagesize={self.PAGE_SIZE}'}
+                }
+                for email_type in email_types
+            ]
+        }
+
+        response = graph_client.post('/$batch', access_token=self.access_token, json=batch)
+        if response.status_code != 200:
+            logger.error(f"Mailbox delta batch failed: {response.status_code} - {response.text}")
+            return
+
+        reset = []
+        for item in response.json().get('responses', []):
+            email_type = item.get('id')
+            if email_type not in self.FOLDERS:
+                continue
+
+            if item.get('status') == 200:
+                next_link = self._apply_page(email_type, item.get('body') or {})
+                self._follow_next_links(email_type, next_link)
+            elif item.get('status') == 410:
+                # Sync state expired - start this folder over
+                reset.append(email_type)
+            else:
+                logger.warning(f"Mailbox delta failed ({email_type}): {item.get('status')} - {item.get('body')}")
+
+        for email_type in reset:
+            self._reset_folder(email_type)
+
+        if reset and retry_reset:
+            self._refresh(retry_reset=False)
+            return
+
+        self.state['synced_at'] = time.time()
+        self.save()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get_emails(self, subject_filters, email_type='all', top=50):
+        """
+        Cached emails matching any of the subject filters
+
+        Returns:
+            dict: {'received': [...], 'sent': [...]} newest first, top per type
+        """
+        filters = [prefix.lower() for prefix in subject_filters if prefix]
+        result = {'received': [], 'sent': []}
+
+        for cached_type, key, date_field in (
+            ('RECEIVED', 'received', 'receivedDateTime'),
+            ('SENT', 'sent', 'sentDateTime'),
+        ):
+            if email_type not in (key, 'all'):
+                continue
+            emails = [
+                dict(message)
+                for message in self.state['folders'][cached_type]['messages'].values()
+                if any(prefix in (message.get('subject') or '').lower() for prefix in filters)
+            ]
+            emails.sort(key=lambda x: x.get(date_field) or '', reverse=True)
+            result[key] = emails[:top]
+
+        return result
+
+    # ------------------------------------------------------------------
+    # In-place updates
+    # ------------------------------------------------------------------
+
+    def set_read(self, message_ids, is_read):
+        changed = False
+        message_ids = set(message_ids)
+        for folder_state in self.state['folders'].values():
+            for message_id in message_ids & folder_state['messages'].keys():
+                folder_state['messages'][message_id]['isRead'] = is_read
+                changed = True
+        if changed:
+            self.save()
+
+    def remove(self, message_id):
+        changed = False
+        for folder_state in self.state['folders'].values():
+            if folder_state['messages'].pop(message_id, None) is not None:
+                changed = True
+        if changed:
+            self.save()
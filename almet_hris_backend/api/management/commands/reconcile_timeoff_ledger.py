@@ -0,0 +1,49 @@
+# api/management/commands/reconcile_timeoff_ledger.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api.timeoff_models import TimeOffBalance
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Rebuild cached time off balances from the ledger (first run records opening balances)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Balances per aggregate query',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be changed without changing it',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        
+        self.stdout.write(self.style.SUCCESS(f'🔄 Reconciling time off balances ({timezone.now()})'))
+        if dry_run:
+            self.stdout.write(self.style.WARNING('📋 DRY RUN MODE - No changes will be made'))
+        
+        balance_ids = list(TimeOffBalance.objects.order_by('id').values_list('id', flat=True))
+        opened = 0
+        fixed = 0
+        
+        for start in range(0, len(balance_ids), batch_size):
+            result = TimeOffBalance.reconcile_batch(balance_ids[start:start + batch_size], dry_run=dry_run)
+            opened += len(result['opened'])
+            fixed += len(result['fixed'])
+            
+            for employee_id, old_balance, new_balance in result['fixed']:
+                self.stdout.write(
+                    self.style.WARNING(f'   ⚠️ Employee {employee_id}: {old_balance}h → {new_balance}h')
+                )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(balance_ids)} balances checked, {opened} opening balances recorded, {fixed} corrected'
+        ))
@@ -0,0 +1,17 @@
+# api/management/commands/sync_due_events.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api.due_events import EmployeeDueEvents
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Rebuild upcoming contract expiry / probation review due events (run once after deploying the due-date index)'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'🔄 Syncing employee due events ({timezone.now()})'))
+        
+        created, deleted = EmployeeDueEvents.sync_all()
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ {created} events created, {deleted} stale events removed'))
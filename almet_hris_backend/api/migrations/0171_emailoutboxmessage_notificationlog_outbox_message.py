@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:00
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0170_assettransferrequest_employee_approved_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutboxMessage',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('sender_email', models.EmailField(help_text='Mailbox the email is sent from', max_length=254)),
+                ('recipients', models.JSONField(default=list, help_text='List of recipient email addresses (all in the TO field)')),
+                ('subject', models.CharField(max_length=500)),
+                ('body', models.TextField(help_text='Email body (HTML)')),
+                ('related_model', models.CharField(blank=True, max_length=100)),
+                ('related_object_id', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], db_index=True, default='PENDING', max_length=20)),
+                ('attempts', models.IntegerField(default=0, help_text='Number of delivery attempts made')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the dispatcher may (re)try this message')),
+                ('locked_at', models.DateTimeField(blank=True, help_text='When a worker claimed this message', null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('message_id', models.CharField(blank=True, max_length=255)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sent_by', models.ForeignKey(blank=True, help_text='User who triggered this email', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbox_emails', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Email Outbox Message',
+                'verbose_name_plural': 'Email Outbox Messages',
+                'db_table': 'email_outbox',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='email_outbo_status_c5a6aa_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='outbox_message',
+            field=models.ForeignKey(blank=True, help_text='Outbox message that delivers this notification', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='logs', to='api.emailoutboxmessage'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:00
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0171_emailoutboxmessage_notificationlog_outbox_message'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(django.db.models.functions.datetime.ExtractMonth('date_of_birth'), django.db.models.functions.datetime.ExtractDay('date_of_birth'), name='employee_birth_month_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(django.db.models.functions.datetime.ExtractMonth('start_date'), django.db.models.functions.datetime.ExtractDay('start_date'), name='employee_start_month_day_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0172_employee_birth_start_month_day_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeDueEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('CONTRACT_EXPIRY', 'Contract Expiry'), ('PROBATION_30_DAY', '30-Day Probation Review'), ('PROBATION_60_DAY', '60-Day Probation Review'), ('PROBATION_90_DAY', '90-Day Probation Review')], max_length=20)),
+                ('due_date', models.DateField(help_text='Date the scan acts on the event')),
+                ('target_date', models.DateField(help_text='Contract end date / review due date')),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='due_events', to='api.employee')),
+            ],
+            options={
+                'verbose_name': 'Employee Due Event',
+                'verbose_name_plural': 'Employee Due Events',
+                'ordering': ['due_date'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['event_type', 'due_date'], name='due_event_pending_idx')],
+                'unique_together': {('employee', 'event_type', 'target_date')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0173_employeedueevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeOffLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_type', models.CharField(choices=[('ACCRUAL', 'Monthly Accrual')], max_length=20)),
+                ('hours', models.DecimalField(decimal_places=2, help_text='Saat (+ əlavə, - çıxılma)', max_digits=6)),
+                ('balance_after', models.DecimalField(decimal_places=2, help_text='Entry-dən sonra balans', max_digits=7)),
+                ('period', models.DateField(blank=True, help_text='Accrual ayı (ayın 1-i)', null=True)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeoff_ledger_entries', to='api.employee')),
+            ],
+            options={
+                'verbose_name': 'Time Off Ledger Entry',
+                'verbose_name_plural': 'Time Off Ledger Entries',
+                'db_table': 'timeoff_ledger_entries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['employee', 'created_at'], name='timeoff_led_employe_f5c269_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('entry_type', 'ACCRUAL')), fields=('employee', 'period'), name='timeoff_ledger_one_accrual_per_month')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0174_timeoffledgerentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeoffledgerentry',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='timeoff_ledger_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='timeoffledgerentry',
+            name='request',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='api.timeoffrequest'),
+        ),
+        migrations.AlterField(
+            model_name='timeoffledgerentry',
+            name='entry_type',
+            field=models.CharField(choices=[('OPENING', 'Opening Balance'), ('ACCRUAL', 'Monthly Accrual'), ('DEDUCTION', 'Approved Request'), ('REFUND', 'Cancelled Request'), ('ADJUSTMENT', 'Manual Adjustment')], max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='timeoffledgerentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('entry_type', 'OPENING')), fields=('employee',), name='timeoff_ledger_one_opening_balance'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-18 23:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Training = apps.get_model('api', 'Training')
+    TrainingMaterial = apps.get_model('api', 'TrainingMaterial')
+    TrainingAssignment = apps.get_model('api', 'TrainingAssignment')
+    Through = TrainingAssignment.materials_completed.through
+
+    material_counts = TrainingMaterial.objects.filter(
+        training=OuterRef('pk'),
+        is_deleted=False
+    ).order_by().values('training').annotate(total=Count('pk')).values('total')
+    Training.objects.update(material_count=Coalesce(Subquery(material_counts), 0))
+
+    completed_counts = Through.objects.filter(
+        trainingassignment=OuterRef('pk'),
+        trainingmaterial__is_deleted=False
+    ).order_by().values('trainingassignment').annotate(total=Count('pk')).values('total')
+    TrainingAssignment.objects.update(completed_material_count=Coalesce(Subquery(completed_counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0175_timeoffledgerentry_request_created_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='training',
+            name='material_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='trainingassignment',
+            name='completed_material_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='trainingassignment',
+            index=models.Index(fields=['status', 'due_date'], name='training_assign_status_due_idx'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
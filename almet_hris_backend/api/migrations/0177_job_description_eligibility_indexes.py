@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 23:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0176_training_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(django.db.models.functions.text.Upper('job_title'), models.F('business_function'), models.F('department'), name='employee_title_bf_dept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacantposition',
+            index=models.Index(django.db.models.functions.text.Upper('job_title'), models.F('business_function'), models.F('department'), name='vacancy_title_bf_dept_idx'),
+        ),
+    ]
@@ -9,7 +9,8 @@ from datetime import date, timedelta
 from django.db import transaction
 import os
 import logging
-from django.db.models import Q
+from django.db.models import F, Q
+from django.db.models.functions import ExtractDay, ExtractMonth, Upper
 
 import traceback
 from datetime import datetime, timedelta
@@ -741,6 +742,13 @@ class VacantPosition(SoftDeleteModel):
         ordering = ['-created_at']
         verbose_name = "Vacant Position"
         verbose_name_plural = "Vacant Positions"
+        indexes = [
+            # Job description eligibility (job_title is matched case-insensitively)
+            models.Index(
+                Upper('job_title'), F('business_function'), F('department'),
+                name='vacancy_title_bf_dept_idx'
+            ),
+        ]
 
 class EmployeeArchive(models.Model):
     """ENHANCED: Archive for both soft and hard deleted employees"""
@@ -2523,6 +2531,14 @@ class Employee(SoftDeleteModel):
             models.Index(fields=['is_deleted']),
             models.Index(fields=['contract_end_date']),
             models.Index(fields=['line_manager']),
+            # Celebration scans look employees up by month/day of these dates
+            models.Index(ExtractMonth('date_of_birth'), ExtractDay('date_of_birth'), name='employee_birth_month_day_idx'),
+            models.Index(ExtractMonth('start_date'), ExtractDay('start_date'), name='employee_start_month_day_idx'),
+            # Job description eligibility (job_title is matched case-insensitively)
+            models.Index(
+                Upper('job_title'), F('business_function'), F('department'),
+                name='employee_title_bf_dept_idx'
+            ),
         ]
 
 class EmployeeDeletionManager:
@@ -116,8 +116,9 @@ class TargetGroup(SoftDeleteModel):
     
     @property
     def member_count(self):
-        """Get active member count"""
-        return self.members.filter(is_deleted=False).count()
+        """Get active member count (from the cached membership snapshot)"""
+        from .news_recipients import TargetGroupMembership
+        return TargetGroupMembership.member_count(self.id)
     
     def get_active_members(self):
         """Get list of active members"""
@@ -127,12 +128,8 @@ class TargetGroup(SoftDeleteModel):
     
     def get_member_emails(self):
         """Get list of member email addresses for notifications"""
-        return list(
-            self.get_active_members()
-            .exclude(email__isnull=True)
-            .exclude(email='')
-            .values_list('email', flat=True)
-        )
+        from .news_recipients import TargetGroupMembership
+        return TargetGroupMembership.recipient_emails([self.id])
 
 
 class CompanyNews(SoftDeleteModel):
@@ -296,20 +293,20 @@ class CompanyNews(SoftDeleteModel):
             return self.image.url
         return self.image_preview_url or None
     
+    def _target_group_ids(self):
+        # Reuse prefetched target groups when the queryset has them
+        return [group.id for group in self.target_groups.all()]
+    
     @property
     def total_recipients(self):
-        """Get total number of recipients from target groups"""
-        total = 0
-        for group in self.target_groups.all():
-            total += group.member_count
-        return total
+        """Get total number of unique recipients from target groups"""
+        from .news_recipients import TargetGroupMembership
+        return len(TargetGroupMembership.member_ids(self._target_group_ids()))
     
     def get_recipient_emails(self):
         """Get all unique recipient emails from target groups"""
-        emails = set()
-        for group in self.target_groups.all():
-            emails.update(group.get_member_emails())
-        return list(emails)
+        from .news_recipients import TargetGroupMembership
+        return TargetGroupMembership.recipient_emails(self._target_group_ids())
 
 
 
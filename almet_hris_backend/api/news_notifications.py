@@ -7,7 +7,8 @@ Company News Notification Manager
 import logging
 from django.utils import timezone
 from .system_email_service import system_email_service
-from .notification_models import NotificationSettings, NotificationLog
+from .email_outbox import EmailOutbox
+from .notification_models import NotificationSettings
 
 
 logger = logging.getLogger(__name__)
@@ -99,31 +100,23 @@ class NewsNotificationManager:
                 sender_email = 'myalmet@almettrading.com'
                 logger.info(f"Using default sender email: {sender_email}")
             
-            # ✅ Send using SYSTEM EMAIL SERVICE (Application Permissions)
-            bulk_result = self.system_service.send_bulk_emails_as_system(
-                from_email=sender_email,
-                recipients=recipient_emails,
-                subject=subject,
-                body_html=body_html
-            )
-            
-            success_count = bulk_result['success_count']
-            failed_count = bulk_result['failed_count']
+            # ✅ Queue one email per recipient in the outbox (sent by Celery with
+            # Application Permissions; NotificationLog rows are created with it)
+            queued = EmailOutbox.enqueue_many([
+                {
+                    'recipients': recipient_email,
+                    'subject': subject,
+                    'body_html': body_html,
+                    'sender_email': sender_email,
+                    'related_model': 'CompanyNews',
+                    'related_object_id': news.id,
+                    'sent_by': news.author,
+                }
+                for recipient_email in recipient_emails
+            ])
             
-            # Log each email in NotificationLog
-            for result in bulk_result['results']:
-                NotificationLog.objects.create(
-                    notification_type='EMAIL',
-                    recipient_email=result['recipient'],
-                    subject=subject,
-                    body=body_html,
-                    related_model='CompanyNews',
-                    related_object_id=str(news.id),
-                    status='SENT' if result['success'] else 'FAILED',
-                    error_message='' if result['success'] else result['message'],
-                    sent_by=news.author,
-                    sent_at=timezone.now() if result['success'] else None
-                )
+            success_count = len(queued)
+            failed_count = len(recipient_emails) - success_count
             
             # Update notification status
             if success_count > 0:
@@ -137,7 +130,7 @@ class NewsNotificationManager:
                 'success_count': success_count,
                 'failed_count': failed_count,
                 'sender_email': sender_email,
-                'message': f'Notifications sent from {sender_email} (System) to {success_count} of {len(recipient_emails)} recipients'
+                'message': f'Notifications queued from {sender_email} (System) for {success_count} of {len(recipient_emails)} recipients'
             }
             
         except Exception as e:
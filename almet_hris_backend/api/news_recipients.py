@@ -0,0 +1,113 @@
+# api/news_recipients.py - Target group membership snapshot
+"""
+News Recipients
+Target group membership for all groups is loaded with one query over the
+members through table and cached as a versioned snapshot. Recipient emails,
+member counts and statistics are answered from the snapshot, so an
+announcement to many groups resolves its recipients without a query per
+group. The version is bumped on membership changes (add_members /
+remove_members / members.set), group changes and employee changes
+(see api.signals).
+"""
+
+import logging
+
+from django.core.cache import cache
+
+from .news_models import TargetGroup
+
+logger = logging.getLogger(__name__)
+
+
+class TargetGroupMembership:
+    """Versioned snapshot of target group members"""
+
+    VERSION_KEY = 'target_group_membership:version'
+    CACHE_PREFIX = 'target_group_membership'
+    CACHE_TIMEOUT = 60 * 60 * 12
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _version(cls):
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            version = 1
+            cache.set(cls.VERSION_KEY, version, None)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        try:
+            cache.incr(cls.VERSION_KEY)
+        except ValueError:
+            cache.set(cls.VERSION_KEY, 1, None)
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def build():
+        """
+        One query over the through table (active groups, active employees)
+
+        Returns:
+            dict: {'groups': {group_id: [employee_id, ...]}, 'emails': {employee_id: email}}
+        """
+        groups = {}
+        emails = {}
+        rows = TargetGroup.members.through.objects.filter(
+            targetgroup__is_deleted=False,
+            employee__is_deleted=False
+        ).values_list('targetgroup_id', 'employee_id', 'employee__email')
+
+        for group_id, employee_id, email in rows:
+            groups.setdefault(str(group_id), []).append(employee_id)
+            if email:
+                emails[employee_id] = email
+
+        return {'groups': groups, 'emails': emails}
+
+    @classmethod
+    def snapshot(cls):
+        key = f"{cls.CACHE_PREFIX}:{cls._version()}"
+        data = cache.get(key)
+        if data is None:
+            data = cls.build()
+            cache.set(key, data, cls.CACHE_TIMEOUT)
+        return data
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _member_ids(groups, group_ids):
+        member_ids = set()
+        for group_id in group_ids:
+            member_ids.update(groups.get(str(group_id), []))
+        return member_ids
+
+    @classmethod
+    def member_ids(cls, group_ids=None):
+        """Distinct member ids of the given groups (all groups if None)"""
+        groups = cls.snapshot()['groups']
+        return cls._member_ids(groups, groups.keys() if group_ids is None else group_ids)
+
+    @classmethod
+    def member_count(cls, group_id):
+        return len(cls.snapshot()['groups'].get(str(group_id), []))
+
+    @classmethod
+    def recipient_emails(cls, group_ids):
+        """Distinct, non-empty member emails across the groups"""
+        data = cls.snapshot()
+        emails = {
+            data['emails'][employee_id]
+            for employee_id in cls._member_ids(data['groups'], group_ids)
+            if employee_id in data['emails']
+        }
+        return sorted(emails)
@@ -25,7 +25,7 @@ from .news_permissions import (
     is_admin_user,
 )
 from .news_notifications import news_notification_manager
-from .token_helpers import extract_graph_token_from_request
+from .news_recipients import TargetGroupMembership
 
 logger = logging.getLogger(__name__)
 
@@ -121,11 +121,11 @@ class TargetGroupViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        added_count = 0
-        for employee in employees:
-            if not group.members.filter(id=employee.id).exists():
-                group.members.add(employee)
-                added_count += 1
+        existing_ids = set(group.members.values_list('id', flat=True))
+        new_ids = [emp_id for emp_id in employees.values_list('id', flat=True) if emp_id not in existing_ids]
+        if new_ids:
+            group.members.add(*new_ids)
+        added_count = len(new_ids)
         
         return Response({
             'message': f'{added_count} member(s) added successfully',
@@ -149,11 +149,12 @@ class TargetGroupViewSet(viewsets.ModelViewSet):
         from .models import Employee
         employees = Employee.objects.filter(id__in=employee_ids)
         
-        removed_count = 0
-        for employee in employees:
-            if group.members.filter(id=employee.id).exists():
-                group.members.remove(employee)
-                removed_count += 1
+        member_ids = list(
+            group.members.filter(id__in=employees.values('id')).values_list('id', flat=True)
+        )
+        if member_ids:
+            group.members.remove(*member_ids)
+        removed_count = len(member_ids)
         
         return Response({
             'message': f'{removed_count} member(s) removed successfully',
@@ -167,16 +168,11 @@ class TargetGroupViewSet(viewsets.ModelViewSet):
         total_groups = TargetGroup.objects.filter(is_deleted=False).count()
         active_groups = TargetGroup.objects.filter(is_deleted=False, is_active=True).count()
         
-        from .models import Employee
-        all_member_ids = set()
-        for group in TargetGroup.objects.filter(is_deleted=False):
-            all_member_ids.update(group.members.values_list('id', flat=True))
-        
         return Response({
             'total_groups': total_groups,
             'active_groups': active_groups,
             'inactive_groups': total_groups - active_groups,
-            'total_unique_members': len(all_member_ids)
+            'total_unique_members': len(TargetGroupMembership.member_ids())
         })
 
 
@@ -363,34 +359,26 @@ class CompanyNewsViewSet(viewsets.ModelViewSet):
         
         # Auto-send notifications when publishing
         if news.is_published and news.notify_members and not news.notification_sent:
-            graph_token = extract_graph_token_from_request(request)
+            notification_result = news_notification_manager.send_news_notification(
+                news=news,
+                request=request
+            )
             
-            if graph_token:
-                notification_result = news_notification_manager.send_news_notification(
-                    news=news,
-                    access_token=graph_token,
-                    request=request
-                )
-                
-                if notification_result:
-                    response_data['notification_status'] = {
-                        'sent': notification_result['success'],
-                        'total_recipients': notification_result.get('total_recipients', 0)
-                    }
+            if notification_result:
+                response_data['notification_status'] = {
+                    'sent': notification_result['success'],
+                    'total_recipients': notification_result.get('total_recipients', 0)
+                }
         
         return Response(response_data)
     
     def _send_notifications_async(self, news):
         """Helper to send notifications"""
         try:
-            graph_token = extract_graph_token_from_request(self.request)
-            
-            if graph_token:
-                news_notification_manager.send_news_notification(
-                    news=news,
-                    access_token=graph_token,
-                    request=self.request
-                )
+            news_notification_manager.send_news_notification(
+                news=news,
+                request=self.request
+            )
         except Exception as e:
             logger.error(f"Failed to send notifications for news {news.id}: {e}")
     
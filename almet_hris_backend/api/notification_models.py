@@ -3,6 +3,7 @@
 Notification System Models
 - NotificationSettings: System-wide notification configuration
 - EmailTemplate: Reusable email templates for different notification types
+- EmailOutboxMessage: Outgoing emails queued for Celery delivery
 - NotificationLog: Log of all sent notifications with status tracking
 """
 
@@ -125,6 +126,87 @@ class NotificationSettings(models.Model):
             NotificationSettings.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
 
+
+class EmailOutboxMessage(models.Model):
+    """
+    Outgoing email waiting to be delivered by the Celery dispatcher
+    Written in the same transaction as the business change that triggers it,
+    so a rollback drops the email and a commit guarantees it is sent
+    """
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Message
+    sender_email = models.EmailField(
+        help_text="Mailbox the email is sent from"
+    )
+    recipients = models.JSONField(
+        default=list,
+        help_text="List of recipient email addresses (all in the TO field)"
+    )
+    subject = models.CharField(max_length=500)
+    body = models.TextField(help_text="Email body (HTML)")
+
+    # Related object tracking (optional)
+    related_model = models.CharField(max_length=100, blank=True)
+    related_object_id = models.CharField(max_length=100, blank=True)
+
+    # Delivery state
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='PENDING',
+        db_index=True
+    )
+    attempts = models.IntegerField(
+        default=0,
+        help_text="Number of delivery attempts made"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the dispatcher may (re)try this message"
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a worker claimed this message"
+    )
+    last_error = models.TextField(blank=True)
+    message_id = models.CharField(max_length=255, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    # System fields
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='outbox_emails',
+        help_text="User who triggered this email"
+    )
+
+    class Meta:
+        db_table = 'email_outbox'
+        verbose_name = 'Email Outbox Message'
+        verbose_name_plural = 'Email Outbox Messages'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} - {self.status}"
+
+
 class NotificationLog(models.Model):
     """
     Log of all sent notifications with delivery status tracking
@@ -232,7 +314,15 @@ class NotificationLog(models.Model):
         related_name='notifications_sent',
         help_text="User who triggered this notification"
     )
-    
+    outbox_message = models.ForeignKey(
+        EmailOutboxMessage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='logs',
+        help_text="Outbox message that delivers this notification"
+    )
+
     class Meta:
         db_table = 'notification_logs'
         verbose_name = 'Notification Log'
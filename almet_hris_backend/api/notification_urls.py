@@ -15,5 +15,6 @@ urlpatterns = [
     path('outlook/mark-all-read/', notification_views.mark_all_emails_read, name='notification-mark-all-read'),
     path('outlook/emails/', notification_views.get_outlook_emails, name='notification-outlook-emails'),
      path('outlook/email/<str:message_id>/', notification_views.get_email_detail, name='notification-email-detail'),
+    path('graph/metrics/', notification_views.graph_client_metrics, name='notification-graph-metrics'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
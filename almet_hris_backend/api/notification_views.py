@@ -1,7 +1,7 @@
 # api/notification_views.py - COMPLETE VERSION WITH EMAIL DETAIL
 
 import logging
-import requests  # ✅ REQUIRED for email detail endpoint
+import os
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -11,6 +11,8 @@ from drf_yasg import openapi
 
 from .notification_models import NotificationSettings, NotificationLog
 from .notification_service import notification_service
+from .graph_client import graph_client
+from .mailbox_cache import OutlookMailboxCache
 from .models import UserGraphToken
 
 logger = logging.getLogger(__name__)
@@ -142,32 +144,14 @@ def get_outlook_emails(request):
                 settings.company_news_subject_prefix
             ]
         
-        # Fetch emails for each subject filter
-        for subject_filter in subject_filters:
-            emails_by_type = notification_service.get_all_emails_by_type(
-                access_token=graph_token,
-                subject_filter=subject_filter,
-                top=top,
-                email_type=email_type
-            )
-            
-            # Accumulate results
-            result['received_emails'].extend(emails_by_type['received'])
-            result['sent_emails'].extend(emails_by_type['sent'])
-        
-        # Sort received emails by date
-        result['received_emails'].sort(
-            key=lambda x: x.get('receivedDateTime', ''), 
-            reverse=True
-        )
-        result['received_emails'] = result['received_emails'][:top]
+        # Refresh the cached mailbox index (one delta $batch call at most) and filter it
+        mailbox = OutlookMailboxCache(request.user, graph_token, settings)
+        mailbox.refresh()
+        emails_by_type = mailbox.get_emails(subject_filters, email_type=email_type, top=top)
         
-        # Sort sent emails by date
-        result['sent_emails'].sort(
-            key=lambda x: x.get('sentDateTime', ''), 
-            reverse=True
-        )
-        result['sent_emails'] = result['sent_emails'][:top]
+        result['received_emails'] = emails_by_type['received']
+        result['sent_emails'] = emails_by_type['sent']
+        result['mailbox_synced_at'] = mailbox.synced_at
         
         # Combine all emails based on email_type filter
         if email_type == 'all':
@@ -304,19 +288,13 @@ def get_email_detail(request, message_id):
                 'error': 'Microsoft Graph token not available'
             }, status=status.HTTP_401_UNAUTHORIZED)
         
-        headers = {
-            "Authorization": f"Bearer {graph_token}",
-            "Content-Type": "application/json"
-        }
-        
         # Fetch full email details
-        response = requests.get(
-            f"https://graph.microsoft.com/v1.0/me/messages/{message_id}",
-            headers=headers,
+        response = graph_client.get(
+            f"/me/messages/{message_id}",
+            access_token=graph_token,
             params={
                 '$select': 'id,subject,from,toRecipients,ccRecipients,receivedDateTime,sentDateTime,isRead,hasAttachments,importance,body,bodyPreview,attachments'
-            },
-            timeout=30
+            }
         )
         
         if response.status_code == 200:
@@ -416,20 +394,17 @@ def delete_email_handler(request, message_id):
                 'error': 'Microsoft Graph token not available'
             }, status=status.HTTP_401_UNAUTHORIZED)
         
-        headers = {
-            "Authorization": f"Bearer {graph_token}",
-            "Content-Type": "application/json"
-        }
-        
         # Delete email (moves to Deleted Items)
-        response = requests.delete(
-            f"https://graph.microsoft.com/v1.0/me/messages/{message_id}",
-            headers=headers,
-            timeout=30
+        response = graph_client.delete(
+            f"/me/messages/{message_id}",
+            access_token=graph_token
         )
         
         if response.status_code == 204:
             logger.info(f"✅ Email {message_id} deleted successfully")
+            OutlookMailboxCache(
+                request.user, graph_token, NotificationSettings.get_active()
+            ).remove(message_id)
             return Response({
                 'success': True,
                 'message': 'Email deleted successfully'
@@ -488,8 +463,9 @@ def mark_all_emails_read(request):
         
         settings = NotificationSettings.get_active()
         
-        # Collect unread email IDs
-        unread_ids = []
+        # Collect unread email IDs from the cached mailbox index
+        mailbox = OutlookMailboxCache(request.user, graph_token, settings)
+        mailbox.refresh()
         
         # Determine subject filters
         subject_filters = []
@@ -504,27 +480,12 @@ def mark_all_emails_read(request):
         if module in ['company_news', 'all']:
             subject_filters.append(settings.company_news_subject_prefix)
         
-        # Collect unread emails
-        for subject_filter in subject_filters:
-            emails_by_type = notification_service.get_all_emails_by_type(
-                access_token=graph_token,
-                subject_filter=subject_filter,
-                top=50,
-                email_type=email_type
-            )
-            
-            # Get unread IDs based on email_type filter
-            if email_type in ['received', 'all']:
-                unread_ids.extend([
-                    email['id'] for email in emails_by_type['received']
-                    if not email.get('isRead', False)
-                ])
-            
-            if email_type in ['sent', 'all']:
-                unread_ids.extend([
-                    email['id'] for email in emails_by_type['sent']
-                    if not email.get('isRead', False)
-                ])
+        emails_by_type = mailbox.get_emails(subject_filters, email_type=email_type, top=50)
+        unread_ids = [
+            email['id']
+            for email in emails_by_type['received'] + emails_by_type['sent']
+            if not email.get('isRead', False)
+        ]
         
         if not unread_ids:
             return Response({
@@ -540,6 +501,7 @@ def mark_all_emails_read(request):
             access_token=graph_token,
             message_ids=unread_ids
         )
+        mailbox.set_read(results['succeeded_ids'], True)
         
         return Response({
             'success': True,
@@ -603,6 +565,9 @@ def mark_email_read(request):
         )
         
         if success:
+            OutlookMailboxCache(
+                request.user, graph_token, NotificationSettings.get_active()
+            ).set_read([message_id], True)
             return Response({
                 'success': True,
                 'message': 'Email marked as read',
@@ -660,6 +625,9 @@ def mark_email_unread(request):
         )
         
         if success:
+            OutlookMailboxCache(
+                request.user, graph_token, NotificationSettings.get_active()
+            ).set_read([message_id], False)
             return Response({
                 'success': True,
                 'message': 'Email marked as unread',
@@ -673,4 +641,29 @@ def mark_email_unread(request):
     except Exception as e:
         return Response({
             'error': str(e)
-        }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Per-endpoint Microsoft Graph latency metrics for this server process (admin only)",
+    operation_summary="Graph Client Metrics",
+    tags=['Notifications'],
+    responses={200: openapi.Response(description='Graph call count, errors and latency per endpoint')}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def graph_client_metrics(request):
+    """Graph client latency metrics (current process)"""
+    from .vacation_permissions import is_admin_user
+
+    if not (request.user.is_superuser or is_admin_user(request.user)):
+        return Response({
+            'error': 'Only admins can view Graph metrics'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    return Response({
+        'success': True,
+        'pid': os.getpid(),
+        'endpoints': graph_client.get_metrics()
+    })
@@ -23,10 +23,38 @@ from .policy_serializers import (
     PolicyCompanySerializer, PolicyCompanyCreateUpdateSerializer,
 )
 from .models import BusinessFunction, Employee
+from .grouped_stats import GroupedStats
 
 logger = logging.getLogger(__name__)
 
 
+POLICY_STATS = GroupedStats(
+    'policies',
+    measures={
+        'total': Count('pk'),
+        'requiring_acknowledgment': Count('pk', filter=Q(requires_acknowledgment=True)),
+        'total_views': Sum('view_count'),
+        'total_downloads': Sum('download_count'),
+    },
+    invalidate_on=[CompanyPolicy],
+)
+
+POLICY_FOLDER_STATS = GroupedStats(
+    'policy_folders',
+    measures={
+        'active_folders': Count('pk', filter=Q(is_active=True)),
+        # Active companies owning at least one folder
+        'business_functions': Count(
+            'business_function', distinct=True, filter=Q(business_function__is_active=True)
+        ),
+        'policy_companies': Count(
+            'policy_company', distinct=True, filter=Q(policy_company__is_active=True)
+        ),
+    },
+    invalidate_on=[PolicyFolder, PolicyCompany, BusinessFunction],
+)
+
+
 # ==================== POLICY COMPANY VIEWS ====================
 
 class PolicyCompanyViewSet(viewsets.ModelViewSet):
@@ -432,25 +460,20 @@ class PolicyStatisticsViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     def overview(self, request):
         """Get overall policy statistics"""
-        total_policies = CompanyPolicy.objects.filter(is_active=True).count()
-        total_folders = PolicyFolder.objects.filter(is_active=True).count()
+        policy_stats = POLICY_STATS.get(CompanyPolicy.objects.filter(is_active=True))
+        folder_stats = POLICY_FOLDER_STATS.get(PolicyFolder.objects.all())
         
-        # Count both types of companies
-        total_business_functions = BusinessFunction.objects.filter(
-            is_active=True,
-            policy_folders__isnull=False
-        ).distinct().count()
+        total_policies = policy_stats['measures']['total']
+        total_folders = folder_stats['measures']['active_folders']
         
-        total_policy_companies = PolicyCompany.objects.filter(
-            is_active=True,
-            policy_folders__isnull=False
-        ).distinct().count()
+        # Count both types of companies
+        total_business_functions = folder_stats['measures']['business_functions']
+        total_policy_companies = folder_stats['measures']['policy_companies']
         
-        policies = CompanyPolicy.objects.filter(is_active=True)
-        policies_requiring_ack = policies.filter(requires_acknowledgment=True).count()
+        policies_requiring_ack = policy_stats['measures']['requiring_acknowledgment']
         
-        total_views = sum(p.view_count for p in policies)
-        total_downloads = sum(p.download_count for p in policies)
+        total_views = policy_stats['measures']['total_views'] or 0
+        total_downloads = policy_stats['measures']['total_downloads'] or 0
         
         return Response({
             'total_policies': total_policies,
@@ -19,10 +19,37 @@ from .procedure_serializers import (
     ProcedureCompanySerializer, ProcedureCompanyCreateUpdateSerializer,
 )
 from .models import BusinessFunction
+from .grouped_stats import GroupedStats
 
 logger = logging.getLogger(__name__)
 
 
+PROCEDURE_STATS = GroupedStats(
+    'procedures',
+    measures={
+        'total': Count('pk'),
+        'total_views': Sum('view_count'),
+        'total_downloads': Sum('download_count'),
+    },
+    invalidate_on=[CompanyProcedure],
+)
+
+PROCEDURE_FOLDER_STATS = GroupedStats(
+    'procedure_folders',
+    measures={
+        'active_folders': Count('pk', filter=Q(is_active=True)),
+        # Active companies owning at least one folder
+        'business_functions': Count(
+            'business_function', distinct=True, filter=Q(business_function__is_active=True)
+        ),
+        'procedure_companies': Count(
+            'procedure_company', distinct=True, filter=Q(procedure_company__is_active=True)
+        ),
+    },
+    invalidate_on=[ProcedureFolder, ProcedureCompany, BusinessFunction],
+)
+
+
 # ==================== PROCEDURE COMPANY VIEWS ====================
 
 class ProcedureCompanyViewSet(viewsets.ModelViewSet):
@@ -307,23 +334,17 @@ class ProcedureStatisticsViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     def overview(self, request):
         """Get overall procedure statistics"""
-        total_procedures = CompanyProcedure.objects.filter(is_active=True).count()
-        total_folders = ProcedureFolder.objects.filter(is_active=True).count()
-        
-        total_business_functions = BusinessFunction.objects.filter(
-            is_active=True,
-            procedure_folders__isnull=False
-        ).distinct().count()
+        procedure_stats = PROCEDURE_STATS.get(CompanyProcedure.objects.filter(is_active=True))
+        folder_stats = PROCEDURE_FOLDER_STATS.get(ProcedureFolder.objects.all())
         
-        total_procedure_companies = ProcedureCompany.objects.filter(
-            is_active=True,
-            procedure_folders__isnull=False
-        ).distinct().count()
+        total_procedures = procedure_stats['measures']['total']
+        total_folders = folder_stats['measures']['active_folders']
         
-        procedures = CompanyProcedure.objects.filter(is_active=True)
+        total_business_functions = folder_stats['measures']['business_functions']
+        total_procedure_companies = folder_stats['measures']['procedure_companies']
         
-        total_views = sum(p.view_count for p in procedures)
-        total_downloads = sum(p.download_count for p in procedures)
+        total_views = procedure_stats['measures']['total_views'] or 0
+        total_downloads = procedure_stats['measures']['total_downloads'] or 0
         
         return Response({
             'total_procedures': total_procedures,
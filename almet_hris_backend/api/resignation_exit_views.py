@@ -136,7 +136,7 @@ class ResignationRequestViewSet(viewsets.ModelViewSet):
             </html>
             """
             
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email="myalmet@almettrading.com",
                 to_email=resignation.employee.line_manager.email,
                 subject=subject,
@@ -429,7 +429,7 @@ class ExitInterviewViewSet(viewsets.ModelViewSet):
 """
             
             # Send to all recipients
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email="myalmet@almettrading.com",
                 to_email=recipients,
                 subject=subject,
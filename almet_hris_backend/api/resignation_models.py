@@ -242,7 +242,7 @@ class ResignationRequest(SoftDeleteModel):
             </html>
             """
             
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email="myalmet@almettrading.com",
                 to_email=hr_email,
                 subject=subject,
@@ -270,7 +270,7 @@ class ResignationRequest(SoftDeleteModel):
             
             body = self._get_employee_notification_body(notification_type)
             
-            system_email_service.send_email_as_system(
+            system_email_service.queue_email_as_system(
                 from_email="myalmet@almettrading.com",
                 to_email=self.employee.email,
                 subject=subject,
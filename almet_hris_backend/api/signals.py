@@ -1,109 +1,154 @@
 # api/signals.py
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from .models import Employee
 from .status_management import EmployeeStatusManager
+from .employee_side_effects import EmployeeSideEffects
+from .due_events import EmployeeDueEvents
 import logging
 
 logger = logging.getLogger(__name__)
 
-# ==================== STATUS MANAGEMENT SIGNALS ====================
+# ==================== EMPLOYEE SAVE SIDE EFFECTS ====================
+# Receivers only schedule effects; EmployeeSideEffects runs each once per
+# employee when the transaction commits (see api/employee_side_effects.py)
 
-@receiver(post_save, sender=Employee)
-def auto_update_employee_status(sender, instance, created, **kwargs):
-    """
-    ✅ Avtomatik status yenilənməsi - FIXED
-    """
+@receiver(pre_save, sender=Employee)
+def snapshot_employee_before_save(sender, instance, **kwargs):
+    """📝 One lookup of the previous row, shared by all Employee receivers"""
+    EmployeeSideEffects.snapshot(instance)
+
+
+def _welcome_trigger(instance, created, previous):
+    """Reason to send a welcome email, or None"""
+    if instance.is_deleted:
+        return None
     
-    # Skip if explicitly disabled (for bulk operations)
-    if getattr(instance, '_skip_auto_status_update', False):
-        return
+    # Case 1: Brand new employee with start_date
+    if created:
+        return "New employee created with start_date" if instance.start_date else None
     
-    # Skip if deleted
-    if instance.is_deleted:
-        return
+    if previous is None:
+        return None
+    
+    not_vacant = instance.status and instance.status.name != 'Vacant'
+    
+    # Status: Vacant → Not Vacant (and has start_date)
+    if previous.status and previous.status.name == 'Vacant' and not_vacant and instance.start_date:
+        return f"Status changed from Vacant to {instance.status.name}"
+    
+    # Start date added (was None, now has value)
+    if not previous.start_date and instance.start_date and not_vacant:
+        return "Start date added to existing employee"
+    
+    # Was deleted, now active
+    if previous.is_deleted and instance.start_date and not_vacant:
+        return "Employee reactivated from deleted state"
     
+    return None
 
-    if created:
- 
-        return
+
+@receiver(post_save, sender=Employee)
+def collect_employee_side_effects(sender, instance, created, **kwargs):
+    """Schedule side effects of an Employee save"""
+    previous = EmployeeSideEffects.previous(instance)
     
-    try:
-        # Check if status needs update
-        required_status, reason = EmployeeStatusManager.calculate_required_status(instance)
+    # One flush for everything this save schedules
+    with EmployeeSideEffects.batch():
+        EmployeeSideEffects.schedule('caches')
         
-        # If status needs to change
-        if required_status and required_status != instance.status:
-            logger.info(
-                f"🔄 Auto-updating status for {instance.employee_id}: "
-                f"{instance.status.name if instance.status else 'None'} -> {required_status.name}"
-            )
-            logger.info(f"   Reason: {reason}")
-            
-            # ✅ CRITICAL: Update using queryset to avoid triggering signal again
-            Employee.objects.filter(pk=instance.pk).update(status=required_status)
-            
-            # Refresh instance
-            instance.refresh_from_db()
-            
-            # Log activity
-            from .models import EmployeeActivity
-            EmployeeActivity.objects.create(
-                employee=instance,
-                activity_type='STATUS_CHANGED',
-                description=f"Status automatically updated to {required_status.name}. Reason: {reason}",
-                performed_by=None,
-                metadata={
-                    'automatic': True,
-                    'trigger': 'post_save_signal',
-                    'reason': reason,
-                    'new_status': required_status.name
-                }
-            )
-            
-           
-        else:
-            logger.debug(f"   ℹ️  No status update needed for {instance.employee_id}")
-            
-    except Exception as e:
-        logger.error(f"❌ Error in auto_update_employee_status for {instance.employee_id}: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        # Contract / probation due dates
+        if created or previous is None or any(
+            getattr(previous, field) != getattr(instance, field)
+            for field in EmployeeDueEvents.SOURCE_FIELDS
+        ):
+            EmployeeSideEffects.schedule('due_events', instance)
+        
+        if instance.is_deleted:
+            return
+        
+        # Status: existing employees only; bulk code may opt out
+        if not created and not getattr(instance, '_skip_auto_status_update', False):
+            EmployeeSideEffects.schedule('status', instance)
+        
+        EmployeeSideEffects.schedule('job_description', instance)
+        
+        # Position group changed
+        if not created and previous and previous.position_group and instance.position_group \
+                and previous.position_group_id != instance.position_group_id:
+            EmployeeSideEffects.schedule('position_change', instance, {
+                'old_position_group_id': previous.position_group_id,
+                'old_position': str(previous.position_group),
+            })
+        
+        trigger_reason = _welcome_trigger(instance, created, previous)
+        if trigger_reason:
+            EmployeeSideEffects.schedule('welcome', instance, {'reason': trigger_reason})
 
 
-# ==================== CELEBRATION NOTIFICATION SIGNALS ====================
+@receiver(post_delete, sender=Employee)
+def collect_employee_delete_side_effects(sender, instance, **kwargs):
+    EmployeeSideEffects.schedule('caches')
 
-@receiver(pre_save, sender=Employee)
-def track_position_change(sender, instance, **kwargs):
+
+@EmployeeSideEffects.handler('status')
+def auto_update_employee_status(entries):
     """
-    📝 Track position_group changes before saving
-    Stores old position in instance for comparison
+    ✅ Avtomatik status yenilənməsi
     """
-    if instance.pk:  # Only for existing employees
+    from .models import EmployeeActivity
+    
+    for instance, _ in entries:
         try:
-            old_employee = Employee.objects.get(pk=instance.pk)
-            instance._old_position_group = old_employee.position_group
-        except Employee.DoesNotExist:
-            instance._old_position_group = None
-    else:
-        instance._old_position_group = None
+            # Check if status needs update
+            required_status, reason = EmployeeStatusManager.calculate_required_status(instance)
+            
+            # If status needs to change
+            if required_status and required_status != instance.status:
+                logger.info(
+                    f"🔄 Auto-updating status for {instance.employee_id}: "
+                    f"{instance.status.name if instance.status else 'None'} -> {required_status.name}"
+                )
+                logger.info(f"   Reason: {reason}")
+                
+                # ✅ CRITICAL: Update using queryset to avoid triggering signal again
+                Employee.objects.filter(pk=instance.pk).update(status=required_status)
+                instance.status = required_status
+                
+                # Log activity
+                EmployeeActivity.objects.create(
+                    employee=instance,
+                    activity_type='STATUS_CHANGED',
+                    description=f"Status automatically updated to {required_status.name}. Reason: {reason}",
+                    performed_by=None,
+                    metadata={
+                        'automatic': True,
+                        'trigger': 'post_save_signal',
+                        'reason': reason,
+                        'new_status': required_status.name
+                    }
+                )
+            else:
+                logger.debug(f"   ℹ️  No status update needed for {instance.employee_id}")
+                
+        except Exception as e:
+            logger.error(f"❌ Error in auto_update_employee_status for {instance.employee_id}: {e}")
+            import traceback
+            logger.error(f"Traceback: {traceback.format_exc()}")
 
 
-@receiver(post_save, sender=Employee)
-def send_position_change_notification(sender, instance, created, **kwargs):
+# ==================== CELEBRATION NOTIFICATION SIGNALS ====================
 
-    if created:
-        # New employee - no notification needed
-        return
+@EmployeeSideEffects.handler('position_change')
+def send_position_change_notification(entries):
     
-    # Check if position_group changed
-    old_position = getattr(instance, '_old_position_group', None)
-    new_position = instance.position_group
-    
-    if old_position and new_position and old_position != new_position:
-      
+    for instance, context in entries:
+        # Position may have been changed back before commit
+        if not instance.position_group or instance.position_group_id == context['old_position_group_id']:
+            continue
         
-       
+        old_position = context['old_position']
+        new_position = instance.position_group
         change_type = 'promotion'  # or 'transfer' based on your logic
         
         # Send notification asynchronously using Celery
@@ -111,7 +156,7 @@ def send_position_change_notification(sender, instance, created, **kwargs):
             from .tasks import send_position_change_email
             send_position_change_email.delay(
                 employee_id=instance.id,
-                old_position=str(old_position),
+                old_position=old_position,
                 new_position=str(new_position),
                 change_type=change_type
             )
@@ -124,7 +169,7 @@ def send_position_change_notification(sender, instance, created, **kwargs):
                 from .celebration_notification_service import celebration_notification_service
                 celebration_notification_service.send_position_change_notification(
                     employee=instance,
-                    old_position=str(old_position),
+                    old_position=old_position,
                     new_position=str(new_position),
                     change_type=change_type
                 )
@@ -134,105 +179,14 @@ def send_position_change_notification(sender, instance, created, **kwargs):
 
 # ==================== WELCOME EMAIL SIGNAL ====================
 
-@receiver(pre_save, sender=Employee)
-def track_employee_changes_for_welcome(sender, instance, **kwargs):
-    """
-    📝 Track changes before saving for welcome email detection
-    """
-    if instance.pk:
-        try:
-            old = Employee.objects.get(pk=instance.pk)
-            instance._old_status = old.status
-            instance._old_start_date = old.start_date
-            instance._old_is_deleted = old.is_deleted
-            
-          
-        except Employee.DoesNotExist:
-            instance._old_status = None
-            instance._old_start_date = None
-            instance._old_is_deleted = None
-           
-    else:
-        instance._old_status = None
-        instance._old_start_date = None
-        instance._old_is_deleted = None
-      
-
-
-@receiver(post_save, sender=Employee)
-def welcome_new_employee(sender, instance, created, **kwargs):
- 
+@EmployeeSideEffects.handler('welcome')
+def welcome_new_employee(entries):
     
-    should_send_welcome = False
-    trigger_reason = ""
-    
-    # Case 1: Brand new employee with start_date
-    if created and not instance.is_deleted and instance.start_date:
-        should_send_welcome = True
-        trigger_reason = "New employee created with start_date"
-     
-    
-    # Case 2: Existing employee changes
-    elif not created and not instance.is_deleted:
-        old_status = getattr(instance, '_old_status', None)
-        old_start_date = getattr(instance, '_old_start_date', None)
-        old_is_deleted = getattr(instance, '_old_is_deleted', None)
-        
-    
-        
-        # Status: Vacant → Not Vacant (and has start_date)
-        status_changed_from_vacant = (
-            old_status and 
-            old_status.name == 'Vacant' and 
-            instance.status and 
-            instance.status.name != 'Vacant' and
-            instance.start_date  # Must have start_date
-        )
-        
-        # Start date added (was None, now has value)
-        start_date_added = (
-            not old_start_date and 
-            instance.start_date and
-            instance.status and
-            instance.status.name != 'Vacant'  # Not vacant status
-        )
-        
-        # Was deleted, now active
-        reactivated = (
-            old_is_deleted == True and
-            instance.is_deleted == False and
-            instance.start_date and
-            instance.status and
-            instance.status.name != 'Vacant'
-        )
-        
-        if status_changed_from_vacant:
-            should_send_welcome = True
-            trigger_reason = f"Status changed from Vacant to {instance.status.name}"
-           
-            
-        elif start_date_added:
-            should_send_welcome = True
-            trigger_reason = "Start date added to existing employee"
-      
-            
-        elif reactivated:
-            should_send_welcome = True
-            trigger_reason = "Employee reactivated from deleted state"
-       
-        else:
-            logger.info(f"❌ NO TRIGGER: Conditions not met")
-    else:
-        logger.info(f"❌ NO TRIGGER: Either deleted or brand new without start_date")
-    
-  
-    
-    if should_send_welcome:
-       
+    for instance, context in entries:
+        logger.info(f"👋 Welcome trigger for {instance.employee_id}: {context['reason']}")
         
         # ✅ FIRST TRY: Direct synchronous send (most reliable)
         try:
-         
             
             from .celebration_notification_service import celebration_notification_service
 
@@ -253,10 +207,6 @@ def welcome_new_employee(sender, instance, created, **kwargs):
                 logger.error(f"❌ Celery also failed: {celery_error}")
                 import traceback
                 logger.error(f"   Traceback: {traceback.format_exc()}")
-    else:
-        logger.info(f"❌ NOT sending welcome email - conditions not met")
-    
-    logger.info("=" * 80)
     
 
 
@@ -268,8 +218,14 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-@receiver(post_save, sender='api.Employee')
-def auto_assign_job_description_to_employee(sender, instance, created, **kwargs):
+@EmployeeSideEffects.handler('job_description')
+def auto_assign_job_description_to_employee(entries):
+    
+    for instance, _ in entries:
+        _auto_assign_job_description(instance)
+
+
+def _auto_assign_job_description(instance):
   
     
     # Skip if employee is deleted
@@ -485,4 +441,108 @@ def assign_missing_job_descriptions():
     return {
         'total_checked': total_checked,
         'total_assigned': total_assigned
-    }
\ No newline at end of file
+    }
+
+
+# ==================== ASSESSMENT ANALYTICS CACHE ====================
+
+@receiver([post_save, post_delete], sender='api.EmployeeCoreAssessment')
+@receiver([post_save, post_delete], sender='api.EmployeeBehavioralAssessment')
+@receiver([post_save, post_delete], sender='api.EmployeeLeadershipAssessment')
+def invalidate_assessment_analytics(sender, instance, **kwargs):
+    """Assessment dashboard summaries are cached per access scope"""
+    from .assessment_analytics import AssessmentAnalyticsService
+    AssessmentAnalyticsService.invalidate()
+
+
+# ==================== CELEBRATION FEED CACHE ====================
+
+@receiver([post_save, post_delete], sender='api.Celebration')
+@receiver([post_save, post_delete], sender='api.CelebrationImage')
+@receiver(post_delete, sender='api.CelebrationWish')
+def invalidate_celebration_feed(sender, instance, **kwargs):
+    """Celebrations feed is cached per day; new wishes patch it in place"""
+    from .celebration_feed import CelebrationFeed
+    CelebrationFeed.invalidate()
+
+
+# ==================== TARGET GROUP MEMBERSHIP CACHE ====================
+
+@receiver([post_save, post_delete], sender='api.TargetGroup')
+def invalidate_target_group_membership(sender, instance, **kwargs):
+    """News recipients are resolved from a cached membership snapshot"""
+    from .news_recipients import TargetGroupMembership
+    TargetGroupMembership.invalidate()
+
+
+@receiver(m2m_changed, sender='api.TargetGroup_members')
+def invalidate_target_group_membership_on_members_change(sender, instance, action, **kwargs):
+    """add_members / remove_members / members.set()"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        from .news_recipients import TargetGroupMembership
+        TargetGroupMembership.invalidate()
+
+
+@EmployeeSideEffects.handler('due_events')
+def sync_employee_due_events(entries):
+    """Re-sync upcoming contract / probation events of changed employees"""
+    EmployeeDueEvents.sync([instance for instance, _ in entries])
+
+
+@EmployeeSideEffects.handler('caches', needs_employee=False)
+def invalidate_employee_caches(entries):
+    """Once per commit, however many employees were saved"""
+    from .celebration_feed import CelebrationFeed
+    from .job_description_matching import EligibleEmployeeMatcher
+    from .news_recipients import TargetGroupMembership
+    CelebrationFeed.invalidate()
+    EligibleEmployeeMatcher.invalidate()
+    TargetGroupMembership.invalidate()
+
+
+# ==================== JOB DESCRIPTION ELIGIBILITY CACHE ====================
+
+@receiver([post_save, post_delete], sender='api.VacantPosition')
+@receiver([post_save, post_delete], sender='api.Department')
+def invalidate_job_description_matching(sender, instance, **kwargs):
+    """Eligible employee / vacancy ids are cached per criteria (Employee: see 'caches')"""
+    from .job_description_matching import EligibleEmployeeMatcher
+    EligibleEmployeeMatcher.invalidate()
+
+
+# ==================== JOB DESCRIPTION PDF CACHE ====================
+
+@receiver(post_save, sender='api.JobDescription')
+def rerender_job_description_pdf(sender, instance, **kwargs):
+    """The PDF is pre-rendered per content version"""
+    from .job_description_pdf import JobDescriptionPDF
+    JobDescriptionPDF.schedule(instance.pk)
+
+
+@receiver(post_delete, sender='api.JobDescription')
+def remove_job_description_pdf(sender, instance, **kwargs):
+    from .job_description_pdf import JobDescriptionPDF
+    job_description_id = instance.pk
+    transaction.on_commit(lambda: JobDescriptionPDF.prune(job_description_id))
+
+
+@receiver([post_save, post_delete], sender='api.JobDescriptionAssignment')
+@receiver([post_save, post_delete], sender='api.JobDescriptionSection')
+@receiver([post_save, post_delete], sender='api.JobDescriptionSkill')
+@receiver([post_save, post_delete], sender='api.JobDescriptionBehavioralCompetency')
+@receiver([post_save, post_delete], sender='api.JobDescriptionBusinessResource')
+@receiver([post_save, post_delete], sender='api.JobDescriptionAccessMatrix')
+@receiver([post_save, post_delete], sender='api.JobDescriptionCompanyBenefit')
+def rerender_job_description_pdf_on_part_change(sender, instance, **kwargs):
+    from .job_description_pdf import JobDescriptionPDF
+    JobDescriptionPDF.schedule(instance.job_description_id)
+
+
+@receiver(m2m_changed, sender='api.JobDescriptionBusinessResource_specific_items')
+@receiver(m2m_changed, sender='api.JobDescriptionAccessMatrix_specific_items')
+@receiver(m2m_changed, sender='api.JobDescriptionCompanyBenefit_specific_items')
+def rerender_job_description_pdf_on_items_change(sender, instance, action, reverse, **kwargs):
+    """specific_items.set() / add() on a job description part"""
+    if action in ('post_add', 'post_remove', 'post_clear') and not reverse:
+        from .job_description_pdf import JobDescriptionPDF
+        JobDescriptionPDF.schedule(instance.job_description_id)
@@ -5,11 +5,14 @@ User access token lazım deyil, application öz tokenini alır
 """
 
 import logging
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 from django.core.cache import cache
 import msal
 
+from .graph_client import graph_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,8 +22,14 @@ class SystemEmailService:
     myalmet@almettrading.com-dan user token olmadan göndərir
     """
     
+    # Graph accepts at most 20 requests per $batch call
+    BATCH_SIZE = 20
+    MAX_THROTTLE_RETRIES = 3
+    MAX_RETRY_AFTER_SECONDS = 60
+    RETRYABLE_STATUS_CODES = (429, 503, 504)
+    
     def __init__(self):
-        self.graph_endpoint = "https://graph.microsoft.com/v1.0"
+        self.max_workers = getattr(settings, 'GRAPH_BULK_MAX_WORKERS', 4)
         
         # ⚙️ Azure AD Application settings (settings.py-dən oxuyur)
         self.tenant_id = getattr(settings, 'MICROSOFT_TENANT_ID', '')
@@ -52,7 +61,8 @@ class SystemEmailService:
             app = msal.ConfidentialClientApplication(
                 client_id=self.client_id,
                 client_credential=self.client_secret,
-                authority=self.authority
+                authority=self.authority,
+                http_client=graph_client.session
             )
             
       
@@ -120,19 +130,11 @@ class SystemEmailService:
                 "saveToSentItems": "true"
             }
             
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
-            
-        
-            
             # API endpoint: /users/{from_email}/sendMail
-            response = requests.post(
-                f"{self.graph_endpoint}/users/{from_email}/sendMail",
-                headers=headers,
-                json=message,
-                timeout=30
+            response = graph_client.post(
+                f"/users/{from_email}/sendMail",
+                access_token=access_token,
+                json=message
             )
             
             if response.status_code == 202:
@@ -159,34 +161,208 @@ class SystemEmailService:
                 'message': error_msg,
                 'message_id': None
             }
-    def send_bulk_emails_as_system(self, from_email, recipients, subject, body_html):
- 
-        results = {
-            'success_count': 0,
-            'failed_count': 0,
-            'results': []
-        }
-        
-        for recipient in recipients:
-            result = self.send_email_as_system(
-                from_email=from_email,
-                to_email=recipient,
+    def queue_email_as_system(self, from_email, to_email, subject, body_html,
+                              related_model='', related_object_id='', sent_by=None):
+        """
+        📮 Queue email in the outbox instead of sending inside the request
+        Delivered by Celery after the current transaction commits.
+        Returns the same shape as send_email_as_system.
+        """
+        from .email_outbox import EmailOutbox
+
+        try:
+            message = EmailOutbox.enqueue(
+                recipients=to_email,
                 subject=subject,
-                body_html=body_html
+                body_html=body_html,
+                sender_email=from_email,
+                related_model=related_model,
+                related_object_id=related_object_id,
+                sent_by=sent_by
             )
+            if message is None:
+                return {
+                    'success': False,
+                    'message': 'Email not queued (notifications disabled or no recipients)',
+                    'message_id': None
+                }
+            return {
+                'success': True,
+                'message': f'Email queued for {len(message.recipients)} recipients',
+                'message_id': str(message.id)
+            }
+        except Exception as e:
+            error_msg = f"Exception: {str(e)}"
+            logger.error(error_msg)
+            return {
+                'success': False,
+                'message': error_msg,
+                'message_id': None
+            }
+
+    # ==================== BULK SENDING ($batch) ====================
+    
+    @staticmethod
+    def _build_send_mail_payload(to_email, subject, body_html):
+        """sendMail request body for one email"""
+        to_emails = [to_email] if isinstance(to_email, str) else to_email
+        return {
+            "message": {
+                "subject": subject,
+                "body": {
+                    "contentType": "HTML",
+                    "content": body_html
+                },
+                "toRecipients": [
+                    {"emailAddress": {"address": email}}
+                    for email in to_emails
+                ]
+            },
+            "saveToSentItems": "true"
+        }
+    
+    @classmethod
+    def _retry_after_seconds(cls, headers, attempt):
+        """Retry-After header (seconds) or exponential fallback, capped"""
+        retry_after = None
+        for key, value in (headers or {}).items():
+            if key.lower() == 'retry-after':
+                try:
+                    retry_after = float(value)
+                except (TypeError, ValueError):
+                    retry_after = None
+                break
+        if retry_after is None:
+            retry_after = 2 ** attempt
+        return min(max(retry_after, 0), cls.MAX_RETRY_AFTER_SECONDS)
+    
+    def _post_batch(self, chunk, access_token):
+        """
+        Send up to 20 emails in one Graph $batch call
+        
+        Args:
+            chunk: list of (index, email dict)
+        
+        Returns:
+            dict: {index: result dict}
+        """
+        results = {}
+        pending = list(chunk)
+        
+        for attempt in range(self.MAX_THROTTLE_RETRIES + 1):
+            payload = {
+                "requests": [
+                    {
+                        "id": str(index),
+                        "method": "POST",
+                        "url": f"/users/{email['from_email']}/sendMail",
+                        "headers": {"Content-Type": "application/json"},
+                        "body": self._build_send_mail_payload(
+                            email['to_email'], email['subject'], email['body_html']
+                        )
+                    }
+                    for index, email in pending
+                ]
+            }
             
-            if result['success']:
-                results['success_count'] += 1
-            else:
-                results['failed_count'] += 1
+            try:
+                response = graph_client.post(
+                    "/$batch",
+                    access_token=access_token,
+                    json=payload,
+                    timeout=(graph_client.config['CONNECT_TIMEOUT'], 60)
+                )
+            except Exception as e:
+                error_msg = f"Exception: {str(e)}"
+                logger.error(error_msg)
+                for index, _ in pending:
+                    results[index] = {'success': False, 'message': error_msg, 'message_id': None}
+                return results
+            
+            # Whole batch throttled / unavailable
+            if response.status_code in self.RETRYABLE_STATUS_CODES and attempt < self.MAX_THROTTLE_RETRIES:
+                delay = self._retry_after_seconds(response.headers, attempt)
+                logger.warning(f"Graph $batch throttled ({response.status_code}), retrying in {delay}s")
+                time.sleep(delay)
+                continue
+            
+            if response.status_code != 200:
+                error_msg = f"Failed: {response.status_code} - {response.text}"
+                logger.error(error_msg)
+                for index, _ in pending:
+                    results[index] = {'success': False, 'message': error_msg, 'message_id': None}
+                return results
             
-            results['results'].append({
-                'recipient': recipient,
-                'success': result['success'],
-                'message': result['message']
-            })
+            emails_by_index = dict(pending)
+            retry = []
+            delay = 0
+            for item in response.json().get('responses', []):
+                index = int(item['id'])
+                status_code = item.get('status')
+                item_headers = item.get('headers') or {}
+                
+                if status_code == 202:
+                    results[index] = {
+                        'success': True,
+                        'message': 'Email sent',
+                        'message_id': item_headers.get('request-id', '')
+                    }
+                elif status_code in self.RETRYABLE_STATUS_CODES and attempt < self.MAX_THROTTLE_RETRIES:
+                    retry.append((index, emails_by_index[index]))
+                    delay = max(delay, self._retry_after_seconds(item_headers, attempt))
+                else:
+                    results[index] = {
+                        'success': False,
+                        'message': f"Failed: {status_code} - {item.get('body')}",
+                        'message_id': None
+                    }
+            
+            # Requests Graph did not answer
+            retry_indexes = {index for index, _ in retry}
+            for index, _ in pending:
+                if index not in results and index not in retry_indexes:
+                    results[index] = {'success': False, 'message': 'No response in $batch', 'message_id': None}
+            
+            if not retry:
+                return results
+            
+            logger.warning(f"{len(retry)} emails throttled in $batch, retrying in {delay}s")
+            time.sleep(delay)
+            pending = retry
         
         return results
+    
+    def send_batch_as_system(self, emails):
+        """
+        📦 Send many independent emails via Graph $batch (20 per call),
+        several batches concurrently
+        
+        Args:
+            emails: list of dicts with from_email, to_email, subject, body_html
+        
+        Returns:
+            list: one send_email_as_system-style result per email, same order
+        """
+        if not emails:
+            return []
+        
+        access_token = self.get_application_token()
+        if not access_token:
+            return [
+                {'success': False, 'message': 'Failed to get application access token', 'message_id': None}
+                for _ in emails
+            ]
+        
+        indexed = list(enumerate(emails))
+        chunks = [indexed[i:i + self.BATCH_SIZE] for i in range(0, len(indexed), self.BATCH_SIZE)]
+        
+        results = {}
+        workers = max(1, min(self.max_workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for chunk_results in executor.map(lambda chunk: self._post_batch(chunk, access_token), chunks):
+                results.update(chunk_results)
+        
+        return [results[index] for index in range(len(emails))]
 
 
 # Singleton instance
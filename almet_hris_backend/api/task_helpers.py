@@ -0,0 +1,45 @@
+# api/task_helpers.py - Helpers for Celery tasks
+"""
+Task Helpers
+singleton_task: skip a periodic task run while a previous run of the same
+task is still in progress, instead of letting runs pile up. The lock lives in
+the shared Django cache, so it works across workers and hosts.
+"""
+
+from functools import wraps
+import logging
+
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def singleton_task(lock_timeout=60 * 10, lock_name=None):
+    """
+    Decorator for task functions (place below @shared_task)
+
+    Args:
+        lock_timeout: seconds before a lock left by a crashed worker expires
+        lock_name: defaults to the function's module and name
+    """
+    def decorator(func):
+        lock_key = f"celery_task_lock:{lock_name or f'{func.__module__}.{func.__name__}'}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cache.add(lock_key, timezone.now().isoformat(), lock_timeout):
+                logger.info(f"⏭️ Skipping {func.__name__}: previous run still in progress")
+                return {
+                    'success': True,
+                    'skipped': True,
+                    'reason': 'Previous run still in progress',
+                    'timestamp': timezone.now().isoformat()
+                }
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cache.delete(lock_key)
+
+        return wrapper
+    return decorator
@@ -4,11 +4,13 @@ from django.utils import timezone
 from datetime import date
 import logging
 from datetime import timedelta
+from .task_helpers import singleton_task
 logger = logging.getLogger(__name__)
 
 # ==================== EMPLOYEE STATUS TASKS ====================
 
 @shared_task(name='api.tasks.update_all_employee_statuses')
+@singleton_task(lock_timeout=60 * 50)
 def update_all_employee_statuses():
    
     from .models import Employee
@@ -84,12 +86,129 @@ def update_single_employee_status(employee_id):
         return {'success': False, 'error': str(e)}
 
 
+# ==================== EMAIL OUTBOX TASKS ====================
+
+@shared_task(name='api.tasks.deliver_outbox_emails')
+def deliver_outbox_emails(message_ids=None):
+    """
+    Deliver queued outbox emails
+    Called on commit with the new message IDs, and periodically without
+    arguments to drain retries and anything the on-commit call missed
+    """
+    from .email_outbox import EmailOutbox
+
+    try:
+        results = EmailOutbox.dispatch(message_ids)
+        return {
+            'success': True,
+            'sent': results['sent'],
+            'failed': results['failed'],
+            'timestamp': timezone.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"❌ Error delivering outbox emails: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e),
+            'timestamp': timezone.now().isoformat()
+        }
+
+
+@shared_task(name='api.tasks.deliver_bulk_outbox_emails')
+def deliver_bulk_outbox_emails(message_ids):
+    """Same as deliver_outbox_emails, on the rate-limited bulk email queue"""
+    return deliver_outbox_emails(message_ids)
+
+
+@shared_task(name='api.tasks.send_training_assignment_notifications')
+def send_training_assignment_notifications(assignment_ids):
+    """
+    Fan out notification emails for new training assignments
+    (one outbox email per employee)
+    """
+    from .training_assignments import TrainingAssignmentEngine
+
+    try:
+        queued = TrainingAssignmentEngine.notify(assignment_ids)
+        return {
+            'success': True,
+            'queued': queued,
+            'timestamp': timezone.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"❌ Error queuing training assignment notifications: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e),
+            'timestamp': timezone.now().isoformat()
+        }
+
+
+@shared_task(name='api.tasks.send_job_description_assignment_notifications')
+def send_job_description_assignment_notifications(assignment_ids, event):
+    """
+    Fan out notification emails for a batch of job description assignment
+    transitions (one outbox email per recipient)
+    """
+    from .job_description_assignments import JobDescriptionAssignmentBatch
+
+    try:
+        queued = JobDescriptionAssignmentBatch.notify(assignment_ids, event)
+        return {
+            'success': True,
+            'event': event,
+            'queued': queued,
+            'timestamp': timezone.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"❌ Error queuing job description notifications: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e),
+            'timestamp': timezone.now().isoformat()
+        }
+
+
+@shared_task(name='api.tasks.render_job_description_pdf')
+def render_job_description_pdf(job_description_id):
+    """
+    Pre-render the cached PDF of a changed job description (no-op when the
+    file for its current content already exists)
+    """
+    from .job_description_pdf import JobDescriptionPDF
+
+    try:
+        result = JobDescriptionPDF.refresh(job_description_id)
+        return {
+            'success': True,
+            **result,
+            'timestamp': timezone.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"❌ Error rendering job description PDF {job_description_id}: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e),
+            'timestamp': timezone.now().isoformat()
+        }
+
+
+
 # ==================== CELEBRATION NOTIFICATION TASKS ====================
 
 @shared_task(name='api.tasks.send_daily_celebration_notifications')
+@singleton_task(lock_timeout=60 * 60)
 def send_daily_celebration_notifications():
   
     from .celebration_notification_service import celebration_notification_service
+    from .celebration_feed import CelebrationFeed
+    
+    # Precompute today's celebrations feed for the homepage
+    try:
+        CelebrationFeed.refresh()
+    except Exception as e:
+        logger.error(f"❌ Error refreshing celebration feed: {str(e)}")
+    
     try:
         results = celebration_notification_service.check_and_send_daily_celebrations()
         return {
@@ -212,44 +331,53 @@ def send_anniversary_notification(employee_id, years):
         return {'success': False, 'error': str(e)}
 
 @shared_task(name='api.tasks.resignation_exit_tasks.check_expiring_contracts')
+@singleton_task(lock_timeout=60 * 10)
 def check_expiring_contracts():
     """
     Check for contracts expiring in 2 weeks
+    Works through due CONTRACT_EXPIRY events (api.due_events) only
     """
-    from .models import Employee
     from .contract_probation_models import ContractRenewalRequest
-    from .system_email_service import system_email_service
+    from .due_events import EmployeeDueEvents
     
-    try:
-        two_weeks_later = date.today() + timedelta(days=14)
-        
-        expiring_employees = Employee.objects.filter(
-            contract_end_date=two_weeks_later,
-            contract_duration__in=['3_MONTHS', '6_MONTHS', '1_YEAR', '2_YEARS'],
-            status__affects_headcount=True,
+    today = date.today()
+    
+    def create_renewal_request(event):
+        employee = event.employee
+        
+        # The event is re-checked against the employee at processing time;
+        # a skipped event (returns None) stays pending for later runs
+        if (employee.is_deleted or
+                employee.contract_end_date != event.target_date or
+                employee.contract_duration not in EmployeeDueEvents.CONTRACT_DURATIONS or
+                not (employee.status and employee.status.affects_headcount) or
+                event.target_date <= today):
+            return
+        
+        existing_request = ContractRenewalRequest.objects.filter(
+            employee=employee,
+            current_contract_end_date=event.target_date,
             is_deleted=False
-        ).select_related('line_manager', 'business_function', 'department')
-        
-        for employee in expiring_employees:
-            existing_request = ContractRenewalRequest.objects.filter(
-                employee=employee,
-                current_contract_end_date=employee.contract_end_date,
-                is_deleted=False
-            ).exists()
-            
-            if existing_request:
-                continue
-            
-            renewal_request = ContractRenewalRequest.objects.create(
-                employee=employee,
-                current_contract_end_date=employee.contract_end_date,
-                current_contract_type=employee.contract_duration,
-                notification_sent_at=timezone.now()
-            )
-            
-            logger.info(f"✅ Contract expiry notification sent for: {employee.employee_id}")
-        
-        return f"Processed {len(expiring_employees)} expiring contracts"
+        ).exists()
+        
+        if existing_request:
+            return True
+        
+        ContractRenewalRequest.objects.create(
+            employee=employee,
+            current_contract_end_date=event.target_date,
+            current_contract_type=employee.contract_duration,
+            notification_sent_at=timezone.now()
+        )
+        
+        logger.info(f"✅ Contract expiry notification sent for: {employee.employee_id}")
+        return True
+    
+    try:
+        processed, failed = EmployeeDueEvents.process_due(
+            ['CONTRACT_EXPIRY'], create_renewal_request, today
+        )
+        return f"Processed {processed} expiring contracts ({failed} failed)"
         
     except Exception as e:
         logger.error(f"❌ Error in check_expiring_contracts: {e}")
@@ -257,85 +385,61 @@ def check_expiring_contracts():
 
 
 @shared_task(name='api.tasks.resignation_exit_tasks.check_probation_reviews')
+@singleton_task(lock_timeout=60 * 10)
 def check_probation_reviews():
     """
     Check probation reviews - creates review 3 days BEFORE milestone
     - Day 27 → Creates 30-day review (due on day 30)
     - Day 57 → Creates 60-day review (due on day 60)  
     - Day 87 → Creates 90-day review (due on day 90)
+    Works through due PROBATION_* events (api.due_events) only
     """
-    from .models import Employee
     from .contract_probation_models import ProbationReview
-    from datetime import timedelta
+    from .due_events import EmployeeDueEvents
     
-    try:
-        today = date.today()
+    review_count = 0
+    
+    def create_probation_review(event):
+        nonlocal review_count
+        employee = event.employee
+        review_period, review_day = EmployeeDueEvents.PROBATION_REVIEWS[event.event_type]
+        
+        if (employee.is_deleted or
+                not employee.start_date or
+                employee.start_date + timedelta(days=review_day) != event.target_date or
+                not (employee.status and employee.status.status_type == 'PROBATION')):
+            return
+        
+        # unique_together covers soft-deleted reviews too
+        existing_review = ProbationReview.all_objects.filter(
+            employee=employee,
+            review_period=review_period
+        ).exists()
         
-        probation_employees = Employee.objects.filter(
-            status__status_type='PROBATION',
-            start_date__isnull=False,
-            is_deleted=False
-        ).select_related('line_manager', 'business_function', 'department')
+        if existing_review:
+            logger.info(f"   ℹ️  {employee.employee_id} {review_period} already exists - skipping")
+            return True
         
-        review_count = 0
+        ProbationReview.objects.create(
+            employee=employee,
+            review_period=review_period,
+            due_date=event.target_date,
+            notification_sent_at=timezone.now(),
+            status='PENDING'
+        )
         
-        for employee in probation_employees:
-            try:
-                days_since_start = (today - employee.start_date).days
-                
-                logger.info(f"🔍 Checking {employee.employee_id}: {days_since_start} days since start")
-                
-                reviews_to_create = []
-                
-                # ✅ 30-day review: Create on day 27 (3 days before day 30)
-                if days_since_start == 27:
-                    due_date = employee.start_date + timedelta(days=30)
-                    reviews_to_create.append(('30_DAY', due_date))
-                    logger.info(f"   📅 Day 27 reached - should create 30-day review")
-                
-                # ✅ 60-day review: Create on day 57 (3 days before day 60)
-                elif days_since_start == 57:
-                    due_date = employee.start_date + timedelta(days=60)
-                    reviews_to_create.append(('60_DAY', due_date))
-                    logger.info(f"   📅 Day 57 reached - should create 60-day review")
-                
-                # ✅ 90-day review: Create on day 87 (3 days before day 90)
-                elif days_since_start == 87:
-                    due_date = employee.start_date + timedelta(days=90)
-                    reviews_to_create.append(('90_DAY', due_date))
-                    logger.info(f"   📅 Day 87 reached - should create 90-day review")
-                
-                for review_period, due_date in reviews_to_create:
-                    # Check if already exists
-                    existing_review = ProbationReview.objects.filter(
-                        employee=employee,
-                        review_period=review_period,
-                        is_deleted=False
-                    ).exists()
-                    
-                    if existing_review:
-                        logger.info(f"   ℹ️  {review_period} already exists - skipping")
-                        continue
-                    
-                    # ✅ Create review
-                    review = ProbationReview.objects.create(
-                        employee=employee,
-                        review_period=review_period,
-                        due_date=due_date,
-                        notification_sent_at=timezone.now(),
-                        status='PENDING'
-                    )
-                    
-                    review_count += 1
-                    logger.info(f"✅ Created: {employee.employee_id} - {review_period} (due: {due_date})")
-                    
-                    # TODO: Send notification email to employee & manager
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ Error for employee {employee.employee_id}: {e}")
-                continue
+        review_count += 1
+        logger.info(f"✅ Created: {employee.employee_id} - {review_period} (due: {event.target_date})")
         
-        logger.info(f"📊 Total reviews created: {review_count}")
+        # TODO: Send notification email to employee & manager
+        return True
+    
+    try:
+        processed, failed = EmployeeDueEvents.process_due(
+            list(EmployeeDueEvents.PROBATION_REVIEWS), create_probation_review
+        )
+        
+        logger.info(f"📊 Total reviews created: {review_count} ({processed} events, {failed} failed)")
         return f"Created {review_count} probation reviews"
         
     except Exception as e:
@@ -344,7 +448,70 @@ def check_probation_reviews():
         logger.error(traceback.format_exc())
         raise
 
+
+@shared_task(name='api.tasks.resignation_exit_tasks.sync_employee_due_events')
+@singleton_task(lock_timeout=60 * 30)
+def sync_employee_due_events():
+    """
+    Nightly full re-sync of contract / probation due events
+    (catches employee changes made with queryset.update)
+    """
+    from .due_events import EmployeeDueEvents
+    
+    try:
+        created, deleted = EmployeeDueEvents.sync_all()
+        logger.info(f"✅ Due events synced: {created} created, {deleted} removed")
+        return {'success': True, 'created': created, 'deleted': deleted}
+        
+    except Exception as e:
+        logger.error(f"❌ Error in sync_employee_due_events: {e}")
+        raise
+
+@shared_task(name='api.tasks.accrue_monthly_timeoff')
+@singleton_task(lock_timeout=60 * 30)
+def accrue_monthly_timeoff():
+    """
+    Add the monthly time off allowance to every initialized balance
+    (one UPDATE; runs daily, only the first run of a month changes anything)
+    """
+    from .timeoff_models import TimeOffBalance
+    
+    try:
+        entries = TimeOffBalance.accrue_monthly()
+        return {'success': True, 'accrued': len(entries)}
+        
+    except Exception as e:
+        logger.error(f"❌ Error in accrue_monthly_timeoff: {e}")
+        raise
+
+
+@shared_task(name='api.tasks.reconcile_training_progress')
+@singleton_task(lock_timeout=60 * 30)
+def reconcile_training_progress():
+    """
+    Recompute the denormalized training counters / progress and move
+    assignments past their due date to OVERDUE
+    """
+    from .training_models import TrainingAssignment
+    from .training_views import TRAINING_ASSIGNMENT_STATS
+    
+    try:
+        results = TrainingAssignment.reconcile_counters()
+        results['overdue'] = TrainingAssignment.mark_overdue()
+        
+        # queryset.update skips post_save: status counts are cached
+        if results['overdue']:
+            TRAINING_ASSIGNMENT_STATS.invalidate()
+        logger.info(f"✅ Training progress reconciled: {results}")
+        return {'success': True, **results}
+        
+    except Exception as e:
+        logger.error(f"❌ Error in reconcile_training_progress: {e}")
+        raise
+
+
 @shared_task(name='api.tasks.resignation_exit_tasks.send_resignation_reminders')
+@singleton_task(lock_timeout=60 * 10)
 def send_resignation_reminders():
     """Send resignation reminders"""
     from .resignation_models import ResignationRequest
@@ -369,6 +536,7 @@ def send_resignation_reminders():
 
 
 @shared_task(name='api.tasks.resignation_exit_tasks.send_exit_interview_reminders')
+@singleton_task(lock_timeout=60 * 10)
 def send_exit_interview_reminders():
     """Send exit interview reminders"""
     from .exit_interview_models import ExitInterview
@@ -0,0 +1,89 @@
+"""
+EmployeeSideEffects: effects scheduled in a rolled back transaction must
+never run with a later save
+"""
+
+from datetime import date
+from unittest import mock
+
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from api.employee_side_effects import EmployeeSideEffects
+from api.models import BusinessFunction, Department, Employee, EmployeeStatus, JobFunction, PositionGroup
+
+
+class RolledBack(Exception):
+    pass
+
+
+class StaleSideEffectsTests(TransactionTestCase):
+
+    def setUp(self):
+        business_function = BusinessFunction.objects.create(code='HLD', name='Holding')
+        related = {
+            'business_function': business_function,
+            'department': Department.objects.create(name='IT', business_function=business_function),
+            'job_function': JobFunction.objects.create(name='Developer'),
+            'position_group': PositionGroup.objects.create(name='SPECIALIST', hierarchy_level=1),
+            'status': EmployeeStatus.objects.create(name='ACTIVE'),
+        }
+        # bulk_create: no side effects for the fixtures themselves
+        Employee.objects.bulk_create([
+            Employee(
+                employee_id=f'E{number}', first_name=f'First{number}', last_name=f'Last{number}',
+                job_title='Developer', start_date=date(2020, 1, 1), **related
+            )
+            for number in (1, 2)
+        ])
+        self.rolled_back, self.saved = Employee.objects.order_by('employee_id')
+
+        self.ran = []
+        handlers = {
+            name: (self._recorder(name), needs_employee)
+            for name, (_, needs_employee) in EmployeeSideEffects._handlers.items()
+        }
+        patcher = mock.patch.dict(EmployeeSideEffects._handlers, handlers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _recorder(self, name):
+        def handler(entries):
+            self.ran.extend((name, employee.pk) for employee, _ in entries)
+        return handler
+
+    def _save_and_roll_back(self):
+        with self.assertRaises(RolledBack):
+            with transaction.atomic():
+                self.rolled_back.job_title = 'Rolled back'
+                self.rolled_back.save()
+                raise RolledBack()
+        self.assertEqual(self.ran, [])
+
+    def _employees_with(self, effect):
+        return {pk for name, pk in self.ran if name == effect}
+
+    def test_save_outside_atomic_after_rollback(self):
+        self._save_and_roll_back()
+
+        self.saved.job_title = 'Saved'
+        self.saved.save()
+
+        self.assertEqual(self._employees_with('job_description'), {self.saved.pk})
+
+    def test_schedule_outside_atomic_after_rollback(self):
+        self._save_and_roll_back()
+
+        EmployeeSideEffects.schedule('job_description', self.saved)
+
+        self.assertEqual(self._employees_with('job_description'), {self.saved.pk})
+
+    def test_save_in_new_transaction_after_rollback(self):
+        self._save_and_roll_back()
+
+        with transaction.atomic():
+            self.saved.job_title = 'Saved'
+            self.saved.save()
+            self.assertEqual(self.ran, [])
+
+        self.assertEqual(self._employees_with('job_description'), {self.saved.pk})
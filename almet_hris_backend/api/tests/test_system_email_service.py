@@ -0,0 +1,127 @@
+"""
+SystemEmailService.send_batch_as_system against a fake Graph session:
+$batch splitting and per-request throttling / failures
+"""
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.graph_client import GraphClient
+from api.system_email_service import SystemEmailService
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.headers = headers or {}
+        self.text = str(self._payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeGraphSession:
+    """
+    Answers every $batch request item with 202 unless the test scripted
+    a list of statuses for that email (consumed one per attempt)
+    """
+
+    def __init__(self, scripted=None, batch_statuses=None):
+        self.scripted = {index: list(statuses) for index, statuses in (scripted or {}).items()}
+        self.batch_statuses = list(batch_statuses or [])
+        self.calls = []
+
+    def request(self, method, url, headers=None, json=None, **kwargs):
+        self.calls.append([int(item['id']) for item in json['requests']])
+
+        if self.batch_statuses:
+            return FakeResponse(self.batch_statuses.pop(0), headers={'Retry-After': '7'})
+
+        responses = []
+        for item in json['requests']:
+            index = int(item['id'])
+            statuses = self.scripted.get(index)
+            status = statuses.pop(0) if statuses else 202
+            responses.append({
+                'id': item['id'],
+                'status': status,
+                'headers': {'Retry-After': '2'} if status == 429 else {'request-id': f'req-{index}'},
+                'body': {'error': {'code': str(status)}} if status != 202 else None,
+            })
+        return FakeResponse(200, {'responses': responses})
+
+
+class SendBatchAsSystemTests(SimpleTestCase):
+
+    def setUp(self):
+        self.service = SystemEmailService()
+        self.service.max_workers = 1
+
+        token = mock.patch.object(SystemEmailService, 'get_application_token', return_value='token')
+        token.start()
+        self.addCleanup(token.stop)
+
+        sleep = mock.patch('api.system_email_service.time.sleep')
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def send(self, session, count):
+        emails = [
+            {
+                'from_email': 'system@example.com',
+                'to_email': f'user{index}@example.com',
+                'subject': 'Subject',
+                'body_html': '<p>Body</p>',
+            }
+            for index in range(count)
+        ]
+        with mock.patch.object(GraphClient, 'session', new_callable=mock.PropertyMock, return_value=session):
+            return self.service.send_batch_as_system(emails)
+
+    def test_splits_into_batches_of_twenty(self):
+        session = FakeGraphSession()
+
+        results = self.send(session, 45)
+
+        self.assertEqual([len(call) for call in session.calls], [20, 20, 5])
+        self.assertEqual(sorted(index for call in session.calls for index in call), list(range(45)))
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(results[44]['message_id'], 'req-44')
+        self.sleep.assert_not_called()
+
+    def test_retries_only_throttled_requests(self):
+        session = FakeGraphSession(scripted={
+            3: [429],                 # throttled once, then sent
+            5: [503, 503, 503, 503],  # still unavailable after every retry
+            7: [500],                 # not retryable
+        })
+
+        results = self.send(session, 10)
+
+        self.assertEqual(session.calls, [list(range(10)), [3, 5], [5], [5]])
+        self.assertTrue(results[3]['success'])
+        self.assertFalse(results[5]['success'])
+        self.assertIn('503', results[5]['message'])
+        self.assertFalse(results[7]['success'])
+        self.assertIn('500', results[7]['message'])
+        self.assertEqual(
+            [index for index, result in enumerate(results) if not result['success']], [5, 7]
+        )
+        self.sleep.assert_any_call(2.0)
+
+    def test_whole_batch_throttled_then_sent(self):
+        session = FakeGraphSession(batch_statuses=[429])
+
+        results = self.send(session, 3)
+
+        self.assertEqual(session.calls, [[0, 1, 2], [0, 1, 2]])
+        self.assertTrue(all(result['success'] for result in results))
+        self.sleep.assert_called_once_with(7.0)
+
+    def test_retry_after_is_capped(self):
+        self.assertEqual(
+            SystemEmailService._retry_after_seconds({'Retry-After': '3600'}, 0),
+            SystemEmailService.MAX_RETRY_AFTER_SECONDS
+        )
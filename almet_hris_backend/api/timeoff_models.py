@@ -6,7 +6,8 @@ Time Off System Models
 - HR notification
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -15,6 +16,8 @@ from decimal import Decimal
 import uuid
 import logging
 
+from .grouped_stats import GroupedStats
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,73 +76,215 @@ class TimeOffBalance(models.Model):
     def __str__(self):
         return f"{self.employee.full_name} - {self.current_balance_hours}h available"
     
-    def check_and_reset_monthly(self):
-        """
-        ✅ FIXED: Aylıq reset yoxla və tətbiq et
-        - Yalnız initialized balances üçün işləyir
-        - HƏR AY yeni monthly_allowance əlavə edir (istifadə etməsə də)
-        - used_hours_this_month 0-a çevrilir
+    @classmethod
+    def accrue_monthly(cls, today=None):
         """
-        if not self.is_initialized:
-          
-            return False
+        Aylıq allowance-ı bütün initialized balanslara əlavə et
+        - Bir UPDATE: current_balance_hours += monthly_allowance_hours
+        - last_reset_date bu aydan əvvəl olanlara (təkrar çağırış heç nə etmir)
+        - Hər employee üçün ACCRUAL ledger entry (bulk_create)
         
-        today = timezone.now().date()
+        Returns:
+            list: accrued TimeOffLedgerEntry-lər
+        """
+        today = today or timezone.now().date()
+        period = today.replace(day=1)
         
-        # Əgər yeni ay başlayıbsa
-        if today.month != self.last_reset_date.month or today.year != self.last_reset_date.year:
-            # Yeni ay üçün monthly_allowance əlavə et (istifadə etməsə də)
-            old_balance = self.current_balance_hours
-            self.current_balance_hours += self.monthly_allowance_hours
-            self.used_hours_this_month = Decimal('0.0')
-            self.last_reset_date = today
-            self.save()
+        with transaction.atomic():
+            due = cls.objects.filter(is_initialized=True, last_reset_date__lt=period)
+            balance_ids = list(due.select_for_update().values_list('id', flat=True))
+            if not balance_ids:
+                return []
             
-            logger.info(
-                f"✅ Monthly reset: {self.employee.full_name} - "
-                f"Added {self.monthly_allowance_hours}h, "
-                f"{old_balance}h → {self.current_balance_hours}h"
+            cls.objects.filter(
+                id__in=balance_ids,
+                last_reset_date__lt=period
+            ).update(
+                current_balance_hours=F('current_balance_hours') + F('monthly_allowance_hours'),
+                used_hours_this_month=Decimal('0.0'),
+                last_reset_date=today,
+                updated_at=timezone.now()
             )
-            return True
+            
+            entries = [
+                TimeOffLedgerEntry(
+                    employee_id=employee_id,
+                    entry_type='ACCRUAL',
+                    hours=allowance,
+                    balance_after=balance,
+                    period=period,
+                    description=f"Monthly allowance {period.strftime('%Y-%m')}"
+                )
+                for employee_id, allowance, balance in cls.objects.filter(
+                    id__in=balance_ids
+                ).values_list('employee_id', 'monthly_allowance_hours', 'current_balance_hours')
+            ]
+            TimeOffLedgerEntry.objects.bulk_create(entries)
+            
+            # queryset.update / bulk_create skip post_save
+            transaction.on_commit(TIMEOFF_BALANCE_STATS.invalidate)
         
-        return False
+        logger.info(f"✅ Monthly accrual {period.strftime('%Y-%m')}: {len(entries)} balances")
+        return entries
     
     def has_sufficient_balance(self, hours_requested):
         """Kifayət qədər balans var?"""
         return self.current_balance_hours >= Decimal(str(hours_requested))
     
-    def deduct_hours(self, hours):
-        """Saatları balansdan çıxart"""
-        if not self.has_sufficient_balance(hours):
-            raise ValueError(
-                f"Insufficient balance. Available: {self.current_balance_hours}h, "
-                f"Requested: {hours}h"
+    def post_entry(self, entry_type, hours, request=None, description='', created_by=None):
+        """
+        Ledger-ə entry yaz və cached balansı yenilə
+        - Balance row select_for_update ilə kilidlənir (paralel approve-lar sıraya düşür)
+        - self kilidlənmiş row-un dəyərləri ilə yenilənir
+        
+        Returns:
+            TimeOffLedgerEntry
+        """
+        hours = Decimal(str(hours))
+        
+        with transaction.atomic():
+            locked = TimeOffBalance.objects.select_for_update().get(pk=self.pk)
+            
+            if entry_type == 'DEDUCTION' and locked.current_balance_hours < -hours:
+                raise ValueError(
+                    f"Insufficient balance. Available: {locked.current_balance_hours}h, "
+                    f"Requested: {-hours}h"
+                )
+            
+            locked.current_balance_hours += hours
+            if entry_type == 'DEDUCTION':
+                locked.used_hours_this_month += -hours
+            elif entry_type == 'REFUND':
+                locked.used_hours_this_month = max(Decimal('0.0'), locked.used_hours_this_month - hours)
+            locked.save(update_fields=['current_balance_hours', 'used_hours_this_month', 'updated_at'])
+            
+            entry = TimeOffLedgerEntry.objects.create(
+                employee_id=locked.employee_id,
+                entry_type=entry_type,
+                hours=hours,
+                balance_after=locked.current_balance_hours,
+                request=request,
+                description=description,
+                created_by=created_by
             )
         
-        self.current_balance_hours -= Decimal(str(hours))
-        self.used_hours_this_month += Decimal(str(hours))
-        self.save()
+        self.current_balance_hours = locked.current_balance_hours
+        self.used_hours_this_month = locked.used_hours_this_month
+        self.updated_at = locked.updated_at
+        return entry
+    
+    def deduct_hours(self, hours, request=None, created_by=None):
+        """Saatları balansdan çıxart"""
+        self.post_entry(
+            'DEDUCTION', -Decimal(str(hours)),
+            request=request, description='Time off approved', created_by=created_by
+        )
         
         logger.info(
             f"💰 Deducted {hours}h from {self.employee.full_name} - "
             f"New balance: {self.current_balance_hours}h"
         )
     
-    def refund_hours(self, hours):
-        """Saatları geri qaytar (məsələn, reject zamanı)"""
-        self.current_balance_hours += Decimal(str(hours))
-        # Used hours-dan da çıxart
-        self.used_hours_this_month = max(
-            Decimal('0.0'), 
-            self.used_hours_this_month - Decimal(str(hours))
+    def refund_hours(self, hours, request=None, created_by=None):
+        """Saatları geri qaytar (məsələn, cancel zamanı)"""
+        self.post_entry(
+            'REFUND', Decimal(str(hours)),
+            request=request, description='Approved time off cancelled', created_by=created_by
         )
-        self.save()
         
         logger.info(
             f"💵 Refunded {hours}h to {self.employee.full_name} - "
             f"New balance: {self.current_balance_hours}h"
         )
     
+    def set_balance(self, new_balance, created_by=None, reason=''):
+        """
+        Admin balans təyini: fərq ADJUSTMENT entry kimi yazılır
+        Balance initialized olur
+        """
+        with transaction.atomic():
+            locked = TimeOffBalance.objects.select_for_update().get(pk=self.pk)
+            difference = Decimal(str(new_balance)) - locked.current_balance_hours
+            entry = self.post_entry(
+                'ADJUSTMENT', difference, description=reason[:255], created_by=created_by
+            )
+            TimeOffBalance.objects.filter(pk=self.pk).update(
+                is_initialized=True,
+                last_reset_date=timezone.now().date()
+            )
+        
+        self.is_initialized = True
+        self.last_reset_date = timezone.now().date()
+        return entry
+    
+    @classmethod
+    def balance_at(cls, employee, moment):
+        """
+        Point-in-time balans: moment-dən əvvəlki son ledger entry-nin balance_after-i
+        (employee, created_at) index-i ilə bir sətir oxunur
+        """
+        balance_after = TimeOffLedgerEntry.objects.filter(
+            employee=employee,
+            created_at__lte=moment
+        ).order_by('-created_at', '-id').values_list('balance_after', flat=True).first()
+        return balance_after if balance_after is not None else Decimal('0.0')
+    
+    @classmethod
+    def reconcile_batch(cls, balance_ids, dry_run=False):
+        """
+        Balansları ledger-dən yenidən qur (bir aggregate query)
+        - OPENING entry-si olmayan balans: fərq OPENING kimi ledger-ə köçürülür
+        - SUM(hours) != current_balance_hours: cached balans düzəldilir
+        
+        Returns:
+            dict: {'opened': [...], 'fixed': [(employee_id, old, new), ...]}
+        """
+        result = {'opened': [], 'fixed': []}
+        
+        with transaction.atomic():
+            balances = list(
+                cls.objects.select_for_update().filter(id__in=balance_ids).order_by('id')
+            )
+            ledger = {
+                row['employee_id']: row
+                for row in TimeOffLedgerEntry.objects.filter(
+                    employee_id__in=[balance.employee_id for balance in balances]
+                ).order_by().values('employee_id').annotate(
+                    total=Sum('hours'),
+                    openings=Count('id', filter=Q(entry_type='OPENING'))
+                )
+            }
+            
+            openings = []
+            fixed = []
+            for balance in balances:
+                row = ledger.get(balance.employee_id, {'total': None, 'openings': 0})
+                total = row['total'] or Decimal('0.0')
+                
+                if not row['openings']:
+                    openings.append(TimeOffLedgerEntry(
+                        employee_id=balance.employee_id,
+                        entry_type='OPENING',
+                        hours=balance.current_balance_hours - total,
+                        balance_after=balance.current_balance_hours,
+                        description='Opening balance'
+                    ))
+                    result['opened'].append(balance.employee_id)
+                elif total != balance.current_balance_hours:
+                    result['fixed'].append((balance.employee_id, balance.current_balance_hours, total))
+                    balance.current_balance_hours = total
+                    fixed.append(balance)
+            
+            if not dry_run:
+                TimeOffLedgerEntry.objects.bulk_create(openings)
+                cls.objects.bulk_update(fixed, ['current_balance_hours'])
+                
+                # bulk_update skips post_save; openings leave balances unchanged
+                if fixed:
+                    transaction.on_commit(TIMEOFF_BALANCE_STATS.invalidate)
+        
+        return result
+    
     @classmethod
     def get_or_create_for_employee(cls, employee):
         """
@@ -158,17 +303,112 @@ class TimeOffBalance(models.Model):
         )
         
         if created:
+            TimeOffLedgerEntry.objects.create(
+                employee=employee,
+                entry_type='OPENING',
+                hours=balance.current_balance_hours,
+                balance_after=balance.current_balance_hours,
+                description='Opening balance'
+            )
             logger.info(
                 f"📝 Created time off balance for {employee.full_name} "
                 f"with 0h (not initialized)"
             )
-        else:
-            # Monthly reset yoxla (yalnız initialized olanlar üçün)
-            balance.check_and_reset_monthly()
         
+        # Monthly accrual is applied by the scheduled job (accrue_monthly)
         return balance
 
 
+# Time off dashboard totals; bulk balance writes (accrue_monthly,
+# reconcile_batch) skip post_save and invalidate it on commit
+TIMEOFF_BALANCE_STATS = GroupedStats(
+    'timeoff_balances',
+    measures={
+        'total': Count('pk'),
+        'total_balance_hours': Sum('current_balance_hours'),
+    },
+    invalidate_on=[TimeOffBalance],
+)
+
+
+class TimeOffLedgerEntry(models.Model):
+    """
+    Time off balans hərəkətləri (yalnız əlavə olunur)
+    TimeOffBalance.current_balance_hours = SUM(hours) - cached running balance
+    OPENING: ledger-dən əvvəlki balans (reconcile_timeoff_ledger yaradır)
+    """
+    
+    ENTRY_TYPES = [
+        ('OPENING', 'Opening Balance'),
+        ('ACCRUAL', 'Monthly Accrual'),
+        ('DEDUCTION', 'Approved Request'),
+        ('REFUND', 'Cancelled Request'),
+        ('ADJUSTMENT', 'Manual Adjustment'),
+    ]
+    
+    employee = models.ForeignKey(
+        'Employee',
+        on_delete=models.CASCADE,
+        related_name='timeoff_ledger_entries'
+    )
+    entry_type = models.CharField(max_length=20, choices=ENTRY_TYPES)
+    hours = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        help_text="Saat (+ əlavə, - çıxılma)"
+    )
+    balance_after = models.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        help_text="Entry-dən sonra balans"
+    )
+    period = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Accrual ayı (ayın 1-i)"
+    )
+    request = models.ForeignKey(
+        'TimeOffRequest',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ledger_entries'
+    )
+    description = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='timeoff_ledger_entries'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'timeoff_ledger_entries'
+        verbose_name = 'Time Off Ledger Entry'
+        verbose_name_plural = 'Time Off Ledger Entries'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['employee', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['employee', 'period'],
+                condition=models.Q(entry_type='ACCRUAL'),
+                name='timeoff_ledger_one_accrual_per_month'
+            ),
+            models.UniqueConstraint(
+                fields=['employee'],
+                condition=models.Q(entry_type='OPENING'),
+                name='timeoff_ledger_one_opening_balance'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.employee_id} - {self.entry_type} {self.hours}h"
+
+
 class TimeOffRequest(models.Model):
     """
     Time Off Request Model
@@ -303,49 +543,60 @@ class TimeOffRequest(models.Model):
     
     def approve(self, approved_by_user):
         """Line manager tərəfindən approve"""
-        if self.status != 'PENDING':
-            raise ValueError(f"Cannot approve request with status: {self.status}")
-        
-        # Balance-dən çıxart
         balance = TimeOffBalance.get_or_create_for_employee(self.employee)
         
-        if not balance.has_sufficient_balance(self.duration_hours):
-            raise ValueError(
-                f"Insufficient balance. Available: {balance.current_balance_hours}h"
-            )
-        
-        balance.deduct_hours(self.duration_hours)
-        
-        self.status = 'APPROVED'
-        self.approved_by = approved_by_user
-        self.approved_at = timezone.now()
-        self.balance_deducted = True
-        self.save()
+        with transaction.atomic():
+            # Request row kilidi: eyni request iki dəfə approve olunmur
+            current_status = TimeOffRequest.objects.select_for_update().values_list(
+                'status', flat=True
+            ).get(pk=self.pk)
+            if current_status != 'PENDING':
+                raise ValueError(f"Cannot approve request with status: {current_status}")
+            
+            # Balance-dən çıxart (balance row kilidi altında yoxlanılır)
+            balance.deduct_hours(self.duration_hours, request=self, created_by=approved_by_user)
+            
+            self.status = 'APPROVED'
+            self.approved_by = approved_by_user
+            self.approved_at = timezone.now()
+            self.balance_deducted = True
+            self.save()
         
         # HR-lara bildiriş göndər
         self.notify_hr()
     
     def reject(self, rejection_reason, rejected_by_user):
         """Line manager tərəfindən reject"""
-        if self.status != 'PENDING':
-            raise ValueError(f"Cannot reject request with status: {self.status}")
-        
-        self.status = 'REJECTED'
-        self.rejection_reason = rejection_reason
-        self.approved_by = rejected_by_user
-        self.approved_at = timezone.now()
-        self.save()
+        with transaction.atomic():
+            current_status = TimeOffRequest.objects.select_for_update().values_list(
+                'status', flat=True
+            ).get(pk=self.pk)
+            if current_status != 'PENDING':
+                raise ValueError(f"Cannot reject request with status: {current_status}")
+            
+            self.status = 'REJECTED'
+            self.rejection_reason = rejection_reason
+            self.approved_by = rejected_by_user
+            self.approved_at = timezone.now()
+            self.save()
     
     def cancel(self):
         """Employee tərəfindən cancel"""
-        if self.status == 'APPROVED' and self.balance_deducted:
-            # Balance-ə geri qaytar
-            balance = TimeOffBalance.get_or_create_for_employee(self.employee)
-            balance.refund_hours(self.duration_hours)
+        with transaction.atomic():
+            current_status, balance_deducted = TimeOffRequest.objects.select_for_update().values_list(
+                'status', 'balance_deducted'
+            ).get(pk=self.pk)
+            if current_status == 'CANCELLED':
+                raise ValueError("Request is already cancelled")
+            
+            if current_status == 'APPROVED' and balance_deducted:
+                # Balance-ə geri qaytar
+                balance = TimeOffBalance.get_or_create_for_employee(self.employee)
+                balance.refund_hours(self.duration_hours, request=self)
+            
             self.balance_deducted = False
-        
-        self.status = 'CANCELLED'
-        self.save()
+            self.status = 'CANCELLED'
+            self.save()
     
     def notify_hr(self):
         """HR-lara bildiriş göndər"""
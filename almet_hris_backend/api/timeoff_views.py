@@ -8,8 +8,9 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum 
+from django.db.models import Count
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework.parsers import MultiPartParser
 import pandas as pd
 from django.http import HttpResponse
@@ -17,7 +18,8 @@ from io import BytesIO
 import logging
 
 from .timeoff_models import (
-    TimeOffBalance, TimeOffRequest, TimeOffSettings, TimeOffActivity
+    TimeOffBalance, TimeOffRequest, TimeOffSettings, TimeOffActivity,
+    TimeOffLedgerEntry, TIMEOFF_BALANCE_STATS
 )
 from .timeoff_serializers import (
     TimeOffBalanceSerializer, TimeOffRequestSerializer,
@@ -27,7 +29,6 @@ from .timeoff_serializers import (
 )
 from .models import Employee
 from .notification_service import notification_service
-from .token_helpers import extract_graph_token_from_request
 from .timeoff_permissions import (
     get_timeoff_request_access,
     filter_timeoff_requests_by_access,
@@ -36,10 +37,19 @@ from .timeoff_permissions import (
     can_view_timeoff_request_role_based,
     is_admin_user
 )
+from .grouped_stats import Breakdown, GroupedStats
 
 logger = logging.getLogger(__name__)
 
 
+TIMEOFF_REQUEST_STATS = GroupedStats(
+    'timeoff_requests',
+    measures={'total': Count('pk')},
+    breakdowns={'status': Breakdown('status', choices=TimeOffRequest.STATUS_CHOICES)},
+    invalidate_on=[TimeOffRequest],
+)
+
+
 class TimeOffBalanceViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Time Off Balance ViewSet - ROLE-BASED ACCESS
@@ -159,6 +169,53 @@ class TimeOffBalanceViewSet(viewsets.ReadOnlyModelViewSet):
             }
         })
     
+    @action(detail=True, methods=['get'])
+    def ledger(self, request, pk=None):
+        """
+        Balance ledger (latest entries first)
+        ?as_of=<ISO datetime> → balance at that moment
+        """
+        balance = self.get_object()
+        
+        response = {
+            'employee_id': balance.employee.employee_id,
+            'employee_name': balance.employee.full_name,
+            'current_balance': float(balance.current_balance_hours),
+            'entries': [
+                {
+                    'id': entry['id'],
+                    'entry_type': entry['entry_type'],
+                    'hours': float(entry['hours']),
+                    'balance_after': float(entry['balance_after']),
+                    'period': entry['period'],
+                    'request_id': entry['request_id'],
+                    'description': entry['description'],
+                    'created_at': entry['created_at']
+                }
+                for entry in TimeOffLedgerEntry.objects.filter(
+                    employee_id=balance.employee_id
+                ).values(
+                    'id', 'entry_type', 'hours', 'balance_after', 'period',
+                    'request_id', 'description', 'created_at'
+                )[:100]
+            ]
+        }
+        
+        as_of = request.query_params.get('as_of')
+        if as_of:
+            moment = parse_datetime(as_of)
+            if moment is None:
+                return Response(
+                    {'error': 'as_of must be an ISO datetime'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            response['as_of'] = moment.isoformat()
+            response['balance_as_of'] = float(TimeOffBalance.balance_at(balance.employee_id, moment))
+        
+        return Response(response)
+    
     @action(detail=True, methods=['post'])
     def update_balance(self, request, pk=None):
         """
@@ -195,11 +252,8 @@ class TimeOffBalanceViewSet(viewsets.ReadOnlyModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Update balance
-            balance.current_balance_hours = new_balance_decimal
-            balance.is_initialized = True
-            balance.last_reset_date = timezone.now().date()
-            balance.save()
+            # Update balance (ADJUSTMENT ledger entry)
+            balance.set_balance(new_balance_decimal, created_by=request.user, reason=reason)
             
             # Log activity
             TimeOffActivity.objects.create(
@@ -312,12 +366,8 @@ class TimeOffBalanceViewSet(viewsets.ReadOnlyModelViewSet):
                     balance = TimeOffBalance.get_or_create_for_employee(employee)
                     old_balance = balance.current_balance_hours
                     
-                    # Update balance
-                    from decimal import Decimal
-                    balance.current_balance_hours = Decimal(str(new_balance))
-                    balance.is_initialized = True
-                    balance.last_reset_date = timezone.now().date()
-                    balance.save()
+                    # Update balance (ADJUSTMENT ledger entry)
+                    balance.set_balance(new_balance, created_by=request.user, reason=reason)
                     
                     # Log activity
                     TimeOffActivity.objects.create(
@@ -388,6 +438,7 @@ class TimeOffBalanceViewSet(viewsets.ReadOnlyModelViewSet):
         Reset monthly balances - Admin only
         Only resets initialized balances
         ✅ FIXED: HƏR AY 4 saat əlavə edir (istifadə etməsə də)
+        Runs the same set-based accrual as the scheduled job
         """
         if not is_admin_user(request.user):
             return Response(
@@ -395,46 +446,46 @@ class TimeOffBalanceViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        reset_count = 0
-        skipped_count = 0
-        failed_count = 0
-        results = []
+        try:
+            entries = TimeOffBalance.accrue_monthly()
+        except Exception as e:
+            logger.error(f"❌ Monthly accrual failed: {e}")
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
         
-        for balance in TimeOffBalance.objects.all():
-            try:
-                if not balance.is_initialized:
-                    skipped_count += 1
-                    results.append({
-                        'employee_id': balance.employee.employee_id,
-                        'employee_name': balance.employee.full_name,
-                        'status': 'skipped',
-                        'reason': 'Not initialized'
-                    })
-                    continue
-                
-                if balance.check_and_reset_monthly():
-                    reset_count += 1
-                    results.append({
-                        'employee_id': balance.employee.employee_id,
-                        'employee_name': balance.employee.full_name,
-                        'new_balance': float(balance.current_balance_hours),
-                        'status': 'reset'
-                    })
-            except Exception as e:
-                failed_count += 1
-                results.append({
-                    'employee_id': balance.employee.employee_id,
-                    'employee_name': balance.employee.full_name,
-                    'status': 'failed',
-                    'error': str(e)
-                })
+        employees = Employee.all_objects.in_bulk([entry.employee_id for entry in entries])
+        results = [
+            {
+                'employee_id': employees[entry.employee_id].employee_id,
+                'employee_name': employees[entry.employee_id].full_name,
+                'new_balance': float(entry.balance_after),
+                'status': 'reset'
+            }
+            for entry in entries
+        ]
+        
+        skipped = TimeOffBalance.objects.filter(is_initialized=False).values_list(
+            'employee__employee_id', 'employee__full_name'
+        )
+        for employee_id, full_name in skipped:
+            results.append({
+                'employee_id': employee_id,
+                'employee_name': full_name,
+                'status': 'skipped',
+                'reason': 'Not initialized'
+            })
+        
+        reset_count = len(entries)
+        skipped_count = len(results) - reset_count
         
         return Response({
             'success': True,
-            'message': f'{reset_count} balances reset, {skipped_count} skipped (not initialized), {failed_count} failed',
+            'message': f'{reset_count} balances reset, {skipped_count} skipped (not initialized), 0 failed',
             'reset_count': reset_count,
             'skipped_count': skipped_count,
-            'failed_count': failed_count,
+            'failed_count': 0,
             'results': results
         })
     
@@ -856,11 +907,6 @@ class TimeOffRequestViewSet(viewsets.ModelViewSet):
             return
         
         try:
-            access_token = extract_graph_token_from_request(request)
-            if not access_token:
-                logger.error("No Graph token for notification")
-                return
-            
             subject = f"[TIME OFF] {request_obj.employee.full_name} - {request_obj.date}"
             
             body_html = f"""
@@ -889,7 +935,6 @@ class TimeOffRequestViewSet(viewsets.ModelViewSet):
                 recipient_email=request_obj.line_manager.email,
                 subject=subject,
                 body_html=body_html,
-                access_token=access_token,
                 related_model='TimeOffRequest',
                 related_object_id=str(request_obj.id),
                 sent_by=request.user
@@ -908,11 +953,6 @@ class TimeOffRequestViewSet(viewsets.ModelViewSet):
             return
         
         try:
-            access_token = extract_graph_token_from_request(request)
-            if not access_token:
-                logger.error("No Graph token for HR notification")
-                return
-            
             subject = f"[TIME OFF] {request_obj.employee.full_name} - {request_obj.date}"
             
             body_html = f"""
@@ -943,7 +983,6 @@ class TimeOffRequestViewSet(viewsets.ModelViewSet):
                     recipient_email=hr_email,
                     subject=subject,
                     body_html=body_html,
-                    access_token=access_token,
                     related_model='TimeOffRequest',
                     related_object_id=str(request_obj.id),
                     sent_by=request.user
@@ -964,11 +1003,6 @@ class TimeOffRequestViewSet(viewsets.ModelViewSet):
             return
         
         try:
-            access_token = extract_graph_token_from_request(request)
-            if not access_token:
-                logger.error("No Graph token for employee notification")
-                return
-            
             if notification_type == 'approved':
                 subject = f"[TIME OFF] Your request for {request_obj.date} - APPROVED"
                 color = "#10B981"
@@ -1016,7 +1050,6 @@ class TimeOffRequestViewSet(viewsets.ModelViewSet):
                 recipient_email=request_obj.employee.email,
                 subject=subject,
                 body_html=body_html,
-                access_token=access_token,
                 related_model='TimeOffRequest',
                 related_object_id=str(request_obj.id),
                 sent_by=request.user
@@ -1309,27 +1342,28 @@ class TimeOffDashboardViewSet(viewsets.ViewSet):
     def _get_full_dashboard(self, request):
         """Full dashboard for Admin"""
         # System-wide statistics
-        all_balances = TimeOffBalance.objects.all()
         all_requests = TimeOffRequest.objects.all()
+        balance_stats = TIMEOFF_BALANCE_STATS.get(TimeOffBalance.objects.all())
+        request_stats = TIMEOFF_REQUEST_STATS.get(all_requests)
+        
+        total_employees = balance_stats['measures']['total']
+        total_balance_hours = float(balance_stats['measures']['total_balance_hours'] or 0)
+        request_counts = request_stats['breakdowns']['status']
         
         dashboard_data = {
             'access_level': 'Admin - Full Access',
             'is_admin': True,
             'system_stats': {
-                'total_employees': all_balances.count(),
-                'total_balance_hours': float(all_balances.aggregate(
-                    total=Sum('current_balance_hours')
-                )['total'] or 0),
-                'average_balance': float(all_balances.aggregate(
-                    avg=Sum('current_balance_hours')
-                )['avg'] or 0) / max(all_balances.count(), 1),
+                'total_employees': total_employees,
+                'total_balance_hours': total_balance_hours,
+                'average_balance': total_balance_hours / max(total_employees, 1),
             },
             'requests': {
-                'total': all_requests.count(),
-                'pending': all_requests.filter(status='PENDING').count(),
-                'approved': all_requests.filter(status='APPROVED').count(),
-                'rejected': all_requests.filter(status='REJECTED').count(),
-                'cancelled': all_requests.filter(status='CANCELLED').count(),
+                'total': request_stats['measures']['total'],
+                'pending': request_counts['PENDING'],
+                'approved': request_counts['APPROVED'],
+                'rejected': request_counts['REJECTED'],
+                'cancelled': request_counts['CANCELLED'],
             },
             'recent_requests': TimeOffRequestSerializer(
                 all_requests.order_by('-created_at')[:10],
@@ -0,0 +1,250 @@
+# api/training_assignments.py - Bulk training assignment
+"""
+Training Assignment Engine
+Assigns many trainings to many employees with a fixed number of queries:
+the existing (training, employee) pairs are loaded with one query, only the
+missing pairs are inserted (bulk_create, ignore_conflicts as a guard against
+concurrent requests), pairs whose assignment was soft-deleted are restored,
+and the ASSIGNED activity rows are written in bulk.
+
+Notification emails are not built in the request: after commit a Celery task
+(api.tasks.send_training_assignment_notifications) groups the new
+assignments per employee and queues one email each through the outbox.
+"""
+
+from datetime import timedelta
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .email_outbox import EmailOutbox
+from .training_models import TrainingAssignment, TrainingActivity
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingAssignmentEngine:
+    """Set-based training assignment"""
+
+    BULK_BATCH_SIZE = 1000
+
+    @staticmethod
+    def due_date_for(training, due_date=None, today=None):
+        """Explicit due date, else today + the training's completion deadline"""
+        if due_date:
+            return due_date
+        if training.completion_deadline_days:
+            return (today or timezone.now().date()) + timedelta(days=training.completion_deadline_days)
+        return None
+
+    @staticmethod
+    def _pair_info(training, employee, **extra):
+        return {
+            'training_id': training.training_id,
+            'training_title': training.title,
+            'employee_id': employee.employee_id,
+            'employee_name': employee.full_name,
+            **extra
+        }
+
+    @classmethod
+    def bulk_assign(cls, trainings, employees, assigned_by=None, due_date=None, is_mandatory=False, notify=True):
+        """
+        Assign every training to every employee
+
+        Returns:
+            dict: {'created': [...], 'skipped': [...], 'created_count', 'skipped_count'}
+        """
+        trainings = list(trainings)
+        employees = list(employees)
+        today = timezone.now().date()
+
+        training_ids = [training.id for training in trainings]
+        employee_ids = [employee.id for employee in employees]
+
+        # One query for every pair that already has a row (deleted rows included:
+        # unique_together covers them too)
+        existing = {
+            (training_id, employee_id): (assignment_id, is_deleted)
+            for assignment_id, training_id, employee_id, is_deleted in TrainingAssignment.all_objects.filter(
+                training_id__in=training_ids,
+                employee_id__in=employee_ids
+            ).values_list('id', 'training_id', 'employee_id', 'is_deleted')
+        }
+
+        created = []
+        skipped = []
+        new_assignments = []
+        restored = {}  # training_id -> [assignment_id]
+
+        for training in trainings:
+            for employee in employees:
+                row = existing.get((training.id, employee.id))
+                if row is None:
+                    new_assignments.append(TrainingAssignment(
+                        training=training,
+                        employee=employee,
+                        due_date=cls.due_date_for(training, due_date, today),
+                        is_mandatory=is_mandatory,
+                        assigned_by=assigned_by
+                    ))
+                elif row[1]:
+                    restored.setdefault(training.id, []).append(row[0])
+                else:
+                    skipped.append(cls._pair_info(training, employee, reason='Already assigned'))
+
+        trainings_by_id = {training.id: training for training in trainings}
+        employees_by_id = {employee.id: employee for employee in employees}
+
+        with transaction.atomic():
+            TrainingAssignment.objects.bulk_create(
+                new_assignments, batch_size=cls.BULK_BATCH_SIZE, ignore_conflicts=True
+            )
+
+            # Restore soft-deleted assignments as fresh ones
+            now = timezone.now()
+            for training_id, assignment_ids in restored.items():
+                TrainingAssignment.all_objects.filter(id__in=assignment_ids).update(
+                    is_deleted=False,
+                    deleted_at=None,
+                    deleted_by=None,
+                    status='ASSIGNED',
+                    due_date=cls.due_date_for(trainings_by_id[training_id], due_date, today),
+                    is_mandatory=is_mandatory,
+                    assigned_by=assigned_by,
+                    started_date=None,
+                    completed_date=None,
+                    progress_percentage=0,
+                    completed_material_count=0,
+                    updated_at=now
+                )
+                TrainingAssignment.materials_completed.through.objects.filter(
+                    trainingassignment_id__in=assignment_ids
+                ).delete()
+
+            # ignore_conflicts returns no ids: read back the pairs this call wrote
+            wanted = {(assignment.training_id, assignment.employee_id) for assignment in new_assignments}
+            wanted.update(
+                pair for pair, (assignment_id, is_deleted) in existing.items() if is_deleted
+            )
+            assignments = [
+                (assignment_id, training_id, employee_id, due)
+                for assignment_id, training_id, employee_id, due in TrainingAssignment.objects.filter(
+                    training_id__in=training_ids,
+                    employee_id__in=employee_ids,
+                    assigned_by=assigned_by,
+                    status='ASSIGNED'
+                ).values_list('id', 'training_id', 'employee_id', 'due_date')
+                if (training_id, employee_id) in wanted
+            ]
+
+            TrainingActivity.objects.bulk_create(
+                [
+                    TrainingActivity(
+                        assignment_id=assignment_id,
+                        activity_type='ASSIGNED',
+                        description=f"Training assigned to {employees_by_id[employee_id].full_name}",
+                        performed_by=assigned_by,
+                        metadata={'due_date': str(due) if due else None}
+                    )
+                    for assignment_id, training_id, employee_id, due in assignments
+                ],
+                batch_size=cls.BULK_BATCH_SIZE
+            )
+
+            for assignment_id, training_id, employee_id, _ in assignments:
+                created.append(cls._pair_info(
+                    trainings_by_id[training_id], employees_by_id[employee_id], assignment_id=assignment_id
+                ))
+
+            # Conflicts lost to a concurrent request count as skipped
+            written = {(training_id, employee_id) for _, training_id, employee_id, _ in assignments}
+            for training_id, employee_id in wanted - written:
+                skipped.append(cls._pair_info(
+                    trainings_by_id[training_id], employees_by_id[employee_id], reason='Already assigned'
+                ))
+
+            if notify and assignments:
+                assignment_ids = [assignment_id for assignment_id, _, _, _ in assignments]
+                transaction.on_commit(lambda: cls._schedule_notifications(assignment_ids))
+
+        logger.info(f"✅ Bulk training assignment: {len(created)} created, {len(skipped)} skipped")
+
+        return {
+            'created': created,
+            'skipped': skipped,
+            'created_count': len(created),
+            'skipped_count': len(skipped)
+        }
+
+    # ------------------------------------------------------------------
+    # Notifications
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _schedule_notifications(assignment_ids):
+        from .tasks import send_training_assignment_notifications
+        try:
+            send_training_assignment_notifications.delay(assignment_ids)
+        except Exception as e:
+            logger.warning(f"Could not schedule training notifications ({len(assignment_ids)} assignments): {e}")
+
+    @staticmethod
+    def _build_email_html(employee, assignments):
+        rows = ''.join(
+            f"<tr><td style=\"padding:6px 12px;\">{assignment.training.title}</td>"
+            f"<td style=\"padding:6px 12px;\">{assignment.due_date.strftime('%d %b %Y') if assignment.due_date else '-'}</td>"
+            f"<td style=\"padding:6px 12px;\">{'Yes' if assignment.is_mandatory else 'No'}</td></tr>"
+            for assignment in assignments
+        )
+        return f"""
+        <div style="font-family: Arial, sans-serif; max-width: 600px;">
+            <p>Dear {employee.full_name},</p>
+            <p>The following training(s) have been assigned to you:</p>
+            <table style="border-collapse: collapse; width: 100%;">
+                <tr style="background:#f3f4f6;">
+                    <th style="padding:6px 12px; text-align:left;">Training</th>
+                    <th style="padding:6px 12px; text-align:left;">Due date</th>
+                    <th style="padding:6px 12px; text-align:left;">Mandatory</th>
+                </tr>
+                {rows}
+            </table>
+            <p>Please complete them in the myAlmet portal.</p>
+        </div>
+        """
+
+    @classmethod
+    def notify(cls, assignment_ids):
+        """
+        Queue one email per employee listing their new assignments
+
+        Returns:
+            int: number of queued emails
+        """
+        by_employee = {}
+        assignments = TrainingAssignment.objects.filter(
+            id__in=assignment_ids
+        ).select_related('training', 'employee', 'assigned_by').order_by('employee_id', 'due_date')
+        for assignment in assignments:
+            by_employee.setdefault(assignment.employee_id, []).append(assignment)
+
+        emails = []
+        for employee_assignments in by_employee.values():
+            employee = employee_assignments[0].employee
+            if not employee.email:
+                continue
+            emails.append({
+                'recipients': employee.email,
+                'subject': (
+                    f"New training assigned: {employee_assignments[0].training.title}"
+                    if len(employee_assignments) == 1
+                    else f"{len(employee_assignments)} new trainings assigned"
+                ),
+                'body_html': cls._build_email_html(employee, employee_assignments),
+                'related_model': 'TrainingAssignment',
+                'related_object_id': employee_assignments[0].id,
+                'sent_by': employee_assignments[0].assigned_by,
+            })
+
+        return len(EmailOutbox.enqueue_many(emails))
@@ -1,5 +1,7 @@
 # api/training_models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
 from django.utils import timezone
 from .models import Employee, SoftDeleteModel
@@ -47,6 +49,9 @@ class Training(SoftDeleteModel):
         help_text="Days after assignment to complete"
     )
     
+    # Denormalized: active (not deleted) materials, kept by TrainingMaterial
+    material_count = models.PositiveIntegerField(default=0, editable=False)
+    
     # Metadata
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_trainings')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -116,6 +121,40 @@ class TrainingMaterial(SoftDeleteModel):
     def __str__(self):
         filename = self.file.name.split('/')[-1] if self.file else 'No file'
         return f"{self.training.training_id} - {filename}"
+    
+    def save(self, *args, **kwargs):
+        # Previous (training, counted) to move the counters on add / soft delete / restore
+        previous = None
+        if self.pk:
+            previous = TrainingMaterial.all_objects.filter(pk=self.pk).values_list(
+                'training_id', 'is_deleted'
+            ).first()
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            if previous and not previous[1]:
+                self._adjust_counters(previous[0], -1)
+            if not self.is_deleted:
+                self._adjust_counters(self.training_id, 1)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            if not TrainingMaterial.all_objects.filter(pk=self.pk, is_deleted=True).exists():
+                self._adjust_counters(self.training_id, -1)
+            return super().delete(*args, **kwargs)
+    
+    def _adjust_counters(self, training_id, delta):
+        """Training.material_count and completed counts of assignments that completed it"""
+        Training.all_objects.filter(pk=training_id).update(
+            material_count=Greatest(F('material_count') + delta, Value(0))
+        )
+        TrainingAssignment.all_objects.filter(
+            training_id=training_id,
+            materials_completed=self.pk
+        ).update(
+            completed_material_count=Greatest(F('completed_material_count') + delta, Value(0))
+        )
 class TrainingAssignment(SoftDeleteModel):
     """Training assignment to employees"""
     
@@ -150,6 +189,8 @@ class TrainingAssignment(SoftDeleteModel):
         blank=True,
         help_text="Materials that have been viewed/completed"
     )
+    # Denormalized: active materials in materials_completed
+    completed_material_count = models.PositiveIntegerField(default=0, editable=False)
     
     # Completion Details
     completion_notes = models.TextField(blank=True)
@@ -175,43 +216,129 @@ class TrainingAssignment(SoftDeleteModel):
         unique_together = ['training', 'employee']
         verbose_name = 'Training Assignment'
         verbose_name_plural = 'Training Assignments'
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='training_assign_status_due_idx'),
+        ]
     
     def __str__(self):
         return f"{self.employee.full_name} - {self.training.title}"
     
     def calculate_progress(self):
-        """Calculate progress based on completed materials"""
+        """Progress from the denormalized counters (no queries)"""
         if self.status == 'COMPLETED':
             return 100.0
         
-        # Remove is_mandatory filter
-        total_required = self.training.materials.filter(is_deleted=False).count()
+        total_required = self.training.material_count
         if total_required == 0:
             return 0.0
         
-        # Remove is_mandatory filter
-        completed = self.materials_completed.filter(is_deleted=False).count()
-        progress = (completed / total_required) * 100
-        
-        self.progress_percentage = round(progress, 2)
-        self.save(update_fields=['progress_percentage'])
-        
+        progress = (self.completed_material_count / total_required) * 100
+        self.progress_percentage = round(min(progress, 100), 2)
         return self.progress_percentage
     
     def check_completion(self):
-        """Check if training is completed"""
-        # Remove is_mandatory filter
-        total_required = self.training.materials.filter(is_deleted=False).count()
-        completed = self.materials_completed.filter(is_deleted=False).count()
+        """Check if training is completed (counters only; caller saves)"""
+        total_required = self.training.material_count
         
-        if total_required > 0 and completed >= total_required:
+        if total_required > 0 and self.completed_material_count >= total_required:
             self.status = 'COMPLETED'
             self.completed_date = timezone.now()
             self.progress_percentage = 100
-            self.save()
             return True
         
         return False
+    
+    def complete_material(self, material):
+        """
+        Mark a material completed and move the counters
+        
+        Returns:
+            bool: False if the material was already completed
+        """
+        through = TrainingAssignment.materials_completed.through
+        
+        with transaction.atomic():
+            # Serialize concurrent completions of the same assignment
+            list(TrainingAssignment.objects.select_for_update().filter(pk=self.pk).values_list('pk', flat=True))
+            
+            if through.objects.filter(trainingassignment_id=self.pk, trainingmaterial_id=material.pk).exists():
+                return False
+            through.objects.create(trainingassignment_id=self.pk, trainingmaterial_id=material.pk)
+            
+            TrainingAssignment.objects.filter(pk=self.pk).update(
+                completed_material_count=F('completed_material_count') + 1
+            )
+            self.refresh_from_db(fields=['completed_material_count', 'status', 'started_date'])
+            
+            # Update status to IN_PROGRESS if ASSIGNED
+            if self.status == 'ASSIGNED':
+                self.status = 'IN_PROGRESS'
+                self.started_date = timezone.now()
+            
+            self.calculate_progress()
+            self.check_completion()
+            self.save(update_fields=[
+                'status', 'started_date', 'completed_date', 'progress_percentage', 'updated_at'
+            ])
+        
+        return True
+    
+    @classmethod
+    def mark_overdue(cls, today=None):
+        """ASSIGNED / IN_PROGRESS assignments past their due date -> OVERDUE"""
+        today = today or timezone.now().date()
+        return cls.objects.filter(
+            status__in=['ASSIGNED', 'IN_PROGRESS'],
+            due_date__lt=today
+        ).update(status='OVERDUE', updated_at=timezone.now())
+    
+    @classmethod
+    def reconcile_counters(cls):
+        """
+        Recompute Training.material_count, completed_material_count and
+        progress from the source rows (drift from queryset.update / delete)
+        
+        Returns:
+            dict: rows updated per step
+        """
+        material_counts = TrainingMaterial.objects.filter(
+            training=OuterRef('pk')
+        ).order_by().values('training').annotate(total=Count('pk')).values('total')
+        trainings = Training.all_objects.update(
+            material_count=Coalesce(Subquery(material_counts), 0)
+        )
+        
+        through = cls.materials_completed.through
+        completed_counts = through.objects.filter(
+            trainingassignment=OuterRef('pk'),
+            trainingmaterial__is_deleted=False
+        ).order_by().values('trainingassignment').annotate(total=Count('pk')).values('total')
+        assignments = cls.all_objects.update(
+            completed_material_count=Coalesce(Subquery(completed_counts), 0)
+        )
+        
+        # Progress of unfinished assignments from the fresh counters
+        totals = dict(Training.all_objects.values_list('id', 'material_count'))
+        changed = []
+        for assignment in cls.all_objects.exclude(status='COMPLETED').only(
+            'id', 'training_id', 'completed_material_count', 'progress_percentage'
+        ).iterator(chunk_size=2000):
+            total = totals.get(assignment.training_id) or 0
+            progress = round(min(assignment.completed_material_count / total * 100, 100), 2) if total else 0
+            if float(assignment.progress_percentage) != progress:
+                assignment.progress_percentage = progress
+                changed.append(assignment)
+        cls.all_objects.bulk_update(changed, ['progress_percentage'], batch_size=1000)
+        completed_fixed = cls.all_objects.filter(status='COMPLETED').exclude(
+            progress_percentage=100
+        ).update(progress_percentage=100)
+        
+        return {
+            'trainings': trainings,
+            'assignments': assignments,
+            'progress_fixed': len(changed) + completed_fixed
+        }
+    
     def is_overdue(self):
         """Check if assignment is overdue"""
         if self.status not in ['COMPLETED', 'CANCELLED'] and self.due_date:
@@ -75,7 +75,7 @@ class TrainingListSerializer(serializers.ModelSerializer):
         ]
     
     def get_materials_count(self, obj):
-        return obj.materials.filter(is_deleted=False).count()
+        return obj.material_count
     
     def get_assignments_count(self, obj):
         return obj.assignments.filter(is_deleted=False).count()
@@ -232,11 +232,10 @@ class TrainingAssignmentSerializer(serializers.ModelSerializer):
         ]
     
     def get_materials_completed_count(self, obj):
-        return obj.materials_completed.count()
+        return obj.completed_material_count
     
     def get_total_materials(self, obj):
-        # is_mandatory filter-i SİLDİK
-        return obj.training.materials.filter(is_deleted=False).count()
+        return obj.training.material_count
     
     def get_is_overdue(self, obj):
         return obj.is_overdue()
@@ -6,6 +6,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import transaction
+from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
 from drf_yasg.utils import swagger_auto_schema
@@ -23,11 +24,30 @@ from .training_serializers import (
 )
 from .models import Employee
 from .views import ModernPagination
+from .grouped_stats import Breakdown, GroupedStats
+from .training_assignments import TrainingAssignmentEngine
 
 import logging
 logger = logging.getLogger(__name__)
 
 
+TRAINING_STATS = GroupedStats(
+    'trainings',
+    measures={
+        'total': Count('pk'),
+        'active': Count('pk', filter=Q(is_active=True)),
+    },
+    invalidate_on=[Training],
+)
+
+TRAINING_ASSIGNMENT_STATS = GroupedStats(
+    'training_assignments',
+    measures={'total': Count('pk')},
+    breakdowns={'status': Breakdown('status', choices=TrainingAssignment.STATUS_CHOICES)},
+    invalidate_on=[TrainingAssignment],
+)
+
+
 class TrainingViewSet(viewsets.ModelViewSet):
     """Training ViewSet with CRUD and advanced features"""
     permission_classes = [IsAuthenticated]
@@ -328,25 +348,19 @@ class TrainingViewSet(viewsets.ModelViewSet):
     def statistics(self, request):
         """Get overall training statistics"""
         try:
-            trainings = Training.objects.filter(is_deleted=False)
+            training_stats = TRAINING_STATS.get(Training.objects.filter(is_deleted=False))
+            assignment_stats = TRAINING_ASSIGNMENT_STATS.get(
+                TrainingAssignment.objects.filter(is_deleted=False)
+            )
             
-            total_trainings = trainings.count()
-            active_trainings = trainings.filter(is_active=True).count()
+            total_trainings = training_stats['measures']['total']
+            active_trainings = training_stats['measures']['active']
             
             # Assignment statistics
-            total_assignments = TrainingAssignment.objects.filter(is_deleted=False).count()
-            completed = TrainingAssignment.objects.filter(
-                status='COMPLETED',
-                is_deleted=False
-            ).count()
-            in_progress = TrainingAssignment.objects.filter(
-                status='IN_PROGRESS',
-                is_deleted=False
-            ).count()
-            overdue = TrainingAssignment.objects.filter(
-                status='OVERDUE',
-                is_deleted=False
-            ).count()
+            total_assignments = assignment_stats['measures']['total']
+            completed = assignment_stats['breakdowns']['status']['COMPLETED']
+            in_progress = assignment_stats['breakdowns']['status']['IN_PROGRESS']
+            overdue = assignment_stats['breakdowns']['status']['OVERDUE']
             
             completion_rate = 0
             if total_assignments > 0:
@@ -432,95 +446,52 @@ class TrainingViewSet(viewsets.ModelViewSet):
             if not serializer.is_valid():
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
-            training_ids = serializer.validated_data['training_ids']
-            employee_ids = serializer.validated_data['employee_ids']
+            training_ids = set(serializer.validated_data['training_ids'])
+            employee_ids = set(serializer.validated_data['employee_ids'])
             due_date = serializer.validated_data.get('due_date')
             is_mandatory = serializer.validated_data.get('is_mandatory', False)
             
             # Get trainings and employees
-            trainings = Training.objects.filter(id__in=training_ids, is_active=True, is_deleted=False)
-            employees = Employee.objects.filter(id__in=employee_ids, is_deleted=False)
+            trainings = list(Training.objects.filter(id__in=training_ids, is_active=True, is_deleted=False))
+            employees = list(Employee.objects.filter(id__in=employee_ids, is_deleted=False).only(
+                'id', 'employee_id', 'full_name'
+            ))
             
-            if trainings.count() != len(training_ids):
+            if len(trainings) != len(training_ids):
                 return Response(
                     {'error': 'Some trainings not found or inactive'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            if employees.count() != len(employee_ids):
+            if len(employees) != len(employee_ids):
                 return Response(
                     {'error': 'Some employees not found'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            created = []
-            skipped = []
+            # Set-based: existing pairs in one query, missing pairs bulk-created,
+            # notifications fanned out by Celery after commit
+            result = TrainingAssignmentEngine.bulk_assign(
+                trainings,
+                employees,
+                assigned_by=request.user,
+                due_date=due_date,
+                is_mandatory=is_mandatory
+            )
             
-            with transaction.atomic():
-                for training in trainings:
-                    # Calculate due date for this training if not provided
-                    calculated_due_date = due_date
-                    if not calculated_due_date and training.completion_deadline_days:
-                        calculated_due_date = timezone.now().date() + timedelta(
-                            days=training.completion_deadline_days
-                        )
-                    
-                    for employee in employees:
-                        # Check if already assigned
-                        existing = TrainingAssignment.objects.filter(
-                            training=training,
-                            employee=employee,
-                            is_deleted=False
-                        ).first()
-                        
-                        if existing:
-                            skipped.append({
-                                'training_id': training.training_id,
-                                'training_title': training.title,
-                                'employee_id': employee.employee_id,
-                                'employee_name': employee.full_name,
-                                'reason': 'Already assigned'
-                            })
-                            continue
-                        
-                        # Create assignment
-                        assignment = TrainingAssignment.objects.create(
-                            training=training,
-                            employee=employee,
-                            due_date=calculated_due_date,
-                            is_mandatory=is_mandatory,
-                            assigned_by=request.user
-                        )
-                        
-                        # Log activity
-                        TrainingActivity.objects.create(
-                            assignment=assignment,
-                            activity_type='ASSIGNED',
-                            description=f"Training assigned to {employee.full_name}",
-                            performed_by=request.user,
-                            metadata={
-                                'due_date': str(calculated_due_date) if calculated_due_date else None,
-                              
-                            }
-                        )
-                        
-                        created.append({
-                            'training_id': training.training_id,
-                            'training_title': training.title,
-                            'employee_id': employee.employee_id,
-                            'employee_name': employee.full_name,
-                            'assignment_id': assignment.id
-                        })
+            # bulk_create skips post_save: drop cached statistics here
+            if result['created_count']:
+                TRAINING_ASSIGNMENT_STATS.invalidate()
             
             return Response({
                 'success': True,
-                'message': f'{len(created)} assignments created',
-                'created': created,
-                'skipped': skipped,
+                'message': f"{result['created_count']} assignments created",
+                'created': result['created'],
+                'skipped': result['skipped'],
                 'summary': {
                     'total_requested': len(training_ids) * len(employee_ids),
-                    'created': len(created),
-                    'skipped': len(skipped)
+                    'created': result['created_count'],
+                    'skipped': result['skipped_count']
                 }
             })
             
@@ -546,7 +517,7 @@ class TrainingAssignmentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return TrainingAssignment.objects.select_related(
             'training', 'employee', 'assigned_by'
-        ).prefetch_related('materials_completed').filter(is_deleted=False)
+        ).filter(is_deleted=False)
     
     @swagger_auto_schema(
         operation_description="Get assignments for specific employee",
@@ -566,6 +537,13 @@ class TrainingAssignmentViewSet(viewsets.ModelViewSet):
                 assignments = assignments.filter(status=status_filter)
             
             serializer = self.get_serializer(assignments, many=True)
+            summary = assignments.order_by().aggregate(
+                total=Count('pk'),
+                assigned=Count('pk', filter=Q(status='ASSIGNED')),
+                in_progress=Count('pk', filter=Q(status='IN_PROGRESS')),
+                completed=Count('pk', filter=Q(status='COMPLETED')),
+                overdue=Count('pk', filter=Q(status='OVERDUE')),
+            )
             
             return Response({
                 'employee': {
@@ -574,13 +552,7 @@ class TrainingAssignmentViewSet(viewsets.ModelViewSet):
                     'employee_id': employee.employee_id
                 },
                 'assignments': serializer.data,
-                'summary': {
-                    'total': assignments.count(),
-                    'assigned': assignments.filter(status='ASSIGNED').count(),
-                    'in_progress': assignments.filter(status='IN_PROGRESS').count(),
-                    'completed': assignments.filter(status='COMPLETED').count(),
-                    'overdue': assignments.filter(status='OVERDUE').count(),
-                }
+                'summary': summary
             })
         except Employee.DoesNotExist:
             return Response(
@@ -629,21 +601,8 @@ class TrainingAssignmentViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Add to completed materials
-            if material not in assignment.materials_completed.all():
-                assignment.materials_completed.add(material)
-                
-                # Update status to IN_PROGRESS if ASSIGNED
-                if assignment.status == 'ASSIGNED':
-                    assignment.status = 'IN_PROGRESS'
-                    assignment.started_date = timezone.now()
-                
-                # Calculate progress
-                assignment.calculate_progress()
-                
-                # Check if training is completed
-                assignment.check_completion()
-                
+            # Add to completed materials (counters, progress and status move with it)
+            if assignment.complete_material(material):
                 # Log activity
                 TrainingActivity.objects.create(
                     assignment=assignment,
@@ -681,18 +640,17 @@ class TrainingAssignmentViewSet(viewsets.ModelViewSet):
         try:
             today = timezone.now().date()
             
+            # One query on the (status, due_date) index; the status itself is
+            # moved to OVERDUE by the reconcile_training_progress task
             overdue_assignments = self.get_queryset().filter(
-                due_date__lt=today,
-                status__in=['ASSIGNED', 'IN_PROGRESS']
-            )
-            
-            # Update status to OVERDUE
-            overdue_assignments.update(status='OVERDUE')
+                Q(status='OVERDUE') |
+                Q(status__in=['ASSIGNED', 'IN_PROGRESS'], due_date__lt=today)
+            ).order_by('due_date')
             
             serializer = self.get_serializer(overdue_assignments, many=True)
             
             return Response({
-                'count': overdue_assignments.count(),
+                'count': len(serializer.data),
                 'assignments': serializer.data
             })
         except Exception as e:
@@ -1616,16 +1616,15 @@ def create_immediate_request(request):
             graph_token = get_graph_access_token(request.user)
             notification_sent = False
             
-            if graph_token:
-                if vac_req.status == 'PENDING_LINE_MANAGER':
-                    notification_sent = notification_manager.notify_request_created(vac_req, graph_token)
-                elif vac_req.status == 'PENDING_UK_ADDITIONAL':
-                    notification_sent = notification_manager.notify_uk_additional_approval_needed(
-                        vac_req, 
-                        graph_token
-                    )
-                elif vac_req.status == 'PENDING_HR':
-                    notification_sent = notification_manager.notify_hr_approval_needed(vac_req, graph_token)
+            if vac_req.status == 'PENDING_LINE_MANAGER':
+                notification_sent = notification_manager.notify_request_created(vac_req, graph_token)
+            elif vac_req.status == 'PENDING_UK_ADDITIONAL':
+                notification_sent = notification_manager.notify_uk_additional_approval_needed(
+                    vac_req, 
+                    graph_token
+                )
+            elif vac_req.status == 'PENDING_HR':
+                notification_sent = notification_manager.notify_hr_approval_needed(vac_req, graph_token)
             
             balance.refresh_from_db()
             
@@ -1726,12 +1725,11 @@ def edit_schedule(request, pk):
         # ✅ Send notification to HR
         graph_token = get_graph_access_token(request.user)
         notification_sent = False
-        if graph_token:
-            notification_sent = notification_manager.notify_schedule_edited(
-                schedule,
-                request.user,
-                graph_token
-            )
+        notification_sent = notification_manager.notify_schedule_edited(
+            schedule,
+            request.user,
+            graph_token
+        )
         
         return Response({
             'message': 'Schedule yeniləndi',
@@ -1804,11 +1802,10 @@ def approve_schedule(request, pk):
             # Send notification to HR
             graph_token = get_graph_access_token(request.user)
             notification_sent = False
-            if graph_token:
-                notification_sent = notification_manager.notify_schedule_approved_by_manager(
-                    schedule,
-                    graph_token
-                )
+            notification_sent = notification_manager.notify_schedule_approved_by_manager(
+                schedule,
+                graph_token
+            )
             
             return Response({
                 'message': 'Schedule təsdiq edildi',
@@ -1987,11 +1984,10 @@ def create_schedule(request):
                 # ✅ Send notification to HR
                 graph_token = get_graph_access_token(request.user)
                 notification_sent = False
-                if graph_token:
-                    notification_sent = notification_manager.notify_schedule_approved_by_manager(
-                        schedule, 
-                        graph_token
-                    )
+                notification_sent = notification_manager.notify_schedule_approved_by_manager(
+                    schedule, 
+                    graph_token
+                )
                 
                 message = 'Schedule yaradıldı və təsdiq edildi'
             
@@ -2011,15 +2007,12 @@ def create_schedule(request):
                 # ✅ Send notification to MANAGER
                 graph_token = get_graph_access_token(request.user)
                 notification_sent = False
-                if graph_token:
-                    logger.info(f"📧 Sending notification to manager: {employee.line_manager.full_name if employee.line_manager else 'N/A'}")
-                    notification_sent = notification_manager.notify_schedule_created(
-                        schedule,
-                        graph_token
-                    )
-                    logger.info(f"📧 Notification sent: {notification_sent}")
-                else:
-                    logger.warning(f"⚠️ No Graph token available for user {request.user.username}")
+                logger.info(f"📧 Sending notification to manager: {employee.line_manager.full_name if employee.line_manager else 'N/A'}")
+                notification_sent = notification_manager.notify_schedule_created(
+                    schedule,
+                    graph_token
+                )
+                logger.info(f"📧 Notification sent: {notification_sent}")
                 
                 message = 'Schedule yaradıldı və təsdiq gözləyir'
             
@@ -2138,8 +2131,7 @@ def register_schedule(request, pk):
         # Send notification
         graph_token = get_graph_access_token(request.user)
         notification_sent = False
-        if graph_token:
-            notification_sent = notification_manager.notify_schedule_registered(schedule, graph_token)
+        notification_sent = notification_manager.notify_schedule_registered(schedule, graph_token)
         
         # Refresh balance
         balance = EmployeeVacationBalance.objects.get(
@@ -2362,31 +2354,29 @@ def approve_reject_request(request, pk):
                 msg = f'Approved by UK Additional Approver - Now {vac_req.get_status_display()}'
                 
                 # ✅ Send notification based on NEW status
-                if graph_token:
-                    try:
-                        if vac_req.status == 'PENDING_HR':
-                            logger.info(f"📧 Sending HR notification...")
-                            notification_sent = notification_manager.notify_uk_additional_approved(
-                                vac_req, graph_token
-                            )
-                        elif vac_req.status == 'APPROVED':
-                            logger.info(f"📧 Sending final approval notification...")
-                            notification_sent = notification_manager.notify_hr_approved(
-                                vac_req, graph_token
-                            )
-                    except Exception as e:
-                        logger.error(f"❌ Notification error: {e}")
+                try:
+                    if vac_req.status == 'PENDING_HR':
+                        logger.info(f"📧 Sending HR notification...")
+                        notification_sent = notification_manager.notify_uk_additional_approved(
+                            vac_req, graph_token
+                        )
+                    elif vac_req.status == 'APPROVED':
+                        logger.info(f"📧 Sending final approval notification...")
+                        notification_sent = notification_manager.notify_hr_approved(
+                            vac_req, graph_token
+                        )
+                except Exception as e:
+                    logger.error(f"❌ Notification error: {e}")
             else:
                 vac_req.reject_by_uk_additional(request.user, data.get('reason', ''))
                 msg = 'Rejected by UK Additional Approver'
                 
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_request_rejected(
-                            vac_req, graph_token
-                        )
-                    except Exception as e:
-                        logger.error(f"Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_request_rejected(
+                        vac_req, graph_token
+                    )
+                except Exception as e:
+                    logger.error(f"Notification error: {e}")
         
         # ✅ LINE MANAGER APPROVAL/REJECTION
         if vac_req.status == 'PENDING_LINE_MANAGER':
@@ -2395,33 +2385,31 @@ def approve_reject_request(request, pk):
                 msg = 'Approved by Line Manager'
                 
                 # ✅ Send appropriate notification based on NEXT status
-                if graph_token:
-                    try:
-                        if vac_req.status == 'PENDING_UK_ADDITIONAL':
-                            notification_sent = notification_manager.notify_uk_additional_approval_needed(
-                                vac_req, graph_token
-                            )
-                        elif vac_req.status == 'PENDING_HR':
-                            notification_sent = notification_manager.notify_line_manager_approved(
-                                vac_req, graph_token
-                            )
-                        elif vac_req.status == 'APPROVED':
-                            notification_sent = notification_manager.notify_hr_approved(
-                                vac_req, graph_token
-                            )
-                    except Exception as e:
-                        logger.error(f"Notification error: {e}")
+                try:
+                    if vac_req.status == 'PENDING_UK_ADDITIONAL':
+                        notification_sent = notification_manager.notify_uk_additional_approval_needed(
+                            vac_req, graph_token
+                        )
+                    elif vac_req.status == 'PENDING_HR':
+                        notification_sent = notification_manager.notify_line_manager_approved(
+                            vac_req, graph_token
+                        )
+                    elif vac_req.status == 'APPROVED':
+                        notification_sent = notification_manager.notify_hr_approved(
+                            vac_req, graph_token
+                        )
+                except Exception as e:
+                    logger.error(f"Notification error: {e}")
             else:
                 vac_req.reject_by_line_manager(request.user, data.get('reason', ''))
                 msg = 'Rejected by Line Manager'
                 
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_request_rejected(
-                            vac_req, graph_token
-                        )
-                    except Exception as e:
-                        logger.error(f"Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_request_rejected(
+                        vac_req, graph_token
+                    )
+                except Exception as e:
+                    logger.error(f"Notification error: {e}")
         
         
         # ✅ HR APPROVAL/REJECTION
@@ -2430,24 +2418,22 @@ def approve_reject_request(request, pk):
                 vac_req.approve_by_hr(request.user, data.get('comment', ''))
                 msg = 'Approved by HR - Request is now APPROVED'
                 
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_hr_approved(
-                            vac_req, graph_token
-                        )
-                    except Exception as e:
-                        logger.error(f"Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_hr_approved(
+                        vac_req, graph_token
+                    )
+                except Exception as e:
+                    logger.error(f"Notification error: {e}")
             else:
                 vac_req.reject_by_hr(request.user, data.get('reason', ''))
                 msg = 'Rejected by HR'
                 
-                if graph_token:
-                    try:
-                        notification_sent = notification_manager.notify_request_rejected(
-                            vac_req, graph_token
-                        )
-                    except Exception as e:
-                        logger.error(f"Notification error: {e}")
+                try:
+                    notification_sent = notification_manager.notify_request_rejected(
+                        vac_req, graph_token
+                    )
+                except Exception as e:
+                    logger.error(f"Notification error: {e}")
         else:
             return Response({
                 'error': 'Request is not pending approval'
@@ -2695,7 +2681,7 @@ def bulk_create_schedules(request):
         graph_token = get_graph_access_token(request.user)
         notification_sent = False
         
-        if created_schedules and graph_token:
+        if created_schedules:
             if is_manager_creating:
                 # Manager/Admin created → notify HR (only once for bulk)
                 logger.info(f"📧 Sending bulk approval notification to HR for {len(created_schedules)} schedules")
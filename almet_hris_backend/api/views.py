@@ -50,6 +50,7 @@ from .serializers import (
 )
 
 from .asset_permissions import get_asset_access_level
+from .employee_side_effects import EmployeeSideEffects
 from .auth import MicrosoftTokenValidator
 from drf_yasg.inspectors import SwaggerAutoSchema
 logger = logging.getLogger(__name__)
@@ -3246,7 +3247,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             set_hidden_count = 0
             results = []
             
-            with transaction.atomic():
+            with transaction.atomic(), EmployeeSideEffects.batch():
                 for employee in employees:
                     old_visibility = employee.is_visible_in_org_chart
                     
@@ -3380,11 +3381,9 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            # Get assets
-            from .asset_models import Asset
-            assets = Asset.objects.filter(assigned_to=employee).select_related(
-                'batch', 'category', 'batch__category'
-            ).prefetch_related('assignments').order_by('-updated_at')
+            # Get assets (fixed number of queries, see api.asset_holdings)
+            from .asset_holdings import AssetHoldings
+            assets = AssetHoldings.for_employee(employee)
             
             # Categorize by status
             asset_data = []
@@ -3392,7 +3391,8 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             
             for asset in assets:
                 # Get current assignment
-                current_assignment = asset.assignments.filter(check_in_date__isnull=True).first()
+                current_assignment = AssetHoldings.current_assignment(asset)
+                pending_transfer = AssetHoldings.pending_transfer(asset)
                 
                 asset_info = {
                     'id': str(asset.id),
@@ -3428,7 +3428,15 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                     } if current_assignment else None,
                     
                     # ✅ Clarification info
-                    'clarification': self._get_asset_clarification_detail(asset)
+                    'clarification': AssetHoldings.clarification_detail(asset),
+                    
+                    # Pending transfer (offboarding)
+                    'pending_transfer': {
+                        'id': pending_transfer.id,
+                        'to_employee': pending_transfer.to_employee.full_name,
+                        'requested_at': pending_transfer.requested_at.isoformat(),
+                        'employee_approved': pending_transfer.employee_approved
+                    } if pending_transfer else None
                 }
                 
                 asset_data.append(asset_info)
@@ -3453,30 +3461,9 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                         'requested_reason': asset.clarification_requested_reason
                     })
             
-            # Summary by status
-            summary = {
-                'total_assets': assets.count(),
-                'by_status': {},
-                'by_category': {},
-                'pending_actions_count': len(pending_actions)
-            }
-            
-            # Count by status
-            for status_choice in Asset.STATUS_CHOICES:
-                status_code = status_choice[0]
-                count = assets.filter(status=status_code).count()
-                if count > 0:
-                    summary['by_status'][status_code] = {
-                        'label': status_choice[1],
-                        'count': count
-                    }
-            
-            # Count by category
-            from django.db.models import Count
-            category_counts = assets.values('category__name').annotate(count=Count('id'))
-            for cat in category_counts:
-                if cat['category__name']:
-                    summary['by_category'][cat['category__name']] = cat['count']
+            # Summary by status / category
+            summary = AssetHoldings.summary(assets)
+            summary['pending_actions_count'] = len(pending_actions)
             
             return Response({
                 'employee': {
@@ -3504,34 +3491,6 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _get_asset_clarification_detail(self, asset):
-        """Get detailed clarification information"""
-        if asset.status == 'NEED_CLARIFICATION' or (
-            hasattr(asset, 'clarification_requested_reason') and asset.clarification_requested_reason
-        ):
-            return {
-                'has_clarification': True,
-                'requested': {
-                    'reason': asset.clarification_requested_reason,
-                    'requested_at': asset.clarification_requested_at.isoformat() if asset.clarification_requested_at else None,
-                    'requested_by': (
-                        asset.clarification_requested_by.get_full_name() 
-                        if asset.clarification_requested_by else None
-                    )
-                },
-                'response': {
-                    'text': asset.clarification_response,
-                    'provided_at': asset.clarification_provided_at.isoformat() if asset.clarification_provided_at else None,
-                    'provided_by': (
-                        asset.clarification_provided_by.get_full_name() 
-                        if asset.clarification_provided_by else None
-                    )
-                } if asset.clarification_response else None,
-                'status': 'pending' if not asset.clarification_response else 'resolved',
-                'is_pending': not bool(asset.clarification_response)
-            }
-        return None
-    
     @swagger_auto_schema(
         method='post',
         operation_description="Accept assigned asset (Employee approval)",
@@ -6354,7 +6313,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             updated_count = 0
             results = []
             
-            with transaction.atomic():
+            with transaction.atomic(), EmployeeSideEffects.batch():
                 for employee in employees:
                     old_manager_name = employee.line_manager.full_name if employee.line_manager else 'None'
                     employee.change_line_manager(line_manager, request.user)
@@ -6477,7 +6436,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             failed_count = 0
             results = []
             
-            with transaction.atomic():
+            with transaction.atomic(), EmployeeSideEffects.batch():
                 for employee in employees:
                     try:
                         old_contract_type = employee.contract_duration
@@ -6859,7 +6818,9 @@ class BulkEmployeeUploadViewSet(viewsets.ViewSet):
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
-            result = employee_viewset._process_bulk_employee_data_from_excel(df, request.user)
+            # Side effects of all created employees run once, together, at the end
+            with EmployeeSideEffects.batch():
+                result = employee_viewset._process_bulk_employee_data_from_excel(df, request.user)
             
          
             
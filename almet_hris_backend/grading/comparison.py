@@ -0,0 +1,310 @@
+# grading/comparison.py - Vectorized scenario comparison engine
+
+from collections import OrderedDict
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GRADE_LEVELS = ['LD', 'LQ', 'M', 'UQ', 'UD']
+
+# Index used for employees whose grading level cannot be normalized.
+# Every salary matrix carries an extra zero column at this index so lookups
+# never need masking.
+INVALID_LEVEL = len(GRADE_LEVELS)
+
+LEVEL_MAPPINGS = {
+    'LD': ['LD', 'LOWERDECILE', 'LOWER_DECILE', 'L_D', 'LOWER-DECILE'],
+    'LQ': ['LQ', 'LOWERQUARTILE', 'LOWER_QUARTILE', 'L_Q', 'LOWER-QUARTILE'],
+    'M': ['M', 'MEDIAN', 'MED'],
+    'UQ': ['UQ', 'UPPERQUARTILE', 'UPPER_QUARTILE', 'U_Q', 'UPPER-QUARTILE'],
+    'UD': ['UD', 'UPPERDECILE', 'UPPER_DECILE', 'U_D', 'UPPER-DECILE']
+}
+
+# 2% tolerance used for over/at/under classification
+TOLERANCE = 0.02
+
+
+def normalize_grade_level(grade_level):
+    """
+    Normalize grade level - convert all variations to standard format
+    Examples:
+      - MGR_M, MGR_m, MGR_Median -> M
+      - MGR_UQ, MGR_uq, MGR_UpperQuartile -> UQ
+      - DIRECTOR_LD -> LD
+    """
+    if not grade_level:
+        return None
+
+    grade_upper = grade_level.upper()
+
+    # Split by underscore to get level part
+    parts = grade_upper.split('_')
+
+    if len(parts) >= 2:
+        level_part = parts[-1]  # Last part is the level
+
+        for standard_level, variations in LEVEL_MAPPINGS.items():
+            if level_part in variations or any(v in level_part for v in variations):
+                return standard_level
+
+    # If no underscore, check if entire string matches
+    for standard_level, variations in LEVEL_MAPPINGS.items():
+        if grade_upper in variations:
+            return standard_level
+
+    logger.warning(f"⚠️ Could not normalize grade level: {grade_level}")
+    return None
+
+
+def positions_match(emp_position, scenario_position):
+    """Check if employee position matches scenario position"""
+    if not emp_position or not scenario_position:
+        return False
+
+    emp_pos_upper = emp_position.upper().replace(' ', '_').replace('-', '_')
+    scen_pos_upper = scenario_position.upper().replace(' ', '_').replace('-', '_')
+
+    # Direct or partial match
+    return (
+        emp_pos_upper == scen_pos_upper or
+        emp_pos_upper in scen_pos_upper or
+        scen_pos_upper in emp_pos_upper
+    )
+
+
+class ScenarioComparisonEngine:
+    """
+    Compare employees against the current scenario and any number of draft
+    scenarios using array operations.
+
+    Every scenario is turned into a (position x grade level) salary matrix
+    once, and every employee is mapped to a (position index, level index)
+    pair once. Salaries for all employees in a scenario are then a single
+    fancy-index lookup, and per-position totals/distributions are bincounts.
+    """
+
+    def __init__(self, current_scenario, scenarios, employees):
+        self.current_scenario = current_scenario
+        self.scenarios = list(scenarios)
+        self.employees = employees
+
+        self._index_employees()
+
+        self.current_matrix = self._build_matrix(current_scenario)
+        self.scenario_matrices = [self._build_matrix(s) for s in self.scenarios]
+
+        self.current_salaries = self._lookup(self.current_matrix)
+        self.scenario_salaries = [self._lookup(m) for m in self.scenario_matrices]
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def _index_employees(self):
+        """Map every employee to position/level indices (one pass)"""
+        position_index = OrderedDict()
+        level_cache = {}
+
+        pos_idx = np.empty(len(self.employees), dtype=np.intp)
+        level_idx = np.empty(len(self.employees), dtype=np.intp)
+
+        for i, emp in enumerate(self.employees):
+            position = emp.get('position_group__name')
+            if position not in position_index:
+                position_index[position] = len(position_index)
+            pos_idx[i] = position_index[position]
+
+            grading_level = emp.get('grading_level')
+            if grading_level not in level_cache:
+                normalized = normalize_grade_level(grading_level)
+                level_cache[grading_level] = (
+                    GRADE_LEVELS.index(normalized) if normalized else INVALID_LEVEL
+                )
+            level_idx[i] = level_cache[grading_level]
+
+        self.positions = list(position_index.keys())
+        self.pos_idx = pos_idx
+        self.level_idx = level_idx
+        self.valid_level = level_idx != INVALID_LEVEL
+
+    def _build_matrix(self, scenario):
+        """Build the (positions x grade levels + 1) salary matrix of a scenario"""
+        matrix = np.zeros((len(self.positions), INVALID_LEVEL + 1), dtype=float)
+        calculated_grades = scenario.calculated_grades or {}
+
+        for row, position in enumerate(self.positions):
+            for pos_name, grades in calculated_grades.items():
+                if positions_match(position, pos_name) and isinstance(grades, dict):
+                    for col, level in enumerate(GRADE_LEVELS):
+                        value = grades.get(level, 0)
+                        try:
+                            matrix[row, col] = float(value) if value else 0
+                        except (ValueError, TypeError):
+                            matrix[row, col] = 0
+                    break
+
+        return matrix
+
+    def _lookup(self, matrix):
+        """Salary of every employee according to a scenario matrix"""
+        if not len(self.employees):
+            return np.zeros(0, dtype=float)
+        return matrix[self.pos_idx, self.level_idx]
+
+    def _per_position_sum(self, values):
+        return np.bincount(self.pos_idx, weights=values, minlength=len(self.positions))
+
+    def _grade_distribution(self, grade_salaries):
+        """
+        Count employees per (position, level) and classify the current salary
+        as over/at/under the given grade salaries.
+        """
+        size = len(self.positions) * (INVALID_LEVEL + 1)
+        cell = self.pos_idx * (INVALID_LEVEL + 1) + self.level_idx
+
+        has_grade = self.valid_level & (grade_salaries != 0)
+        over = has_grade & (self.current_salaries > grade_salaries * (1 + TOLERANCE))
+        under = has_grade & (self.current_salaries < grade_salaries * (1 - TOLERANCE))
+        at = has_grade & ~over & ~under
+
+        shape = (len(self.positions), INVALID_LEVEL + 1)
+        return {
+            'count': np.bincount(cell, weights=self.valid_level, minlength=size).reshape(shape),
+            'over': np.bincount(cell, weights=over, minlength=size).reshape(shape),
+            'at': np.bincount(cell, weights=at, minlength=size).reshape(shape),
+            'under': np.bincount(cell, weights=under, minlength=size).reshape(shape),
+        }
+
+    @staticmethod
+    def _distribution_for_position(distribution, row):
+        result = {}
+        for col, level in enumerate(GRADE_LEVELS):
+            count = int(distribution['count'][row, col])
+            if not count:
+                continue
+            result[level] = {
+                'count': count,
+                'over': int(distribution['over'][row, col]),
+                'at': int(distribution['at'][row, col]),
+                'under': int(distribution['under'][row, col])
+            }
+        return result
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    def total_cost_comparison(self):
+        """
+        Figure 1: Total Cost Comparison Table
+        Total salary cost per position for current vs scenarios
+        """
+        current_costs = self._per_position_sum(self.current_salaries)
+
+        # Scenarios are keyed by name; same-named scenarios accumulate
+        scenario_costs = OrderedDict()
+        for scenario, salaries in zip(self.scenarios, self.scenario_salaries):
+            costs = self._per_position_sum(salaries)
+            if scenario.name in scenario_costs:
+                scenario_costs[scenario.name] = scenario_costs[scenario.name] + costs
+            else:
+                scenario_costs[scenario.name] = costs
+
+        result = {
+            'positions': {},
+            'totals': {
+                'current': round(float(current_costs.sum())),
+                'scenarios': {
+                    name: round(float(costs.sum()))
+                    for name, costs in scenario_costs.items()
+                }
+            }
+        }
+
+        for row, position in enumerate(self.positions):
+            result['positions'][position] = {
+                'current': round(float(current_costs[row])),
+                'scenarios': {
+                    name: round(float(costs[row]))
+                    for name, costs in scenario_costs.items()
+                }
+            }
+
+        for name, value in result['totals']['scenarios'].items():
+            logger.info(f"💰 Total Cost - {name}: {value}")
+
+        return result
+
+    def employee_analysis(self):
+        """
+        Figure 2: Employee Analysis - Headcount by Grade
+        Shows distribution: how many employees are over/under/at their grade
+        """
+        headcount = np.bincount(self.pos_idx, minlength=len(self.positions))
+
+        current_distribution = self._grade_distribution(self.current_salaries)
+        scenario_distributions = [
+            (scenario.name, self._grade_distribution(salaries))
+            for scenario, salaries in zip(self.scenarios, self.scenario_salaries)
+        ]
+
+        analysis = {}
+        for row, position in enumerate(self.positions):
+            analysis[position] = {
+                'total_employees': int(headcount[row]),
+                'current_grading': self._distribution_for_position(current_distribution, row),
+                'scenarios': {
+                    name: self._distribution_for_position(distribution, row)
+                    for name, distribution in scenario_distributions
+                }
+            }
+
+        return analysis
+
+    def underpaid_overpaid_lists(self):
+        """
+        Underpaid and Overpaid employee lists
+        Compares employee's current salary vs what scenario says it should be
+        """
+        result = {}
+        current = self.current_salaries
+
+        for scenario, scenario_salary in zip(self.scenarios, self.scenario_salaries):
+            comparable = self.valid_level & (current != 0) & (scenario_salary != 0)
+            underpaid_mask = comparable & (scenario_salary > current * (1 + TOLERANCE))
+            overpaid_mask = comparable & (scenario_salary < current * (1 - TOLERANCE))
+
+            underpaid = [self._employee_info(i, scenario_salary) for i in np.flatnonzero(underpaid_mask)]
+            overpaid = [self._employee_info(i, scenario_salary) for i in np.flatnonzero(overpaid_mask)]
+
+            # Sort by absolute difference
+            underpaid.sort(key=lambda x: x['difference'], reverse=True)
+            overpaid.sort(key=lambda x: abs(x['difference']), reverse=True)
+
+            result[scenario.name] = {
+                'underpaid': underpaid,
+                'overpaid': overpaid
+            }
+
+        return result
+
+    def _employee_info(self, i, scenario_salaries):
+        emp = self.employees[i]
+        current_salary = float(self.current_salaries[i])
+        scenario_salary = float(scenario_salaries[i])
+        difference = scenario_salary - current_salary
+
+        return {
+            'employee_id': emp['employee_id'],
+            'employee_name': emp['full_name'],
+            'position': emp['position_group__name'],
+            'department': emp['department__name'] or 'N/A',
+            'start_date': str(emp['start_date']) if emp['start_date'] else 'N/A',
+            'current_salary': round(current_salary),
+            'scenario_salary': round(scenario_salary),
+            'difference': round(difference),
+            'difference_percent': round(difference / current_salary * 100, 1),
+            'grading_level': GRADE_LEVELS[self.level_idx[i]]
+        }
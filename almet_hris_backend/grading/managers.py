@@ -2,8 +2,11 @@
 from django.db import models
 from django.utils import timezone
 from decimal import Decimal
+from itertools import product
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 class SalaryCalculationManager:
@@ -23,8 +26,11 @@ class SalaryCalculationManager:
             return PositionGroup.objects.none()
     
     @staticmethod
-    def create_current_structure_from_db():
-        """FIXED: Create current structure data with proper input values for comparison"""
+    def create_current_structure_from_db(current_scenario=None):
+        """FIXED: Create current structure data with proper input values for comparison
+        
+        Uncached builder; read paths should go through CurrentStructureCache.
+        """
         from .models import SalaryGrade, SalaryScenario
         from api.models import PositionGroup
         
@@ -39,7 +45,8 @@ class SalaryCalculationManager:
         
         # Try to get current scenario first for input data
         try:
-            current_scenario = SalaryScenario.objects.get(status='CURRENT')
+            if current_scenario is None:
+                current_scenario = SalaryScenario.objects.get(status='CURRENT')
           
             
             # Build grade order from database position groups
@@ -425,6 +432,8 @@ class SalaryCalculationManager:
                 )
                 salary_grades_created += 1
         
+        from .structure_cache import CurrentStructureCache
+        CurrentStructureCache.invalidate()
        
         return scenario
     
@@ -436,6 +445,239 @@ class SalaryCalculationManager:
         deviation = abs(vertical_avg - horizontal_avg)
         return (vertical_avg + horizontal_avg) / (1 + deviation) if (vertical_avg + horizontal_avg) > 0 else 0
     
+    @staticmethod
+    def expand_sweep_values(value):
+        """Expand one sweep axis: scalar, list of values or {'start', 'stop', 'step'} range"""
+        if value is None or value == '':
+            return [0.0]
+        
+        if isinstance(value, dict):
+            start = float(value.get('start', 0))
+            stop = float(value.get('stop', start))
+            step = float(value.get('step') or 0)
+            if step <= 0:
+                raise ValueError("Sweep range step must be greater than 0")
+            if stop < start:
+                raise ValueError("Sweep range stop must not be less than start")
+            return [round(float(v), 6) for v in np.arange(start, stop + step / 2, step)]
+        
+        if isinstance(value, (list, tuple)):
+            if not value:
+                raise ValueError("Sweep value lists cannot be empty")
+            return [float(v) if v not in ('', None) else 0.0 for v in value]
+        
+        return [float(value)]
+    
+    @staticmethod
+    def get_grade_headcount(position_groups):
+        """Active headcount as a (position x grade level) matrix in position_groups order"""
+        from api.models import Employee
+        from django.db.models import Count
+        from .comparison import GRADE_LEVELS, normalize_grade_level
+        
+        positions_list = list(position_groups)
+        row_by_id = {pos.id: row for row, pos in enumerate(positions_list)}
+        headcount = np.zeros((len(positions_list), len(GRADE_LEVELS)), dtype=float)
+        
+        rows = Employee.objects.filter(
+            is_deleted=False,
+            status__affects_headcount=True,
+            position_group__in=positions_list
+        ).values('position_group_id', 'grading_level').annotate(count=Count('id'))
+        
+        for row in rows:
+            level = normalize_grade_level(row['grading_level'])
+            if level and row['position_group_id'] in row_by_id:
+                headcount[row_by_id[row['position_group_id']], GRADE_LEVELS.index(level)] += row['count']
+        
+        return headcount
+    
+    @staticmethod
+    def sweep_scenarios(base_values, input_rates, global_horizontal_intervals=None,
+                        position_groups=None, current_data=None, max_points=10000,
+                        include_grades=False):
+        """
+        Evaluate every combination of base value and per-position rates in one
+        vectorized batch.
+        
+        Each input may be a scalar, a list of values or a {'start', 'stop', 'step'}
+        range. Per-position horizontal intervals override the global ones. Grades
+        follow calculate_scenario_grades exactly (the vertical chain uses the
+        rounded LD of the position below).
+        """
+        from .comparison import GRADE_LEVELS
+        
+        if position_groups is None:
+            position_groups = SalaryCalculationManager.get_position_groups_from_db()
+        
+        positions_list = list(position_groups)
+        if not positions_list:
+            raise ValueError("No positions to calculate")
+        
+        names = [pos.get_name_display() for pos in positions_list]
+        base_index = len(positions_list) - 1
+        interval_names = ['LD_to_LQ', 'LQ_to_M', 'M_to_UQ', 'UQ_to_UD']
+        input_rates = input_rates or {}
+        global_horizontal_intervals = global_horizontal_intervals or {}
+        
+        # Register axes; shared global intervals map to a single axis each
+        axes = []
+        
+        def add_axis(key, raw_value):
+            values = SalaryCalculationManager.expand_sweep_values(raw_value)
+            for value in values:
+                if key != 'baseValue1' and (value < 0 or value > 100):
+                    raise ValueError(f"{key} values must be between 0-100")
+            axes.append((key, values))
+            return len(axes) - 1
+        
+        base_axis = add_axis('baseValue1', base_values)
+        if any(v <= 0 for v in axes[base_axis][1]):
+            raise ValueError("Base value must be greater than 0")
+        
+        global_axes = {}
+        vertical_axes = {}
+        horizontal_axes = {}
+        for i, name in enumerate(names):
+            position_inputs = input_rates.get(name, {}) or {}
+            if i != base_index:
+                vertical_axes[i] = add_axis(f'{name}.vertical', position_inputs.get('vertical'))
+            
+            position_intervals = position_inputs.get('horizontal_intervals') or {}
+            for j, interval_name in enumerate(interval_names):
+                if position_intervals.get(interval_name) not in (None, ''):
+                    horizontal_axes[(i, j)] = add_axis(
+                        f'{name}.horizontal_intervals.{interval_name}',
+                        position_intervals[interval_name]
+                    )
+                else:
+                    if interval_name not in global_axes:
+                        global_axes[interval_name] = add_axis(
+                            f'globalHorizontalIntervals.{interval_name}',
+                            global_horizontal_intervals.get(interval_name)
+                        )
+                    horizontal_axes[(i, j)] = global_axes[interval_name]
+        
+        total_points = 1
+        for _, values in axes:
+            total_points *= len(values)
+        if total_points > max_points:
+            raise ValueError(f"Sweep has {total_points} points; the maximum is {max_points}")
+        
+        # (points x axes) grid of every combination
+        grid = np.array(list(product(*[values for _, values in axes])), dtype=float).reshape(total_points, len(axes))
+        
+        position_count = len(positions_list)
+        vertical = np.zeros((total_points, position_count))
+        for i, axis in vertical_axes.items():
+            vertical[:, i] = grid[:, axis]
+        horizontal = np.zeros((total_points, position_count, len(interval_names)))
+        for (i, j), axis in horizontal_axes.items():
+            horizontal[:, i, j] = grid[:, axis]
+        
+        # Grades from the base position upwards
+        grades = np.zeros((total_points, position_count, len(GRADE_LEVELS)))
+        for i in range(base_index, -1, -1):
+            if i == base_index:
+                ld = grid[:, base_axis]
+            else:
+                ld = grades[:, i + 1, 0] * (1 + vertical[:, i] / 100)
+            lq = ld * (1 + horizontal[:, i, 0] / 100)
+            m = lq * (1 + horizontal[:, i, 1] / 100)
+            uq = m * (1 + horizontal[:, i, 2] / 100)
+            ud = uq * (1 + horizontal[:, i, 3] / 100)
+            grades[:, i, :] = np.round(np.stack([ld, lq, m, uq, ud], axis=1))
+        
+        # Averages and balance score (same rules as SalaryScenario.calculate_averages)
+        vertical_mask = np.zeros(position_count, dtype=bool)
+        vertical_mask[list(vertical_axes.keys())] = True
+        vertical_nonzero = (vertical != 0) & vertical_mask
+        vertical_count = vertical_nonzero.sum(axis=1)
+        vertical_avg = np.divide(
+            (vertical * vertical_nonzero).sum(axis=1), vertical_count * 100,
+            out=np.zeros(total_points), where=vertical_count > 0
+        )
+        
+        has_intervals = (horizontal != 0).any(axis=2)
+        first_with_intervals = has_intervals.argmax(axis=1)
+        global_intervals = horizontal[np.arange(total_points), first_with_intervals]
+        horizontal_nonzero = global_intervals != 0
+        horizontal_count = horizontal_nonzero.sum(axis=1)
+        horizontal_avg = np.divide(
+            (global_intervals * horizontal_nonzero).sum(axis=1), horizontal_count * 100,
+            out=np.zeros(total_points), where=horizontal_count > 0
+        )
+        
+        avg_sum = vertical_avg + horizontal_avg
+        balance_score = np.divide(
+            avg_sum, 1 + np.abs(vertical_avg - horizontal_avg),
+            out=np.zeros(total_points), where=avg_sum > 0
+        )
+        
+        # Cost of the active headcount at each point
+        headcount = SalaryCalculationManager.get_grade_headcount(positions_list)
+        total_cost = (grades * headcount).sum(axis=(1, 2))
+        
+        # Metrics against the current structure medians
+        if current_data is None:
+            from .structure_cache import CurrentStructureCache
+            current_data = CurrentStructureCache.get_current_structure() or {}
+        current_grades = current_data.get('grades', {}) or {}
+        current_medians = np.array([
+            float((current_grades.get(name) or {}).get('M', 0) or 0) for name in names
+        ])
+        median_index = GRADE_LEVELS.index('M')
+        scenario_medians = grades[:, :, median_index]
+        comparable = (current_medians > 0) & (scenario_medians > 0)
+        increases = np.divide(
+            scenario_medians - current_medians, current_medians,
+            out=np.zeros_like(scenario_medians), where=comparable
+        ) * 100
+        comparable_count = comparable.sum(axis=1)
+        avg_increase = np.divide(
+            (increases * comparable).sum(axis=1), comparable_count,
+            out=np.zeros(total_points), where=comparable_count > 0
+        )
+        max_increase = np.where(
+            comparable_count > 0,
+            np.where(comparable, increases, -np.inf).max(axis=1),
+            0
+        )
+        budget_impact = scenario_medians.sum(axis=1)
+        
+        varying_axes = [(index, key) for index, (key, values) in enumerate(axes) if len(values) > 1]
+        points = []
+        for p in range(total_points):
+            point = {
+                'index': p,
+                'baseValue1': float(grid[p, base_axis]),
+                'inputs': {key: float(grid[p, index]) for index, key in varying_axes},
+                'totalCost': float(total_cost[p]),
+                'verticalAvg': float(vertical_avg[p]),
+                'horizontalAvg': float(horizontal_avg[p]),
+                'balanceScore': float(balance_score[p]),
+                'metrics': {
+                    'totalBudgetImpact': float(budget_impact[p]),
+                    'avgSalaryIncrease': float(avg_increase[p]),
+                    'maxSalaryIncrease': float(max_increase[p]),
+                    'positionsAffected': int(comparable_count[p])
+                }
+            }
+            if include_grades:
+                point['calculatedOutputs'] = {
+                    name: {level: int(grades[p, i, k]) for k, level in enumerate(GRADE_LEVELS)}
+                    for i, name in enumerate(names)
+                }
+            points.append(point)
+        
+        return {
+            'gradeOrder': names,
+            'axes': [{'key': key, 'values': values} for key, values in axes if len(values) > 1],
+            'count': total_points,
+            'headcount': int(headcount.sum()),
+            'points': points
+        }
+    
     @staticmethod
     def validate_scenario_inputs(base_value, input_rates):
         """Validate scenario inputs with proper type checking"""
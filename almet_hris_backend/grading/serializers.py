@@ -2,6 +2,7 @@
 
 from rest_framework import serializers
 from .models import GradingSystem, SalaryGrade, SalaryScenario, ScenarioHistory
+from .structure_cache import CurrentStructureCache
 from api.models import PositionGroup
 import logging
 
@@ -56,11 +57,13 @@ class GradingSystemSerializer(serializers.ModelSerializer):
         return obj.scenarios.count()
     
     def get_current_scenario(self, obj):
-        try:
-            current = obj.scenarios.get(status='CURRENT')
-            return {'id': str(current.id), 'name': current.name}
-        except SalaryScenario.DoesNotExist:
+        # One cache lookup per serializer (shared by every row of a list)
+        if not hasattr(self, '_current_scenario'):
+            self._current_scenario = CurrentStructureCache.get_current_scenario()
+        current = self._current_scenario
+        if current is None or current.grading_system_id != obj.id:
             return None
+        return {'id': str(current.id), 'name': current.name}
 
 class SalaryGradeSerializer(serializers.ModelSerializer):
     position_group_name = serializers.CharField(source='position_group.get_name_display', read_only=True)
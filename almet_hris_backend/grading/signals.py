@@ -0,0 +1,13 @@
+# grading/signals.py - Keep the cached current structure in sync
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from api.models import PositionGroup
+from .structure_cache import CurrentStructureCache
+
+
+@receiver([post_save, post_delete], sender=PositionGroup)
+def invalidate_structure_on_position_group_change(sender, instance, **kwargs):
+    """Grade order and names come from position groups"""
+    CurrentStructureCache.invalidate()
@@ -0,0 +1,96 @@
+# grading/structure_cache.py - Cached, versioned current salary structure
+
+from django.core.cache import cache
+from django.db import transaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CurrentStructureCache:
+    """
+    Cache of the CURRENT SalaryScenario and the grade structure derived from it.
+
+    Entries are keyed by the scenario ID and its ``updated_at``, so any save of
+    the current scenario produces a new key. A generation counter is bumped on
+    explicit invalidation (apply/archive, position group changes) to drop
+    entries whose key would otherwise stay the same.
+    """
+
+    CACHE_PREFIX = 'grading:current_structure'
+    GENERATION_KEY = 'grading:current_structure:generation'
+    CACHE_TIMEOUT = 60 * 60 * 24
+
+    @classmethod
+    def _generation(cls):
+        generation = cache.get(cls.GENERATION_KEY)
+        if generation is None:
+            generation = 0
+            cache.set(cls.GENERATION_KEY, generation, None)
+        return generation
+
+    @staticmethod
+    def get_version():
+        """Return (scenario_id, updated_at) of the current scenario, or None"""
+        from .models import SalaryScenario
+
+        return SalaryScenario.objects.filter(
+            status='CURRENT'
+        ).values_list('id', 'updated_at').first()
+
+    @classmethod
+    def _cache_key(cls, version):
+        if version is None:
+            return f"{cls.CACHE_PREFIX}:{cls._generation()}:none"
+        scenario_id, updated_at = version
+        return f"{cls.CACHE_PREFIX}:{cls._generation()}:{scenario_id}:{updated_at.timestamp()}"
+
+    @classmethod
+    def get_entry(cls):
+        """Return {'scenario': SalaryScenario|None, 'structure': dict|None}"""
+        from .models import SalaryScenario
+        from .managers import SalaryCalculationManager
+
+        version = cls.get_version()
+        key = cls._cache_key(version)
+
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+
+        current_scenario = None
+        if version is not None:
+            current_scenario = SalaryScenario.objects.select_related(
+                'grading_system', 'created_by', 'applied_by'
+            ).filter(pk=version[0]).first()
+
+        entry = {
+            'scenario': current_scenario,
+            'structure': SalaryCalculationManager.create_current_structure_from_db(
+                current_scenario=current_scenario
+            )
+        }
+        cache.set(key, entry, cls.CACHE_TIMEOUT)
+        return entry
+
+    @classmethod
+    def get_current_scenario(cls):
+        """The CURRENT SalaryScenario, or None"""
+        return cls.get_entry()['scenario']
+
+    @classmethod
+    def get_current_structure(cls):
+        """Current grade structure as built by create_current_structure_from_db"""
+        return cls.get_entry()['structure']
+
+    @classmethod
+    def invalidate(cls):
+        """Drop all cached structures (runs after the surrounding transaction commits)"""
+        def _bump():
+            try:
+                cache.incr(cls.GENERATION_KEY)
+            except ValueError:
+                cache.set(cls.GENERATION_KEY, 1, None)
+            logger.info("Current salary structure cache invalidated")
+
+        transaction.on_commit(_bump)
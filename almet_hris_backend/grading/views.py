@@ -21,6 +21,8 @@ from .serializers import (
  
 )
 from .managers import SalaryCalculationManager
+from .comparison import ScenarioComparisonEngine
+from .structure_cache import CurrentStructureCache
 from api.views import ModernPagination
 from api.models import PositionGroup
 
@@ -41,8 +43,8 @@ class GradingSystemViewSet(viewsets.ModelViewSet):
     def current_structure(self, request):
         """Get current grade structure from database - SIMPLIFIED"""
         try:
-            # Create current structure from database
-            current_data = SalaryCalculationManager.create_current_structure_from_db()
+            # Current structure (cached per current scenario version)
+            current_data = CurrentStructureCache.get_current_structure()
             
             if current_data is None:
                 return Response({
@@ -196,6 +198,56 @@ class SalaryScenarioViewSet(viewsets.ModelViewSet):
                 'success': False
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'], url_path='sweep')
+    def sweep(self, request):
+        """What-if sweep: evaluate grids of base value and rates in one batch"""
+        try:
+            base_values = request.data.get('baseValue1')
+            input_rates = request.data.get('grades', {})
+            global_horizontal_intervals = request.data.get('globalHorizontalIntervals', {})
+            include_grades = str(request.data.get('includeGrades', False)).lower() in ('1', 'true', 'yes')
+            
+            if base_values in (None, '', []):
+                return Response({
+                    'errors': ['Base value is required'],
+                    'success': False
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            position_groups = SalaryCalculationManager.get_position_groups_from_db()
+            
+            if not position_groups.exists():
+                return Response({
+                    'errors': ['No position groups found in database'],
+                    'success': False
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            max_points = getattr(settings, 'GRADING_SYSTEM_SETTINGS', {}).get('MAX_SWEEP_POINTS', 10000)
+            
+            try:
+                result = SalaryCalculationManager.sweep_scenarios(
+                    base_values, input_rates, global_horizontal_intervals,
+                    position_groups=position_groups,
+                    max_points=max_points,
+                    include_grades=include_grades
+                )
+            except (ValueError, TypeError) as e:
+                return Response({
+                    'errors': [str(e)],
+                    'success': False
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            return Response({
+                'success': True,
+                **result
+            })
+            
+        except Exception as e:
+            logger.error(f"Sweep error: {str(e)}")
+            return Response({
+                'errors': [f'Sweep error: {str(e)}'],
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     @action(detail=False, methods=['post'], url_path='save_draft')
     def save_draft(self, request):
         """SIMPLIFIED: Save scenario with clean data handling"""
@@ -375,6 +427,8 @@ class SalaryScenarioViewSet(viewsets.ModelViewSet):
                     performed_by=request.user,
                     changes_made={'archived_by': request.user.get_full_name()}
                 )
+                
+                CurrentStructureCache.invalidate()
             
             return Response({
                 'success': True,
@@ -397,7 +451,6 @@ class SalaryScenarioViewSet(viewsets.ModelViewSet):
         """
         try:
             from api.models import Employee
-            from collections import defaultdict
             
             scenario_ids = request.data.get('scenario_ids', [])
             
@@ -415,9 +468,8 @@ class SalaryScenarioViewSet(viewsets.ModelViewSet):
             scenarios = list(SalaryScenario.objects.filter(id__in=scenario_uuids))
             
             # Get CURRENT scenario
-            try:
-                current_scenario = SalaryScenario.objects.get(status='CURRENT')
-            except SalaryScenario.DoesNotExist:
+            current_scenario = CurrentStructureCache.get_current_scenario()
+            if current_scenario is None:
                 return Response({
                     'success': False,
                     'error': 'No current scenario found. Please apply a scenario first.'
@@ -439,17 +491,14 @@ class SalaryScenarioViewSet(viewsets.ModelViewSet):
             
          
             
+            # Build salary matrices once, then compare with array operations
+            engine = ScenarioComparisonEngine(current_scenario, scenarios, employees)
+            
             # Build comparison result
             comparison_result = {
-                'total_cost_comparison': self._build_total_cost_comparison(
-                    current_scenario, scenarios, employees
-                ),
-                'employee_analysis': self._build_employee_analysis(
-                    current_scenario, scenarios, employees
-                ),
-                'underpaid_overpaid_lists': self._build_underpaid_overpaid_lists(
-                    current_scenario, scenarios, employees
-                ),
+                'total_cost_comparison': engine.total_cost_comparison(),
+                'employee_analysis': engine.employee_analysis(),
+                'underpaid_overpaid_lists': engine.underpaid_overpaid_lists(),
                 'scenarios_comparison': self._build_scenarios_percentage_comparison(
                     current_scenario, scenarios
                 )
@@ -486,362 +535,6 @@ class SalaryScenarioViewSet(viewsets.ModelViewSet):
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    def _normalize_grade_level(self, grade_level):
-        """
-        Normalize grade level - convert all variations to standard format
-        Examples: 
-          - MGR_M, MGR_m, MGR_Median -> M
-          - MGR_UQ, MGR_uq, MGR_UpperQuartile -> UQ
-          - DIRECTOR_LD -> LD
-        """
-        if not grade_level:
-            return None
-        
-        grade_upper = grade_level.upper()
-        
-        # Mapping for all possible variations
-        level_mappings = {
-            'LD': ['LD', 'LOWERDECILE', 'LOWER_DECILE', 'L_D', 'LOWER-DECILE'],
-            'LQ': ['LQ', 'LOWERQUARTILE', 'LOWER_QUARTILE', 'L_Q', 'LOWER-QUARTILE'],
-            'M': ['M', 'MEDIAN', 'MED'],
-            'UQ': ['UQ', 'UPPERQUARTILE', 'UPPER_QUARTILE', 'U_Q', 'UPPER-QUARTILE'],
-            'UD': ['UD', 'UPPERDECILE', 'UPPER_DECILE', 'U_D', 'UPPER-DECILE']
-        }
-        
-        # Split by underscore to get level part
-        parts = grade_upper.split('_')
-        
-        if len(parts) >= 2:
-            level_part = parts[-1]  # Last part is the level
-            
-            # Find matching standard level
-            for standard_level, variations in level_mappings.items():
-                if level_part in variations or any(v in level_part for v in variations):
-                    return standard_level
-        
-        # If no underscore, check if entire string matches
-        for standard_level, variations in level_mappings.items():
-            if grade_upper in variations:
-                return standard_level
-        
-        logger.warning(f"⚠️ Could not normalize grade level: {grade_level}")
-        return None
-    
-    def _get_employee_current_salary(self, employee, current_scenario):
-        """
-        Get employee's current salary from current scenario based on their grading level
-        This is their ACTUAL current salary, not what it should be
-        """
-        grading_level = employee.get('grading_level')
-        position_name = employee.get('position_group__name')
-        
-        if not grading_level or not current_scenario.calculated_grades:
-            logger.warning(f"⚠️ No grading level or calculated grades for {employee.get('full_name')}")
-            return 0
-        
-        # Normalize the grade level
-        normalized_level = self._normalize_grade_level(grading_level)
-        
-        if not normalized_level:
-            logger.warning(f"⚠️ Could not normalize grade level: {grading_level} for {employee.get('full_name')}")
-            return 0
-        
-        # Find matching position in current scenario
-        for pos_name, grades in current_scenario.calculated_grades.items():
-            if self._positions_match(position_name, pos_name):
-                if isinstance(grades, dict):
-                    salary = grades.get(normalized_level, 0)
-                    return float(salary) if salary else 0
-        
-        logger.warning(f"⚠️ No matching position {position_name} found in current scenario for {employee.get('full_name')}")
-        return 0
-    
-    def _get_employee_scenario_salary(self, employee, scenario):
-        """
-        Get what employee's salary SHOULD BE according to a scenario
-        """
-        grading_level = employee.get('grading_level')
-        position_name = employee.get('position_group__name')
-        
-        if not grading_level or not scenario.calculated_grades:
-            return 0
-        
-        # Normalize the grade level
-        normalized_level = self._normalize_grade_level(grading_level)
-        
-        if not normalized_level:
-            return 0
-        
-        # Find matching position in scenario
-        for pos_name, grades in scenario.calculated_grades.items():
-            if self._positions_match(position_name, pos_name):
-                if isinstance(grades, dict):
-                    salary = grades.get(normalized_level, 0)
-                    return float(salary) if salary else 0
-        
-        return 0
-    
-    def _positions_match(self, emp_position, scenario_position):
-        """Check if employee position matches scenario position"""
-        if not emp_position or not scenario_position:
-            return False
-        
-        emp_pos_upper = emp_position.upper().replace(' ', '_').replace('-', '_')
-        scen_pos_upper = scenario_position.upper().replace(' ', '_').replace('-', '_')
-        
-        # Direct match
-        if emp_pos_upper == scen_pos_upper:
-            return True
-        
-        # Partial match
-        if emp_pos_upper in scen_pos_upper or scen_pos_upper in emp_pos_upper:
-            return True
-        
-        return False
-    
-    def _build_total_cost_comparison(self, current_scenario, scenarios, employees):
-        """
-        Figure 1: Total Cost Comparison Table
-        Total salary cost per position for current vs scenarios
-        """
-        from collections import defaultdict
-        
-        position_costs = defaultdict(lambda: {
-            'current': 0,
-            'scenarios': {}
-        })
-        
-        for emp in employees:
-            position = emp['position_group__name']
-            
-            # Current salary (from current scenario + employee grading)
-            current_salary = self._get_employee_current_salary(emp, current_scenario)
-            position_costs[position]['current'] += current_salary
-            
-            # Each scenario salary
-            for scenario in scenarios:
-                scenario_name = scenario.name
-                if scenario_name not in position_costs[position]['scenarios']:
-                    position_costs[position]['scenarios'][scenario_name] = 0
-                
-                scenario_salary = self._get_employee_scenario_salary(emp, scenario)
-                position_costs[position]['scenarios'][scenario_name] += scenario_salary
-        
-        # Format output with totals
-        result = {
-            'positions': {},
-            'totals': {
-                'current': 0,
-                'scenarios': {}
-            }
-        }
-        
-        for position, costs in position_costs.items():
-            result['positions'][position] = {
-                'current': round(costs['current']),
-                'scenarios': {
-                    name: round(value) 
-                    for name, value in costs['scenarios'].items()
-                }
-            }
-            
-            result['totals']['current'] += costs['current']
-            for scenario_name, value in costs['scenarios'].items():
-                if scenario_name not in result['totals']['scenarios']:
-                    result['totals']['scenarios'][scenario_name] = 0
-                result['totals']['scenarios'][scenario_name] += value
-        
-        result['totals']['current'] = round(result['totals']['current'])
-        result['totals']['scenarios'] = {
-            name: round(value)
-            for name, value in result['totals']['scenarios'].items()
-        }
-        
-        for name, value in result['totals']['scenarios'].items():
-            logger.info(f"💰 Total Cost - {name}: {value}")
-        
-        return result
-    
-    def _build_employee_analysis(self, current_scenario, scenarios, employees):
-        """
-        Figure 2: Employee Analysis - Headcount by Grade
-        Shows distribution: how many employees are over/under/at their grade
-        """
-        from collections import defaultdict
-        
-        analysis = {}
-        positions = set(emp['position_group__name'] for emp in employees)
-        
-        for position in positions:
-            position_employees = [
-                emp for emp in employees 
-                if emp['position_group__name'] == position
-            ]
-            
-            if not position_employees:
-                continue
-            
-            analysis[position] = {
-                'total_employees': len(position_employees),
-                'current_grading': defaultdict(lambda: {
-                    'count': 0,
-                    'over': 0,
-                    'at': 0,
-                    'under': 0
-                }),
-                'scenarios': {}
-            }
-            
-            # Current scenario analysis
-            for emp in position_employees:
-                grade = self._normalize_grade_level(emp['grading_level'])
-                if not grade:
-                    continue
-                
-                # Employee's current salary (from current scenario)
-                current_salary = self._get_employee_current_salary(emp, current_scenario)
-                
-                # What the grade midpoint is in current scenario
-                grade_salary = self._get_grade_salary(current_scenario, emp['position_group__name'], grade)
-                
-                analysis[position]['current_grading'][grade]['count'] += 1
-                
-                if grade_salary == 0:
-                    continue
-                
-                # Over/Under/At calculation with 2% tolerance
-                if current_salary > grade_salary * 1.02:
-                    analysis[position]['current_grading'][grade]['over'] += 1
-                elif current_salary < grade_salary * 0.98:
-                    analysis[position]['current_grading'][grade]['under'] += 1
-                else:
-                    analysis[position]['current_grading'][grade]['at'] += 1
-            
-            # Each scenario analysis
-            for scenario in scenarios:
-                scenario_name = scenario.name
-                scenario_data = defaultdict(lambda: {
-                    'count': 0,
-                    'over': 0,
-                    'at': 0,
-                    'under': 0
-                })
-                
-                for emp in position_employees:
-                    grade = self._normalize_grade_level(emp['grading_level'])
-                    if not grade:
-                        continue
-                    
-                    # Employee's current salary (stays same)
-                    current_salary = self._get_employee_current_salary(emp, current_scenario)
-                    
-                    # What the grade midpoint WOULD BE in this scenario
-                    scenario_salary = self._get_grade_salary(scenario, emp['position_group__name'], grade)
-                    
-                    scenario_data[grade]['count'] += 1
-                    
-                    if scenario_salary == 0:
-                        continue
-                    
-                    if current_salary > scenario_salary * 1.02:
-                        scenario_data[grade]['over'] += 1
-                    elif current_salary < scenario_salary * 0.98:
-                        scenario_data[grade]['under'] += 1
-                    else:
-                        scenario_data[grade]['at'] += 1
-                
-                analysis[position]['scenarios'][scenario_name] = dict(scenario_data)
-            
-            analysis[position]['current_grading'] = dict(analysis[position]['current_grading'])
-        
-        return analysis
-    
-    def _get_grade_salary(self, scenario, position_name, grade_level):
-        """
-        Get the midpoint (M) salary for a specific grade level in a scenario
-        """
-        if not scenario.calculated_grades:
-            return 0
-        
-        for pos_name, grades in scenario.calculated_grades.items():
-            if self._positions_match(position_name, pos_name):
-                if isinstance(grades, dict):
-                    # Return median (M) value for the grade
-                    return float(grades.get(grade_level, 0) or 0)
-        
-        return 0
-    
-    def _build_underpaid_overpaid_lists(self, current_scenario, scenarios, employees):
-        """
-        Underpaid and Overpaid employee lists
-        Compares employee's current salary vs what scenario says it should be
-        """
-        result = {}
-        
-        for scenario in scenarios:
-            scenario_name = scenario.name
-            underpaid = []
-            overpaid = []
-            
-            for emp in employees:
-                # Employee's current salary (from current scenario + their grading)
-                current_salary = self._get_employee_current_salary(emp, current_scenario)
-                
-                if current_salary == 0:
-                    continue
-                
-                # What salary SHOULD BE according to this scenario
-                grade_level = self._normalize_grade_level(emp['grading_level'])
-                if not grade_level:
-                    continue
-                
-                scenario_salary = self._get_grade_salary(
-                    scenario, 
-                    emp['position_group__name'], 
-                    grade_level
-                )
-                
-                if scenario_salary == 0:
-                    continue
-                
-                # Calculate difference
-                difference = scenario_salary - current_salary
-                diff_percent = (difference / current_salary * 100) if current_salary > 0 else 0
-                
-                employee_info = {
-                    'employee_id': emp['employee_id'],
-                    'employee_name': emp['full_name'],
-                    'position': emp['position_group__name'],
-                    'department': emp['department__name'] or 'N/A',
-                    'start_date': str(emp['start_date']) if emp['start_date'] else 'N/A',
-                    'current_salary': round(current_salary),
-                    'scenario_salary': round(scenario_salary),
-                    'difference': round(difference),
-                    'difference_percent': round(diff_percent, 1),
-                    'grading_level': grade_level
-                }
-                
-                # 2% tolerance for classification
-                if scenario_salary < current_salary * 0.98:
-                    # Scenario suggests lower salary - employee is OVERPAID
-                    overpaid.append(employee_info)
-                elif scenario_salary > current_salary * 1.02:
-                    # Scenario suggests higher salary - employee is UNDERPAID
-                    underpaid.append(employee_info)
-            
-            # Sort by absolute difference
-            underpaid.sort(key=lambda x: x['difference'], reverse=True)
-            overpaid.sort(key=lambda x: abs(x['difference']), reverse=True)
-            
-            result[scenario_name] = {
-                'underpaid': underpaid,
-                'overpaid': overpaid
-            }
-            
-          
-        
-        return result
-    
     def _build_scenarios_percentage_comparison(self, current_scenario, scenarios):
         """
         Figure 3: Scenarios Comparison - Percentage Differences
@@ -899,11 +592,11 @@ class SalaryScenarioViewSet(viewsets.ModelViewSet):
     def current_scenario(self, request):
         """Get current active scenario"""
         try:
-            try:
-                current_scenario = SalaryScenario.objects.get(status='CURRENT')
+            current_scenario = CurrentStructureCache.get_current_scenario()
+            if current_scenario is not None:
                 serializer = SalaryScenarioDetailSerializer(current_scenario)
                 return Response(serializer.data)
-            except SalaryScenario.DoesNotExist:
+            else:
                 return Response({
                     'message': 'No current scenario found',
                     'current_scenario': None